@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""
+Dependabot PR Merger Benchmark
+==============================
+Run dependabot-pr-merge.py against the local mock GitHub (mock_github.py)
+for a grid of N repos x M PRs and report, per scenario:
+
+  - wall-clock time
+  - API calls (total, writes, 304s) and the busiest endpoints
+  - seconds spent sleeping (summed across workers: polling, pacing, waits)
+  - PRs actually merged
+
+Each scenario gets a fresh mock, a fresh copy of the script (no state
+carried over) and a temporary working directory (cold ETag cache, own logs).
+With --warm the scenario runs once beforehand in that directory, so the
+measured run schedules from the first run's journal (merge timings).
+
+Usage:
+  # Default grid: 5 and 20 repos x 2 PRs, every scenario
+  python benchmark.py
+
+  # Polling behaviour only: drop the 1s spacing between merges
+  python benchmark.py --scenarios merge,merge-parallel --write-interval 0
+
+  # Discovery at scale, with a per-endpoint breakdown
+  python benchmark.py --repos 100,1000 --prs 2 --scenarios list,list-search -v
+
+  # Throughput under a tight quota: 1 token vs. a pool of 4
+  python benchmark.py --scenarios list --repos 200 --rate-limit 100 --rate-window 10
+  python benchmark.py --scenarios list --repos 200 --rate-limit 100 --rate-window 10 --tokens 4
+
+  # Longest-chain-first scheduling: every 4th repo has 5x slower CI
+  python benchmark.py --scenarios merge-checks --repos 16 --prs 3 --ci 2 \
+    --slow-every 4 --concurrency 4 --write-interval 0 --warm
+
+  # Discovery over a 100ms network: pages after the first are fetched in parallel
+  python benchmark.py --scenarios list --repos 1000 --prs 0 --latency 0.1
+
+  # Save results to compare against a later run
+  python benchmark.py --json before.json
+  python benchmark.py --json after.json --compare before.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from mock_github import DEFAULT_ORG, RATE_LIMIT, MockGitHub  # noqa: E402
+
+# ─────────────────────────────────────────────
+# Configuration
+# ─────────────────────────────────────────────
+DEFAULT_SCRIPT = Path(__file__).resolve().parent.parent / "dependabot-pr-merge.py"
+
+# name -> CLI arguments (after `--org`); {c} is --concurrency
+SCENARIOS = {
+    "list": ["list"],
+    "list-search": ["list", "--discovery", "search"],
+    "merge": ["merge", "-y"],
+    "merge-parallel": ["merge", "-y", "--concurrency", "{c}"],
+    "merge-checks": ["merge", "-y", "--wait-checks", "--concurrency", "{c}"],
+    "merge-train": ["merge", "-y", "--train", "--concurrency", "{c}"],
+    "auto-merge": ["merge", "-y", "--auto-merge"],
+}
+
+
+class Color:
+    GREEN = "\033[92m"
+    YELLOW = "\033[93m"
+    RED = "\033[91m"
+    BOLD = "\033[1m"
+    DIM = "\033[2m"
+    RESET = "\033[0m"
+
+
+@dataclass
+class Result:
+    scenario: str
+    repos: int
+    prs: int
+    wall: float = 0.0
+    calls: int = 0
+    writes: int = 0
+    not_modified: int = 0
+    sleep: float = 0.0
+    sleep_reasons: dict[str, float] = field(default_factory=dict)
+    merged: int = 0
+    exit_code: int = 0
+    endpoints: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def key(self) -> str:
+        return f"{self.scenario} {self.repos}x{self.prs}"
+
+
+# ─────────────────────────────────────────────
+# Running one scenario
+# ─────────────────────────────────────────────
+def _load_script(path: Path):
+    """Import a fresh copy of the merger (module globals reset per scenario)."""
+    spec = importlib.util.spec_from_file_location("dependabot_pr_merge_bench", path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module  # dataclasses resolve annotations through here
+    spec.loader.exec_module(module)
+    return module
+
+
+def run_scenario(args: argparse.Namespace, scenario: str, repos: int, prs: int) -> Result:
+    with tempfile.TemporaryDirectory(prefix="dpm-bench-") as tmp:
+        if args.warm:
+            # Keep the warm-up's journal (merge timings), not its ETag cache.
+            _run_once(args, scenario, repos, prs, Path(tmp))
+            shutil.rmtree(Path(tmp) / ".cache", ignore_errors=True)
+        return _run_once(args, scenario, repos, prs, Path(tmp))
+
+
+def _run_once(
+    args: argparse.Namespace, scenario: str, repos: int, prs: int, workdir: Path
+) -> Result:
+    mock = MockGitHub(
+        repos=repos,
+        prs=prs,
+        settle=args.settle,
+        ci=args.ci,
+        run=args.run,
+        conflict_every=args.conflict_every,
+        missing_every=args.missing_every,
+        slow_every=args.slow_every,
+        slow_factor=args.slow_factor,
+        rate_limit=args.rate_limit,
+        rate_window=args.rate_window,
+        latency=args.latency,
+    )
+    url = mock.start()
+    script = _load_script(args.script)
+    script.GITHUB_API = url
+    script.WRITE_INTERVAL = args.write_interval
+
+    # Every wait in the script goes through _sleep(); sum it across threads
+    # (scripts with a request profile also break it down by reason).
+    slept = [0.0]
+    lock = threading.Lock()
+    real_sleep = script._sleep
+
+    def timed_sleep(seconds: float, *reason):
+        start = time.perf_counter()
+        try:
+            real_sleep(seconds, *reason)
+        finally:
+            with lock:
+                slept[0] += time.perf_counter() - start
+
+    script._sleep = timed_sleep
+
+    argv = [a.replace("{c}", str(args.concurrency)) for a in SCENARIOS[scenario]]
+    argv[1:1] = ["--org", DEFAULT_ORG]
+    if argv[0] == "merge":
+        argv += ["--poll-interval", str(args.poll_interval)]
+    result = Result(scenario=scenario, repos=repos, prs=prs)
+
+    cwd = os.getcwd()
+    old_argv = sys.argv
+    old_env = {k: os.environ.get(k) for k in ("GITHUB_TOKEN", "GITHUB_TOKENS")}
+    output = io.StringIO()
+    os.chdir(workdir)
+    sys.argv = ["dependabot-pr-merge.py", *argv]
+    os.environ["GITHUB_TOKEN"] = "bench"
+    # Scripts without a token pool just ignore GITHUB_TOKENS.
+    os.environ["GITHUB_TOKENS"] = ",".join(f"bench-{i}" for i in range(2, args.tokens + 1))
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+            script.main()
+    except SystemExit as e:
+        result.exit_code = e.code if isinstance(e.code, int) else 1
+    finally:
+        result.wall = time.perf_counter() - start
+        os.chdir(cwd)
+        sys.argv = old_argv
+        for k, v in old_env.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+        mock.stop()
+
+    # main() configures the root logger on first use; drop its handlers so the
+    # next scenario's basicConfig() attaches to that scenario's redirected output.
+    for handler in list(script.logging.root.handlers):
+        script.logging.root.removeHandler(handler)
+
+    result.calls = sum(mock.calls.values())
+    result.writes = mock.writes
+    result.not_modified = mock.not_modified
+    result.sleep = slept[0]
+    if hasattr(script, "_profile"):
+        result.sleep_reasons = {
+            reason: e["seconds"] for reason, e in script._profile.snapshot()["sleep"].items()
+        }
+    result.merged = mock.merged()
+    result.endpoints = dict(mock.calls.most_common())
+    if args.verbose > 1 or result.exit_code:
+        print(output.getvalue())
+    return result
+
+
+# ─────────────────────────────────────────────
+# Report
+# ─────────────────────────────────────────────
+def _delta(new: float, old: float | None) -> str:
+    if not old:
+        return ""
+    change = (new - old) / old * 100
+    if abs(change) < 5:
+        return f" {Color.DIM}(±{abs(change):.0f}%){Color.RESET}"
+    color = Color.RED if change > 0 else Color.GREEN
+    return f" {color}({change:+.0f}%){Color.RESET}"
+
+
+def print_report(results: list[Result], baseline: dict[str, dict], verbose: int):
+    print(
+        f"\n{Color.BOLD}{'Scenario':<16} {'Repos×PRs':>10} {'Wall (s)':>10} "
+        f"{'Calls':>7} {'Writes':>7} {'304s':>6} {'Sleep (s)':>10} {'Merged':>7}{Color.RESET}"
+    )
+    for r in results:
+        old = baseline.get(r.key, {})
+        status = "" if r.exit_code == 0 else f"  {Color.RED}exit {r.exit_code}{Color.RESET}"
+        print(
+            f"{r.scenario:<16} {f'{r.repos}×{r.prs}':>10} {r.wall:>10.2f} "
+            f"{r.calls:>7} {r.writes:>7} {r.not_modified:>6} {r.sleep:>10.1f} {r.merged:>7}"
+            f"{_delta(r.wall, old.get('wall'))}{_delta(r.calls, old.get('calls'))}{status}"
+        )
+        if verbose:
+            for endpoint, n in r.endpoints.items():
+                print(f"{Color.DIM}{'':<18}{n:>7}  {endpoint}{Color.RESET}")
+            for reason, seconds in r.sleep_reasons.items():
+                print(f"{Color.DIM}{'':<18}{seconds:>6.1f}s sleep: {reason}{Color.RESET}")
+    if baseline:
+        print(f"\n{Color.DIM}(±%: wall time, then API calls, vs. --compare){Color.RESET}")
+    print(
+        f"{Color.DIM}Sleep is summed over all worker threads, so it can exceed "
+        f"wall time with --concurrency.{Color.RESET}"
+    )
+
+
+# ─────────────────────────────────────────────
+# Main
+# ─────────────────────────────────────────────
+def _int_list(value: str) -> list[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark dependabot-pr-merge.py against a mock GitHub",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=f"Scenarios: {', '.join(SCENARIOS)}",
+    )
+    parser.add_argument(
+        "--repos", type=_int_list, default=[5, 20], help="Repo counts (default: 5,20)"
+    )
+    parser.add_argument(
+        "--prs", type=_int_list, default=[2], help="PRs per repo (default: 2)"
+    )
+    parser.add_argument(
+        "--scenarios",
+        default=",".join(SCENARIOS),
+        help="Comma-separated scenarios to run (default: all)",
+    )
+    parser.add_argument(
+        "--script", type=Path, default=DEFAULT_SCRIPT, help="Merger script to benchmark"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=8,
+        help="--concurrency for the parallel scenarios (default: 8)",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=int,
+        default=1,
+        help="--poll-interval passed to merge (default: 1)",
+    )
+    parser.add_argument(
+        "--write-interval",
+        type=float,
+        default=1.0,
+        help="Seconds between merges/updates, the script's WRITE_INTERVAL "
+        "(default: 1.0, as against GitHub)",
+    )
+    parser.add_argument(
+        "--warm",
+        action="store_true",
+        help="Run each scenario once first in the same directory (merge history)",
+    )
+    parser.add_argument(
+        "--tokens",
+        type=int,
+        default=1,
+        help="Tokens handed to the script (GITHUB_TOKEN + GITHUB_TOKENS; default: 1)",
+    )
+    mock = parser.add_argument_group("mock GitHub")
+    mock.add_argument(
+        "--settle",
+        type=float,
+        default=0.5,
+        help="Seconds `mergeable` stays unknown after a head change (default: 0.5)",
+    )
+    mock.add_argument(
+        "--ci",
+        type=float,
+        default=0.0,
+        help="Seconds a PR stays blocked on checks (default: 0)",
+    )
+    mock.add_argument(
+        "--run",
+        type=float,
+        default=1.0,
+        help="Seconds a merge commit's workflow run lasts (default: 1)",
+    )
+    mock.add_argument(
+        "--conflict-every",
+        type=int,
+        default=0,
+        help="Make every Nth PR conflict (default: none)",
+    )
+    mock.add_argument(
+        "--missing-every",
+        type=int,
+        default=0,
+        help="Make every Nth PR listed but deleted: lookups get NOT_FOUND (default: none)",
+    )
+    mock.add_argument(
+        "--slow-every",
+        type=int,
+        default=0,
+        help="Make every Nth repo slow (default: none)",
+    )
+    mock.add_argument(
+        "--slow-factor",
+        type=float,
+        default=5.0,
+        help="Check/workflow time multiplier for slow repos (default: 5)",
+    )
+    mock.add_argument(
+        "--rate-limit",
+        type=int,
+        default=RATE_LIMIT,
+        help=f"Requests per token and resource per window (default: {RATE_LIMIT})",
+    )
+    mock.add_argument(
+        "--rate-window",
+        type=int,
+        default=3600,
+        help="Rate-limit window in seconds (default: 3600)",
+    )
+    mock.add_argument(
+        "--latency",
+        type=float,
+        default=0.0,
+        help="Seconds the mock adds to every response, like a network round trip (default: 0)",
+    )
+    parser.add_argument("--json", type=Path, help="Write results to this JSON file")
+    parser.add_argument(
+        "--compare", type=Path, help="Show changes against an earlier --json file"
+    )
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        action="count",
+        default=0,
+        help="-v: per-endpoint calls, -vv: also the script's output",
+    )
+    args = parser.parse_args()
+
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = [s for s in scenarios if s not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    baseline = {}
+    if args.compare:
+        baseline = {
+            f"{r['scenario']} {r['repos']}x{r['prs']}": r
+            for r in json.loads(args.compare.read_text())
+        }
+
+    results = []
+    for scenario in scenarios:
+        for repos in args.repos:
+            for prs in args.prs:
+                print(f"{Color.DIM}running {scenario} {repos}×{prs}...{Color.RESET}", flush=True)
+                results.append(run_scenario(args, scenario, repos, prs))
+
+    print_report(results, baseline, args.verbose)
+    if args.json:
+        args.json.write_text(json.dumps([asdict(r) for r in results], indent=2))
+        print(f"\nResults saved to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,705 @@
+#!/usr/bin/env python3
+"""
+Mock GitHub API
+===============
+A local stand-in for the parts of the GitHub REST/GraphQL API that
+dependabot-pr-merge.py talks to, so its scaling can be measured without
+touching real GitHub (see benchmark.py).
+
+Simulated:
+  - N repos x M open Dependabot PRs (every `conflict_every`-th PR conflicts,
+    every `missing_every`-th is listed but deleted: lookups say NOT_FOUND)
+  - Optionally every `slow_every`-th repo has `slow_factor` x longer checks
+    and workflow runs (a slow repo late in alphabetical order)
+  - Asynchronous mergeability: `mergeable: null` / `unknown` for `settle`
+    seconds after a PR's head changes, then `blocked` while checks run for
+    `ci` seconds, then `clean` (or `behind` once another PR has merged)
+  - A push workflow run per merge commit lasting `run` seconds
+  - update-branch, train endpoints (refs, merges, PR create/close), auto-merge
+  - Rate-limit headers per token and resource (core / graphql), ETag + 304
+    (free, like GitHub), Link pagination, and optional secondary limits on writes
+  - Optional per-response latency (`latency` seconds), like a real round trip
+  - Per-endpoint call counters
+
+Usage:
+  # Serve 20 repos x 3 PRs on :8000 until Ctrl-C
+  python mock_github.py --repos 20 --prs 3 --port 8000
+  curl -s localhost:8000/orgs/bench/repos | head
+
+  # From Python
+  mock = MockGitHub(repos=20, prs=3)
+  url = mock.start()
+  ...
+  print(mock.calls)
+  mock.stop()
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+# ─────────────────────────────────────────────
+# Configuration
+# ─────────────────────────────────────────────
+DEFAULT_ORG = "bench"
+RATE_LIMIT = 5000  # per resource per hour, like a personal token
+MAX_PER_PAGE = 100
+DEPENDABOT = "dependabot[bot]"
+
+# Endpoint labels (same templates as the script's --profile), so counters
+# aggregate per endpoint.
+ENDPOINT_PATTERNS = [
+    (re.compile(r"^/repos/[^/]+/[^/]+"), "/repos/{o}/{r}"),
+    (re.compile(r"/(pulls|issues)/\d+"), r"/\1/{n}"),
+    (re.compile(r"/(git/refs?)/heads/.+"), r"/\1/heads/{ref}"),
+    (re.compile(r"^/(orgs|users)/[^/]+"), r"/\1/{org}"),
+]
+
+
+# ─────────────────────────────────────────────
+# Simulated state
+# ─────────────────────────────────────────────
+@dataclass
+class MockPR:
+    number: int
+    title: str
+    head: str
+    sha: str
+    updated: float  # last head change: mergeability restarts from here
+    ci: float = 0.0  # seconds blocked on checks after settling
+    author: str = DEPENDABOT
+    dirty: bool = False
+    behind: bool = False
+    open: bool = True
+    merged_at: str | None = None
+    auto_merge: str | None = None  # merge method once auto-merge is enabled
+    gone: bool = False  # still listed, but lookups say NOT_FOUND (deleted since)
+
+
+@dataclass
+class MockRepo:
+    name: str
+    pushed_at: str
+    prs: dict[int, MockPR] = field(default_factory=dict)
+    runs: list[tuple[str, float]] = field(default_factory=list)  # (head_sha, ends_at)
+    branches: dict[str, str] = field(default_factory=dict)
+    base_sha: str = ""
+    slow: float = 1.0  # multiplier on this repo's check and workflow time
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def endpoint_label(method: str, path: str) -> str:
+    for pattern, repl in ENDPOINT_PATTERNS:
+        path = pattern.sub(repl, path)
+    return f"{method} {path}"
+
+
+class MockGitHub:
+    """In-process GitHub stand-in; start() returns its base URL."""
+
+    def __init__(
+        self,
+        repos: int = 10,
+        prs: int = 2,
+        org: str = DEFAULT_ORG,
+        settle: float = 0.5,
+        ci: float = 0.0,
+        run: float = 1.0,
+        conflict_every: int = 0,
+        missing_every: int = 0,
+        slow_every: int = 0,
+        slow_factor: float = 5.0,
+        secondary_every: int = 0,
+        rate_limit: int = RATE_LIMIT,
+        rate_window: int = 3600,
+        latency: float = 0.0,
+    ):
+        self.org = org
+        self.latency = latency
+        self.settle = settle
+        self.ci = ci
+        self.run = run
+        self.secondary_every = secondary_every
+        self.lock = threading.Lock()
+        self.calls: Counter[str] = Counter()
+        self.not_modified = 0
+        self.writes = 0
+        self._window = rate_window
+        self._reset = int(time.time()) + rate_window
+        self._limit = rate_limit
+        self._remaining: dict[tuple[str, str], int] = {}  # (token, resource) -> left
+        self._server: ThreadingHTTPServer | None = None
+        self._seq = 0
+        self._auto: list[tuple[MockRepo, MockPR]] = []  # auto-merge enabled, still open
+
+        self.repos: dict[str, MockRepo] = {}
+        number = 0
+        for i in range(repos):
+            name = f"repo-{i:04d}"
+            repo = MockRepo(name=name, pushed_at=_now_iso(), base_sha=self._sha())
+            if slow_every and i % slow_every == slow_every - 1:
+                repo.slow = slow_factor
+            created = time.time() - settle - ci * repo.slow  # PRs start out settled
+            for j in range(prs):
+                number += 1
+                repo.prs[number] = MockPR(
+                    number=number,
+                    title=f"Bump pkg{j} from 1.{j}.0 to 1.{j}.1",
+                    head=f"dependabot/pip/pkg{j}-1.{j}.1",
+                    sha=self._sha(),
+                    updated=created,
+                    ci=ci * repo.slow,
+                    dirty=bool(conflict_every) and number % conflict_every == 0,
+                    gone=bool(missing_every) and number % missing_every == 0,
+                )
+            self.repos[name] = repo
+
+    # ── lifecycle ──
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        self._server = ThreadingHTTPServer((host, port), _make_handler(self))
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+    # ── summaries ──
+    def merged(self) -> int:
+        return sum(1 for r in self.repos.values() for p in r.prs.values() if p.merged_at)
+
+    def open_dependabot(self) -> int:
+        return sum(
+            1
+            for r in self.repos.values()
+            for p in r.prs.values()
+            if p.open and p.author == DEPENDABOT
+        )
+
+    # ── simulation helpers (call with self.lock held) ──
+    def _sha(self) -> str:
+        self._seq += 1
+        return hashlib.sha1(str(self._seq).encode()).hexdigest()
+
+    def merge_state(self, pr: MockPR) -> tuple[bool | None, str]:
+        """REST-style (mergeable, mergeable_state) at this moment."""
+        age = time.time() - pr.updated
+        if age < self.settle:
+            return None, "unknown"
+        if pr.dirty:
+            return False, "dirty"
+        if pr.behind:
+            return True, "behind"
+        if age < self.settle + pr.ci:
+            return True, "blocked"
+        return True, "clean"
+
+    def tick(self):
+        """Let GitHub's auto-merge land every PR that became clean."""
+        pending = []
+        for repo, pr in self._auto:
+            if pr.open and self.merge_state(pr)[1] == "clean":
+                self.merge(repo, pr)
+            elif pr.open:
+                pending.append((repo, pr))
+        self._auto = pending
+
+    def merge(self, repo: MockRepo, pr: MockPR) -> str:
+        pr.open = False
+        pr.merged_at = _now_iso()
+        repo.base_sha = self._sha()
+        repo.pushed_at = _now_iso()
+        repo.runs.append((repo.base_sha, time.time() + self.run * repo.slow))
+        for other in repo.prs.values():
+            if other.open:
+                other.behind = True
+        return repo.base_sha
+
+    def take_quota(self, token: str, resource: str) -> bool:
+        if time.time() >= self._reset:
+            self._reset = int(time.time()) + self._window
+            self._remaining.clear()
+        left = self._remaining.get((token, resource), self._limit)
+        if left <= 0:
+            return False
+        self._remaining[(token, resource)] = left - 1
+        return True
+
+    def refund_quota(self, token: str, resource: str):
+        self._remaining[(token, resource)] = self._remaining.get((token, resource), 0) + 1
+
+    def quota_headers(self, token: str, resource: str) -> dict[str, str]:
+        left = self._remaining.get((token, resource), self._limit)
+        return {
+            "X-RateLimit-Limit": str(self._limit),
+            "X-RateLimit-Remaining": str(max(left, 0)),
+            "X-RateLimit-Reset": str(self._reset),
+            "X-RateLimit-Resource": resource,
+        }
+
+    def pr_json(self, repo: MockRepo, pr: MockPR) -> dict:
+        mergeable, state = self.merge_state(pr)
+        return {
+            "number": pr.number,
+            "title": pr.title,
+            "state": "open" if pr.open else "closed",
+            "merged": bool(pr.merged_at),
+            "user": {"login": pr.author},
+            "head": {"ref": pr.head, "sha": pr.sha},
+            "base": {"ref": "main", "sha": repo.base_sha},
+            "html_url": f"https://github.com/{self.org}/{repo.name}/pull/{pr.number}",
+            "mergeable": mergeable,
+            "mergeable_state": state,
+        }
+
+    def graphql_node(self, repo: MockRepo, pr: MockPR) -> dict:
+        mergeable, state = self.merge_state(pr)
+        return {
+            "id": f"PR_{repo.name}_{pr.number}",
+            "number": pr.number,
+            "title": pr.title,
+            "url": f"https://github.com/{self.org}/{repo.name}/pull/{pr.number}",
+            "headRefName": pr.head,
+            "headRefOid": pr.sha,
+            "mergeable": {None: "UNKNOWN", True: "MERGEABLE", False: "CONFLICTING"}[mergeable],
+            "mergeStateStatus": state.upper(),
+            "state": "MERGED" if pr.merged_at else ("OPEN" if pr.open else "CLOSED"),
+            "mergedAt": pr.merged_at,
+            "autoMergeRequest": {"enabledAt": _now_iso()} if pr.auto_merge else None,
+            "repository": {"name": repo.name, "isArchived": False, "isDisabled": False},
+        }
+
+    def find_node(self, node_id: str) -> tuple[MockRepo, MockPR] | None:
+        m = re.fullmatch(r"PR_(.+)_(\d+)", node_id or "")
+        repo = self.repos.get(m.group(1)) if m else None
+        pr = repo.prs.get(int(m.group(2))) if repo else None
+        return (repo, pr) if pr else None
+
+
+# ─────────────────────────────────────────────
+# HTTP handler
+# ─────────────────────────────────────────────
+def _make_handler(mock: MockGitHub):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like api.github.com
+        disable_nagle_algorithm = True  # headers and body go out as separate writes
+        routes: dict[str, list] = {}  # filled in below
+
+        def log_message(self, fmt, *args):
+            pass
+
+        # ── plumbing ──
+        def _body(self) -> dict:
+            length = int(self.headers.get("Content-Length", 0))
+            return json.loads(self.rfile.read(length) or b"{}") if length else {}
+
+        def _token(self) -> str:
+            return self.headers.get("Authorization", "")
+
+        def _send(self, code: int, body=None, resource: str = "core", headers=None):
+            data = json.dumps(body).encode() if body is not None else b""
+            headers = dict(headers or {})
+            if self.command == "GET" and code == 200:
+                etag = f'"{hashlib.md5(data).hexdigest()}"'
+                headers["ETag"] = etag
+                if self.headers.get("If-None-Match") == etag:
+                    code, data = 304, b""
+                    mock.not_modified += 1
+                    mock.refund_quota(self._token(), resource)  # conditional hits are free
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            for k, v in {**mock.quota_headers(self._token(), resource), **headers}.items():
+                self.send_header(k, v)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _page(self, items: list, query: dict, path: str):
+            per = min(int(query.get("per_page", 30)), MAX_PER_PAGE)
+            page = max(int(query.get("page", 1)), 1)
+            last = max((len(items) + per - 1) // per, 1)
+            links = []
+            base = f"http://{self.headers.get('Host')}{path}"
+            for rel, n in (("next", page + 1), ("last", last)):
+                if page < last:
+                    links.append(f'<{base}?{urlencode({**query, "page": n})}>; rel="{rel}"')
+            headers = {"Link": ", ".join(links)} if links else None
+            self._send(200, items[(page - 1) * per : page * per], headers=headers)
+
+        def _dispatch(self, method: str):
+            url = urlparse(self.path)
+            query = {k: v[0] for k, v in parse_qs(url.query).items()}
+            resource = "graphql" if url.path == "/graphql" else "core"
+            body = self._body() if method in ("POST", "PUT", "PATCH") else {}
+            if mock.latency:
+                time.sleep(mock.latency)  # outside the lock: requests overlap, like GitHub's
+            with mock.lock:
+                mock.calls[endpoint_label(method, url.path)] += 1
+                if not mock.take_quota(self._token(), resource):
+                    return self._send(
+                        403, {"message": "API rate limit exceeded"}, resource=resource
+                    )
+                if method != "GET" and resource == "core":
+                    mock.writes += 1
+                    if mock.secondary_every and mock.writes % mock.secondary_every == 0:
+                        return self._send(
+                            403,
+                            {"message": "You have exceeded a secondary rate limit."},
+                            headers={"Retry-After": "1"},
+                        )
+                mock.tick()
+                if resource == "graphql":
+                    return self._graphql(body)
+                for pattern, handler in self.routes[method]:
+                    m = pattern.fullmatch(url.path)
+                    if m:
+                        return handler(self, query, body, url.path, *m.groups())
+                self._send(404, {"message": "Not Found"})
+
+        def do_GET(self):
+            self._dispatch("GET")
+
+        def do_POST(self):
+            self._dispatch("POST")
+
+        def do_PUT(self):
+            self._dispatch("PUT")
+
+        def do_PATCH(self):
+            self._dispatch("PATCH")
+
+        def do_DELETE(self):
+            self._dispatch("DELETE")
+
+        def _repo(self, owner: str, name: str) -> MockRepo | None:
+            return mock.repos.get(name) if owner == mock.org else None
+
+        # ── REST routes ──
+        def list_repos(self, query, body, path, kind, owner):
+            if owner != mock.org:
+                return self._send(404, {"message": "Not Found"})
+            items = [
+                {"name": r.name, "archived": False, "disabled": False, "pushed_at": r.pushed_at}
+                for r in mock.repos.values()
+            ]
+            self._page(items, query, path)
+
+        def list_pulls(self, query, body, path, owner, name):
+            repo = self._repo(owner, name)
+            if not repo:
+                return self._send(404, {"message": "Not Found"})
+            items = [
+                mock.pr_json(repo, pr)
+                for pr in sorted(repo.prs.values(), key=lambda p: -p.number)
+                if pr.open
+            ]
+            self._page(items, query, path)
+
+        def get_pull(self, query, body, path, owner, name, number):
+            repo = self._repo(owner, name)
+            pr = repo.prs.get(int(number)) if repo else None
+            if not pr or pr.gone:
+                return self._send(404, {"message": "Not Found"})
+            self._send(200, mock.pr_json(repo, pr))
+
+        def merge_pull(self, query, body, path, owner, name, number):
+            repo = self._repo(owner, name)
+            pr = repo.prs.get(int(number)) if repo else None
+            if not pr or not pr.open:
+                return self._send(404, {"message": "Not Found"})
+            if body.get("sha") and body["sha"] != pr.sha:
+                return self._send(409, {"message": "Head branch was modified."})
+            mergeable, state = mock.merge_state(pr)
+            if state not in ("clean", "unstable", "has_hooks"):
+                return self._send(405, {"message": f"Pull Request is not mergeable ({state})"})
+            sha = mock.merge(repo, pr)
+            self._send(200, {"merged": True, "sha": sha})
+
+        def update_branch(self, query, body, path, owner, name, number):
+            repo = self._repo(owner, name)
+            pr = repo.prs.get(int(number)) if repo else None
+            if not pr or not pr.open:
+                return self._send(404, {"message": "Not Found"})
+            pr.sha, pr.updated, pr.behind = mock._sha(), time.time(), False
+            repo.pushed_at = _now_iso()
+            self._send(202, {"message": "Updating pull request branch."})
+
+        def close_pull(self, query, body, path, owner, name, number):
+            repo = self._repo(owner, name)
+            pr = repo.prs.get(int(number)) if repo else None
+            if not pr:
+                return self._send(404, {"message": "Not Found"})
+            if body.get("state") == "closed":
+                pr.open = False
+            self._send(200, mock.pr_json(repo, pr))
+
+        def create_pull(self, query, body, path, owner, name):
+            repo = self._repo(owner, name)
+            if not repo or body.get("head") not in repo.branches:
+                return self._send(422, {"message": "Validation Failed"})
+            number = max((n for r in mock.repos.values() for n in r.prs), default=0) + 1
+            pr = MockPR(
+                number=number,
+                title=body.get("title", ""),
+                head=body["head"],
+                sha=repo.branches[body["head"]],
+                updated=time.time(),
+                ci=mock.ci * repo.slow,
+                author="bench-user",
+            )
+            repo.prs[number] = pr
+            self._send(201, mock.pr_json(repo, pr))
+
+        def get_ref(self, query, body, path, owner, name, ref):
+            repo = self._repo(owner, name)
+            if not repo:
+                return self._send(404, {"message": "Not Found"})
+            sha = repo.base_sha if ref == "main" else repo.branches.get(ref)
+            if not sha:
+                return self._send(404, {"message": "Not Found"})
+            self._send(200, {"ref": f"refs/heads/{ref}", "object": {"sha": sha}})
+
+        def create_ref(self, query, body, path, owner, name):
+            repo = self._repo(owner, name)
+            ref = body.get("ref", "").removeprefix("refs/heads/")
+            if not repo or not ref or ref in repo.branches:
+                return self._send(422, {"message": "Reference already exists"})
+            repo.branches[ref] = body.get("sha", repo.base_sha)
+            self._send(201, {"ref": body["ref"], "object": {"sha": repo.branches[ref]}})
+
+        def delete_ref(self, query, body, path, owner, name, ref):
+            repo = self._repo(owner, name)
+            if not repo or repo.branches.pop(ref, None) is None:
+                return self._send(422, {"message": "Reference does not exist"})
+            self._send(204)
+
+        def merge_into(self, query, body, path, owner, name):
+            repo = self._repo(owner, name)
+            if not repo or body.get("base") not in repo.branches:
+                return self._send(404, {"message": "Not Found"})
+            head = next((p for p in repo.prs.values() if p.head == body.get("head")), None)
+            if head and head.dirty:
+                return self._send(409, {"message": "Merge conflict"})
+            repo.branches[body["base"]] = mock._sha()
+            self._send(201, {"sha": repo.branches[body["base"]]})
+
+        def comment(self, query, body, path, owner, name, number):
+            self._send(201, {"body": body.get("body", "")})
+
+        def list_runs(self, query, body, path, owner, name):
+            repo = self._repo(owner, name)
+            if not repo:
+                return self._send(404, {"message": "Not Found"})
+            now = time.time()
+            runs = [
+                {
+                    "id": i,
+                    "head_sha": sha,
+                    "status": "completed" if ends <= now else "in_progress",
+                    "conclusion": "success" if ends <= now else None,
+                }
+                for i, (sha, ends) in enumerate(repo.runs)
+            ]
+            if "head_sha" in query:
+                runs = [r for r in runs if r["head_sha"] == query["head_sha"]]
+            if "status" in query:
+                runs = [r for r in runs if r["status"] == query["status"]]
+            self._send(200, {"total_count": len(runs), "workflow_runs": runs[:MAX_PER_PAGE]})
+
+        # ── GraphQL ──
+        def _graphql(self, body: dict):
+            query, variables = body.get("query", ""), body.get("variables") or {}
+            if "enablePullRequestAutoMerge" in query:
+                return self._send(200, self._enable_auto_merge(variables), resource="graphql")
+            if "search(" in query:
+                return self._send(200, self._search(variables), resource="graphql")
+            # Like GitHub: what resolved, plus a NOT_FOUND error (and a null
+            # value) per alias that didn't.
+            data, errors = {}, []
+            for alias, owner, name, number in re.findall(
+                r'(\w+): repository\(owner: "([^"]+)", name: "([^"]+)"\) '
+                r"\{ pullRequest\(number: (\d+)\)",
+                query,
+            ):
+                repo = self._repo(owner, name)
+                pr = repo.prs.get(int(number)) if repo else None
+                if not repo:
+                    data[alias] = None
+                    errors.append(
+                        {
+                            "type": "NOT_FOUND",
+                            "path": [alias],
+                            "message": f"Could not resolve to a Repository with the name '{owner}/{name}'.",
+                        }
+                    )
+                elif not pr or pr.gone:
+                    data[alias] = {"pullRequest": None}
+                    errors.append(
+                        {
+                            "type": "NOT_FOUND",
+                            "path": [alias, "pullRequest"],
+                            "message": f"Could not resolve to a PullRequest with the number of {number}.",
+                        }
+                    )
+                else:
+                    data[alias] = {"pullRequest": mock.graphql_node(repo, pr)}
+            body = {"data": data, "errors": errors} if errors else {"data": data}
+            self._send(200, body, resource="graphql")
+
+        def _search(self, variables: dict) -> dict:
+            nodes = [
+                mock.graphql_node(repo, pr)
+                for repo in mock.repos.values()
+                for pr in repo.prs.values()
+                if pr.open and pr.author == DEPENDABOT
+            ]
+            start = int(variables.get("after") or 0)
+            page = nodes[start : start + MAX_PER_PAGE]
+            return {
+                "data": {
+                    "search": {
+                        "issueCount": len(nodes),
+                        "pageInfo": {
+                            "hasNextPage": start + MAX_PER_PAGE < len(nodes),
+                            "endCursor": str(start + MAX_PER_PAGE),
+                        },
+                        "nodes": page,
+                    }
+                }
+            }
+
+        def _enable_auto_merge(self, variables: dict) -> dict:
+            found = mock.find_node(variables.get("id"))
+            if not found:
+                return {"errors": [{"message": "Could not resolve to a node"}]}
+            repo, pr = found
+            state = mock.merge_state(pr)[1]
+            if state in ("clean", "unstable", "has_hooks"):
+                return {"errors": [{"message": f"Pull request is in {state} status"}]}
+            if state == "dirty":
+                return {"errors": [{"message": "Pull request has merge conflicts"}]}
+            pr.auto_merge = variables.get("method", "SQUASH")
+            mock._auto.append((repo, pr))
+            node = mock.graphql_node(repo, pr)
+            return {"data": {"enablePullRequestAutoMerge": {"pullRequest": node}}}
+
+    repo_path = r"/repos/([^/]+)/([^/]+)"
+    Handler.routes = {
+        "GET": [
+            (re.compile(r"/(orgs|users)/([^/]+)/repos"), Handler.list_repos),
+            (re.compile(repo_path + r"/pulls"), Handler.list_pulls),
+            (re.compile(repo_path + r"/pulls/(\d+)"), Handler.get_pull),
+            (re.compile(repo_path + r"/git/ref/heads/(.+)"), Handler.get_ref),
+            (re.compile(repo_path + r"/actions/runs"), Handler.list_runs),
+        ],
+        "PUT": [
+            (re.compile(repo_path + r"/pulls/(\d+)/merge"), Handler.merge_pull),
+            (re.compile(repo_path + r"/pulls/(\d+)/update-branch"), Handler.update_branch),
+        ],
+        "POST": [
+            (re.compile(repo_path + r"/pulls"), Handler.create_pull),
+            (re.compile(repo_path + r"/git/refs"), Handler.create_ref),
+            (re.compile(repo_path + r"/merges"), Handler.merge_into),
+            (re.compile(repo_path + r"/issues/(\d+)/comments"), Handler.comment),
+        ],
+        "PATCH": [(re.compile(repo_path + r"/pulls/(\d+)"), Handler.close_pull)],
+        "DELETE": [(re.compile(repo_path + r"/git/refs/heads/(.+)"), Handler.delete_ref)],
+    }
+    return Handler
+
+
+# ─────────────────────────────────────────────
+# Main
+# ─────────────────────────────────────────────
+def main():
+    parser = argparse.ArgumentParser(description="Serve a mock GitHub API")
+    parser.add_argument("--repos", type=int, default=10, help="Number of repos (default: 10)")
+    parser.add_argument("--prs", type=int, default=2, help="Dependabot PRs per repo (default: 2)")
+    parser.add_argument("--org", default=DEFAULT_ORG, help=f"Org name (default: {DEFAULT_ORG})")
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8000, help="Port (default: 8000)")
+    parser.add_argument(
+        "--settle", type=float, default=0.5, help="Seconds mergeable stays unknown (default: 0.5)"
+    )
+    parser.add_argument(
+        "--ci", type=float, default=0.0, help="Seconds a PR stays blocked on checks (default: 0)"
+    )
+    parser.add_argument(
+        "--run", type=float, default=1.0, help="Seconds a merge's workflow run lasts (default: 1)"
+    )
+    parser.add_argument(
+        "--conflict-every", type=int, default=0, help="Make every Nth PR conflict (default: none)"
+    )
+    parser.add_argument(
+        "--missing-every",
+        type=int,
+        default=0,
+        help="Make every Nth PR listed but NOT_FOUND on lookup (default: none)",
+    )
+    parser.add_argument(
+        "--slow-every", type=int, default=0, help="Make every Nth repo slow (default: none)"
+    )
+    parser.add_argument(
+        "--slow-factor",
+        type=float,
+        default=5.0,
+        help="Check/workflow time multiplier for slow repos (default: 5)",
+    )
+    parser.add_argument(
+        "--rate-limit",
+        type=int,
+        default=RATE_LIMIT,
+        help=f"Requests per token and resource per window (default: {RATE_LIMIT})",
+    )
+    parser.add_argument(
+        "--rate-window", type=int, default=3600, help="Rate-limit window in seconds (default: 3600)"
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Seconds added to every response (default: 0)"
+    )
+    args = parser.parse_args()
+
+    mock = MockGitHub(
+        repos=args.repos,
+        prs=args.prs,
+        org=args.org,
+        settle=args.settle,
+        ci=args.ci,
+        run=args.run,
+        conflict_every=args.conflict_every,
+        missing_every=args.missing_every,
+        slow_every=args.slow_every,
+        slow_factor=args.slow_factor,
+        rate_limit=args.rate_limit,
+        rate_window=args.rate_window,
+        latency=args.latency,
+    )
+    url = mock.start(args.host, args.port)
+    print(f"Mock GitHub for org '{args.org}' on {url} (Ctrl-C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        mock.stop()
+        for endpoint, n in mock.calls.most_common():
+            print(f"{n:>7}  {endpoint}")
+
+
+if __name__ == "__main__":
+    main()
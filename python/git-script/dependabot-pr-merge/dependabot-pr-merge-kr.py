@@ -3,17 +3,19 @@
 Dependabot PR Bulk Merger
 =========================
 조직/사용자의 모든 리포지토리에서 열려 있는 Dependabot PR을 찾아
-순차적으로 머지합니다.
+머지합니다 (리포지토리 안에서는 하나씩).
 
 주요 기능:
   - list   : 모든 리포지토리의 열린 Dependabot PR 목록 조회
-  - merge  : Dependabot PR을 하나씩(순차적으로) 머지
+  - merge  : Dependabot PR을 리포지토리별로 하나씩 머지
+  - status : --auto-merge에 맡긴 PR 중 실제로 머지된 것을 보고
+  - watch  : 상주하면서 Dependabot PR이 준비되는 대로 머지
 
 사용 예시:
   # 열린 Dependabot PR 미리보기
   python dependabot-pr-merge.py list --org somaz94
 
-  # 모든 Dependabot PR 순차 머지 (기본 squash)
+  # 모든 Dependabot PR 머지 (기본 squash)
   python dependabot-pr-merge.py merge --org somaz94
 
   # 머지 방식 지정
@@ -28,43 +30,301 @@ Dependabot PR Bulk Merger
   # Dry-run 모드 (실제 머지 안 함)
   python dependabot-pr-merge.py merge --org somaz94 --dry-run
 
+  # 중단된 실행을 저널에서 이어서 진행
+  python dependabot-pr-merge.py merge --org somaz94 --resume logs/dependabot_merge_<ts>.jsonl
+
   # 확인 프롬프트 생략
   python dependabot-pr-merge.py merge --org somaz94 -y
+
+  # 최대 8개 repo의 머지 체인을 병렬 실행 (repo 내부는 직렬)
+  python dependabot-pr-merge.py merge --org somaz94 --concurrency 8
+
+  # repo별 Dependabot PR을 하나의 PR로 합치기 (CI 한 번, 머지 한 번)
+  python dependabot-pr-merge.py merge --org somaz94 --train
+
+  # 모든 PR에 네이티브 auto-merge를 켜고 종료; 나중에 머지된 것을 확인
+  python dependabot-pr-merge.py merge --org somaz94 --auto-merge
+  python dependabot-pr-merge.py status --org somaz94
+
+  # 상주 모드: 5분마다 재확인, :8081에 /healthz 노출
+  python dependabot-pr-merge.py watch --org somaz94 --health-port 8081
+
+  # repo별 목록 조회 대신 조직 전체 GraphQL 검색 한 번으로 모든 PR 찾기
+  python dependabot-pr-merge.py list --org somaz94 --discovery search
+
+  # PR마다 JSON 레코드 한 줄, org를 훑는 동안 바로바로 출력
+  python dependabot-pr-merge.py list --org somaz94 --format ndjson | jq -r .url
 """
 
 from __future__ import annotations
 
 import argparse
+import csv
+import hashlib
+import hmac
 import json
 import logging
 import os
+import re
+import shutil
+import sqlite3
+import statistics
 import sys
+import threading
 import time
-from dataclasses import dataclass, field
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager, redirect_stdout
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
+from urllib.parse import parse_qs, urlencode, urlparse
 
 import requests
+from requests.structures import CaseInsensitiveDict
+from requests.adapters import HTTPAdapter
 
 # ─────────────────────────────────────────────
 # 상수
 # ─────────────────────────────────────────────
 GITHUB_API = "https://api.github.com"
 PER_PAGE = 100
+# 첫 페이지의 Link 헤더로 페이지 수를 안 뒤 한 목록에서 동시에 가져오는 페이지 수
+# (--max-in-flight 제한은 그대로 적용)
+PAGE_WORKERS = 8
+# GitHub 검색은 쿼리 하나에 1000건을 넘는 결과를 돌려주지 않는다.
+SEARCH_RESULT_CAP = 1000
+# 머지 가능 상태 프리페치에서 GraphQL 요청 하나당 PR 수 (alias 조회)
+PREFETCH_BATCH = 50
 RATE_LIMIT_BUFFER = 10
+# GitHub 콘텐츠 생성 가이드: 분당 최대 80회, 시간당 500회의 쓰기, 그리고 각 쓰기
+# 사이 약 1초 간격 (merge / update-branch가 해당).
+WRITE_INTERVAL = 1.0
+WRITE_LIMIT_HOUR = 500
+# Retry-After 없는 2차 레이트 리밋 후 첫 대기 시간; 걸릴 때마다 두 배.
+SECONDARY_BACKOFF = 60
+# 403/429 레이트 리밋 응답 후 요청 하나당 재시도 횟수
+RATE_LIMIT_RETRIES = 3
 REQUEST_TIMEOUT = 30
+# 동시 HTTP 요청 수의 기본 상한 (--concurrency와 별개): 대부분의 워커는
+# 커넥션을 잡고 있지 않고 CI를 기다리며 시간을 보낸다.
+MAX_IN_FLIGHT = 10
+# GitHub App 설치 토큰을 만료 이 시간 전에 재발급 (토큰 수명 1시간)
+APP_TOKEN_REFRESH = 300
+# 발급에 실패한 설치는 이 시간 동안 쉬고 풀의 나머지 토큰이 요청을 맡는다
+APP_MINT_RETRY = 60
+
+# 조건부 요청 캐시 (ETag / Last-Modified), 기본 위치는 logs/ 옆
+CACHE_DIR = Path(".cache") / "github-http"
+CACHE_MAX_BYTES = 50 * 1024 * 1024
+
+# 로컬 리포 인벤토리 (SQLite): repo별 pushed_at / updated_at / 플래그와 마지막으로
+# 본 열린 Dependabot PR — 바뀌지 않은 repo는 다시 조회하지 않는다.
+# 중간에 멈추는 스윕은 삭제/이전된 repo를 볼 수 없으므로 INVENTORY_FULL_SWEEP초마다
+# org 전체를 다시 조회한다.
+INVENTORY_PATH = Path(".cache") / "inventory.sqlite3"
+INVENTORY_FULL_SWEEP = 24 * 3600
+INVENTORY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS repos (
+    owner TEXT NOT NULL,
+    name TEXT NOT NULL,
+    pushed_at TEXT NOT NULL DEFAULT '',
+    updated_at TEXT NOT NULL DEFAULT '',
+    archived INTEGER NOT NULL DEFAULT 0,
+    disabled INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (owner, name)
+);
+CREATE TABLE IF NOT EXISTS sweeps (
+    owner TEXT PRIMARY KEY,
+    full_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pr_lists (
+    owner TEXT NOT NULL,
+    repo TEXT NOT NULL,
+    pushed_at TEXT NOT NULL,
+    PRIMARY KEY (owner, repo)
+);
+CREATE TABLE IF NOT EXISTS prs (
+    owner TEXT NOT NULL,
+    repo TEXT NOT NULL,
+    number INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    head TEXT NOT NULL,
+    url TEXT NOT NULL,
+    updates TEXT NOT NULL DEFAULT '{}',
+    PRIMARY KEY (owner, repo, number)
+);
+"""
+
+# 체인 스케줄링: 이 org의 최근 저널 수, repo당 보관할 최근 샘플 수,
+# 아무 기록도 없는 단계의 추정값 (초).
+HISTORY_RUNS = 20
+HISTORY_SAMPLES = 20
+HISTORY_DEFAULT_SECONDS = 60
 
 # Dependabot 작성자 로그인 (현재 + 레거시 preview 앱)
 DEPENDABOT_LOGINS = {"dependabot[bot]", "dependabot-preview[bot]"}
 
+# Dependabot PR 분류. head 브랜치와 제목만으로 판단한다:
+#   dependabot/<ecosystem>/[<directory>/]<package>-<version>
+#   "[build(deps): ]Bump <package> from <old> to <new>[ in /dir]"
+#   "Update <package> requirement from ~> 1.0 to ~> 2.0" (버전 범위)
+#   "Bump the <group> group ... with N updates" (그룹 업데이트: delta는 unknown)
+DEPENDABOT_BRANCH_RE = re.compile(r"^dependabot/(?P<ecosystem>[^/]+)/(?P<rest>.+)$")
+BUMP_TITLE_RE = re.compile(
+    r"\b(?:bump|update) (?P<package>\S+)(?: requirement)? from (?P<old>.+?) "
+    r"to (?P<new>.+?)(?: in \S+)?$",
+    re.IGNORECASE,
+)
+GROUP_TITLE_RE = re.compile(r"\bbump the (?P<group>\S+) group\b", re.IGNORECASE)
+# 그룹 / 다중 패키지 PR 본문은 업데이트마다 한 줄씩 나열한다
+UPDATES_BODY_RE = re.compile(r"^Updates `(?P<package>[^`]+)` from \S+ to (?P<new>\S+)", re.MULTILINE)
+# 제목의 매니페스트 디렉터리: "... in /frontend", "... across 2 directories"
+DIRECTORY_RE = re.compile(r" in (?P<directory>/\S*)")
+# 점으로 구분된 버전. 커밋 SHA의 일부는 제외 (SHA로 고정된 action은 unknown)
+VERSION_RE = re.compile(r"(?<![\w.])v?(\d+(?:\.\d+)*)(?![\w.])")
+# 그런 버전 바로 뒤의 semver 프리릴리스 접미사: "1.0.0-beta.1"
+PRERELEASE_RE = re.compile(r"-[0-9A-Za-z]")
+# semver 변경 폭, 안전한 순. 그룹 업데이트나 해석 불가한 제목은 "unknown".
+SEMVER_DELTAS = ("patch", "minor", "major", "unknown")
+# `list --format ndjson|csv` 레코드 필드. --mergeable이면 LIST_STATE_FIELDS 추가
+LIST_FIELDS = ["repo", "number", "title", "head", "url", "ecosystem", "package", "delta"]
+LIST_STATE_FIELDS = ["mergeable", "mergeable_state"]
+# --ecosystem이 받는 약칭 -> Dependabot 브랜치 이름
+ECOSYSTEM_ALIASES = {
+    "npm": "npm_and_yarn",
+    "yarn": "npm_and_yarn",
+    "pnpm": "npm_and_yarn",
+    "go": "go_modules",
+    "gomod": "go_modules",
+    "actions": "github_actions",
+    "github-actions": "github_actions",
+    "python": "pip",
+    "rust": "cargo",
+    "ruby": "bundler",
+}
+
+# 조직 전체 Dependabot PR 검색 (N+1번의 REST 호출 대신 페이지네이션 쿼리 하나)
+SEARCH_PRS_QUERY = """
+query($q: String!, $after: String) {
+  search(query: $q, type: ISSUE, first: 100, after: $after) {
+    issueCount
+    pageInfo { hasNextPage endCursor }
+    nodes {
+      ... on PullRequest {
+        id
+        number
+        title
+        body
+        url
+        headRefName
+        headRefOid
+        mergeable
+        mergeStateStatus
+        isMergeQueueEnabled
+        isInMergeQueue
+        repository { name isArchived isDisabled }
+      }
+    }
+  }
+}
+"""
+
+# 일괄 조회하는 PR별 필드 — 대부분의 PR이 REST get_pr() 왕복 없이 끝나게 한다
+PR_STATE_FIELDS = (
+    "id state headRefOid mergeable mergeStateStatus isMergeQueueEnabled isInMergeQueue"
+)
+
+# `status`가 auto-merge PR의 머지 여부를 확인할 때 읽는 PR별 필드
+PR_STATUS_FIELDS = (
+    "state mergedAt mergeStateStatus autoMergeRequest { enabledAt } "
+    "isInMergeQueue mergeQueueEntry { position }"
+)
+
+# repo의 머지 큐를 따라가는 동안 폴링하는 PR별 필드
+PR_QUEUE_FIELDS = (
+    "state isInMergeQueue mergeQueueEntry { position state } autoMergeRequest { enabledAt }"
+)
+
+# --auto-merge: 요구 조건이 충족되면 GitHub가 직접 PR을 머지하게 한다
+ENABLE_AUTO_MERGE_MUTATION = """
+mutation($id: ID!, $method: PullRequestMergeMethod!, $sha: GitObjectID) {
+  enablePullRequestAutoMerge(
+    input: {pullRequestId: $id, mergeMethod: $method, expectedHeadOid: $sha}
+  ) {
+    pullRequest { autoMergeRequest { enabledAt } }
+  }
+}
+"""
+
+# 머지 큐가 있는 base 브랜치: GitHub가 PR을 묶어 테스트하고 머지한다
+ENQUEUE_MUTATION = """
+mutation($id: ID!, $sha: GitObjectID) {
+  enqueuePullRequest(input: {pullRequestId: $id, expectedHeadOid: $sha}) {
+    mergeQueueEntry { position }
+  }
+}
+"""
+
 # 방금 push된 머지가 워크플로 실행을 queue에 등록할 시간을 준 뒤 idle을 폴링한다.
 # 이 유예가 없으면 changelog/release 워크플로가 시작되기도 전에
-# count_active_runs()가 0을 읽고 통과해버릴 수 있다.
+# count_active_runs()가 0을 읽고 통과해버릴 수 있다. 머지 커밋 SHA를 알면 이
+# 값은 상한일 뿐이다: WORKFLOW_REGISTER_POLL초마다 폴링하다가 그 커밋의 실행이
+# 나타나 끝나는 즉시 다음으로 넘어간다.
 WORKFLOW_START_GRACE = 12
+WORKFLOW_REGISTER_POLL = 3
+
+# --webhook-port를 쓰면 폴링은 폴백이 된다: workflow_run / check_suite 전달이
+# 오지 않더라도 (유실/차단된 훅) 최소 이 주기로는 다시 확인한다.
+WEBHOOK_FALLBACK_POLL = 60
+
+# --train: repo의 Dependabot 업데이트를 PR 하나로 모으는 브랜치
+TRAIN_BRANCH_PREFIX = "dependabot-train/"
+
+# watch: 갱신 주기(초)와 헬스 엔드포인트가 보관하는 최근 결과 수
+# (데몬이 얼마나 오래 돌든 메모리는 일정 범위 안에 머문다)
+WATCH_INTERVAL = 300
+WATCH_RECENT = 100
+
+# 라이브 대시보드: 스크롤되는 출력 아래 고정된 상태 줄을 다시 그리는 간격(초)
+# (터미널에서 실행한 merge / watch, --no-dashboard가 아닐 때)
+DASHBOARD_REFRESH = 1
+
+# --metrics-port: 대기 시간 히스토그램 버킷의 상한(초)
+WAIT_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1800)
+
+# 요청 프로파일 라벨: owner, repo, PR 번호, 실행 id, 브랜치를 템플릿으로 접어
+# 엔드포인트별로 집계되게 한다
+ENDPOINT_TEMPLATES = [
+    (re.compile(r"^/repos/[^/]+/[^/]+"), "/repos/{o}/{r}"),
+    (re.compile(r"/(pulls|issues)/\d+"), r"/\1/{n}"),
+    (re.compile(r"/actions/runs/\d+"), "/actions/runs/{id}"),
+    (re.compile(r"/(git/refs?)/heads/.+"), r"/\1/heads/{ref}"),
+    (re.compile(r"^/(orgs|users)/[^/]+"), r"/\1/{org}"),
+]
 
 # "지금 바로 머지 가능"을 의미하는 mergeable_state 값
 MERGEABLE_STATES = {"clean", "unstable", "has_hooks"}
 
+# --concurrency > 1이면 PR별 출력을 워커 스레드마다 버퍼링했다가 PR이 끝날 때
+# 한 블록으로 출력해 줄이 서로 섞이지 않게 한다.
+_output = threading.local()
+_print_lock = threading.Lock()
+
+# Ctrl-C 시 설정되어 워커 스레드가 대기/폴링을 멈추고 즉시 빠져나오게 한다.
+_stop = threading.Event()
+
+# --webhook-port로 시작한 웹훅 수신기 (None = 일반 폴링).
+_webhook: WebhookReceiver | None = None
+
+# 머지 체인이 도는 동안의 라이브 대시보드 (None = 꺼짐 또는 TTY 아님).
+_dashboard: Dashboard | None = None
+
+# repo / PR 인벤토리 (None = --no-inventory: 매 실행마다 전부 조회).
+_inventory: Inventory | None = None
+
 
 class Color:
     GREEN = "\033[92m"
@@ -87,6 +347,45 @@ class PullRequest:
     title: str
     head: str
     url: str
+    # 일괄 프리페치로 얻은 REST PR 상세의 일부 (mergeable, mergeable_state,
+    # head.sha). 프리페치 전에는 None.
+    prefetched: dict | None = None
+    # 그룹 / 다중 패키지 PR의 패키지 -> 새 버전 (PR 본문에서 파싱)
+    updates: dict[str, str] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class Bump:
+    """Dependabot PR이 무엇을 올리는지. 브랜치와 제목에서 파싱한다."""
+
+    ecosystem: str
+    package: str
+    old: str = ""
+    new: str = ""
+    delta: str = "unknown"  # SEMVER_DELTAS 중 하나
+
+    @property
+    def risk(self) -> tuple[int, bool]:
+        """안전한 순 정렬 키: delta 순, 같으면 1.x+가 0.x보다 먼저 (1.0 이전은 깨질 수 있음)."""
+        return SEMVER_DELTAS.index(self.delta), self.old.split(".")[0] == "0"
+
+
+@dataclass(frozen=True)
+class Duplicate:
+    """같은 repo의 다른 열린 PR이 이미 (전부 또는 일부) 포함하는 PR."""
+
+    pr: PullRequest
+    by: PullRequest
+    packages: tuple[str, ...]  # 두 PR이 함께 올리는 패키지
+    covered: bool  # `by`가 전부를 같거나 더 높은 버전으로 올림
+
+    def reason(self, close: bool) -> str:
+        if not self.covered:
+            return (
+                f"#{self.by.number}와 겹침 ({', '.join(self.packages)}); "
+                "Dependabot 리베이스에 맡김"
+            )
+        return f"#{self.by.number}로 대체됨{', 닫음' if close else ''}"
 
 
 @dataclass
@@ -94,7 +393,7 @@ class PRResult:
     repo: str
     number: int
     title: str
-    action: str  # merged / skipped / failed
+    action: str  # merged / auto-merge / skipped / failed
     success: bool
     message: str = ""
 
@@ -105,249 +404,2450 @@ class Stats:
     merged: int = 0
     failed: int = 0
     skipped: int = 0
+    auto_merge: int = 0  # GitHub auto-merge에 맡김, 아직 머지 전
     details: list[PRResult] = field(default_factory=list)
+    journal: Journal | None = field(default=None, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def recorded(self, pr: PullRequest) -> bool:
+        """이번 실행에서 `pr`의 결과가 이미 기록되었는지."""
+        with self._lock:
+            return any(r.repo == pr.repo and r.number == pr.number for r in self.details)
 
     def record(self, result: PRResult):
-        self.total += 1
-        if result.success:
-            if result.action == "skipped":
-                self.skipped += 1
+        with self._lock:
+            if self.journal:
+                self.journal.write("result", **asdict(result))
+            self.total += 1
+            if result.success:
+                if result.action == "skipped":
+                    self.skipped += 1
+                elif result.action == "auto-merge":
+                    self.auto_merge += 1
+                else:
+                    self.merged += 1
             else:
-                self.merged += 1
-        else:
-            self.failed += 1
-        self.details.append(result)
+                self.failed += 1
+            self.details.append(result)
+        _metrics.record(result)
+
+
+@dataclass
+class Progress:
+    """머지 워커들이 공유하는 스레드 안전 [idx/total] 카운터."""
+
+    total: int
+    done: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def advance(self) -> int:
+        with self._lock:
+            self.done += 1
+            return self.done
 
 
 # ─────────────────────────────────────────────
-# GitHub API 클라이언트
+# 실행 저널 (이어서 머지)
 # ─────────────────────────────────────────────
-class GitHubClient:
-    """레이트 리밋 처리를 포함한 GitHub API 클라이언트."""
+class Journal:
+    """
+    머지 실행의 추가 전용 JSONL 기록. PR 하나가 끝날 때마다 기록된다.
 
-    def __init__(self, token: str):
-        self.token = token
-        self.session = requests.Session()
-        self.session.headers.update(
+    "run" 헤더, "discovery" PR 목록, 그리고 PR마다 "result" 한 줄 (즉시 flush
+    및 fsync)로 구성되어, 중단되거나 크래시한 실행을 다시 탐색하지 않고
+    --resume으로 이어갈 수 있다.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._file = path.open("a", encoding="utf-8")
+
+    def write(self, kind: str, **data):
+        record = {"type": kind, "time": datetime.now().isoformat(), **data}
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    @staticmethod
+    def load(path: Path) -> tuple[dict, list[PullRequest], dict[tuple[str, int], PRResult]]:
+        """저널을 다시 읽는다: (run 헤더, 탐색된 PR, PR별 최신 결과)."""
+        header, prs, results = None, [], {}
+        for line in path.read_text(encoding="utf-8").splitlines():
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # 쓰는 도중 크래시로 잘린 마지막 줄
+            kind = record.pop("type", None)
+            record.pop("time", None)
+            if kind == "run":
+                header = record
+            elif kind == "discovery":
+                prs = [PullRequest(**pr) for pr in record["prs"]]
+            elif kind == "result":
+                result = PRResult(**record)
+                results[(result.repo, result.number)] = result
+        if header is None:
+            raise RuntimeError(f"{path}는 dependabot 머지 저널이 아님")
+        return header, prs, results
+
+
+# ─────────────────────────────────────────────
+# 머지 이력 (가장 긴 체인 먼저)
+# ─────────────────────────────────────────────
+class MergeHistory:
+    """
+    repo별 머지 소요 시간. 가장 긴 머지 체인을 먼저 시작하는 데 쓴다.
+
+    실제 머지마다 저널에 "timing" 줄을 남긴다: 같은 repo의 이전 머지
+    워크플로를 기다린 시간과, 자신의 rebase / 체크 / 머지에 걸린 시간.
+    load()는 이 org의 최근 HISTORY_RUNS개 저널에서 이를 다시 읽고, watch는
+    같은 이력에 계속 추가한다. repo의 체인 추정치는 첫 머지 + 후속 PR마다
+    워크플로 대기 1회와 후속 머지 1회 (해당 repo 샘플의 중앙값, 없으면 전체
+    repo의 중앙값, 그것도 없으면 HISTORY_DEFAULT_SECONDS).
+    """
+
+    KINDS = ("first", "followup", "workflow")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples: dict[str, dict[str, deque[float]]] = {}
+        self.runs = 0  # timing을 하나 이상 제공한 저널 수
+
+    def load(self, org: str, log_dir: Path = Path("logs")):
+        """`org`의 최근 HISTORY_RUNS개 저널에서 소요 시간을 읽는다."""
+        for path in sorted(log_dir.glob("dependabot_merge_*.jsonl"))[-HISTORY_RUNS:]:
+            timings = []
+            try:
+                lines = path.read_text(encoding="utf-8").splitlines()
+            except OSError:
+                continue
+            for line in lines:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record.get("type") == "run" and record.get("org") != org:
+                    break
+                if record.get("type") == "timing":
+                    timings.append(record)
+            for t in timings:
+                self.add(t["repo"], t["followup"], t["workflow"], t["merge"])
+            self.runs += bool(timings)
+
+    def add(self, repo: str, followup: bool, workflow: float, merge: float):
+        with self._lock:
+            samples = self.samples.setdefault(
+                repo, {k: deque(maxlen=HISTORY_SAMPLES) for k in self.KINDS}
+            )
+            samples["followup" if followup else "first"].append(merge)
+            if followup:
+                samples["workflow"].append(workflow)
+
+    def _median(self, repo: str, kind: str) -> float:
+        own = self.samples.get(repo, {}).get(kind)
+        if own:
+            return statistics.median(own)
+        every = [x for s in self.samples.values() for x in s[kind]]
+        return statistics.median(every) if every else HISTORY_DEFAULT_SECONDS
+
+    def estimate(self, repo: str, steps: int) -> float:
+        """`repo`에서 `steps`번의 직렬 머지에 걸릴 것으로 예상되는 초."""
+        with self._lock:
+            first = self._median(repo, "first")
+            followup = self._median(repo, "workflow") + self._median(repo, "followup")
+        return first + (steps - 1) * followup
+
+
+_history = MergeHistory()
+
+
+# ─────────────────────────────────────────────
+# HTTP 캐시 (조건부 요청)
+# ─────────────────────────────────────────────
+class HTTPCache:
+    """
+    GET 응답을 디스크에 캐시하고 ETag / Last-Modified로 재검증한다.
+
+    304 응답은 디스크에서 돌려주며 기본 레이트 리밋에 포함되지 않는다.
+    자격 증명+URL+params마다 JSON 파일 하나이므로, 한 토큰으로 받은 본문을 같은
+    데이터를 볼 수 없을지도 모르는 다른 토큰에 돌려주지 않는다. 디렉터리가
+    max_bytes를 넘으면 가장 오래 사용하지 않은 항목부터 제거한다.
+    """
+
+    # 캐시에서 되살릴 응답 헤더 (페이지네이션, 본문 타입)
+    KEEP_HEADERS = ("Content-Type", "Link")
+
+    def __init__(self, path: Path = CACHE_DIR, max_bytes: int = CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._size = sum(f.stat().st_size for f in self.path.glob("*.json"))
+
+    def _file(self, url: str, params: dict | None, credential: str) -> Path:
+        # 해시하므로 자격 증명(PAT)이 파일 이름에 드러나지 않는다.
+        key = f"{credential} {url}?{urlencode(sorted((params or {}).items()))}"
+        return self.path / f"{hashlib.sha256(key.encode()).hexdigest()}.json"
+
+    def load(self, url: str, params: dict | None, credential: str) -> dict | None:
+        try:
+            return json.loads(self._file(url, params, credential).read_text())
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def validators(entry: dict) -> dict:
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, url: str, params: dict | None, credential: str, resp: requests.Response):
+        etag = resp.headers.get("ETag")
+        last_modified = resp.headers.get("Last-Modified")
+        if not (etag or last_modified):
+            return
+        data = json.dumps(
             {
-                "Authorization": f"token {token}",
-                "Accept": "application/vnd.github.v3+json",
+                "etag": etag,
+                "last_modified": last_modified,
+                "headers": {h: resp.headers[h] for h in self.KEEP_HEADERS if h in resp.headers},
+                "body": resp.text,
             }
         )
+        f = self._file(url, params, credential)
+        with self._lock:
+            old = f.stat().st_size if f.exists() else 0
+            tmp = f.with_suffix(".tmp")
+            tmp.write_text(data)
+            os.replace(tmp, f)
+            self._size += f.stat().st_size - old
+            if self._size > self.max_bytes:
+                self._evict()
 
-    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
-        resp = self.session.request(method, url, timeout=REQUEST_TIMEOUT, **kwargs)
-        self._handle_rate_limit(resp)
-        return resp
+    def replay(
+        self,
+        url: str,
+        params: dict | None,
+        credential: str,
+        entry: dict,
+        resp: requests.Response,
+    ) -> requests.Response:
+        """304를 캐시된 200으로 바꾸되, 새 레이트 리밋 헤더는 유지한다."""
+        try:
+            os.utime(self._file(url, params, credential))  # 최근 사용으로 표시
+        except OSError:
+            pass
+        cached = requests.Response()
+        cached.status_code = 200
+        cached._content = entry["body"].encode("utf-8")
+        cached.encoding = "utf-8"
+        cached.headers = CaseInsensitiveDict(entry["headers"])
+        cached.headers.update(
+            {k: v for k, v in resp.headers.items() if k.lower().startswith("x-ratelimit")}
+        )
+        cached.url = resp.url
+        cached.request = resp.request
+        return cached
 
-    def get(self, path: str, **kwargs) -> requests.Response:
-        return self._request("GET", f"{GITHUB_API}{path}", **kwargs)
+    def _evict(self):
+        # 가장 오래 사용하지 않은 항목부터 예산의 90%까지 제거한다.
+        files = sorted(self.path.glob("*.json"), key=lambda f: f.stat().st_mtime)
+        for f in files:
+            if self._size <= self.max_bytes * 0.9:
+                break
+            size = f.stat().st_size
+            f.unlink(missing_ok=True)
+            self._size -= size
 
-    def put(self, path: str, **kwargs) -> requests.Response:
-        return self._request("PUT", f"{GITHUB_API}{path}", **kwargs)
 
-    def _handle_rate_limit(self, resp: requests.Response):
-        remaining = int(resp.headers.get("X-RateLimit-Remaining", 999))
-        if remaining <= RATE_LIMIT_BUFFER:
-            reset_ts = int(resp.headers.get("X-RateLimit-Reset", 0))
-            wait = max(reset_ts - int(time.time()), 1) + 1
-            logging.warning(
-                f"레이트 리밋 임박 (remaining={remaining}). {wait}초 대기..."
-            )
-            time.sleep(wait)
+# ─────────────────────────────────────────────
+# 리포 인벤토리 (SQLite, 증분 갱신)
+# ─────────────────────────────────────────────
+class Inventory:
+    """
+    소유자의 repo와 열린 Dependabot PR을 기록하는 로컬 SQLite.
 
-    def list_repos(self, org: str) -> list[str]:
-        repos: list[str] = []
-        page = 1
-        while True:
-            resp = self.get(
-                f"/orgs/{org}/repos", params={"per_page": PER_PAGE, "page": page}
-            )
-            if resp.status_code == 404:
-                resp = self.get(
-                    f"/users/{org}/repos",
-                    params={"per_page": PER_PAGE, "page": page, "type": "owner"},
-                )
-            if resp.status_code != 200:
-                raise RuntimeError(
-                    f"리포지토리 목록 조회 실패: HTTP {resp.status_code}\n{resp.text}"
+    refresh()는 최근에 갱신된 repo부터 조회하고 (`sort=updated`) updated_at과
+    pushed_at이 저장된 행과 같은 첫 repo에서 멈춘다: 그 뒤의 repo도 모두 그대로이므로
+    변화 없는 org는 요청 하나로 끝난다. 이 조기 중단은 GitHub가 push와 설정 변경
+    때마다 updated_at(정렬 키)을 갱신한다는 데 기대며, 그렇지 않은 변경은 하루 한
+    번의 전체 조회에서만 보인다. repo의 pulls는 마지막 조회 이후 pushed_at이
+    바뀌었을 때만 (Dependabot의 브랜치 push, 머지 반영) 다시 조회하고, 아니면 PR을
+    데이터베이스에서 읽는다.
+    """
+
+    def __init__(self, path: Path = INVENTORY_PATH):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._db:
+            self._db.executescript(INVENTORY_SCHEMA)
+
+    def refresh(self, client: GitHubClient, org: str) -> list[str]:
+        """`org`의 repo를 최신으로 갱신; 활성 repo를 정렬해 반환."""
+        with self._lock:
+            stored = {
+                name: (updated, pushed)
+                for name, updated, pushed in self._db.execute(
+                    "SELECT name, updated_at, pushed_at FROM repos WHERE owner = ?", (org,)
                 )
-            data = resp.json()
-            if not data:
+            }
+            row = self._db.execute("SELECT full_at FROM sweeps WHERE owner = ?", (org,)).fetchone()
+        full = not stored or not row or time.time() - row[0] >= INVENTORY_FULL_SWEEP
+
+        changed: list[tuple] = []
+        for repo in client.iter_repos_by_update(org):
+            stamps = (repo.get("updated_at") or "", repo.get("pushed_at") or "")
+            if not full and stored.get(repo["name"]) == stamps:
                 break
-            repos.extend(
-                r["name"]
-                for r in data
-                if not r.get("archived", False) and not r.get("disabled", False)
+            changed.append(
+                (
+                    org,
+                    repo["name"],
+                    stamps[1],
+                    stamps[0],
+                    int(bool(repo.get("archived"))),
+                    int(bool(repo.get("disabled"))),
+                )
             )
-            logging.info(f"  페이지 {page}: {len(data)}개 repo (누적 {len(repos)}개)")
-            page += 1
-        return sorted(repos)
 
-    def list_dependabot_prs(self, org: str, repo: str) -> list[PullRequest]:
-        prs: list[PullRequest] = []
-        page = 1
-        while True:
-            resp = self.get(
-                f"/repos/{org}/{repo}/pulls",
-                params={"state": "open", "per_page": PER_PAGE, "page": page},
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO repos VALUES (?, ?, ?, ?, ?, ?)", changed
             )
-            if resp.status_code != 200:
-                return prs
-            data = resp.json()
-            if not data:
-                break
-            for pr in data:
-                login = (pr.get("user") or {}).get("login", "")
-                if login in DEPENDABOT_LOGINS:
-                    prs.append(
-                        PullRequest(
-                            repo=repo,
-                            number=pr["number"],
-                            title=pr["title"],
-                            head=(pr.get("head") or {}).get("ref", ""),
-                            url=pr["html_url"],
-                        )
+            if full:
+                seen = {c[1] for c in changed}
+                for gone in set(stored) - seen:
+                    self._forget(org, gone, drop_repo=True)
+                self._db.execute(
+                    "INSERT OR REPLACE INTO sweeps VALUES (?, ?)", (org, time.time())
+                )
+            repos = [
+                name
+                for (name,) in self._db.execute(
+                    "SELECT name FROM repos WHERE owner = ? AND NOT archived AND NOT disabled "
+                    "ORDER BY name",
+                    (org,),
+                )
+            ]
+        kind = "전체 스윕" if full else "증분 스윕"
+        logging.info(f"인벤토리: 새로 생기거나 바뀐 repo {len(changed)}개 ({kind})")
+        return repos
+
+    def dependabot_prs(self, client: GitHubClient, org: str, repo: str) -> list[PullRequest]:
+        """`repo`의 열린 Dependabot PR. 지난번 이후 push가 있었을 때만 조회."""
+        with self._lock:
+            current = self._db.execute(
+                "SELECT pushed_at FROM repos WHERE owner = ? AND name = ?", (org, repo)
+            ).fetchone()
+            listed = self._db.execute(
+                "SELECT pushed_at FROM pr_lists WHERE owner = ? AND repo = ?", (org, repo)
+            ).fetchone()
+            if current and listed and current == listed:
+                return [
+                    PullRequest(repo, number, title, head, url, updates=json.loads(updates))
+                    for number, title, head, url, updates in self._db.execute(
+                        "SELECT number, title, head, url, updates FROM prs "
+                        "WHERE owner = ? AND repo = ? ORDER BY number DESC",
+                        (org, repo),
                     )
-            if len(data) < PER_PAGE:
-                break
-            page += 1
+                ]
+        try:
+            prs = client.list_dependabot_prs(org, repo, strict=True)
+        except RuntimeError as e:
+            logging.debug(f"{e}; 인벤토리에 기록하지 않음")
+            return []
+        if not current:
+            return prs  # 인벤토리에 없음 (예: 아직 본 적 없는 --repos 이름)
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM prs WHERE owner = ? AND repo = ?", (org, repo))
+            self._db.executemany(
+                "INSERT INTO prs VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (org, repo, pr.number, pr.title, pr.head, pr.url, json.dumps(pr.updates))
+                    for pr in prs
+                ],
+            )
+            self._db.execute(
+                "INSERT OR REPLACE INTO pr_lists VALUES (?, ?, ?)", (org, repo, current[0])
+            )
         return prs
 
-    def get_pr(self, org: str, repo: str, number: int) -> dict:
-        resp = self.get(f"/repos/{org}/{repo}/pulls/{number}")
-        if resp.status_code != 200:
+    def forget(self, org: str, repo: str):
+        """다음번에 `repo`의 pulls를 다시 조회 (캐시된 PR이 닫힌 것으로 확인됨)."""
+        with self._lock, self._db:
+            self._forget(org, repo, drop_repo=False)
+
+    def _forget(self, org: str, repo: str, drop_repo: bool):
+        self._db.execute("DELETE FROM pr_lists WHERE owner = ? AND repo = ?", (org, repo))
+        self._db.execute("DELETE FROM prs WHERE owner = ? AND repo = ?", (org, repo))
+        if drop_repo:
+            self._db.execute("DELETE FROM repos WHERE owner = ? AND name = ?", (org, repo))
+
+
+# ─────────────────────────────────────────────
+# 토큰 풀 (PAT와 GitHub App 설치 토큰)
+# ─────────────────────────────────────────────
+@dataclass
+class Token:
+    label: str  # 로그에 남는 이름 (토큰 값 자체는 절대 아님)
+    value: str = ""
+    installation: str = ""  # GitHub App 설치 ID (발급받는 토큰)
+    expires: float = 0.0
+    # 리소스 -> 이 토큰의 마지막 응답에서 본 {"limit", "remaining", "reset"}
+    quota: dict[str, dict] = field(default_factory=dict)
+    last_used: float = 0.0
+    # 발급 중에 잡는다: 슬롯마다 한 스레드만 발급하고 풀 잠금은 비워 둔다
+    minting: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+    mint_retry: float = 0.0  # 이 시각 전에는 다시 발급을 시도하지 않는다 (실패 후)
+
+
+class GitHubApp:
+    """GitHub App의 설치 토큰을 발급한다 (PyJWT[crypto] 필요)."""
+
+    def __init__(self, app_id: str, private_key: str):
+        try:
+            import jwt  # noqa: F401  (선택 의존성: GitHub App 인증에서만 필요)
+        except ImportError:
             raise RuntimeError(
-                f"PR 조회 실패 {org}/{repo}#{number}: HTTP {resp.status_code}"
+                "GitHub App 인증에는 crypto 지원 PyJWT가 필요합니다: pip install 'PyJWT[crypto]'"
             )
-        return resp.json()
+        self.app_id = app_id
+        self.private_key = private_key
 
-    def merge_pr(
-        self, org: str, repo: str, number: int, sha: str, method: str
-    ) -> tuple[bool, str]:
-        resp = self.put(
-            f"/repos/{org}/{repo}/pulls/{number}/merge",
-            json={"sha": sha, "merge_method": method},
-        )
-        if resp.status_code == 200:
-            return True, "merged"
-        try:
-            msg = resp.json().get("message", resp.text)
-        except ValueError:
-            msg = resp.text
-        return False, f"HTTP {resp.status_code}: {msg}"
+    def _headers(self) -> dict:
+        import jwt
 
-    def update_branch(self, org: str, repo: str, number: int) -> tuple[bool, str]:
-        """PR 브랜치를 최신 base로 리베이스 (PUT .../update-branch)."""
-        resp = self.put(f"/repos/{org}/{repo}/pulls/{number}/update-branch")
-        if resp.status_code == 202:
-            return True, "update requested"
-        try:
-            msg = resp.json().get("message", resp.text)
-        except ValueError:
-            msg = resp.text
-        return False, f"HTTP {resp.status_code}: {msg}"
+        now = int(time.time())
+        # 시계 오차를 감안해 과거로 발급; GitHub는 App JWT를 최대 10분으로 제한한다.
+        payload = {"iat": now - 60, "exp": now + 540, "iss": self.app_id}
+        return {
+            "Authorization": f"Bearer {jwt.encode(payload, self.private_key, algorithm='RS256')}",
+            "Accept": "application/vnd.github.v3+json",
+        }
 
-    def count_active_runs(self, org: str, repo: str) -> int:
-        """리포지토리의 queued + in_progress Actions 워크플로 실행 수를 센다."""
-        total = 0
-        for status in ("queued", "in_progress"):
-            resp = self.get(
-                f"/repos/{org}/{repo}/actions/runs",
-                params={"status": status, "per_page": 1},
+    def find_installation(self, org: str) -> str:
+        """조직 (또는 사용자) 계정에 설치된 이 App의 설치 ID."""
+        for kind in ("orgs", "users"):
+            resp = requests.get(
+                f"{GITHUB_API}/{kind}/{org}/installation",
+                headers=self._headers(),
+                timeout=REQUEST_TIMEOUT,
             )
             if resp.status_code == 200:
-                total += resp.json().get("total_count", 0)
-        return total
+                return str(resp.json()["id"])
+        raise RuntimeError(
+            f"GitHub App {self.app_id}이(가) {org}에 설치되어 있지 않습니다: HTTP {resp.status_code}"
+        )
 
+    def mint(self, installation: str) -> tuple[str, float]:
+        """새 설치 토큰과 만료 시각 (epoch 초)."""
+        resp = requests.post(
+            f"{GITHUB_API}/app/installations/{installation}/access_tokens",
+            headers=self._headers(),
+            timeout=REQUEST_TIMEOUT,
+        )
+        if resp.status_code != 201:
+            raise RuntimeError(
+                f"설치 {installation}의 토큰 발급 실패: HTTP {resp.status_code}"
+            )
+        data = resp.json()
+        expires = datetime.fromisoformat(data["expires_at"].replace("Z", "+00:00")).timestamp()
+        return data["token"], expires
 
-# ─────────────────────────────────────────────
-# 명령
-# ─────────────────────────────────────────────
-def cmd_list(client: GitHubClient, args: argparse.Namespace):
-    """모든 리포지토리의 열린 Dependabot PR 목록 조회."""
-    repos = _resolve_repos(client, args)
 
-    print(f"\n{Color.BOLD}열린 Dependabot Pull Request{Color.RESET}")
-    print(f"범위: {len(repos)}개 리포지토리\n")
+class TokenUnavailable(requests.RequestException):
+    """풀에서 쓸 수 있는 토큰이 없다: 모든 App 설치의 토큰 발급이 실패했다."""
 
-    total = 0
-    for repo in repos:
-        prs = client.list_dependabot_prs(args.org, repo)
-        if not prs:
-            continue
-        total += len(prs)
-        print(f"{Color.BOLD}{Color.CYAN}{args.org}/{repo}{Color.RESET}")
-        for pr in prs:
-            print(
-                f"  #{pr.number} {pr.title}\n"
-                f"      {Color.DIM}{pr.head} | {pr.url}{Color.RESET}"
-            )
-        print()
 
-    if total == 0:
-        print(f"{Color.GREEN}열린 Dependabot PR이 없습니다.{Color.RESET}")
-    else:
-        print(f"{Color.BOLD}총 {total}개의 Dependabot PR{Color.RESET}")
+class TokenPool:
+    """
+    클라이언트가 요청을 나눠 보내는 토큰들. 모든 스레드가 공유한다.
 
+    각 요청은 해당 리소스의 쿼터가 가장 많이 남은 토큰으로 나간다 (아직 안 쓴
+    토큰 우선, 같으면 가장 오래전에 쓴 토큰). 그래서 토큰 N개면 시간당 약
+    N x 5,000 요청을 쓸 수 있다. GitHub App 설치 토큰은 처음 쓸 때 발급하고
+    만료 APP_TOKEN_REFRESH초 전에 재발급하되, 풀 잠금 밖에서 하므로 한 스레드가
+    GitHub를 기다리는 동안에도 다른 스레드는 계속 토큰을 고른다. 발급에 실패한
+    설치는 건너뛰고 풀의 나머지 토큰을 쓴다. quota()는 RateBudget을 위해 풀
+    전체를 합산한다.
+    """
 
-def cmd_merge(client: GitHubClient, args: argparse.Namespace):
-    """모든 Dependabot PR을 순차적으로 머지."""
-    repos = _resolve_repos(client, args)
+    def __init__(self, tokens: list[Token], app: GitHubApp | None = None):
+        self.tokens = tokens
+        self.app = app
+        self._lock = threading.Lock()
 
-    print(f"\n{Color.BOLD}Dependabot PR 순차 머지{Color.RESET}")
-    print(f"범위: {len(repos)}개 리포지토리 | 머지 방식: {args.merge_method}")
-    if args.one_per_repo:
-        print("모드: run당 repo별 1개만 머지 (나머지는 재실행)")
-    if args.wait_checks:
-        print(f"CI 체크 대기: PR당 최대 {args.checks_timeout}초")
-    if args.dry_run:
-        _print_warn("DRY-RUN 모드: 실제 머지를 수행하지 않습니다")
-    print()
+    @classmethod
+    def from_env(cls, org: str) -> TokenPool:
+        """GITHUB_TOKEN / GITHUB_TOKENS, 그리고 GITHUB_APP_ID가 있으면 GitHub App."""
+        values = [os.environ.get("GITHUB_TOKEN", "")]
+        values += os.environ.get("GITHUB_TOKENS", "").split(",")
+        values = list(dict.fromkeys(v.strip() for v in values if v.strip()))
+        tokens = [Token(label=f"token {i + 1}", value=v) for i, v in enumerate(values)]
 
-    # 머지 전에 범위를 보여주기 위해 모든 Dependabot PR을 먼저 수집한다.
-    logging.info("Dependabot PR 수집 중...")
-    all_prs: list[PullRequest] = []
-    for repo in repos:
-        all_prs.extend(client.list_dependabot_prs(args.org, repo))
+        app = None
+        app_id = os.environ.get("GITHUB_APP_ID", "")
+        if app_id:
+            key = os.environ.get("GITHUB_APP_PRIVATE_KEY", "")
+            key_file = os.environ.get("GITHUB_APP_PRIVATE_KEY_FILE", "")
+            if not key and key_file:
+                key = Path(key_file).expanduser().read_text()
+            if not key:
+                raise RuntimeError(
+                    "GITHUB_APP_ID에는 GITHUB_APP_PRIVATE_KEY 또는 GITHUB_APP_PRIVATE_KEY_FILE이 필요합니다"
+                )
+            app = GitHubApp(app_id, key)
+            ids = os.environ.get("GITHUB_APP_INSTALLATION_ID", "")
+            installations = [i.strip() for i in ids.split(",") if i.strip()]
+            for installation in installations or [app.find_installation(org)]:
+                tokens.append(
+                    Token(label=f"app installation {installation}", installation=installation)
+                )
+        return cls(tokens, app)
 
-    if not all_prs:
-        print(f"{Color.GREEN}머지할 Dependabot PR이 없습니다.{Color.RESET}")
-        return
+    def __len__(self) -> int:
+        return len(self.tokens)
 
-    groups = _group_by_repo(all_prs)
-    multi = [r for r, prs in groups.items() if len(prs) > 1]
+    def pick(self, resource: str) -> Token:
+        """`resource` 쿼터가 가장 많이 남은 토큰. 필요하면 발급/재발급한다."""
+        failed: list[Token] = []
+        while True:
+            with self._lock:
+                now = time.time()
 
-    print(f"{Color.BOLD}{len(all_prs)}{Color.RESET}개의 Dependabot PR 발견:")
-    for pr in all_prs:
-        print(f"  {Color.CYAN}{args.org}/{pr.repo}{Color.RESET} #{pr.number} {pr.title}")
-    if multi:
-        # 같은 repo의 PR은 한 번에 하나씩, 각 머지의 changelog/release 워크플로가
-        # 끝난 뒤 다음을 머지해 두 워크플로가 동시에 돌지 않게 한다.
-        print(
-            f"\n  {Color.YELLOW}참고: {len(multi)}개 repo에 PR이 2개 이상 "
-            f"({', '.join(multi)}) — 해당 repo는 직렬로 머지합니다.{Color.RESET}"
-        )
-    print()
+                def left(t: Token) -> float:
+                    q = t.quota.get(resource)
+                    if not q or q["reset"] <= now:
+                        return float("inf")  # 아직 안 썼거나 윈도우가 리셋됨
+                    return q["remaining"]
 
-    if not args.dry_run and not args.yes:
-        if not _confirm(f"{len(all_prs)}개의 Dependabot PR을 순차적으로 머지할까요?"):
-            return
+                usable = [t for t in self.tokens if all(t is not f for f in failed)]
+                if not usable:
+                    raise TokenUnavailable(f"쓸 수 있는 토큰 없음: {failed[-1].label} 발급 실패")
+                # 발급 실패 후 쉬고 있는 설치는 맨 뒤로 보낸다.
+                token = max(
+                    usable, key=lambda t: (t.mint_retry <= now, left(t), -t.last_used)
+                )
+                token.last_used = now
+            if not token.installation or self._mint(token):
+                return token
+            failed.append(token)
 
-    stats = Stats()
-    idx = 0
+    def _mint(self, token: Token) -> bool:
+        """`token`이 만료(임박)면 발급한다. 쓸 수 없으면 False."""
+        # 같은 슬롯을 고른 스레드는 여기서 기다리고, 처음 온 스레드가 발급한다.
+        with token.minting:
+            now = time.time()
+            if token.expires - now >= APP_TOKEN_REFRESH or token.mint_retry > now:
+                # 현재 토큰이 아직 몇 분 남아 있을 수 있다.
+                return token.expires > now
+            try:
+                token.value, token.expires = self.app.mint(token.installation)
+            except (RuntimeError, requests.RequestException) as e:
+                logging.warning(
+                    f"{token.label} 토큰 발급 실패 ({e}); "
+                    f"{APP_MINT_RETRY}초 동안 풀의 나머지 토큰 사용"
+                )
+                token.mint_retry = now + APP_MINT_RETRY
+                return token.expires > now
+            logging.debug(f"{token.label} 토큰 발급")
+            return True
 
-    for repo, prs in groups.items():
-        for i, pr in enumerate(prs):
-            idx += 1
-            _print_progress(idx, len(all_prs), f"{args.org}/{pr.repo} #{pr.number}")
-            print(f"  {Color.DIM}{pr.title}{Color.RESET}")
+    def observe(self, token: Token, resource: str, resp: requests.Response) -> str:
+        """응답의 쿼터 헤더를 `token`에 기록하고, 헤더가 가리키는 리소스를 반환."""
+        h = resp.headers
+        resource = h.get("X-RateLimit-Resource", resource)
+        if "X-RateLimit-Remaining" in h:
+            with self._lock:
+                token.quota[resource] = {
+                    "limit": int(h.get("X-RateLimit-Limit", 0)),
+                    "remaining": int(h["X-RateLimit-Remaining"]),
+                    "reset": int(h.get("X-RateLimit-Reset", 0)),
+                }
+        return resource
 
-            followup = i > 0  # 같은 repo의 2번째+ Dependabot PR
+    def quota(self, resource: str) -> dict | None:
+        """
+        `resource`에 대한 풀 전체의 쿼터.
 
-            if followup and not args.dry_run:
-                if args.one_per_repo:
-                    msg = "보류 (one-per-repo; Dependabot 리베이스 후 재실행)"
+        `remaining` / `limit`은 토큰별 합계, `reset`은 가장 늦은 리셋 (페이싱
+        윈도우), `refill`은 가장 이른 리셋, 즉 소진된 풀이 요청을 되찾는 시각.
+        """
+        with self._lock:
+            now = time.time()
+            seen = [t.quota[resource] for t in self.tokens if resource in t.quota]
+            if not seen:
+                return None
+            # 아직 응답을 받지 못한 토큰은 쿼터가 가득 찬 것으로 본다.
+            fresh = len(self.tokens) - len(seen)
+            limit = max(q["limit"] for q in seen)
+            return {
+                "limit": sum(q["limit"] for q in seen) + fresh * limit,
+                "remaining": sum(q["remaining"] if q["reset"] > now else q["limit"] for q in seen)
+                + fresh * limit,
+                "reset": max(q["reset"] for q in seen),
+                "refill": min(q["reset"] for q in seen),
+            }
+
+    def snapshot(self) -> list[dict]:
+        """실행 로그용 토큰별 쿼터 (이름만, 토큰 값은 절대 남기지 않음)."""
+        with self._lock:
+            return [
+                {
+                    "token": t.label,
+                    "quota": {
+                        r: {**q, "reset": datetime.fromtimestamp(q["reset"]).isoformat()}
+                        for r, q in sorted(t.quota.items())
+                    },
+                }
+                for t in self.tokens
+            ]
+
+
+# ─────────────────────────────────────────────
+# 레이트 리밋 예산 (모든 워커가 공유)
+# ─────────────────────────────────────────────
+class RateBudget:
+    """
+    GitHub 레이트 리밋에 맞춘 토큰 버킷 페이싱. 모든 스레드가 공유한다.
+
+    리소스(core, graphql, ...)마다 remaining/리셋까지 남은 초 속도로 채워지므로,
+    긴 실행은 한도에 부딪히는 대신 쿼터를 윈도우 전체에 나눠 쓴다. 버킷은 쓸 수
+    있는 쿼터의 절반을 담으므로 짧은 실행은 느려지지 않는다. 콘텐츠 생성 호출
+    (merge, update-branch)은 추가로 WRITE_INTERVAL 간격을 두고 시간당
+    WRITE_LIMIT_HOUR로 제한된다. 403/429 2차 리밋은 모든 워커를 Retry-After
+    (또는 백오프) 동안 멈춘다.
+    쿼터는 TokenPool 전체 합계라서 토큰이 많을수록 페이싱이 빨라진다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._quota: dict[str, dict] = {}  # 리소스 -> limit/remaining/reset/refill
+        self._tokens: dict[str, float] = {}
+        self._refilled: dict[str, float] = {}
+        self._writes: deque[float] = deque()  # 최근 쓰기 시각
+        self._paused_until = 0.0
+        self._backoffs = 0  # 연속된 2차 리밋 횟수
+        self.requests = 0
+        self.write_requests = 0
+        self.secondary_hits = 0
+        self.throttled = 0.0
+
+    def acquire(self, resource: str, write: bool = False):
+        """`resource`에 대한 요청이 예산에 들어올 때까지 대기한다."""
+        while True:
+            with self._lock:
+                wait, reason = self._wait_for(resource, write)
+                if wait <= 0:
+                    self.requests += 1
+                    if resource in self._tokens:
+                        self._tokens[resource] -= 1
+                    if write:
+                        self.write_requests += 1
+                        self._writes.append(time.time())
+                    return
+                self.throttled += wait
+            if wait >= 5:
+                logging.info(f"레이트 예산: {reason}, {wait:.0f}초 대기...")
+            _sleep(wait, f"rate limit ({reason})")
+
+    def _wait_for(self, resource: str, write: bool) -> tuple[float, str]:
+        now = time.time()
+        if self._paused_until > now:
+            return self._paused_until - now, "2차 레이트 리밋"
+        q = self._quota.get(resource)
+        if q:
+            window = max(q["reset"] - now, 1)
+            spendable = q["remaining"] - RATE_LIMIT_BUFFER
+            if spendable <= 0:
+                refill = q.get("refill", q["reset"])
+                if refill > now:
+                    return refill - now + 1, f"{resource} 쿼터 소진"
+            else:
+                rate = spendable / window
+                tokens = min(
+                    self._tokens[resource] + (now - self._refilled[resource]) * rate,
+                    max(spendable / 2, 1),
+                )
+                self._tokens[resource], self._refilled[resource] = tokens, now
+                if tokens < 1:
+                    return (1 - tokens) / rate, f"{resource} 쿼터 페이싱"
+        if write:
+            while self._writes and self._writes[0] <= now - 3600:
+                self._writes.popleft()
+            if len(self._writes) >= WRITE_LIMIT_HOUR:
+                return self._writes[0] + 3600 - now, "시간당 쓰기 한도"
+            if self._writes and now - self._writes[-1] < WRITE_INTERVAL:
+                return self._writes[-1] + WRITE_INTERVAL - now, "쓰기 간격"
+        return 0, ""
+
+    def observe(
+        self, resource: str, resp: requests.Response, quota: dict | None = None
+    ) -> float | None:
+        """
+        응답 후 풀의 쿼터를 기록한다. 레이트 리밋에 걸렸으면 백오프할 초를 반환
+        (0: 그 토큰만 소진됨, 다른 토큰으로 바로 재시도).
+        """
+        h = resp.headers
+        now = time.time()
+        with self._lock:
+            if quota:
+                prev = self._quota.get(resource)
+                if (
+                    not prev
+                    or quota["reset"] > prev["reset"]
+                    or quota.get("refill", 0) > prev.get("refill", 0)
+                ):
+                    # 새 리소스이거나 새 윈도우: 가득 찬 버킷으로 시작한다.
+                    self._quota[resource] = quota
+                    self._tokens[resource] = float("inf")  # 용량으로 잘림
+                    self._refilled[resource] = now
+                elif quota["reset"] == prev["reset"] and quota["remaining"] <= prev["remaining"]:
+                    self._quota[resource] = quota
+                # 그 밖의 경우는 --concurrency에서 나중 응답에 추월당한 이전 응답이다:
+                # 더 높은 `remaining`은 낡은 값이므로 기존 값을 유지한다.
+            if resp.status_code not in (403, 429) or not self._is_rate_limited(resp):
+                self._backoffs = 0
+                return None
+            if (
+                h.get("X-RateLimit-Remaining") == "0"
+                and "Retry-After" not in h
+                and quota
+                and quota["remaining"] > RATE_LIMIT_BUFFER
+            ):
+                return 0.0
+            self.secondary_hits += 1
+            if "Retry-After" in h:
+                wait = float(h["Retry-After"])
+            elif h.get("X-RateLimit-Remaining") == "0":
+                # 풀 전체가 소진됨: 가장 먼저 리셋되는 토큰까지 대기.
+                reset = quota["refill"] if quota else int(h.get("X-RateLimit-Reset", 0))
+                wait = max(reset - now, 0) + 1
+            else:
+                # 힌트 없음: GitHub는 최소 1분을 요구하고, 이후 지수 증가.
+                wait = SECONDARY_BACKOFF * 2 ** min(self._backoffs, 4)
+            self._backoffs += 1
+            self._paused_until = max(self._paused_until, now + wait)
+            return wait
+
+    @staticmethod
+    def _is_rate_limited(resp: requests.Response) -> bool:
+        h = resp.headers
+        if resp.status_code == 429 or "Retry-After" in h:
+            return True
+        if h.get("X-RateLimit-Remaining") == "0":
+            return True
+        return "rate limit" in resp.text.lower()
+
+    def snapshot(self) -> dict:
+        """실행 로그에 남길 예산 상태."""
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "write_requests": self.write_requests,
+                "secondary_limit_hits": self.secondary_hits,
+                "throttled_seconds": round(self.throttled, 1),
+                "quota": {
+                    r: {
+                        **q,
+                        **{
+                            k: datetime.fromtimestamp(v).isoformat()
+                            for k, v in q.items()
+                            if k in ("reset", "refill")
+                        },
+                    }
+                    for r, q in sorted(self._quota.items())
+                },
+            }
+
+
+# ─────────────────────────────────────────────
+# 요청 프로파일 (실행 로그 / --profile)
+# ─────────────────────────────────────────────
+def _endpoint_template(method: str, url: str) -> str:
+    """요청 URL에 대한 `GET /repos/{o}/{r}/pulls/{n}` 형태의 라벨."""
+    path = url[len(GITHUB_API):] if url.startswith(GITHUB_API) else url
+    for pattern, repl in ENDPOINT_TEMPLATES:
+        path = pattern.sub(repl, path)
+    return f"{method} {path}"
+
+
+class Profile:
+    """
+    실행의 시간과 쿼터가 어디에 쓰였는지. 모든 스레드가 공유한다.
+
+    모든 API 요청을 엔드포인트 템플릿과 상태 코드별로 세고, 전송 시간(재시도 포함)을
+    잰다. 모든 sleep은 사유별로(settle, checks, workflow idle, rate limit,
+    delay, ...) 잰다. 스로틀링과 대기는 요청 시간이 아니라 sleep으로 잡힌다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._started = time.time()
+        self._requests: dict[str, dict] = {}
+        self._sleeps: dict[str, dict] = {}
+        self._waiting: dict[int, str] = {}  # 스레드 id -> 대기 중인 사유
+        self._histograms: dict[str, list[int]] = {}  # 사유 -> WAIT_BUCKETS별 횟수
+
+    def request(self, label: str, status: int, seconds: float, retries: int):
+        with self._lock:
+            entry = self._requests.setdefault(
+                label, {"count": 0, "seconds": 0.0, "retries": 0, "status": {}}
+            )
+            entry["count"] += 1
+            entry["seconds"] += seconds
+            entry["retries"] += retries
+            entry["status"][str(status)] = entry["status"].get(str(status), 0) + 1
+
+    def slept(self, reason: str, seconds: float):
+        with self._lock:
+            entry = self._sleeps.setdefault(reason, {"count": 0, "seconds": 0.0})
+            entry["count"] += 1
+            entry["seconds"] += seconds
+            buckets = self._histograms.setdefault(reason, [0] * len(WAIT_BUCKETS))
+            for i, bound in enumerate(WAIT_BUCKETS):
+                if seconds <= bound:
+                    buckets[i] += 1
+                    break
+
+    @contextmanager
+    def waiting(self, reason: str):
+        """대기 시간을 `reason`으로 기록한다. 그동안 이 스레드는 waits()에 잡힌다."""
+        thread = threading.get_ident()
+        with self._lock:
+            self._waiting[thread] = reason
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._waiting.pop(thread, None)
+            self.slept(reason, time.monotonic() - start)
+
+    def waits(self) -> dict[str, int]:
+        """지금 대기 중인 스레드 수, 사유별 (`rate limit (...)`은 하나로 합침)."""
+        counts: dict[str, int] = {}
+        with self._lock:
+            for reason in self._waiting.values():
+                reason = reason.split(" (")[0]
+                counts[reason] = counts.get(reason, 0) + 1
+        return counts
+
+    def wait_histograms(self) -> dict[str, dict]:
+        """사유별 대기를 누적 WAIT_BUCKETS 횟수와 전체 횟수, 합계로 반환."""
+        with self._lock:
+            return {
+                reason: {
+                    "buckets": [sum(counts[: i + 1]) for i in range(len(counts))],
+                    "count": self._sleeps[reason]["count"],
+                    "sum": self._sleeps[reason]["seconds"],
+                }
+                for reason, counts in sorted(self._histograms.items())
+            }
+
+    def snapshot(self) -> dict:
+        """실행 로그용 프로파일. 가장 느린 엔드포인트 / 가장 긴 대기부터."""
+        with self._lock:
+            requests_ = sorted(self._requests.items(), key=lambda kv: -kv[1]["seconds"])
+            sleeps = sorted(self._sleeps.items(), key=lambda kv: -kv[1]["seconds"])
+            return {
+                "wall_seconds": round(time.time() - self._started, 1),
+                "requests": {
+                    label: {
+                        "count": e["count"],
+                        "seconds": round(e["seconds"], 2),
+                        "avg_ms": round(e["seconds"] / e["count"] * 1000),
+                        "retries": e["retries"],
+                        "status": dict(sorted(e["status"].items())),
+                    }
+                    for label, e in requests_
+                },
+                "sleep": {
+                    reason: {**e, "seconds": round(e["seconds"], 1)} for reason, e in sleeps
+                },
+            }
+
+
+# 요청 횟수/시간과 사유별 sleep 시간 (실행 로그 / --profile 용).
+_profile = Profile()
+
+
+# ─────────────────────────────────────────────
+# GitHub API 클라이언트
+# ─────────────────────────────────────────────
+def _last_page(resp: requests.Response) -> int:
+    """목록 응답의 `Link: <...&page=N>; rel="last"`에서 읽은 페이지 수 (없으면 1)."""
+    last = resp.links.get("last", {}).get("url")
+    if not last:
+        return 1
+    return int(parse_qs(urlparse(last).query).get("page", ["1"])[0])
+
+
+class GitHubClient:
+    """TokenPool 위에서 공유 RateBudget으로 페이싱되는 GitHub API 클라이언트."""
+
+    def __init__(
+        self,
+        tokens: TokenPool,
+        max_in_flight: int = MAX_IN_FLIGHT,
+        cache: HTTPCache | None = None,
+    ):
+        self.tokens = tokens
+        self.cache = cache
+        self.budget = RateBudget()
+        # 진행 중인 요청 수를 제한해, 수백 개의 머지 워커가 동시에 CI를 기다려도
+        # 실제로 API와 통신하는 것은 몇 개뿐이게 한다.
+        self._in_flight = threading.BoundedSemaphore(max(max_in_flight, 1))
+        self.session = requests.Session()
+        # 진행 중 요청 슬롯마다 풀 커넥션 1개 (requests 기본값은 10).
+        self.session.mount("https://", HTTPAdapter(pool_maxsize=max(max_in_flight, 10)))
+        # Authorization은 요청마다 설정: 풀에서 쿼터가 가장 많이 남은 토큰을 쓴다.
+        self.session.headers.update({"Accept": "application/vnd.github.v3+json"})
+
+    def _request(
+        self, method: str, url: str, write: bool | None = None, **kwargs
+    ) -> requests.Response:
+        params = kwargs.get("params")
+        resource = "graphql" if url.endswith("/graphql") else "core"
+        if write is None:
+            write = method != "GET" and resource == "core"
+        headers = kwargs.pop("headers", {})
+        cached = self.cache is not None and method == "GET"
+        elapsed = 0.0
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            self.budget.acquire(resource, write)
+            token = self.tokens.pick(resource)
+            # 자격 증명별로 캐시한다. App 토큰 값은 바뀌지만 설치 id는 그대로다.
+            credential = token.installation or token.value
+            entry = self.cache.load(url, params, credential) if cached else None
+            validators = self.cache.validators(entry) if entry else {}
+            auth = {**headers, **validators, "Authorization": f"token {token.value}"}
+            with self._in_flight:
+                start = time.monotonic()
+                resp = self.session.request(
+                    method, url, headers=auth, timeout=REQUEST_TIMEOUT, **kwargs
+                )
+                elapsed += time.monotonic() - start
+            observed = self.tokens.observe(token, resource, resp)
+            backoff = self.budget.observe(observed, resp, self.tokens.quota(observed))
+            if backoff is None or attempt == RATE_LIMIT_RETRIES:
+                break
+            if backoff == 0:
+                logging.info(
+                    f"{token.label}의 {observed} 쿼터 소진: {method} {url}; "
+                    f"다른 토큰으로 재시도 (재시도 {attempt + 1}/{RATE_LIMIT_RETRIES})"
+                )
+                continue
+            logging.warning(
+                f"레이트 리밋 (HTTP {resp.status_code}): {method} {url}; "
+                f"모든 요청 {backoff:.0f}초 중지 (재시도 {attempt + 1}/{RATE_LIMIT_RETRIES})"
+            )
+        _profile.request(_endpoint_template(method, url), resp.status_code, elapsed, attempt)
+        if entry and resp.status_code == 304:
+            return self.cache.replay(url, params, credential, entry, resp)
+        if cached and resp.status_code == 200:
+            self.cache.store(url, params, credential, resp)
+        return resp
+
+    def rate_limit(self) -> dict:
+        """실행 로그와 /healthz용 예산 상태와 토큰별 쿼터."""
+        return {**self.budget.snapshot(), "tokens": self.tokens.snapshot()}
+
+    def get(self, path: str, **kwargs) -> requests.Response:
+        return self._request("GET", f"{GITHUB_API}{path}", **kwargs)
+
+    def put(self, path: str, **kwargs) -> requests.Response:
+        return self._request("PUT", f"{GITHUB_API}{path}", **kwargs)
+
+    def post(self, path: str, **kwargs) -> requests.Response:
+        return self._request("POST", f"{GITHUB_API}{path}", **kwargs)
+
+    def patch(self, path: str, **kwargs) -> requests.Response:
+        return self._request("PATCH", f"{GITHUB_API}{path}", **kwargs)
+
+    def delete(self, path: str, **kwargs) -> requests.Response:
+        return self._request("DELETE", f"{GITHUB_API}{path}", **kwargs)
+
+    def graphql(self, query: str, variables: dict) -> dict:
+        """GraphQL 요청의 `data`; 오류가 하나라도 있으면 예외."""
+        data, errors = self.graphql_partial(query, variables)
+        if errors:
+            raise RuntimeError(f"GraphQL 오류: {errors[0].get('message')}")
+        return data
+
+    def graphql_partial(self, query: str, variables: dict) -> tuple[dict, list[dict]]:
+        """
+        GraphQL 요청의 (`data`, `errors`). 빈 자리를 허용하는 쿼리용.
+
+        GitHub는 alias 조회 묶음에 대해 찾은 것과 함께, 찾지 못한 alias마다
+        (삭제된 repo나 PR이면 NOT_FOUND) 오류 하나를 돌려주고 그 값은 null이다.
+        `data`가 없는 응답만 예외를 던진다.
+        """
+        # mergeStateStatus는 아직 merge-info preview 미디어 타입 뒤에 있다.
+        resp = self.post(
+            "/graphql",
+            json={"query": query, "variables": variables},
+            headers={"Accept": "application/vnd.github.merge-info-preview+json"},
+            write=query.lstrip().startswith("mutation"),
+        )
+        if resp.status_code != 200:
+            raise RuntimeError(f"GraphQL 요청 실패: HTTP {resp.status_code}")
+        body = resp.json()
+        errors = body.get("errors") or []
+        if body.get("data") is None:
+            message = errors[0].get("message") if errors else "data 없음"
+            raise RuntimeError(f"GraphQL 오류: {message}")
+        return body["data"], errors
+
+    def get_pages(self, path: str, params: dict | None = None) -> list[requests.Response]:
+        """
+        페이지네이션된 목록의 모든 페이지를 페이지 순서대로 반환한다.
+
+        첫 페이지의 `Link: rel="last"`로 페이지 수를 알고, 나머지 페이지는
+        동시에 가져온다. Link 헤더가 없으면 첫 페이지가 유일한 페이지이므로
+        빈 페이지를 요청하는 일이 없다. 첫 페이지가 실패하면 그 응답만 반환해
+        호출자가 보고하게 한다.
+        """
+        params = {**(params or {}), "per_page": PER_PAGE}
+        first = self.get(path, params={**params, "page": 1})
+        last = _last_page(first) if first.status_code == 200 else 1
+        if last <= 1:
+            return [first]
+        with ThreadPoolExecutor(max_workers=min(last - 1, PAGE_WORKERS)) as pool:
+            rest = pool.map(
+                lambda page: self.get(path, params={**params, "page": page}),
+                range(2, last + 1),
+            )
+            return [first, *rest]
+
+    def list_repos(self, org: str) -> list[str]:
+        return sorted(self.list_repos_pushed(org))
+
+    def list_repos_pushed(self, org: str) -> dict[str, str]:
+        """활성(아카이브·비활성화되지 않은) repo → `pushed_at` 타임스탬프 매핑."""
+        repos: dict[str, str] = {}
+        pages = self.get_pages(f"/orgs/{org}/repos")
+        if pages[0].status_code == 404:
+            pages = self.get_pages(f"/users/{org}/repos", {"type": "owner"})
+        for page, resp in enumerate(pages, 1):
+            if resp.status_code != 200:
+                raise RuntimeError(
+                    f"리포지토리 목록 조회 실패: HTTP {resp.status_code}\n{resp.text}"
+                )
+            data = resp.json()
+            repos.update(
+                (r["name"], r.get("pushed_at") or "")
+                for r in data
+                if not r.get("archived", False) and not r.get("disabled", False)
+            )
+            logging.info(f"  페이지 {page}: {len(data)}개 repo (누적 {len(repos)}개)")
+        return repos
+
+    def iter_repos_by_update(self, org: str) -> Iterator[dict]:
+        """
+        모든 repo (아카이브 포함), 최근에 갱신된 순.
+
+        호출자가 순회하는 만큼 페이지를 하나씩 가져오므로, 중간에 멈추는 호출자
+        (Inventory.refresh)는 나머지를 요청하지 않는다.
+        """
+        path, params = f"/orgs/{org}/repos", {"sort": "updated", "direction": "desc"}
+        page = 1
+        while True:
+            resp = self.get(path, params={**params, "per_page": PER_PAGE, "page": page})
+            if resp.status_code == 404 and page == 1 and path.startswith("/orgs/"):
+                path, params = f"/users/{org}/repos", {**params, "type": "owner"}
+                continue
+            if resp.status_code != 200:
+                raise RuntimeError(
+                    f"리포지토리 목록 조회 실패: HTTP {resp.status_code}\n{resp.text}"
+                )
+            yield from resp.json()
+            if page >= _last_page(resp):
+                return
+            page += 1
+
+    def list_dependabot_prs(
+        self, org: str, repo: str, strict: bool = False
+    ) -> list[PullRequest]:
+        """열린 Dependabot PR; 실패한 페이지에서 목록이 끝난다 (strict: 예외)."""
+        prs: list[PullRequest] = []
+        for resp in self.get_pages(f"/repos/{org}/{repo}/pulls", {"state": "open"}):
+            if resp.status_code != 200:
+                if strict:
+                    raise RuntimeError(
+                        f"{org}/{repo} pulls 조회 실패: HTTP {resp.status_code}"
+                    )
+                return prs
+            data = resp.json()
+            for pr in data:
+                login = (pr.get("user") or {}).get("login", "")
+                if login in DEPENDABOT_LOGINS:
+                    prs.append(
+                        PullRequest(
+                            repo=repo,
+                            number=pr["number"],
+                            title=pr["title"],
+                            head=(pr.get("head") or {}).get("ref", ""),
+                            url=pr["html_url"],
+                            updates=_body_updates(pr.get("body")),
+                        )
+                    )
+        return prs
+
+    def search_dependabot_prs(self, org: str) -> list[PullRequest]:
+        """
+        `org` 소유의 열린 Dependabot PR을 페이지네이션 검색 한 번으로 모두 찾는다.
+
+        검색을 쓸 수 없으면 (API 오류, 또는 검색 상한을 넘는 결과) RuntimeError를
+        던져 호출자가 repo별 목록 조회로 폴백할 수 있게 한다.
+        """
+        q = f"is:pr is:open archived:false author:app/dependabot user:{org}"
+        prs: list[PullRequest] = []
+        after = None
+        page = 1
+        while True:
+            data = self.graphql(SEARCH_PRS_QUERY, {"q": q, "after": after})["search"]
+            if data["issueCount"] > SEARCH_RESULT_CAP:
+                raise RuntimeError(
+                    f"검색 결과 {data['issueCount']}건이 상한 {SEARCH_RESULT_CAP}건을 초과"
+                )
+            for node in data["nodes"]:
+                repo = (node or {}).get("repository") or {}
+                if not repo or repo.get("isArchived") or repo.get("isDisabled"):
+                    continue
+                prs.append(
+                    PullRequest(
+                        repo=repo["name"],
+                        number=node["number"],
+                        title=node["title"],
+                        head=node.get("headRefName") or "",
+                        url=node["url"],
+                        prefetched=_merge_detail_from_graphql(node),
+                        updates=_body_updates(node.get("body")),
+                    )
+                )
+            logging.info(f"  검색 페이지 {page}: {len(data['nodes'])}개 PR (누적 {len(prs)}개)")
+            if not data["pageInfo"]["hasNextPage"]:
+                break
+            after = data["pageInfo"]["endCursor"]
+            page += 1
+        # repo별 목록 조회와 같은 순서: repo는 알파벳순, PR은 최신순.
+        return sorted(prs, key=lambda pr: (pr.repo, -pr.number))
+
+    def fetch_merge_states(
+        self, org: str, prs: list[PullRequest]
+    ) -> dict[tuple[str, int], dict]:
+        """
+        여러 PR의 머지 가능 상태를 GraphQL 요청당 PREFETCH_BATCH개씩 조회한다.
+
+        {(repo, number): detail}을 반환하며, detail은 머지 로직이 읽는 REST
+        필드(mergeable, mergeable_state, head.sha)와 같은 모양이다.
+        """
+        nodes = self.fetch_pr_nodes(org, [(pr.repo, pr.number) for pr in prs], PR_STATE_FIELDS)
+        return {key: _merge_detail_from_graphql(node) for key, node in nodes.items()}
+
+    def fetch_pr_nodes(
+        self, org: str, keys: list[tuple[str, int]], fields: str
+    ) -> dict[tuple[str, int], dict]:
+        """
+        여러 PR의 GraphQL `fields`. 요청당 PREFETCH_BATCH개의 alias 조회.
+
+        더 이상 조회되지 않는 PR (또는 repo)은 결과에서 빠질 뿐이다.
+        """
+        nodes: dict[tuple[str, int], dict] = {}
+        for start in range(0, len(keys), PREFETCH_BATCH):
+            batch = keys[start : start + PREFETCH_BATCH]
+            lookups = "\n".join(
+                f"pr{i}: repository(owner: {json.dumps(org)}, name: {json.dumps(repo)}) "
+                f"{{ pullRequest(number: {number}) {{ {fields} }} }}"
+                for i, (repo, number) in enumerate(batch)
+            )
+            data, errors = self.graphql_partial(f"query {{\n{lookups}\n}}", {})
+            for error in errors:
+                logging.debug(f"GraphQL 조회 {error.get('path')}: {error.get('message')}")
+            for i, key in enumerate(batch):
+                node = (data.get(f"pr{i}") or {}).get("pullRequest")
+                if node:
+                    nodes[key] = node
+        return nodes
+
+    def get_pr(self, org: str, repo: str, number: int) -> dict:
+        resp = self.get(f"/repos/{org}/{repo}/pulls/{number}")
+        if resp.status_code != 200:
+            raise RuntimeError(
+                f"PR 조회 실패 {org}/{repo}#{number}: HTTP {resp.status_code}"
+            )
+        return resp.json()
+
+    def merge_pr(
+        self, org: str, repo: str, number: int, sha: str, method: str
+    ) -> tuple[bool, str]:
+        """PR을 머지한다. (True, 머지 커밋 SHA) 또는 (False, 오류)를 반환."""
+        resp = self.put(
+            f"/repos/{org}/{repo}/pulls/{number}/merge",
+            json={"sha": sha, "merge_method": method},
+        )
+        if resp.status_code == 200:
+            return True, resp.json().get("sha", "")
+        try:
+            msg = resp.json().get("message", resp.text)
+        except ValueError:
+            msg = resp.text
+        return False, f"HTTP {resp.status_code}: {msg}"
+
+    def enable_auto_merge(self, node_id: str, sha: str, method: str) -> tuple[bool, str]:
+        """PR의 네이티브 auto-merge를 켠다 (현재 head SHA에 고정)."""
+        try:
+            self.graphql(
+                ENABLE_AUTO_MERGE_MUTATION,
+                {"id": node_id, "method": method.upper(), "sha": sha or None},
+            )
+        except RuntimeError as e:
+            return False, str(e)
+        return True, "auto-merge 활성화"
+
+    def enqueue_pr(self, node_id: str, sha: str) -> tuple[bool, str]:
+        """PR을 base 브랜치의 머지 큐에 추가 (현재 head SHA에 고정)."""
+        try:
+            data = self.graphql(ENQUEUE_MUTATION, {"id": node_id, "sha": sha or None})
+        except RuntimeError as e:
+            return False, str(e)
+        entry = (data.get("enqueuePullRequest") or {}).get("mergeQueueEntry") or {}
+        return True, f"머지 큐 {entry.get('position', '?')}번째에 추가됨"
+
+    def update_branch(self, org: str, repo: str, number: int) -> tuple[bool, str]:
+        """PR 브랜치를 최신 base로 리베이스 (PUT .../update-branch)."""
+        resp = self.put(f"/repos/{org}/{repo}/pulls/{number}/update-branch")
+        if resp.status_code == 202:
+            return True, "update requested"
+        try:
+            msg = resp.json().get("message", resp.text)
+        except ValueError:
+            msg = resp.text
+        return False, f"HTTP {resp.status_code}: {msg}"
+
+    def get_branch_sha(self, org: str, repo: str, branch: str) -> str:
+        """브랜치의 현재 head 커밋."""
+        resp = self.get(f"/repos/{org}/{repo}/git/ref/heads/{branch}")
+        if resp.status_code != 200:
+            raise RuntimeError(
+                f"브랜치 조회 실패 {org}/{repo}@{branch}: HTTP {resp.status_code}"
+            )
+        return resp.json()["object"]["sha"]
+
+    def create_branch(self, org: str, repo: str, branch: str, sha: str):
+        resp = self.post(
+            f"/repos/{org}/{repo}/git/refs",
+            json={"ref": f"refs/heads/{branch}", "sha": sha},
+        )
+        if resp.status_code != 201:
+            raise RuntimeError(
+                f"브랜치 생성 실패 {org}/{repo}@{branch}: HTTP {resp.status_code}"
+            )
+
+    def delete_branch(self, org: str, repo: str, branch: str) -> bool:
+        resp = self.delete(f"/repos/{org}/{repo}/git/refs/heads/{branch}")
+        return resp.status_code in (204, 422)  # 422: 이미 삭제됨
+
+    def merge_branch(
+        self, org: str, repo: str, base: str, head: str, message: str
+    ) -> tuple[bool, str]:
+        """`head`를 `base` 브랜치에 서버 측에서 머지한다 (POST .../merges)."""
+        resp = self.post(
+            f"/repos/{org}/{repo}/merges",
+            json={"base": base, "head": head, "commit_message": message},
+        )
+        if resp.status_code in (201, 204):  # 204: 이미 포함됨
+            return True, "머지됨"
+        if resp.status_code == 409:
+            return False, "머지 충돌"
+        return False, f"HTTP {resp.status_code}"
+
+    def create_pr(
+        self, org: str, repo: str, head: str, base: str, title: str, body: str
+    ) -> dict:
+        resp = self.post(
+            f"/repos/{org}/{repo}/pulls",
+            json={"head": head, "base": base, "title": title, "body": body},
+        )
+        if resp.status_code != 201:
+            raise RuntimeError(
+                f"PR 생성 실패 {org}/{repo} {head}: HTTP {resp.status_code}"
+            )
+        return resp.json()
+
+    def close_pr(self, org: str, repo: str, number: int, comment: str) -> bool:
+        """PR에 코멘트를 남기고 닫는다."""
+        self.post(f"/repos/{org}/{repo}/issues/{number}/comments", json={"body": comment})
+        resp = self.patch(f"/repos/{org}/{repo}/pulls/{number}", json={"state": "closed"})
+        return resp.status_code == 200
+
+    def count_active_runs(self, org: str, repo: str) -> int:
+        """리포지토리의 queued + in_progress Actions 워크플로 실행 수를 센다."""
+        total = 0
+        for status in ("queued", "in_progress"):
+            resp = self.get(
+                f"/repos/{org}/{repo}/actions/runs",
+                params={"status": status, "per_page": 1},
+            )
+            if resp.status_code == 200:
+                total += resp.json().get("total_count", 0)
+        return total
+
+    def list_runs_for_sha(self, org: str, repo: str, sha: str) -> list[dict]:
+        """커밋 하나로 트리거된 Actions 워크플로 실행 목록 (필터 쿼리 한 번)."""
+        resp = self.get(
+            f"/repos/{org}/{repo}/actions/runs",
+            params={"head_sha": sha, "per_page": PER_PAGE},
+        )
+        if resp.status_code != 200:
+            return []
+        return resp.json().get("workflow_runs", [])
+
+    def cancel_run(self, org: str, repo: str, run_id: int) -> bool:
+        """워크플로 실행 취소 (POST .../actions/runs/{id}/cancel)."""
+        resp = self.post(f"/repos/{org}/{repo}/actions/runs/{run_id}/cancel")
+        return resp.status_code == 202  # 409: 이미 끝남
+
+
+# ─────────────────────────────────────────────
+# 웹훅 수신기 (선택, 이벤트 기반 대기)
+# ─────────────────────────────────────────────
+class WebhookReceiver:
+    """
+    GitHub `workflow_run` / `check_suite` 웹훅을 받는 작은 HTTP 엔드포인트.
+
+    repo/조직 웹훅(또는 smee/gh webhook forward 같은 로컬 리플레이어)을 여기로
+    향하게 한다. 전달이 올 때마다 해당 repo를 기다리는 머지 워커를 깨워, idle/체크
+    대기가 다음 폴링이 아니라 GitHub가 진행을 알리는 즉시 끝나게 한다.
+    `pull_request` / `push` 전달은 `watch`를 위해 해당 repo를 변경됨으로 표시한다.
+    GITHUB_WEBHOOK_SECRET이 설정되어 있으면 전달을 검증한다.
+    """
+
+    EVENTS = {"workflow_run", "check_suite"}
+    CHANGE_EVENTS = {"pull_request", "push"}
+
+    def __init__(self, org: str, host: str, port: int, secret: str = ""):
+        self.org = org.lower()
+        self.secret = secret
+        self._cond = threading.Condition()
+        # repo -> [받은 전달 수, 받은 완료 전달 수]
+        self._counts: dict[str, list[int]] = {}
+        self._changed: set[str] = set()  # PR/push 활동이 있었던 repo (watch)
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        host, port = self.server.server_address[:2]
+        logging.info(f"웹훅 수신 대기 중: http://{host}:{port}/")
+
+    def _handler(self):
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, fmt, *args):
+                logging.debug(f"webhook: {fmt % args}")
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if not receiver._verify(body, self.headers.get("X-Hub-Signature-256", "")):
+                    self.send_response(401)
+                    self.end_headers()
+                    return
+                self.send_response(204)
+                self.end_headers()
+                try:
+                    payload = json.loads(body or b"{}")
+                except ValueError:
+                    return
+                receiver._deliver(self.headers.get("X-GitHub-Event", ""), payload)
+
+        return Handler
+
+    def _verify(self, body: bytes, signature: str) -> bool:
+        if not self.secret:
+            return True
+        digest = hmac.new(self.secret.encode(), body, hashlib.sha256).hexdigest()
+        return hmac.compare_digest(f"sha256={digest}", signature)
+
+    def _deliver(self, event: str, payload: dict):
+        repo = payload.get("repository") or {}
+        owner = ((repo.get("owner") or {}).get("login") or "").lower()
+        if owner != self.org:
+            return
+        if event in self.CHANGE_EVENTS:
+            with self._cond:
+                self._changed.add(repo.get("name", ""))
+                self._cond.notify_all()
+            return
+        if event not in self.EVENTS:
+            return
+        with self._cond:
+            counts = self._counts.setdefault(repo.get("name", ""), [0, 0])
+            counts[0] += 1
+            if payload.get("action") == "completed":
+                counts[1] += 1
+            self._cond.notify_all()
+        logging.debug(f"webhook: {event} {payload.get('action')} for {repo.get('name')}")
+
+    def mark(self, repo: str) -> tuple[int, int]:
+        """
+        지금까지 `repo`에 들어온 전달 수. wait()에 넘긴다.
+
+        대기로 이어질 수 있는 상태 요청 전에 받아 둔다: 그 요청이 진행 중일 때
+        도착한 전달도 대기를 끝낸다.
+        """
+        with self._cond:
+            return tuple(self._counts.get(repo, [0, 0]))
+
+    def wait(
+        self,
+        repo: str,
+        mark: tuple[int, int],
+        timeout: float,
+        completed_only: bool = True,
+    ) -> bool:
+        """
+        `mark` 이후 `repo`의 (완료) 이벤트 또는 `timeout`까지 대기한다.
+
+        이벤트가 오면 True를 반환한다. False면 호출자가 폴링으로 폴백해야 한다.
+        Ctrl-C로 _stop이 설정되면 KeyboardInterrupt를 던진다.
+        """
+        slot = 1 if completed_only else 0
+        deadline = time.time() + timeout
+        seen = mark[slot]
+        with self._cond:
+            while True:
+                if _stop.is_set():
+                    raise KeyboardInterrupt
+                if self._counts.get(repo, [0, 0])[slot] != seen:
+                    return True
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return False
+                # Ctrl-C는 notify를 보낼 수 없으므로 짧게 나눠 대기해 알아챈다.
+                self._cond.wait(min(remaining, 1))
+
+    def take_changed(self, timeout: float = 0) -> set[str]:
+        """pull_request/push 전달로 표시된 repo를 꺼낸다. 최대 `timeout`초 대기."""
+        deadline = time.time() + timeout
+        with self._cond:
+            while not self._changed:
+                if _stop.is_set():
+                    raise KeyboardInterrupt
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                self._cond.wait(min(remaining, 1))
+            changed, self._changed = self._changed, set()
+        return changed
+
+
+# ─────────────────────────────────────────────
+# Watch 데몬 (인메모리 인덱스 + 헬스 엔드포인트)
+# ─────────────────────────────────────────────
+class WatchIndex:
+    """
+    `watch`용 조직 인메모리 뷰: repo -> pushed_at, repo -> 열린 PR.
+
+    repo의 pulls는 `pushed_at`이 바뀌었을 때(Dependabot의 브랜치 push, 머지 반영)나
+    웹훅이 표시했을 때만 다시 조회한다. 그래서 조용한 주기의 비용은 repo 목록 조회
+    한 번(대부분 ETag 캐시의 304)과 mergeable 상태 일괄 사전 조회뿐이다. 메모리는
+    조직 크기에 비례한다: repo당 항목 하나, 열린 Dependabot PR당 하나.
+    """
+
+    def __init__(self):
+        self.pushed: dict[str, str] = {}
+        self.prs: dict[str, list[PullRequest]] = {}
+        self.previewed: set[tuple[str, int]] = set()
+
+    def refresh(
+        self, client: GitHubClient, args: argparse.Namespace, changed: set[str]
+    ) -> int:
+        """인덱스를 최신으로 갱신하고, 다시 조회한 repo 수를 반환."""
+        repos = client.list_repos_pushed(args.org)
+        if args.repos:
+            wanted = {r.strip() for r in args.repos.split(",")}
+            repos = {r: ts for r, ts in repos.items() if r in wanted}
+        for gone in set(self.pushed) - set(repos):  # 아카이브 / 삭제됨
+            self.pushed.pop(gone, None)
+            self.prs.pop(gone, None)
+        stale = [r for r, ts in repos.items() if self.pushed.get(r) != ts or r in changed]
+        for repo in stale:
+            prs = client.list_dependabot_prs(args.org, repo)
+            if prs:
+                self.prs[repo] = prs
+            else:
+                self.prs.pop(repo, None)
+            self.pushed[repo] = repos[repo]
+        return len(stale)
+
+    def invalidate(self, repo: str):
+        """다음 갱신 때 `repo`를 강제로 다시 조회."""
+        self.pushed.pop(repo, None)
+
+    def open_prs(self) -> list[PullRequest]:
+        return [pr for prs in self.prs.values() for pr in prs]
+
+
+@dataclass
+class WatchState:
+    """헬스 엔드포인트가 보고하는 `watch` 루프 상태."""
+
+    interval: int
+    started: float = field(default_factory=time.time)
+    cycles: int = 0
+    last_ok: float = 0.0
+    last_error: str = ""
+    repos: int = 0
+    open_prs: int = 0
+    merged: int = 0
+    failed: int = 0
+    recent: deque = field(default_factory=lambda: deque(maxlen=WATCH_RECENT))
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, stats: Stats):
+        with self._lock:
+            self.merged += stats.merged
+            self.failed += stats.failed
+            now = datetime.now().isoformat(timespec="seconds")
+            self.recent.extend(
+                {"time": now, "repo": d.repo, "number": d.number, "action": d.action, "message": d.message}
+                for d in stats.details
+            )
+
+    def healthy(self) -> bool:
+        """최근 세 주기 안에 갱신이 성공했는지 (또는 막 시작했는지)."""
+        since = self.last_ok or self.started
+        return time.time() - since <= 3 * self.interval
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "status": "ok" if self.healthy() else "stalled",
+                "started": datetime.fromtimestamp(self.started).isoformat(timespec="seconds"),
+                "cycles": self.cycles,
+                "last_refresh": (
+                    datetime.fromtimestamp(self.last_ok).isoformat(timespec="seconds")
+                    if self.last_ok
+                    else None
+                ),
+                "last_error": self.last_error,
+                "repos": self.repos,
+                "open_prs": self.open_prs,
+                "merged": self.merged,
+                "failed": self.failed,
+                "recent": list(self.recent),
+            }
+
+
+class HealthEndpoint:
+    """`watch`용 GET /healthz: JSON 상태, 정상이면 200, 멈췄으면 503."""
+
+    def __init__(self, host: str, port: int, state: WatchState, client: GitHubClient):
+        self.state = state
+        self.client = client
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        host, port = self.server.server_address[:2]
+        logging.info(f"헬스 엔드포인트: http://{host}:{port}/healthz")
+
+    def _handler(self):
+        endpoint = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, fmt, *args):
+                logging.debug(f"health: {fmt % args}")
+
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/healthz"):
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                report = endpoint.state.snapshot()
+                report["rate_limit"] = endpoint.client.rate_limit()
+                report["profile"] = _profile.snapshot()
+                body = json.dumps(report, ensure_ascii=False).encode()
+                self.send_response(200 if report["status"] == "ok" else 503)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+
+# ─────────────────────────────────────────────
+# Prometheus 메트릭 (--metrics-port)
+# ─────────────────────────────────────────────
+class Metrics:
+    """
+    --metrics-port용 프로세스 전체 PR 결과 합계. Stats.record가 채운다.
+
+    Stats는 실행 하나(`watch`에서는 주기 하나) 동안만 살지만, Prometheus
+    카운터는 프로세스가 사는 동안 증가만 해야 한다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.last_result = 0.0
+        self.results: dict[str, int] = {}
+
+    def record(self, result: PRResult):
+        outcome = result.action if result.success else "failed"
+        with self._lock:
+            self.results[outcome] = self.results.get(outcome, 0) + 1
+            self.last_result = time.time()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "started": self.started,
+                "last_result": self.last_result,
+                "results": dict(sorted(self.results.items())),
+            }
+
+
+# 모든 실행 / watch 주기에 걸친 PR 결과 (--metrics-port용).
+_metrics = Metrics()
+
+
+def _prometheus_labels(labels: dict[str, str]) -> str:
+    """텍스트 형식에 맞게 값을 이스케이프한 `{k="v",...}` (레이블이 없으면 "")."""
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _prometheus_text(client: GitHubClient) -> str:
+    """현재 카운터를 Prometheus 텍스트 노출 형식으로."""
+    out: list[str] = []
+
+    def metric(name: str, kind: str, help_: str, samples: list[tuple[dict, float]]):
+        out.append(f"# HELP dependabot_merge_{name} {help_}")
+        out.append(f"# TYPE dependabot_merge_{name} {kind}")
+        for labels, value in samples:
+            out.append(f"dependabot_merge_{name}{_prometheus_labels(labels)} {value}")
+
+    profile = _profile.snapshot()
+    metric(
+        "api_requests_total",
+        "counter",
+        "GitHub API requests by endpoint template and HTTP status.",
+        [
+            ({"endpoint": label, "status": status}, n)
+            for label, entry in profile["requests"].items()
+            for status, n in entry["status"].items()
+        ],
+    )
+    metric(
+        "api_request_seconds_total",
+        "counter",
+        "Time spent on the wire per endpoint template, retries included.",
+        [({"endpoint": label}, entry["seconds"]) for label, entry in profile["requests"].items()],
+    )
+    quota = client.rate_limit()["quota"]
+    metric(
+        "rate_limit_remaining",
+        "gauge",
+        "Requests left in the current window, per rate-limit resource (whole token pool).",
+        [({"resource": r}, q["remaining"]) for r, q in quota.items()],
+    )
+    metric(
+        "rate_limit_limit",
+        "gauge",
+        "Window size per rate-limit resource (whole token pool).",
+        [({"resource": r}, q["limit"]) for r, q in quota.items()],
+    )
+
+    totals = _metrics.snapshot()
+    metric(
+        "prs_total",
+        "counter",
+        "PRs processed, by outcome (merged, auto-merge, skipped, failed).",
+        [({"result": r}, n) for r, n in totals["results"].items()],
+    )
+    metric(
+        "last_result_timestamp_seconds",
+        "gauge",
+        "Unix time the last PR outcome was recorded (0 before the first); alert when it stops moving.",
+        [({}, totals["last_result"])],
+    )
+    metric(
+        "start_time_seconds",
+        "gauge",
+        "Unix time the process started.",
+        [({}, totals["started"])],
+    )
+
+    histograms = _profile.wait_histograms()
+    waits = _profile.waits()
+    reasons = sorted({r.split(" (")[0] for r in histograms} | set(waits))
+    metric(
+        "waiting_workers",
+        "gauge",
+        "Workers asleep right now, by wait reason.",
+        [({"reason": r}, waits.get(r, 0)) for r in reasons],
+    )
+    samples: list[tuple[dict, float]] = []
+    for reason, h in histograms.items():
+        for bound, n in zip(WAIT_BUCKETS, h["buckets"]):
+            samples.append(({"reason": reason, "le": f"{bound:g}"}, n))
+        samples.append(({"reason": reason, "le": "+Inf"}, h["count"]))
+    out.append("# HELP dependabot_merge_wait_seconds Duration of each sleep, by wait reason.")
+    out.append("# TYPE dependabot_merge_wait_seconds histogram")
+    for labels, n in samples:
+        out.append(f"dependabot_merge_wait_seconds_bucket{_prometheus_labels(labels)} {n}")
+    for reason, h in histograms.items():
+        labels = _prometheus_labels({"reason": reason})
+        out.append(f"dependabot_merge_wait_seconds_sum{labels} {round(h['sum'], 3)}")
+        out.append(f"dependabot_merge_wait_seconds_count{labels} {h['count']}")
+    return "\n".join(out) + "\n"
+
+
+class MetricsEndpoint:
+    """GET /metrics: 실행(또는 `watch`) 중 Prometheus 텍스트 메트릭."""
+
+    def __init__(self, host: str, port: int, client: GitHubClient):
+        self.client = client
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        host, port = self.server.server_address[:2]
+        logging.info(f"메트릭 엔드포인트: http://{host}:{port}/metrics")
+
+    def _handler(self):
+        endpoint = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, fmt, *args):
+                logging.debug(f"metrics: {fmt % args}")
+
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                body = _prometheus_text(endpoint.client).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+
+# ─────────────────────────────────────────────
+# 라이브 대시보드 (터미널에서 실행한 merge / watch)
+# ─────────────────────────────────────────────
+class Dashboard:
+    """
+    체인이 도는 동안 터미널 맨 아래에 고정되는 상태 두 줄.
+
+    이 footer는 터미널 스크롤 영역 밖에 있어 PR별 출력은 그 위에서 평소처럼
+    스크롤된다. DASHBOARD_REFRESH초마다 지금까지의 결과, 진행 중인 PR과 그 대기
+    사유(checks, workflow idle, merge queue, rate limit, ...), 분당 머지 수,
+    남은 core 쿼터, ETA를 다시 그린다. ETA는 관측된 진행 단계당 평균 시간에
+    남은 단계 수를 곱해 바쁜 워커 수로 나눈 값이다.
+    """
+
+    LINES = 2
+
+    def __init__(self, client: GitHubClient, stats: Stats, progress: Progress, workers: int):
+        self.client = client
+        self.stats = stats
+        self.progress = progress
+        self.workers = max(workers, 1)
+        self._lock = threading.Lock()
+        self._active: dict[int, float] = {}  # 스레드 id -> 단계 시작 시각
+        self._durations: list[float] = []
+        self._started = time.monotonic()
+        self._merged_before = stats.merged
+        self._rows = 0
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+
+    @staticmethod
+    def available(args: argparse.Namespace) -> bool:
+        """--no-dashboard이거나 stdout이 대화형 터미널이 아니면 꺼진다."""
+        return (
+            not args.no_dashboard
+            and sys.stdout.isatty()
+            and os.environ.get("TERM", "dumb") != "dumb"
+        )
+
+    def started(self):
+        with self._lock:
+            self._active[threading.get_ident()] = time.monotonic()
+
+    def finished(self):
+        with self._lock:
+            start = self._active.pop(threading.get_ident(), None)
+            if start is not None:
+                self._durations.append(time.monotonic() - start)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        """다시 그리기를 멈추고, 스크롤 영역을 되돌리고 footer를 지운다."""
+        self._done.set()
+        self._thread.join()
+        if self._rows:
+            top = self._rows - self.LINES
+            clear = "".join(f"\033[{top + 1 + i};1H\033[2K" for i in range(self.LINES))
+            self._write(f"\0337\033[r{clear}\0338")
+
+    def lines(self) -> list[str]:
+        """색 없는 footer 텍스트."""
+        with self._lock:
+            in_flight = len(self._active)
+            durations = list(self._durations)
+        elapsed = time.monotonic() - self._started
+        stats = self.stats
+        left = max(self.progress.total - len(durations), 0)
+        if not durations:
+            eta = "ETA —"
+        else:
+            mean = sum(durations) / len(durations)
+            eta = f"ETA {_duration(mean * left / min(self.workers, max(left, 1)))}"
+        done = f"머지 {stats.merged} · 건너뜀 {stats.skipped} · 실패 {stats.failed}"
+        if stats.auto_merge:
+            done += f" · auto-merge {stats.auto_merge}"
+
+        waits = _profile.waits()
+        waiting = ", ".join(f"{reason} {n}" for reason, n in sorted(waits.items()))
+        rate = (stats.merged - self._merged_before) / max(elapsed / 60, 1 / 60)
+        core = self.client.rate_limit()["quota"].get("core")
+        quota = f"쿼터 {core['remaining']}/{core['limit']}" if core else "쿼터 —"
+        return [
+            f"{done} | {left}/{self.progress.total} 남음 · {eta}",
+            f"진행 중 {in_flight}" + (f" (대기: {waiting})" if waiting else "")
+            + f" · 분당 머지 {rate:.1f} · {quota} · {_duration(elapsed)} 경과",
+        ]
+
+    def _loop(self):
+        while True:
+            try:
+                self._draw()
+            except OSError:
+                return  # 터미널이 사라짐
+            if self._done.wait(DASHBOARD_REFRESH):
+                return
+
+    def _draw(self):
+        cols, rows = shutil.get_terminal_size()
+        if rows <= self.LINES + 2:
+            return
+        top = rows - self.LINES
+        out = ""
+        if rows != self._rows:
+            # 출력을 footer 자리 밖으로 밀어 올린 뒤 스크롤 영역으로 가둔다.
+            if not self._rows:
+                out += "\n" * self.LINES + f"\033[{self.LINES}A"
+            out += f"\0337\033[1;{top}r\0338"
+            self._rows = rows
+        out += "\0337"
+        for i, line in enumerate(self.lines()):
+            style = Color.BOLD if i == 0 else Color.DIM
+            out += f"\033[{top + 1 + i};1H\033[2K{style}{line[: cols - 1]}{Color.RESET}"
+        self._write(out + "\0338")
+
+    @staticmethod
+    def _write(text: str):
+        with _print_lock:
+            sys.stdout.write(text)
+            sys.stdout.flush()
+
+
+def _duration(seconds: float) -> str:
+    """`1h05m` / `4m20s` / `12s`."""
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}h{minutes:02d}m"
+    if minutes:
+        return f"{minutes}m{secs:02d}s"
+    return f"{secs}s"
+
+
+@contextmanager
+def _live_dashboard(
+    client: GitHubClient, args: argparse.Namespace, stats: Stats, progress: Progress
+):
+    """터미널이 붙어 있으면 블록이 실행되는 동안 대시보드를 보여준다."""
+    global _dashboard
+    if not Dashboard.available(args):
+        yield
+        return
+    _dashboard = Dashboard(client, stats, progress, args.concurrency)
+    _dashboard.start()
+    try:
+        yield
+    finally:
+        _dashboard.stop()
+        _dashboard = None
+
+
+# ─────────────────────────────────────────────
+# 명령
+# ─────────────────────────────────────────────
+def cmd_list(client: GitHubClient, args: argparse.Namespace):
+    """모든 리포지토리의 열린 Dependabot PR 목록 조회."""
+    if args.format != "text":
+        _stream_list(client, args)
+        return
+    found = _search_prs(client, args)
+    if found is None:
+        repos = _resolve_repos(client, args)
+        scope = f"{len(repos)}개 리포지토리"
+        listing = _list_concurrently(client, args, repos, ordered=True)
+    else:
+        groups = _group_by_repo(found)
+        scope = f"열린 Dependabot PR이 있는 {len(groups)}개 리포지토리 (검색)"
+        listing = groups.items()
+
+    print(f"\n{Color.BOLD}열린 Dependabot Pull Request{Color.RESET}")
+    print(f"범위: {scope}\n")
+
+    total = 0
+    deltas: dict[str, int] = {}
+    ecosystems: dict[str, int] = {}
+    for repo, prs in listing:
+        prs = _group_by_repo(_filter_prs(args, prs)).get(repo, [])
+        if not prs:
+            continue
+        total += len(prs)
+        if args.mergeable:
+            _prefetch_merge_states(client, args, prs)
+        print(f"{Color.BOLD}{Color.CYAN}{args.org}/{repo}{Color.RESET}")
+        for pr in prs:
+            bump = _classify(pr)
+            deltas[bump.delta] = deltas.get(bump.delta, 0) + 1
+            ecosystems[bump.ecosystem] = ecosystems.get(bump.ecosystem, 0) + 1
+            state = f" | {(pr.prefetched or {}).get('mergeable_state', 'unknown')}" if args.mergeable else ""
+            print(
+                f"  #{pr.number} {pr.title} {Color.DIM}[{_bump_label(pr)}]{Color.RESET}\n"
+                f"      {Color.DIM}{pr.head} | {pr.url}{state}{Color.RESET}"
+            )
+        print()
+
+    if total == 0:
+        print(f"{Color.GREEN}열린 Dependabot PR이 없습니다.{Color.RESET}")
+    else:
+        print(f"{Color.BOLD}총 {total}개의 Dependabot PR{Color.RESET}")
+        by_delta = ", ".join(f"{d} {deltas[d]}" for d in SEMVER_DELTAS if d in deltas)
+        by_ecosystem = ", ".join(
+            f"{e} {n}" for e, n in sorted(ecosystems.items(), key=lambda x: -x[1])
+        )
+        print(f"{Color.DIM}  업데이트 유형별: {by_delta}\n  에코시스템별:   {by_ecosystem}{Color.RESET}")
+
+
+def _stream_list(client: GitHubClient, args: argparse.Namespace):
+    """
+    `list --format ndjson|csv`: PR마다 레코드 하나를 stdout에 쓴다. repo의
+    목록이 도착하는 즉시 쓰며 (repo는 동시에 조회하므로 출력은 완료 순서를
+    따른다), 진행 상황과 오류는 stderr로 간다.
+    """
+    fields = LIST_FIELDS + (LIST_STATE_FIELDS if args.mergeable else [])
+    writer = csv.DictWriter(sys.stdout, fields, lineterminator="\n")
+    if args.format == "csv":
+        writer.writeheader()
+    found = _search_prs(client, args)
+    if found is None:
+        listing = _list_concurrently(client, args, _resolve_repos(client, args), ordered=False)
+    else:
+        listing = _group_by_repo(found).items()
+    try:
+        for repo, prs in listing:
+            prs = _group_by_repo(_filter_prs(args, prs)).get(repo, [])
+            if args.mergeable:
+                _prefetch_merge_states(client, args, prs)
+            for pr in prs:
+                record = _list_record(pr, fields)
+                if args.format == "csv":
+                    writer.writerow(record)
+                else:
+                    sys.stdout.write(json.dumps(record, ensure_ascii=False) + "\n")
+            sys.stdout.flush()
+    except BrokenPipeError:
+        # 읽는 쪽(예: `| head`)이 끝났다. 종료 시 flush 오류를 막는다.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+
+
+def _list_record(pr: PullRequest, fields: list[str]) -> dict:
+    bump = _classify(pr)
+    detail = pr.prefetched or {}
+    record = {
+        "repo": pr.repo,
+        "number": pr.number,
+        "title": pr.title,
+        "head": pr.head,
+        "url": pr.url,
+        "ecosystem": bump.ecosystem,
+        "package": bump.package,
+        "delta": bump.delta,
+        "mergeable": detail.get("mergeable"),
+        "mergeable_state": detail.get("mergeable_state", "unknown"),
+    }
+    return {k: record[k] for k in fields}
+
+
+def _list_concurrently(
+    client: GitHubClient, args: argparse.Namespace, repos: list[str], ordered: bool
+) -> Iterator[tuple[str, list[PullRequest]]]:
+    """
+    repo마다 (repo, Dependabot PR 목록). 최대 --max-in-flight개씩 동시에 조회한다.
+
+    ordered면 repo 순서를 지킨다 (느린 repo가 뒤의 repo를 붙잡는다). 아니면
+    목록 조회가 끝나는 대로 repo를 내보낸다.
+    """
+    with ThreadPoolExecutor(max_workers=max(args.max_in_flight, 1)) as pool:
+        if ordered:
+            yield from zip(repos, pool.map(lambda r: _dependabot_prs(client, args, r), repos))
+            return
+        futures = {pool.submit(_dependabot_prs, client, args, repo): repo for repo in repos}
+        try:
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        finally:
+            for future in futures:
+                future.cancel()  # 중간에 멈춤 (Ctrl-C, 닫힌 파이프): 나머지는 버린다
+
+
+def cmd_merge(client: GitHubClient, args: argparse.Namespace):
+    """모든 Dependabot PR 머지: repo 안에서는 직렬, --concurrency개 repo를 동시에."""
+    prior: dict[tuple[str, int], PRResult] = {}
+    if args.resume:
+        all_prs, prior = _load_journal(args)
+        scope = f"리포지토리 {len({pr.repo for pr in all_prs})}개 (이어서 진행)"
+    else:
+        found = _search_prs(client, args)
+        if found is None:
+            repos = _resolve_repos(client, args)
+            scope = f"{len(repos)}개 리포지토리"
+        else:
+            scope = f"{len({pr.repo for pr in found})}개 리포지토리 (검색)"
+
+    print(f"\n{Color.BOLD}Dependabot PR 일괄 머지{Color.RESET}")
+    print(f"범위: {scope} | 머지 방식: {args.merge_method}")
+    if args.one_per_repo:
+        print("모드: run당 repo별 1개만 머지 (나머지는 재실행)")
+    if args.train:
+        print("모드: 머지 트레인 (PR 2개+ repo마다 합친 PR 하나)")
+    if args.auto_merge:
+        print("모드: 네이티브 auto-merge를 켜고 종료 (나중에 `status`로 확인)")
+    if args.wait_checks:
+        print(f"CI 체크 대기: PR당 최대 {args.checks_timeout}초")
+    if args.concurrency > 1 and not args.auto_merge:
+        _history.load(args.org)
+        print(f"동시성: 최대 {args.concurrency}개 repo 병렬 (repo 내부는 직렬)")
+        basis = f"지난 {_history.runs}회 실행의 소요 시간 기준" if _history.runs else "소요 시간 기록 없음"
+        print(f"스케줄: 예상 소요 시간이 긴 체인부터 ({basis})")
+    if args.dry_run:
+        _print_warn("DRY-RUN 모드: 실제 머지를 수행하지 않습니다")
+    print()
+
+    # 머지 전에 범위를 보여주기 위해 모든 Dependabot PR을 먼저 수집한다.
+    if args.resume:
+        pass  # 탐색 결과는 저널에서 가져옴
+    elif found is None:
+        logging.info("Dependabot PR 수집 중...")
+        all_prs: list[PullRequest] = []
+        for repo in repos:
+            all_prs.extend(_dependabot_prs(client, args, repo))
+    else:
+        all_prs = found
+
+    # --only / --ecosystem은 제목과 브랜치만 보므로 PR별 API 호출이 없다.
+    found_count = len(all_prs)
+    all_prs = _filter_prs(args, all_prs)
+    if len(all_prs) < found_count:
+        print(f"필터: {found_count}개 중 {len(all_prs)}개 PR이 --only / --ecosystem에 해당")
+
+    if not all_prs:
+        print(f"{Color.GREEN}머지할 Dependabot PR이 없습니다.{Color.RESET}")
+        return
+
+    # 중단 전에 머지되었거나 건너뛴 PR은 그대로 이어받는다.
+    pending = [pr for pr in all_prs if (pr.repo, pr.number) not in prior]
+    if prior:
+        print(f"{args.resume} 이어서 진행: PR {len(all_prs)}개 중 {len(prior)}개 완료됨")
+    if not pending:
+        print(f"{Color.GREEN}저널의 모든 PR이 이미 완료되었습니다.{Color.RESET}")
+        return
+
+    # 같은 repo의 다른 PR이 이미 포함하는 PR은 그 PR이 머지되면 충돌할 뿐이므로,
+    # 프리페치나 CI 한 바퀴를 쓰기 전에 뺀다.
+    listed = pending
+    pending, dupes = _dedupe_prs(pending)
+    close = args.close_superseded and not args.dry_run
+
+    # 모든 PR의 머지 가능 상태를 한꺼번에 조회해, 이미 확정된 PR은 PR별
+    # get_pr() 폴링을 건너뛰고 가망 없는 PR은 미리 건너뛴다.
+    _prefetch_merge_states(client, args, pending)
+    groups, early_skips = _split_early_skips(args, _group_by_repo(pending))
+    queued = sum(len(prs) for prs in groups.values())
+    multi = [r for r, prs in groups.items() if len(prs) > 1]
+
+    print(f"Found {Color.BOLD}{len(listed)}{Color.RESET} Dependabot PR(s):")
+    skip_reasons = {(pr.repo, pr.number): msg for pr, msg in early_skips}
+    skip_reasons.update({(d.pr.repo, d.pr.number): d.reason(close) for d in dupes})
+    for pr in listed:
+        reason = skip_reasons.get((pr.repo, pr.number))
+        note = f" {Color.DIM}(건너뜀: {reason}){Color.RESET}" if reason else ""
+        print(
+            f"  {Color.CYAN}{args.org}/{pr.repo}{Color.RESET} #{pr.number} {pr.title} "
+            f"{Color.DIM}[{_bump_label(pr)}]{Color.RESET}{note}"
+        )
+    if dupes:
+        superseded = sum(d.covered for d in dupes)
+        print(
+            f"\n  {Color.DIM}같은 repo의 다른 PR로 대체된 {superseded}개와 겹치는 "
+            f"{len(dupes) - superseded}개 PR을 건너뜁니다"
+            f"{' (대체된 PR은 닫음)' if close else ''}.{Color.RESET}"
+        )
+    if early_skips:
+        print(
+            f"\n  {Color.DIM}프리페치한 머지 가능 상태로 {len(early_skips)}개 PR을 "
+            f"미리 건너뜁니다.{Color.RESET}"
+        )
+    # 머지 큐 repo는 묶음 처리를 GitHub에 맡긴다: 트레인도, 직렬 체인도 없음.
+    queue_repos = [
+        r for r, prs in groups.items() if _uses_merge_queue(prs) and not args.auto_merge
+    ]
+    multi = [r for r in multi if r not in queue_repos]
+    if queue_repos:
+        print(
+            f"\n  {Color.YELLOW}참고: {len(queue_repos)}개 repo에 머지 큐가 있음 "
+            f"({', '.join(queue_repos)}) — PR을 한꺼번에 큐에 넣고 GitHub가 "
+            f"묶어서 머지합니다.{Color.RESET}"
+        )
+    if multi and args.train:
+        print(
+            f"\n  {Color.YELLOW}참고: {len(multi)}개 repo에 PR이 2개 이상 "
+            f"({', '.join(multi)}) — 각각 합친 트레인 PR 하나로 머지됩니다.{Color.RESET}"
+        )
+    elif multi and not args.auto_merge:
+        # 같은 repo의 PR은 한 번에 하나씩, 각 머지의 changelog/release 워크플로가
+        # 끝난 뒤 다음을 머지해 두 워크플로가 동시에 돌지 않게 한다.
+        print(
+            f"\n  {Color.YELLOW}참고: {len(multi)}개 repo에 PR이 2개 이상 "
+            f"({', '.join(multi)}) — 해당 repo는 직렬로 머지합니다.{Color.RESET}"
+        )
+    print()
+
+    if not args.dry_run and not args.yes:
+        if args.auto_merge:
+            prompt = f"Dependabot PR {queued}개에 auto-merge를 켤까요?"
+        else:
+            prompt = f"Dependabot PR {queued}개를 머지할까요?"
+        if not _confirm(prompt):
+            return
+
+    stats = Stats()
+    for result in prior.values():
+        stats.record(result)
+    stats.journal = _open_journal(args, all_prs)
+    print(f"저널: {stats.journal.path}\n")
+    for dupe in dupes:
+        if close and dupe.covered:
+            _close_superseded(client, args, dupe)
+        pr = dupe.pr
+        stats.record(PRResult(pr.repo, pr.number, pr.title, "skipped", True, dupe.reason(close)))
+    for pr, msg in early_skips:
+        stats.record(PRResult(pr.repo, pr.number, pr.title, "skipped", True, msg))
+    # 트레인은 repo 전체를 진행 단계 하나로 보고한다.
+    steps = sum(_progress_steps(args, prs) for prs in groups.values())
+    progress = Progress(total=steps)
+
+    try:
+        # --resume 전에 이미 PR을 머지한 repo는 followup으로 이어간다.
+        merged = {r.repo for r in prior.values() if r.action == "merged"}
+        with _live_dashboard(client, args, stats, progress):
+            _run_chains(client, args, groups, stats, progress, merged)
+    except (KeyboardInterrupt, Exception):
+        print(
+            f"\n{Color.YELLOW}완료된 PR은 저널에 기록됨; 이어서 진행: "
+            f"--resume {stats.journal.path}{Color.RESET}"
+        )
+        raise
+
+    _print_summary(stats, args, client.rate_limit(), _profile.snapshot())
+    if stats.auto_merge and not args.dry_run:
+        print(
+            f"머지 결과 확인: {Color.BOLD}dependabot-pr-merge.py status "
+            f"--org {args.org} --journal {stats.journal.path}{Color.RESET}"
+        )
+
+
+def _run_chains(
+    client: GitHubClient,
+    args: argparse.Namespace,
+    groups: dict[str, list[PullRequest]],
+    stats: Stats,
+    progress: Progress,
+    merged_repos: set[str],
+):
+    """모든 repo의 머지 체인을 실행한다. 요청 시 repo 간 병렬."""
+    # 머지 큐 repo를 먼저, 전부 처리한다: 큐에 넣는 데는 PR당 요청 한두 번이면 되고,
+    # 그 뒤 GitHub가 모든 큐를 동시에 처리하는 동안 여기서는 다른 체인을 실행한다.
+    # 큐는 마지막에 한꺼번에 따라간다.
+    queued: list[PullRequest] = []
+    chains: dict[str, list[PullRequest]] = {}
+    for repo, prs in groups.items():
+        if _uses_merge_queue(prs) and not args.auto_merge:
+            queued += _enqueue_merge_queue(client, args, prs, stats, progress)
+        else:
+            chains[repo] = prs
+    queue_deadline = time.monotonic() + args.queue_timeout
+
+    if args.concurrency > 1:
+        # 각 repo의 체인은 직렬을 유지하고 (changelog/release 안전), 서로 다른
+        # repo는 워크플로를 공유하지 않으므로 체인끼리는 나란히 실행한다.
+        # 예상이 가장 긴 체인부터: 느린 repo의 CI가 짧은 체인들 뒤에서 시작하지
+        # 않고 그것들과 겹쳐 돌아가므로 전체 소요 시간이 줄어든다.
+        order = sorted(
+            chains.items(),
+            key=lambda g: _history.estimate(g[0], _chain_steps(args, g[1])),
+            reverse=True,
+        )
+        logging.debug(
+            "체인 순서: "
+            + ", ".join(
+                f"{repo} (~{_history.estimate(repo, _chain_steps(args, prs)):.0f}s)"
+                for repo, prs in order
+            )
+        )
+        pool = ThreadPoolExecutor(max_workers=args.concurrency)
+        futures = [
+            pool.submit(
+                _merge_chain, client, args, prs, stats, progress, repo in merged_repos
+            )
+            for repo, prs in order
+        ]
+        try:
+            for future in as_completed(futures):
+                future.result()
+        except BaseException as e:
+            # Ctrl-C, 또는 체인이 예상치 못한 오류로 죽음: 다른 체인을 다음 확인
+            # 지점에서 멈추고 끝날 때까지 기다려, 오류를 보고할 때 (또는 `watch`
+            # 사이클이 같은 repo에 두 번째 체인을 시작할 때) 머지 중인 것이 없게 한다.
+            _stop.set()
+            pool.shutdown(wait=True, cancel_futures=True)
+            if not isinstance(e, KeyboardInterrupt):
+                _stop.clear()
+            raise
+        pool.shutdown()
+    else:
+        for repo, prs in chains.items():
+            _merge_chain(client, args, prs, stats, progress, repo in merged_repos)
+    if queued and not _stop.is_set():
+        _follow_merge_queue(client, args, queued, stats, queue_deadline)
+
+
+def _chain_steps(args: argparse.Namespace, prs: list[PullRequest]) -> int:
+    """repo 체인의 직렬 머지 수 (트레인, --one-per-repo는 1)."""
+    if args.auto_merge or args.one_per_repo:
+        return 1
+    if args.train and len(prs) > 1:
+        return 1
+    return len(prs)
+
+
+def _progress_steps(args: argparse.Namespace, prs: list[PullRequest]) -> int:
+    """repo 하나의 [idx/total] 단계 수: 트레인은 repo 전체를 한 번으로 보고한다."""
+    if args.train and len(prs) > 1 and not args.auto_merge and not _uses_merge_queue(prs):
+        return 1
+    return len(prs)
+
+
+def cmd_status(client: GitHubClient, args: argparse.Namespace):
+    """auto-merge에 맡긴 PR이 머지되었는지 보고한다."""
+    path = Path(args.journal) if args.journal else _latest_journal()
+    header, _, results = Journal.load(path)
+    if header.get("org") != args.org:
+        raise RuntimeError(f"저널 {path}은 --org {header.get('org')}용이며 {args.org}가 아님")
+    queued = [r for r in results.values() if r.action == "auto-merge"]
+
+    print(f"\n{Color.BOLD}Dependabot Auto-merge 상태{Color.RESET}")
+    print(f"저널: {path}\n")
+    if header.get("dry_run"):
+        print(f"{Color.YELLOW}Dry-run 저널: auto-merge가 켜진 적 없음.{Color.RESET}")
+        return
+    if not queued:
+        print(f"{Color.GREEN}이 실행에서 auto-merge에 맡긴 PR이 없습니다.{Color.RESET}")
+        return
+
+    nodes = client.fetch_pr_nodes(
+        args.org, [(r.repo, r.number) for r in queued], PR_STATUS_FIELDS
+    )
+    landed = waiting = attention = 0
+    for r in queued:
+        # 없음: 조회가 NOT_FOUND로 돌아왔다 (PR이나 repo가 삭제됐거나 이 토큰으로 더는
+        # 보이지 않음). 나머지 PR은 그대로 보고한다.
+        node = nodes.get((r.repo, r.number))
+        label = f"{Color.CYAN}{args.org}/{r.repo}{Color.RESET} #{r.number} {r.title}"
+        state = node.get("state") if node else None
+        if state == "MERGED":
+            landed += 1
+            print(f"  {Color.GREEN}✓{Color.RESET} {label} {Color.DIM}(머지됨 {node['mergedAt']}){Color.RESET}")
+        elif state == "OPEN" and node.get("isInMergeQueue"):
+            waiting += 1
+            position = (node.get("mergeQueueEntry") or {}).get("position", "?")
+            print(f"  {Color.BLUE}…{Color.RESET} {label} {Color.DIM}(머지 큐 {position}번째){Color.RESET}")
+        elif state == "OPEN" and node.get("autoMergeRequest"):
+            waiting += 1
+            merge_state = (node.get("mergeStateStatus") or "unknown").lower()
+            print(f"  {Color.BLUE}…{Color.RESET} {label} {Color.DIM}(대기 중, state={merge_state}){Color.RESET}")
+        else:
+            attention += 1
+            reason = {
+                "OPEN": "auto-merge가 꺼짐",
+                "CLOSED": "머지 없이 닫힘",
+            }.get(state, "찾을 수 없음: 삭제됐거나 이 토큰으로 보이지 않음")
+            print(f"  {Color.YELLOW}⚠{Color.RESET} {label} {Color.DIM}({reason}){Color.RESET}")
+
+    print(
+        f"\n{Color.BOLD}머지됨: {landed}{Color.RESET}  대기 중: {waiting}  "
+        f"{Color.YELLOW if attention else ''}확인 필요: {attention}{Color.RESET}"
+    )
+
+
+def cmd_watch(client: GitHubClient, args: argparse.Namespace):
+    """상주하면서 Dependabot PR이 머지 가능해지는 대로 머지."""
+    index = WatchIndex()
+    state = WatchState(interval=max(args.interval, 1))
+    _history.load(args.org)
+    if args.health_port:
+        HealthEndpoint(args.health_host, args.health_port, state, client).start()
+
+    print(f"\n{Color.BOLD}Dependabot PR Watch{Color.RESET}")
+    print(f"조직: {args.org} | 머지 방식: {args.merge_method} | {state.interval}초마다 갱신")
+    if _webhook is not None:
+        print("pull_request / push 웹훅이 오면 즉시 갱신")
+    if args.dry_run:
+        _print_warn("DRY-RUN 모드: 실제 머지를 수행하지 않습니다")
+    print(f"{Color.DIM}중지하려면 Ctrl-C.{Color.RESET}")
+
+    while True:
+        changed = _webhook.take_changed() if _webhook is not None else set()
+        try:
+            _watch_cycle(client, args, index, state, changed)
+        except (RuntimeError, requests.RequestException) as e:
+            state.last_error = f"{datetime.now().isoformat(timespec='seconds')} {e}"
+            logging.error(f"Watch 주기 실패: {e}")
+        if _webhook is not None:
+            # 다음 주기까지, 또는 첫 PR/push 전달이 올 때까지 대기.
+            with _profile.waiting("watch interval"):
+                changed_repos = _webhook.take_changed(state.interval)
+            for repo in changed_repos:
+                index.invalidate(repo)
+        else:
+            _sleep(state.interval, "watch interval")
+
+
+def _watch_cycle(
+    client: GitHubClient,
+    args: argparse.Namespace,
+    index: WatchIndex,
+    state: WatchState,
+    changed: set[str],
+):
+    """`watch` 한 주기: 인덱스를 갱신하고 준비된 것을 머지."""
+    relisted = index.refresh(client, args, changed)
+    prs, dupes = _dedupe_prs(_filter_prs(args, index.open_prs()))
+    if args.close_superseded and not args.dry_run:
+        for dupe in dupes:
+            if dupe.covered:
+                _close_superseded(client, args, dupe)
+                index.invalidate(dupe.pr.repo)
+                print(f"{args.org}/{dupe.pr.repo} #{dupe.pr.number}: {dupe.reason(True)}")
+    state.last_ok = time.time()  # 아래의 긴 머지 체인은 멈춤이 아니다
+    state.repos, state.open_prs = len(index.pushed), len(prs)
+    for pr in prs:
+        pr.prefetched = None  # mergeable 상태는 push 없이도 바뀐다 (CI 완료)
+    _prefetch_merge_states(client, args, prs)
+    if args.dry_run:  # dry-run: 매 주기가 아니라 PR마다 한 번만 보고
+        keys = {(pr.repo, pr.number) for pr in prs}
+        index.previewed &= keys
+        prs = [pr for pr in prs if (pr.repo, pr.number) not in index.previewed]
+        index.previewed |= {(pr.repo, pr.number) for pr in prs}
+    groups = _ready_groups(args, _group_by_repo(prs))
+
+    stats = Stats()
+    if groups:
+        progress = Progress(total=sum(_progress_steps(args, g) for g in groups.values()))
+        with _live_dashboard(client, args, stats, progress):
+            _run_chains(client, args, groups, stats, progress, set())
+        for repo in groups:
+            index.invalidate(repo)  # 머지/종료된 PR은 다음 주기에 빠진다
+        state.record(stats)
+
+    state.cycles += 1
+    ts = datetime.now().strftime("%H:%M:%S")
+    print(
+        f"{Color.DIM}[{ts}] repo {state.repos}개, 열린 PR {state.open_prs}개, "
+        f"재조회 {relisted}개, 준비된 repo {len(groups)}개{Color.RESET}"
+        + (f" — 머지 {stats.merged}, 실패 {stats.failed}" if groups else "")
+    )
+
+
+def _merge_chain(
+    client: GitHubClient,
+    args: argparse.Namespace,
+    prs: list[PullRequest],
+    stats: Stats,
+    progress: Progress,
+    merged_before: bool = False,
+):
+    """
+    한 repo의 Dependabot PR을 순서대로 머지 (병렬 처리의 단위).
+
+    merged_before: 이어서 진행하는 실행이 이 repo에서 이미 PR을 머지했으므로
+    첫 PR도 followup이다 (SHA를 모르므로 idle 대기).
+    """
+    if args.auto_merge:
+        _auto_merge_chain(client, args, prs, stats, progress)
+        return
+    if args.train and len(prs) > 1:
+        _merge_train(client, args, prs, stats, progress)
+        return
+    buffered = args.concurrency > 1
+    # 실제 머지 후 설정되고, 그 실행을 기다린 뒤 해제 ("" = SHA를 모름)
+    merge_sha: str | None = "" if merged_before else None
+    for i, pr in enumerate(prs):
+        if _stop.is_set():
+            return
+        followup = i > 0 or merged_before  # 같은 repo의 2번째+ Dependabot PR
+
+        with _pr_block(progress, f"{args.org}/{pr.repo} #{pr.number}", buffered):
+            _emit(f"  {Color.DIM}{pr.title}{Color.RESET}")
+            start = time.monotonic()
+
+            if followup and not args.dry_run:
+                if args.one_per_repo:
+                    msg = "보류 (one-per-repo; Dependabot 리베이스 후 재실행)"
                     stats.record(
                         PRResult(pr.repo, pr.number, pr.title, "skipped", True, msg)
                     )
@@ -355,28 +2855,91 @@ def cmd_merge(client: GitHubClient, args: argparse.Namespace):
                     continue
                 # 직전 머지가 changelog/release 워크플로를 트리거했을 수 있으므로,
                 # 두 워크플로가 동시에 돌지 않도록 먼저 끝날 때까지 대기한다.
-                _wait_repo_idle(client, args, pr.repo)
+                if merge_sha:
+                    _wait_merge_runs(client, args, pr.repo, merge_sha)
+                elif merge_sha is not None:
+                    _wait_repo_idle(client, args, pr.repo)  # SHA를 모름
+                merge_sha = None
 
-            _merge_one(client, args, pr, stats, followup=followup)
+            waited = time.monotonic() - start
+            merged = _merge_one(client, args, pr, stats, followup=followup)
+            if merged is not None:
+                merge_sha = merged
+                _record_timing(stats, pr, followup, waited, time.monotonic() - start - waited)
 
-            if idx < len(all_prs) and not args.dry_run:
-                time.sleep(args.delay)
+        # 쓰기 간격은 이미 레이트 예산이 맞춘다. --delay는 추가 여유.
+        if args.delay and progress.done < progress.total and not args.dry_run:
+            _sleep(args.delay, "delay")
 
-    _print_summary(stats, args)
+
+def _record_timing(
+    stats: Stats, pr: PullRequest, followup: bool, workflow: float, merge: float
+):
+    """머지 한 건의 소요 시간을 이력과 저널에 추가한다."""
+    _history.add(pr.repo, followup, workflow, merge)
+    if stats.journal:
+        stats.journal.write(
+            "timing",
+            repo=pr.repo,
+            number=pr.number,
+            followup=followup,
+            workflow=round(workflow, 1),
+            merge=round(merge, 1),
+        )
 
 
 # ─────────────────────────────────────────────
 # 머지 로직
 # ─────────────────────────────────────────────
+def _cancel_stale_runs(client: GitHubClient, args: argparse.Namespace, pr: PullRequest, sha: str):
+    """
+    PR의 업데이트 전 head SHA에서 아직 도는 워크플로 실행을 취소한다.
+
+    update-branch 후에는 새 head의 CI가 우리가 기다리는 실행이다. 이전 head의
+    실행은 어차피 대체될 뿐인데 끝날 때까지 러너를 붙잡는다. 최선 노력: 그 사이
+    끝난 실행은 취소되지 않을 뿐이다.
+    """
+    stale = [
+        run
+        for run in client.list_runs_for_sha(args.org, pr.repo, sha)
+        if run.get("status") != "completed"
+    ]
+    cancelled = sum(1 for run in stale if client.cancel_run(args.org, pr.repo, run["id"]))
+    if stale:
+        _print_skip(f"{sha[:7]}의 오래된 워크플로 실행 {cancelled}/{len(stale)}개 취소")
+
+
 def _merge_one(
     client: GitHubClient,
     args: argparse.Namespace,
     pr: PullRequest,
     stats: Stats,
-    followup: bool = False,
-):
+    followup: bool = False,
+) -> str | None:
+    """PR 하나를 머지(또는 건너뜀)한다. 머지했으면 머지 커밋 SHA를 반환."""
+    try:
+        return _merge_one_pr(client, args, pr, stats, followup)
+    except requests.RequestException as e:
+        # 끊긴 연결은 이 PR만 실패시키고, 체인의 나머지는 계속한다.
+        msg = f"요청 실패: {e}"
+        stats.record(PRResult(pr.repo, pr.number, pr.title, "failed", False, msg))
+        _print_err(msg)
+
+
+def _merge_one_pr(
+    client: GitHubClient,
+    args: argparse.Namespace,
+    pr: PullRequest,
+    stats: Stats,
+    followup: bool,
+) -> str | None:
+    """_merge_one의 본체; 네트워크 오류는 _merge_one이 처리한다."""
     try:
-        detail = _resolve_mergeable(client, args, pr)
+        # 프리페치 상태는 repo의 첫 PR에만 신뢰한다: 같은 repo 머지가 반영되면
+        # 이후 followup의 상태는 모두 낡은 값이 된다.
+        detail = None if followup else _settled_prefetch(args, pr)
+        if detail is None:
+            detail = _resolve_mergeable(client, args, pr)
     except RuntimeError as e:
         result = PRResult(pr.repo, pr.number, pr.title, "failed", False, str(e))
         stats.record(result)
@@ -409,14 +2972,17 @@ def _merge_one(
             )
             _print_ok("update-branch 후 머지 예정 (dry-run)")
             return
+        mark = _event_mark(pr.repo)
         ok, m = client.update_branch(args.org, pr.repo, pr.number)
         if not ok:
             msg = f"update-branch 실패: {m}"
             stats.record(PRResult(pr.repo, pr.number, pr.title, "failed", False, msg))
             _print_err(msg)
             return
+        if args.cancel_stale_runs and sha:
+            _cancel_stale_runs(client, args, pr, sha)
         _print_wait("브랜치를 base로 리베이스 중 (update-branch), 체크 대기...")
-        time.sleep(args.poll_interval)
+        _wait_event(pr.repo, args.poll_interval, "checks", mark=mark)
         try:
             # 리베이스 후 CI가 재시작되므로 여기서는 항상 대기한다.
             detail = _resolve_mergeable(client, args, pr, wait_checks=True)
@@ -433,98 +2999,794 @@ def _merge_one(
             _print_skip(msg)
             return
 
-    if state == "blocked":
-        msg = "머지 차단됨 (필수 체크/리뷰 미충족)"
-        stats.record(PRResult(pr.repo, pr.number, pr.title, "skipped", True, msg))
-        _print_skip(msg)
-        return
+    if state == "blocked":
+        msg = "머지 차단됨 (필수 체크/리뷰 미충족)"
+        stats.record(PRResult(pr.repo, pr.number, pr.title, "skipped", True, msg))
+        _print_skip(msg)
+        return
+
+    if state not in MERGEABLE_STATES:
+        msg = f"예상치 못한 mergeable_state={state}"
+        stats.record(PRResult(pr.repo, pr.number, pr.title, "skipped", True, msg))
+        _print_skip(msg)
+        return
+
+    if args.dry_run:
+        stats.record(
+            PRResult(pr.repo, pr.number, pr.title, "merged", True, f"dry-run (state={state})")
+        )
+        _print_ok(f"머지 예정 (state={state}, dry-run)")
+        return
+
+    ok, msg = client.merge_pr(args.org, pr.repo, pr.number, sha, args.merge_method)
+    if ok:
+        stats.record(PRResult(pr.repo, pr.number, pr.title, "merged", True))
+        _print_ok("머지 완료")
+        return msg
+    stats.record(PRResult(pr.repo, pr.number, pr.title, "failed", False, msg))
+    _print_err(msg)
+
+
+def _merge_train(
+    client: GitHubClient,
+    args: argparse.Namespace,
+    prs: list[PullRequest],
+    stats: Stats,
+    progress: Progress,
+):
+    """
+    repo의 Dependabot PR을 합친 PR 하나로 머지한다 (--train).
+
+    각 PR 브랜치를 base에서 새로 딴 브랜치에 서버 측에서 머지한다. 앞선 PR과
+    충돌하는 PR은 제외된다 (Dependabot이 리베이스하도록 열어 둠). 합친 PR은 CI를
+    한 번 돌고 한 번 머지되며, 그 뒤 포함된 PR은 대체됨으로 닫힌다.
+    """
+    repo = prs[0].repo
+    with _pr_block(progress, f"{args.org}/{repo} train ({len(prs)} PRs)", args.concurrency > 1):
+        try:
+            _run_train(client, args, prs, stats)
+        except requests.RequestException as e:
+            msg = f"train: 요청 실패: {e}"
+            for pr in prs:
+                if not stats.recorded(pr):
+                    stats.record(PRResult(pr.repo, pr.number, pr.title, "failed", False, msg))
+            _print_err(msg)
+
+
+def _run_train(
+    client: GitHubClient,
+    args: argparse.Namespace,
+    prs: list[PullRequest],
+    stats: Stats,
+):
+    """_merge_train의 본체 (출력 블록 안에서 실행)."""
+    repo = prs[0].repo
+    for pr in prs:
+        _emit(f"  {Color.DIM}#{pr.number} {pr.title}{Color.RESET}")
+    if args.dry_run:
+        for pr in prs:
+            stats.record(PRResult(pr.repo, pr.number, pr.title, "merged", True, "dry-run (train)"))
+        _print_ok(f"PR {len(prs)}개를 한 브랜치로 합쳐 머지 예정 (dry-run)")
+        return
+
+    try:
+        branch, base, included, left_out = _build_train(client, args, prs)
+    except RuntimeError as e:
+        for pr in prs:
+            stats.record(PRResult(pr.repo, pr.number, pr.title, "failed", False, f"train: {e}"))
+        _print_err(str(e))
+        return
+    for pr, msg in left_out:
+        stats.record(PRResult(pr.repo, pr.number, pr.title, "skipped", True, msg))
+        _print_skip(f"#{pr.number} {msg}")
+
+    if len(included) < 2:
+        # 합칠 것이 없음: 깨끗한 PR 하나를 단독으로 머지한다.
+        client.delete_branch(args.org, repo, branch)
+        if included:
+            _merge_one(client, args, included[0], stats)
+        return
+
+    def fail(msg: str):
+        for pr in included:
+            stats.record(PRResult(pr.repo, pr.number, pr.title, "failed", False, msg))
+        _print_err(msg)
+
+    body = "Combined Dependabot updates:\n\n" + "\n".join(
+        f"- #{pr.number} {pr.title}" for pr in included
+    )
+    mark = _event_mark(repo)
+    try:
+        opened = client.create_pr(
+            args.org, repo, branch, base,
+            f"Combined Dependabot updates ({len(included)} PRs)", body,
+        )
+    except RuntimeError as e:
+        client.delete_branch(args.org, repo, branch)
+        return fail(f"train: {e}")
+    train = PullRequest(repo, opened["number"], opened["title"], branch, opened.get("html_url", ""))
+    _print_wait(f"트레인 #{train.number} 생성 (PR {len(included)}개), 체크 대기...")
+    _wait_event(repo, args.poll_interval, "checks", mark=mark)
+    try:
+        # 새 브랜치는 항상 CI를 시작하므로 플래그와 무관하게 기다린다.
+        detail = _resolve_mergeable(client, args, train, wait_checks=True)
+    except RuntimeError as e:
+        return fail(f"train #{train.number}: {e}")
+    state = detail.get("mergeable_state", "unknown")
+    if detail.get("mergeable") is False or state not in MERGEABLE_STATES:
+        return fail(f"트레인 #{train.number} 머지 불가 (state={state}); 열어 둠 {train.url}")
+
+    sha = (detail.get("head") or {}).get("sha", "")
+    ok, msg = client.merge_pr(args.org, repo, train.number, sha, args.merge_method)
+    if not ok:
+        return fail(f"train #{train.number}: {msg}")
+    _print_ok(f"트레인 #{train.number} 머지됨")
+    for pr in included:
+        stats.record(PRResult(pr.repo, pr.number, pr.title, "merged", True, f"via train #{train.number}"))
+    try:  # 최선 노력: 여기서 무슨 일이 있어도 업데이트는 이미 반영됐다
+        client.delete_branch(args.org, repo, branch)
+        for pr in included:
+            client.close_pr(
+                args.org, repo, pr.number,
+                f"Superseded by #{train.number}, which merged this update together "
+                "with the repository's other Dependabot PRs.",
+            )
+    except requests.RequestException as e:
+        _print_warn(f"트레인 #{train.number} 머지됨, 하지만 정리 실패 ({e})")
+
+
+def _build_train(
+    client: GitHubClient, args: argparse.Namespace, prs: list[PullRequest]
+) -> tuple[str, str, list[PullRequest], list[tuple[PullRequest, str]]]:
+    """
+    트레인 브랜치를 만들고 각 PR 브랜치를 머지한다.
+
+    (브랜치, base, 포함된 PR, [(제외된 PR, 사유)])를 반환한다. 첫 PR과 같은
+    base를 대상으로 하는 PR만 같은 트레인에 탈 수 있다.
+    """
+    repo = prs[0].repo
+    bases = {pr.number: client.get_pr(args.org, repo, pr.number)["base"]["ref"] for pr in prs}
+    base = bases[prs[0].number]
+    branch = f"{TRAIN_BRANCH_PREFIX}{datetime.now():%Y%m%d-%H%M%S}"
+    client.create_branch(args.org, repo, branch, client.get_branch_sha(args.org, repo, base))
+
+    included, left_out = [], []
+    try:
+        for pr in prs:
+            if bases[pr.number] != base:
+                left_out.append(
+                    (pr, f"대상이 {base}가 아닌 {bases[pr.number]}; 트레인에서 제외")
+                )
+                continue
+            ok, msg = client.merge_branch(
+                args.org, repo, branch, pr.head, f"Merge #{pr.number}: {pr.title}"
+            )
+            if ok:
+                included.append(pr)
+            else:
+                left_out.append((pr, f"다른 업데이트와 {msg}; 트레인에서 제외"))
+    except BaseException:
+        # 만들다 만 트레인 브랜치를 원격에 남기지 않는다.
+        try:
+            client.delete_branch(args.org, repo, branch)
+        except (RuntimeError, requests.RequestException) as e:
+            logging.warning(f"{repo}@{branch} 삭제 실패: {e}")
+        raise
+    return branch, base, included, left_out
+
+
+def _auto_merge_chain(
+    client: GitHubClient,
+    args: argparse.Namespace,
+    prs: list[PullRequest],
+    stats: Stats,
+    progress: Progress,
+):
+    """
+    한 repo의 PR에 GitHub 네이티브 auto-merge를 켜고 넘어간다 (--auto-merge).
+
+    CI를 기다리지 않는다: 브랜치 보호 조건이 충족되면 GitHub가 각 PR을 머지한다.
+    이미 머지 가능한 PR은 auto-merge를 받을 수 없으므로 바로 머지하되, 두
+    changelog/release 워크플로가 함께 시작되지 않도록 repo당 하나만 머지한다.
+    이후 준비된 PR은 재실행으로 보류한다.
+    """
+    buffered = args.concurrency > 1
+    merged_now = False
+    for pr in prs:
+        if _stop.is_set():
+            return
+        with _pr_block(progress, f"{args.org}/{pr.repo} #{pr.number}", buffered):
+            _emit(f"  {Color.DIM}{pr.title}{Color.RESET}")
+            detail = pr.prefetched if (pr.prefetched or {}).get("node_id") else None
+            try:
+                detail = detail or client.get_pr(args.org, pr.repo, pr.number)
+            except RuntimeError as e:
+                stats.record(PRResult(pr.repo, pr.number, pr.title, "failed", False, str(e)))
+                _print_err(str(e))
+                continue
+            state = detail.get("mergeable_state", "unknown")
+            sha = (detail.get("head") or {}).get("sha", "")
+
+            if detail.get("mergeable") is False or state == "dirty":
+                msg = f"머지 불가 (충돌, state={state})"
+                stats.record(PRResult(pr.repo, pr.number, pr.title, "skipped", True, msg))
+                _print_skip(msg)
+                continue
+            if args.dry_run:
+                msg = f"dry-run (auto-merge 활성화 예정, state={state})"
+                stats.record(PRResult(pr.repo, pr.number, pr.title, "auto-merge", True, msg))
+                _print_ok(f"auto-merge 활성화 예정 (state={state}, dry-run)")
+                continue
+
+            ok, msg = client.enable_auto_merge(detail["node_id"], sha, args.merge_method)
+            if ok:
+                msg = f"auto-merge 활성화 ({args.merge_method})"
+                stats.record(PRResult(pr.repo, pr.number, pr.title, "auto-merge", True, msg))
+                _print_ok(msg)
+                continue
+
+            # "Pull request is in clean status": 기다릴 것이 없으니 지금 머지한다.
+            ready = re.search(r"is in (\w+) status", msg)
+            if not ready or ready.group(1).lower() not in MERGEABLE_STATES:
+                stats.record(PRResult(pr.repo, pr.number, pr.title, "failed", False, msg))
+                _print_err(msg)
+                continue
+            if merged_now:
+                msg = "보류 (이미 머지 가능; repo당 직접 머지는 하나 — 재실행)"
+                stats.record(PRResult(pr.repo, pr.number, pr.title, "skipped", True, msg))
+                _print_skip(msg)
+                continue
+            ok, msg = client.merge_pr(args.org, pr.repo, pr.number, sha, args.merge_method)
+            if ok:
+                merged_now = True
+                stats.record(PRResult(pr.repo, pr.number, pr.title, "merged", True, "이미 머지 가능"))
+                _print_ok("이미 머지 가능: 머지됨")
+            else:
+                stats.record(PRResult(pr.repo, pr.number, pr.title, "failed", False, msg))
+                _print_err(msg)
+
+
+def _uses_merge_queue(prs: list[PullRequest]) -> bool:
+    """repo의 PR이 머지 큐가 있는 base 브랜치를 대상으로 하는지 (프리페치 결과 기준)."""
+    return any((pr.prefetched or {}).get("merge_queue") for pr in prs)
+
+
+def _enqueue_merge_queue(
+    client: GitHubClient,
+    args: argparse.Namespace,
+    prs: list[PullRequest],
+    stats: Stats,
+    progress: Progress,
+) -> list[PullRequest]:
+    """
+    repo 하나의 PR을 모두 머지 큐에 넣고, 큐에 들어간 PR을 반환한다.
+
+    큐에 든 PR은 GitHub가 직접 리베이스하고 묶어서 테스트하므로, 여기서는 로컬
+    update-branch / 체크 대기 / 워크플로 대기를 거치지 않고 앞 PR을 기다리지도
+    않는다. 체크가 아직 도는 PR은 바로 큐에 들어갈 수 없어, 체크가 통과하면
+    auto-merge가 큐에 추가한다.
+    """
+    buffered = args.concurrency > 1
+    queued: list[PullRequest] = []
+    for pr in prs:
+        if _stop.is_set():
+            break
+        with _pr_block(progress, f"{args.org}/{pr.repo} #{pr.number}", buffered):
+            _emit(f"  {Color.DIM}{pr.title}{Color.RESET}")
+            # 미리 가져온 값이 없으면 (예: GraphQL 별칭이 NOT_FOUND) REST로 조회한다.
+            detail = pr.prefetched if (pr.prefetched or {}).get("node_id") else None
+            try:
+                detail = detail or client.get_pr(args.org, pr.repo, pr.number)
+            except RuntimeError as e:
+                stats.record(PRResult(pr.repo, pr.number, pr.title, "failed", False, str(e)))
+                _print_err(str(e))
+                continue
+            state = detail.get("mergeable_state", "unknown")
+            sha = (detail.get("head") or {}).get("sha", "")
+
+            if detail.get("mergeable") is False or state == "dirty":
+                msg = f"머지 불가 (충돌, state={state})"
+                stats.record(PRResult(pr.repo, pr.number, pr.title, "skipped", True, msg))
+                _print_skip(msg)
+                continue
+            if args.dry_run:
+                msg = f"dry-run (머지 큐 추가 예정, state={state})"
+                stats.record(PRResult(pr.repo, pr.number, pr.title, "merged", True, msg))
+                _print_ok(f"머지 큐 추가 예정 (state={state}, dry-run)")
+                continue
+            if detail.get("in_merge_queue"):
+                _print_ok("이미 머지 큐에 있음")
+                queued.append(pr)
+                continue
+
+            ok, msg = client.enqueue_pr(detail["node_id"], sha)
+            if not ok:
+                ok, error = client.enable_auto_merge(detail["node_id"], sha, args.merge_method)
+                msg = "auto-merge 활성화: 체크 통과 후 머지 큐에 들어감" if ok else msg
+                if not ok:
+                    msg = f"{msg}; auto-merge: {error}"
+            if ok:
+                _print_ok(msg)
+                queued.append(pr)
+            else:
+                stats.record(PRResult(pr.repo, pr.number, pr.title, "failed", False, msg))
+                _print_err(msg)
+    return queued
+
+
+def _follow_merge_queue(
+    client: GitHubClient,
+    args: argparse.Namespace,
+    prs: list[PullRequest],
+    stats: Stats,
+    deadline: float,
+):
+    """
+    모든 repo의 큐에 든 PR이 각각 머지되거나 빠질 때까지, 또는 `deadline`까지 폴링한다.
+
+    폴링마다 GraphQL 일괄 조회 하나로 모든 큐를 확인한다. deadline (큐에 넣은 뒤
+    --queue-timeout) 때까지 큐에 남은 PR은 GitHub에 맡기고 --auto-merge PR처럼
+    저널에 기록해, 나중에 `status`가 머지 여부를 보고한다.
+    """
+    pending = {(pr.repo, pr.number): pr for pr in prs}
+    nodes: dict[tuple[str, int], dict] = {}
+    while pending and not _stop.is_set():
+        if time.monotonic() >= deadline:
+            break
+        _sleep(args.poll_interval, "merge queue")
+        try:
+            nodes = client.fetch_pr_nodes(args.org, list(pending), PR_QUEUE_FIELDS)
+        except (RuntimeError, requests.RequestException) as e:
+            logging.warning(f"머지 큐 폴링 실패 ({e}); 재시도")
+            continue
+        for key, pr in list(pending.items()):
+            node = nodes.get(key) or {}
+            label = f"{args.org}/{pr.repo} #{pr.number}"
+            if node.get("state") == "MERGED":
+                stats.record(PRResult(pr.repo, pr.number, pr.title, "merged", True, "머지 큐로 머지됨"))
+                _emit(f"  {Color.GREEN}✓ {label} 머지 큐로 머지됨{Color.RESET}")
+            elif node.get("state") == "CLOSED":
+                msg = "머지 큐에 있는 동안 닫힘"
+                stats.record(PRResult(pr.repo, pr.number, pr.title, "failed", False, msg))
+                _emit(f"  {Color.RED}✗ {label}: {msg}{Color.RESET}")
+            elif not node.get("isInMergeQueue") and not node.get("autoMergeRequest"):
+                msg = "머지 큐에서 제외됨 (체크 실패 또는 충돌)"
+                stats.record(PRResult(pr.repo, pr.number, pr.title, "failed", False, msg))
+                _emit(f"  {Color.RED}✗ {label}: {msg}{Color.RESET}")
+            else:
+                continue
+            del pending[key]
+    for key, pr in pending.items():
+        position = ((nodes.get(key) or {}).get("mergeQueueEntry") or {}).get("position")
+        where = f"{position}번째" if position else "체크 대기 중"
+        msg = f"{args.queue_timeout}초 후에도 머지 큐에 있음 ({where})"
+        stats.record(PRResult(pr.repo, pr.number, pr.title, "auto-merge", True, msg))
+        _emit(f"  {Color.BLUE}… {args.org}/{pr.repo} #{pr.number}: {msg}{Color.RESET}")
+
+
+def _resolve_mergeable(
+    client: GitHubClient,
+    args: argparse.Namespace,
+    pr: PullRequest,
+    wait_checks: bool | None = None,
+) -> dict:
+    """
+    PR 상세를 조회해 머지 가능 상태를 확정한다.
+
+    GitHub는 `mergeable` / `mergeable_state`를 비동기로 계산하므로 첫 응답은
+    `mergeable: null` / `mergeable_state: unknown`일 수 있다. 확정될 때까지
+    폴링한다. 체크 대기가 켜져 있으면 상태가 `blocked`(필수 체크 진행 중)인 동안
+    --checks-timeout까지 계속 대기한다.
+
+    `wait_checks`는 args.wait_checks를 오버라이드한다 (리베이스 후에는 CI가 항상
+    재시작되므로 플래그와 무관하게 대기해야 함).
+    """
+    if wait_checks is None:
+        wait_checks = args.wait_checks
+    poll_interval = max(args.poll_interval, 1)
+    settle_deadline = time.time() + 30  # null/unknown 확정 최대 대기
+    checks_deadline = time.time() + args.checks_timeout
+
+    while True:
+        mark = _event_mark(pr.repo)
+        detail = client.get_pr(args.org, pr.repo, pr.number)
+        state = detail.get("mergeable_state", "unknown")
+        mergeable = detail.get("mergeable")
+
+        # 아직 계산 중 — 확정될 때까지 대기.
+        if mergeable is None or state == "unknown":
+            if time.time() < settle_deadline:
+                _sleep(2, "settle")
+                continue
+            return detail
+
+        # 필수 CI 체크 완료 대기.
+        if wait_checks and state == "blocked":
+            if time.time() < checks_deadline:
+                _print_wait(f"체크 진행 중 (state={state}), {poll_interval}초 대기...")
+                _wait_event(pr.repo, poll_interval, "checks", mark=mark)
+                continue
+            return detail
+
+        return detail
+
+
+# ─────────────────────────────────────────────
+# 헬퍼
+# ─────────────────────────────────────────────
+def _load_journal(
+    args: argparse.Namespace,
+) -> tuple[list[PullRequest], dict[tuple[str, int], PRResult]]:
+    """--resume 저널의 탐색된 PR과 이미 머지/건너뛴 PR."""
+    header, prs, results = Journal.load(Path(args.resume))
+    if header.get("org") != args.org:
+        raise RuntimeError(
+            f"저널 {args.resume}은 --org {header.get('org')}용이며 {args.org}가 아님"
+        )
+    # 실패한 PR은 재시도한다. dry-run 저널의 "머지"는 실제로 일어나지 않았다.
+    done = {
+        key: r
+        for key, r in results.items()
+        if r.success and not (header.get("dry_run") and not args.dry_run and r.action == "merged")
+    }
+    return prs, done
+
+
+def _latest_journal() -> Path:
+    """Newest logs/dependabot_merge_*.jsonl (timestamped names sort in order)."""
+    journals = sorted(Path("logs").glob("dependabot_merge_*.jsonl"))
+    if not journals:
+        raise RuntimeError("No merge journal found in logs/; pass --journal")
+    return journals[-1]
+
+
+def _open_journal(args: argparse.Namespace, prs: list[PullRequest]) -> Journal:
+    """--resume 저널을 이어 쓰거나, 탐색 결과로 새 저널을 시작한다."""
+    if args.resume:
+        journal = Journal(Path(args.resume))
+        journal.write("resume", dry_run=args.dry_run)
+        return journal
+    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    journal = Journal(Path("logs") / f"dependabot_merge_{ts}.jsonl")
+    journal.write("run", org=args.org, dry_run=args.dry_run, merge_method=args.merge_method)
+    journal.write(
+        "discovery",
+        prs=[{k: v for k, v in asdict(pr).items() if k != "prefetched"} for pr in prs],
+    )
+    return journal
+
+
+def _resolve_repos(client: GitHubClient, args: argparse.Namespace) -> list[str]:
+    if args.repos:
+        return [r.strip() for r in args.repos.split(",")]
+    if _inventory is not None:
+        logging.info("리포지토리 인벤토리 갱신 중...")
+        repos = _inventory.refresh(client, args.org)
+    else:
+        logging.info("리포지토리 목록 조회 중...")
+        repos = client.list_repos(args.org)
+    logging.info(f"{len(repos)}개 리포지토리 발견 (아카이브·비활성화 제외)")
+    return repos
+
+
+def _dependabot_prs(client: GitHubClient, args: argparse.Namespace, repo: str) -> list[PullRequest]:
+    """repo의 열린 Dependabot PR. push가 없었으면 인벤토리에서 읽는다."""
+    if _inventory is not None and not args.repos:
+        # --repos면 스윕을 건너뛰므로 저장된 pushed_at으로 캐시된 PR을 보증할 수 없다.
+        return _inventory.dependabot_prs(client, args.org, repo)
+    return client.list_dependabot_prs(args.org, repo)
+
+
+def _merge_detail_from_graphql(node: dict) -> dict:
+    """GraphQL PR 필드를 _merge_one이 읽는 REST 상세 모양으로 변환."""
+    mergeable = {"MERGEABLE": True, "CONFLICTING": False}.get(node.get("mergeable"))
+    return {
+        "mergeable": mergeable,
+        "mergeable_state": (node.get("mergeStateStatus") or "unknown").lower(),
+        "head": {"sha": node.get("headRefOid") or ""},
+        "node_id": node.get("id") or "",
+        "merge_queue": bool(node.get("isMergeQueueEnabled")),
+        "in_merge_queue": bool(node.get("isInMergeQueue")),
+        "open": node.get("state", "OPEN") == "OPEN",
+    }
+
+
+def _prefetch_merge_states(
+    client: GitHubClient, args: argparse.Namespace, prs: list[PullRequest]
+):
+    """PullRequest.prefetched를 일괄로 채운다. 실패하면 PR별 폴링으로 진행할 뿐이다."""
+    missing = [pr for pr in prs if pr.prefetched is None]
+    if not missing:
+        return
+    logging.info(f"{len(missing)}개 PR의 머지 가능 상태 프리페치 중...")
+    try:
+        states = client.fetch_merge_states(args.org, missing)
+    except (RuntimeError, requests.RequestException) as e:
+        logging.warning(f"머지 가능 상태 프리페치 실패 ({e}); PR별로 폴링합니다")
+        return
+    for pr in missing:
+        pr.prefetched = states.get((pr.repo, pr.number))
+        if pr.prefetched and not pr.prefetched["open"] and _inventory is not None:
+            _inventory.forget(args.org, pr.repo)  # push 없이 닫힘: 다음 실행에서 다시 조회
+
+
+def _settled_prefetch(args: argparse.Namespace, pr: PullRequest) -> dict | None:
+    """프리페치한 상세가 _resolve_mergeable()을 대신할 수 있으면 반환."""
+    detail = pr.prefetched
+    if not detail or detail["mergeable"] is None or detail["mergeable_state"] == "unknown":
+        return None  # 아직 계산 중 -> 폴링 경로
+    if args.wait_checks and detail["mergeable_state"] == "blocked":
+        return None  # 체크 대기 루프가 필요
+    return detail
+
+
+def _split_early_skips(
+    args: argparse.Namespace, groups: dict[str, list[PullRequest]]
+) -> tuple[dict[str, list[PullRequest]], list[tuple[PullRequest, str]]]:
+    """
+    프리페치 결과 이번 실행에서 머지할 수 없는 PR을 걸러낸다.
+
+    충돌(`dirty`)은 다른 PR을 머지해도 풀리지 않으므로 체인 어디서든 건너뛴다.
+    `blocked`는 repo에서 처음 실행될 PR에만 확정이며 (둘 다 이를 기다리는
+    --wait-checks / --auto-merge가 없을 때만), 이후 PR은 base가 움직인 뒤 다시
+    평가한다.
+    """
+    kept: dict[str, list[PullRequest]] = {}
+    skips: list[tuple[PullRequest, str]] = []
+    for repo, prs in groups.items():
+        for pr in prs:
+            detail = pr.prefetched or {}
+            state = detail.get("mergeable_state", "unknown")
+            if not detail.get("open", True):
+                skips.append((pr, "더 이상 열려 있지 않음"))
+            elif detail.get("mergeable") is False or state == "dirty":
+                skips.append((pr, f"머지 불가 (충돌, state={state})"))
+            elif (
+                state == "blocked"
+                and not (args.wait_checks or args.auto_merge or detail.get("merge_queue"))
+                and repo not in kept
+            ):
+                skips.append((pr, "머지 차단됨 (필수 체크/리뷰 미충족)"))
+            else:
+                kept.setdefault(repo, []).append(pr)
+    return kept, skips
+
+
+def _ready_groups(
+    args: argparse.Namespace, groups: dict[str, list[PullRequest]]
+) -> dict[str, list[PullRequest]]:
+    """
+    `watch`가 지금 시작할 수 있는 체인: 충돌 없는 첫 PR이 준비된 repo.
+
+    충돌 PR은 Dependabot의 rebase를 기다리고, 다음 PR이 아직
+    blocked/behind/계산 중인 repo는 다음 주기에 다시 본다.
+    """
+    ready: dict[str, list[PullRequest]] = {}
+    for repo, prs in groups.items():
+        prs = [
+            pr
+            for pr in prs
+            if (pr.prefetched or {}).get("mergeable") is not False
+            and (pr.prefetched or {}).get("mergeable_state") != "dirty"
+        ]
+        if not prs:
+            continue
+        state = (prs[0].prefetched or {}).get("mergeable_state", "unknown")
+        if (
+            _uses_merge_queue(prs)
+            or state in MERGEABLE_STATES
+            or (state == "blocked" and args.wait_checks)
+            or (state == "behind" and args.merge_behind)
+        ):
+            ready[repo] = prs
+    return ready
+
+
+def _search_prs(
+    client: GitHubClient, args: argparse.Namespace
+) -> list[PullRequest] | None:
+    """
+    --discovery search가 설정되면 조직 전체 검색 한 번으로 PR을 찾는다.
+
+    None을 반환하면 "repo별 경로를 사용"하라는 뜻이다: 검색 discovery가 꺼져
+    있거나, 실패한 경우다 (실패는 로그로 남기고 조용히 폴백한다).
+    """
+    if args.discovery != "search":
+        return None
+    logging.info("열린 Dependabot PR 검색 중...")
+    try:
+        prs = client.search_dependabot_prs(args.org)
+    except (RuntimeError, requests.RequestException) as e:
+        logging.warning(f"검색 discovery 사용 불가 ({e}); repo별 목록 조회로 폴백")
+        return None
+    if args.repos:
+        wanted = {r.strip() for r in args.repos.split(",")}
+        prs = [pr for pr in prs if pr.repo in wanted]
+    logging.info(f"검색으로 {len(prs)}개의 Dependabot PR 발견")
+    return prs
+
+
+def _group_by_repo(prs: list[PullRequest]) -> dict[str, list[PullRequest]]:
+    """
+    PR을 발견 순서대로 repo별로 묶는다 (dict는 삽입 순서 유지). repo 안에서는
+    안전한 bump부터 정렬해, 위험한 major는 patch들 다음에 머지된다.
+    """
+    groups: dict[str, list[PullRequest]] = {}
+    for pr in prs:
+        groups.setdefault(pr.repo, []).append(pr)
+    for repo_prs in groups.values():
+        repo_prs.sort(key=lambda pr: _classify(pr).risk)
+    return groups
+
+
+def _classify(pr: PullRequest) -> Bump:
+    """Dependabot PR의 에코시스템, 패키지, semver 변경 폭 (API 호출 없음)."""
+    branch = DEPENDABOT_BRANCH_RE.match(pr.head)
+    ecosystem = branch.group("ecosystem") if branch else "unknown"
+    m = BUMP_TITLE_RE.search(pr.title)
+    if not m:
+        group = GROUP_TITLE_RE.search(pr.title)
+        package = group.group("group") if group else (branch.group("rest") if branch else "")
+        return Bump(ecosystem, package)
+    old, new = VERSION_RE.search(m.group("old")), VERSION_RE.search(m.group("new"))
+    if not (old and new):
+        return Bump(ecosystem, m.group("package"))
+    delta = _semver_delta(old.group(1), new.group(1))
+    # 프리릴리스로/에서/사이의 업데이트("1.0.0-beta.1 -> 1.0.0")는 단순 patch/minor가 아니다.
+    if delta != "major" and any(PRERELEASE_RE.match(v.string, v.end()) for v in (old, new)):
+        delta = "unknown"
+    return Bump(ecosystem, m.group("package"), old.group(1), new.group(1), delta)
+
+
+def _semver_delta(old: str, new: str) -> str:
+    """
+    "major" / "minor" / "patch": 세 자리 중 처음으로 바뀐 자리.
+
+    1.0 미만에서는 minor 자리가 호환성을 깨는 자리이므로 0.3 -> 0.4는 "major"다.
+    """
+    a = [int(x) for x in old.split(".")] + [0, 0]
+    b = [int(x) for x in new.split(".")] + [0, 0]
+    if a[0] != b[0]:
+        return "major"
+    if a[1] != b[1]:
+        return "major" if a[0] == 0 else "minor"
+    return "patch"
+
+
+def _filter_prs(args: argparse.Namespace, prs: list[PullRequest]) -> list[PullRequest]:
+    """--only / --ecosystem 적용. 제목과 브랜치만 본다 (API 호출 없음)."""
+    if not (args.only or args.ecosystem):
+        return prs
+    return [
+        pr
+        for pr in prs
+        if (not args.only or _classify(pr).delta in args.only)
+        and (not args.ecosystem or _classify(pr).ecosystem in args.ecosystem)
+    ]
+
+
+def _bump_label(pr: PullRequest) -> str:
+    bump = _classify(pr)
+    return f"{bump.ecosystem} · {bump.delta}"
 
-    if state not in MERGEABLE_STATES:
-        msg = f"예상치 못한 mergeable_state={state}"
-        stats.record(PRResult(pr.repo, pr.number, pr.title, "skipped", True, msg))
-        _print_skip(msg)
-        return
 
-    if args.dry_run:
-        stats.record(
-            PRResult(pr.repo, pr.number, pr.title, "merged", True, f"dry-run (state={state})")
-        )
-        _print_ok(f"머지 예정 (state={state}, dry-run)")
-        return
+def _body_updates(body: str | None) -> dict[str, str]:
+    """그룹 / 다중 패키지 PR 본문에서 읽은 패키지 -> 새 버전."""
+    return {m.group("package"): m.group("new") for m in UPDATES_BODY_RE.finditer(body or "")}
 
-    ok, msg = client.merge_pr(args.org, pr.repo, pr.number, sha, args.merge_method)
-    if ok:
-        stats.record(PRResult(pr.repo, pr.number, pr.title, "merged", True))
-        _print_ok("머지 완료")
+
+def _updates(pr: PullRequest) -> dict[tuple[str, str, str], tuple[int, ...]]:
+    """
+    PR이 올리는 모든 패키지의 (ecosystem, directory, package) -> 새 버전.
+    디렉터리 "*"는 여러 디렉터리에 걸친 그룹이다.
+    """
+    bump = _classify(pr)
+    if "directories" in pr.title:
+        directory = "*"
     else:
-        stats.record(PRResult(pr.repo, pr.number, pr.title, "failed", False, msg))
-        _print_err(msg)
+        m = DIRECTORY_RE.search(pr.title)
+        directory = m.group("directory") if m else "/"
+    packages = pr.updates or ({bump.package: bump.new} if bump.new else {})
+    return {
+        (bump.ecosystem, directory, package): _version_key(new)
+        for package, new in packages.items()
+    }
 
 
-def _resolve_mergeable(
-    client: GitHubClient,
-    args: argparse.Namespace,
-    pr: PullRequest,
-    wait_checks: bool | None = None,
-) -> dict:
-    """
-    PR 상세를 조회해 머지 가능 상태를 확정한다.
+def _version_key(version: str) -> tuple[int, ...]:
+    m = VERSION_RE.search(version)
+    return tuple(int(x) for x in m.group(1).split(".")) if m else ()
 
-    GitHub는 `mergeable` / `mergeable_state`를 비동기로 계산하므로 첫 응답은
-    `mergeable: null` / `mergeable_state: unknown`일 수 있다. 확정될 때까지
-    폴링한다. 체크 대기가 켜져 있으면 상태가 `blocked`(필수 체크 진행 중)인 동안
-    --checks-timeout까지 계속 대기한다.
 
-    `wait_checks`는 args.wait_checks를 오버라이드한다 (리베이스 후에는 CI가 항상
-    재시작되므로 플래그와 무관하게 대기해야 함).
-    """
-    if wait_checks is None:
-        wait_checks = args.wait_checks
-    poll_interval = max(args.poll_interval, 1)
-    settle_deadline = time.time() + 30  # null/unknown 확정 최대 대기
-    checks_deadline = time.time() + args.checks_timeout
+def _match(
+    updates: dict[tuple[str, str, str], tuple[int, ...]], key: tuple[str, str, str]
+) -> tuple[int, ...] | None:
+    """`updates`가 `key`의 패키지를 올리는 버전. 직접 또는 "*" 그룹을 통해."""
+    ecosystem, _, package = key
+    return updates.get(key, updates.get((ecosystem, "*", package)))
 
-    while True:
-        detail = client.get_pr(args.org, pr.repo, pr.number)
-        state = detail.get("mergeable_state", "unknown")
-        mergeable = detail.get("mergeable")
 
-        # 아직 계산 중 — 확정될 때까지 대기.
-        if mergeable is None or state == "unknown":
-            if time.time() < settle_deadline:
-                time.sleep(2)
-                continue
-            return detail
+def _covers(
+    by: dict[tuple[str, str, str], tuple[int, ...]],
+    updates: dict[tuple[str, str, str], tuple[int, ...]],
+) -> bool:
+    """`by`가 `updates`의 모든 패키지를 같거나 더 높은 버전으로 올리는지."""
+    for key, version in updates.items():
+        target = _match(by, key)
+        if target is None or target < version:
+            return False
+    return True
 
-        # 필수 CI 체크 완료 대기.
-        if wait_checks and state == "blocked":
-            if time.time() < checks_deadline:
-                _print_wait(f"체크 진행 중 (state={state}), {poll_interval}초 대기...")
-                time.sleep(poll_interval)
-                continue
-            return detail
 
-        return detail
+def _dedupe_prs(prs: list[PullRequest]) -> tuple[list[PullRequest], list[Duplicate]]:
+    """
+    같은 repo의 다른 열린 PR이 이미 포함하는 PR을 떼어 낸다.
 
+    다른 PR이 모든 패키지를 같거나 더 높은 버전으로 올리면 (더 새로운 단일
+    bump, 또는 그 패키지를 포함한 그룹) 대체된 PR이다. 똑같은 PR끼리는 가장
+    새 PR을 남긴다. 패키지 일부만 겹치는 두 PR은 더 적게 올리는 쪽을 건너뛴다.
+    다른 쪽이 머지되면 충돌할 것이고, 그때 Dependabot이 리베이스한다. 제목과
+    본문만 보며 API 호출은 없다.
+    """
+    updates = {id(pr): _updates(pr) for pr in prs}
 
-# ─────────────────────────────────────────────
-# 헬퍼
-# ─────────────────────────────────────────────
-def _resolve_repos(client: GitHubClient, args: argparse.Namespace) -> list[str]:
-    if args.repos:
-        return [r.strip() for r in args.repos.split(",")]
-    logging.info("리포지토리 목록 조회 중...")
-    repos = client.list_repos(args.org)
-    logging.info(f"{len(repos)}개 리포지토리 발견 (아카이브 제외)")
-    return repos
+    def size(pr: PullRequest) -> tuple[int, int]:
+        return len(updates[id(pr)]), pr.number
 
+    dupes: list[Duplicate] = []
+    for repo_prs in _group_by_repo(prs).values():
+        live: list[PullRequest] = []
+        for pr in repo_prs:
+            mine = updates[id(pr)]
+            by = max(
+                (
+                    other
+                    for other in repo_prs
+                    if mine
+                    and other is not pr
+                    and _covers(updates[id(other)], mine)
+                    and not (_covers(mine, updates[id(other)]) and pr.number > other.number)
+                ),
+                key=size,
+                default=None,
+            )
+            if by:
+                dupes.append(Duplicate(pr, by, tuple(k[2] for k in mine), True))
+            else:
+                live.append(pr)
+        # 일부만 겹치면 더 큰 PR(같으면 더 새 PR)이 먼저다.
+        kept: list[PullRequest] = []
+        for pr in sorted(live, key=size, reverse=True):
+            mine = updates[id(pr)]
+            for other in kept:
+                shared = tuple(k[2] for k in mine if _match(updates[id(other)], k) is not None)
+                if shared:
+                    dupes.append(Duplicate(pr, other, shared, False))
+                    break
+            else:
+                kept.append(pr)
 
-def _group_by_repo(prs: list[PullRequest]) -> dict[str, list[PullRequest]]:
-    """PR을 repo별로 그룹핑 (dict는 삽입 순서를 보존하므로 발견 순서 유지)."""
-    groups: dict[str, list[PullRequest]] = {}
-    for pr in prs:
-        groups.setdefault(pr.repo, []).append(pr)
-    return groups
+    # 각 건너뛴 PR이 살아남는 PR을 가리키게 한다. 그 자체가 대체되어
+    # (--close-superseded면 같은 실행에서 닫히는) PR은 가리키지 않는다.
+    superseded = {id(d.pr): d.by for d in dupes if d.covered}
+    resolved: list[Duplicate] = []
+    for d in dupes:
+        by, seen = d.by, {id(d.pr)}
+        while id(by) in superseded and id(by) not in seen:
+            seen.add(id(by))
+            by = superseded[id(by)]
+        resolved.append(Duplicate(d.pr, by, d.packages, d.covered))
+    skipped = {id(d.pr) for d in resolved}
+    return [pr for pr in prs if id(pr) not in skipped], resolved
+
+
+def _close_superseded(client: GitHubClient, args: argparse.Namespace, dupe: Duplicate):
+    """--close-superseded: 대체된 PR을 닫고, 그것을 포함하는 PR을 알린다."""
+    client.close_pr(
+        args.org, dupe.pr.repo, dupe.pr.number,
+        f"Superseded by #{dupe.by.number}, which updates {', '.join(dupe.packages)} "
+        "to the same or a newer version.",
+    )
 
 
 def _wait_repo_idle(client: GitHubClient, args: argparse.Namespace, repo: str):
@@ -538,8 +3800,10 @@ def _wait_repo_idle(client: GitHubClient, args: argparse.Namespace, repo: str):
     poll_interval = max(args.poll_interval, 1)
     # 방금 push된 머지가 워크플로를 등록할 시간을 준 뒤 첫 폴링을 한다.
     _print_wait(f"{repo}의 워크플로 등록 대기 ({WORKFLOW_START_GRACE}초)...")
-    time.sleep(WORKFLOW_START_GRACE)
+    # repo에 대한 전달이 하나라도 오면 실행이 등록된 것이므로 유예를 일찍 끝낸다.
+    _wait_event(repo, WORKFLOW_START_GRACE, "workflow idle", completed_only=False, fallback=False)
     while True:
+        mark = _event_mark(repo)
         active = client.count_active_runs(args.org, repo)
         if active == 0:
             return
@@ -551,7 +3815,133 @@ def _wait_repo_idle(client: GitHubClient, args: argparse.Namespace, repo: str):
         _print_wait(
             f"{repo}에 워크플로 {active}개 실행 중 (changelog/release?), {poll_interval}초 대기..."
         )
-        time.sleep(poll_interval)
+        _wait_event(repo, poll_interval, "workflow idle", mark=mark)
+
+
+def _wait_merge_runs(
+    client: GitHubClient, args: argparse.Namespace, repo: str, merge_sha: str
+):
+    """
+    머지 커밋 하나에 대한 워크플로 실행이 끝날 때까지 대기한다.
+
+    head_sha가 머지 커밋인 실행만 세므로, repo의 관계없는 장시간 워크플로가
+    다음 머지를 붙잡지 않는다. 그 실행들이 끝나는 즉시, 또는
+    WORKFLOW_START_GRACE가 지나도록 아무 실행도 등록되지 않으면 (머지가
+    워크플로를 트리거하지 않음) 반환한다.
+    """
+    deadline = time.time() + args.workflow_timeout
+    register_deadline = time.time() + WORKFLOW_START_GRACE
+    poll_interval = max(args.poll_interval, 1)
+    short = merge_sha[:7]
+    _print_wait(f"{repo}의 {short} 워크플로 대기 중...")
+    while True:
+        mark = _event_mark(repo)
+        runs = client.list_runs_for_sha(args.org, repo, merge_sha)
+        active = sum(1 for r in runs if r.get("status") != "completed")
+        if runs and not active:
+            return
+        now = time.time()
+        if not runs and now >= register_deadline:
+            return
+        if now >= deadline:
+            _print_warn(
+                f"{repo}의 {short} 워크플로가 {args.workflow_timeout}초 후에도 실행 중; 그대로 진행"
+            )
+            return
+        if not runs:
+            # 아직 등록 전: 짧게 폴링하거나, 첫 전달이 오면 깨어난다.
+            _wait_event(
+                repo,
+                WORKFLOW_REGISTER_POLL,
+                "workflow idle",
+                completed_only=False,
+                fallback=False,
+                mark=mark,
+            )
+            continue
+        _print_wait(
+            f"{repo}에 {short} 워크플로 {active}개 실행 중 (changelog/release?), {poll_interval}초 대기..."
+        )
+        _wait_event(repo, poll_interval, "workflow idle", mark=mark)
+
+
+def _sleep(seconds: float, reason: str):
+    """Ctrl-C 시 깨어나 워커를 중단시키는 time.sleep()."""
+    with _profile.waiting(reason):
+        if _stop.wait(seconds):
+            raise KeyboardInterrupt
+
+
+def _event_mark(repo: str) -> tuple[int, int] | None:
+    """상태 요청 전에 받는 `repo`의 웹훅 마크 (수신기가 없으면 None)."""
+    return _webhook.mark(repo) if _webhook is not None else None
+
+
+def _wait_event(
+    repo: str,
+    seconds: float,
+    reason: str,
+    completed_only: bool = True,
+    fallback: bool = True,
+    mark: tuple[int, int] | None = None,
+):
+    """
+    `repo`의 다음 웹훅 전달을 기다리거나, 수신기가 없으면 그냥 sleep한다.
+
+    --webhook-port를 쓰면 폴링 주기는 폴백일 뿐이다: `mark`(대기를 결정한 폴링 전에
+    _event_mark()로 받은 값, 기본값: 지금) 이후 첫 번째로 일치하는 전달이
+    오거나 max(seconds, WEBHOOK_FALLBACK_POLL)이 지나면 대기가 끝난다
+    (fallback=False면 `seconds`만 — 예: 고정 시작 유예).
+    어느 쪽이든 대기한 시간은 `reason` 항목으로 프로파일에 기록된다.
+    """
+    if _webhook is None:
+        _sleep(seconds, reason)
+        return
+    if mark is None:
+        mark = _webhook.mark(repo)
+    timeout = max(seconds, WEBHOOK_FALLBACK_POLL) if fallback else seconds
+    with _profile.waiting(reason):
+        _webhook.wait(repo, mark, timeout, completed_only=completed_only)
+
+
+@contextmanager
+def _pr_block(progress: Progress, label: str, buffered: bool):
+    """
+    PR 하나의 콘솔 출력을 [idx/total] 헤더와 함께 묶는다.
+
+    버퍼링하지 않으면 (직렬 실행) 헤더를 먼저 출력하고 줄을 바로바로 내보낸다.
+    버퍼링하면 (--concurrency > 1) 이 스레드에서 줄을 모았다가 PR이 끝날 때
+    락을 잡고 한 블록으로 출력한다. idx는 완료 순서다.
+    """
+    dashboard = _dashboard
+    if dashboard is not None:
+        dashboard.started()
+    try:
+        if not buffered:
+            _print_progress(progress.advance(), progress.total, label)
+            yield
+            return
+        _output.lines = []
+        try:
+            yield
+        finally:
+            lines, _output.lines = _output.lines, None
+            with _print_lock:
+                _print_progress(progress.advance(), progress.total, label)
+                for line in lines:
+                    print(line)
+    finally:
+        if dashboard is not None:
+            dashboard.finished()
+
+
+def _emit(line: str):
+    """PR별 한 줄을 출력하거나, 버퍼링 중인 _pr_block 안이면 버퍼에 담는다."""
+    lines = getattr(_output, "lines", None)
+    if lines is None:
+        print(line)
+    else:
+        lines.append(line)
 
 
 def _confirm(message: str) -> bool:
@@ -564,36 +3954,38 @@ def _confirm(message: str) -> bool:
 
 
 def _print_progress(idx: int, total: int, label: str):
-    print(f"\n[{idx}/{total}] {Color.BOLD}{label}{Color.RESET}")
+    _emit(f"\n[{idx}/{total}] {Color.BOLD}{label}{Color.RESET}")
 
 
 def _print_ok(msg: str):
-    print(f"  {Color.GREEN}✓ {msg}{Color.RESET}")
+    _emit(f"  {Color.GREEN}✓ {msg}{Color.RESET}")
 
 
 def _print_err(msg: str):
-    print(f"  {Color.RED}✗ {msg}{Color.RESET}")
+    _emit(f"  {Color.RED}✗ {msg}{Color.RESET}")
 
 
 def _print_warn(msg: str):
-    print(f"  {Color.YELLOW}⚠ {msg}{Color.RESET}")
+    _emit(f"  {Color.YELLOW}⚠ {msg}{Color.RESET}")
 
 
 def _print_skip(msg: str):
-    print(f"  {Color.DIM}→ {msg}{Color.RESET}")
+    _emit(f"  {Color.DIM}→ {msg}{Color.RESET}")
 
 
 def _print_wait(msg: str):
-    print(f"  {Color.BLUE}… {msg}{Color.RESET}")
+    _emit(f"  {Color.BLUE}… {msg}{Color.RESET}")
 
 
-def _print_summary(stats: Stats, args: argparse.Namespace):
+def _print_summary(stats: Stats, args: argparse.Namespace, budget: dict, profile: dict):
     print(f"\n{Color.BOLD}{Color.BLUE}{'='*60}{Color.RESET}")
     print(f"{Color.BOLD}요약{Color.RESET}")
     print(f"{Color.BOLD}{Color.BLUE}{'='*60}{Color.RESET}")
     print(f"  전체:     {stats.total}")
     print(f"  {Color.GREEN}머지:     {stats.merged}{Color.RESET}")
     print(f"  {Color.DIM}건너뜀:   {stats.skipped}{Color.RESET}")
+    if stats.auto_merge:
+        print(f"  {Color.CYAN}auto-merge: {stats.auto_merge}{Color.RESET}")
     if stats.failed:
         print(f"  {Color.RED}실패:     {stats.failed}{Color.RESET}")
 
@@ -609,6 +4001,17 @@ def _print_summary(stats: Stats, args: argparse.Namespace):
         for r in failed:
             print(f"  - {r.repo} #{r.number} {r.message}")
 
+    core = budget["quota"].get("core")
+    if core:
+        tokens = len(budget["tokens"])
+        pool = f" (토큰 {tokens}개 합계)" if tokens > 1 else ""
+        print(
+            f"\n{Color.DIM}레이트 리밋: core {core['remaining']}/{core['limit']} 남음{pool}, "
+            f"요청 {budget['requests']}회 (쓰기 {budget['write_requests']}회), "
+            f"스로틀 {budget['throttled_seconds']:.0f}초, "
+            f"2차 리밋 {budget['secondary_limit_hits']}회{Color.RESET}"
+        )
+
     # 로그 저장
     log_dir = Path("logs")
     log_dir.mkdir(exist_ok=True)
@@ -625,6 +4028,7 @@ def _print_summary(stats: Stats, args: argparse.Namespace):
             "merged": stats.merged,
             "failed": stats.failed,
             "skipped": stats.skipped,
+            "auto_merge": stats.auto_merge,
         },
         "details": [
             {
@@ -637,14 +4041,47 @@ def _print_summary(stats: Stats, args: argparse.Namespace):
             }
             for d in stats.details
         ],
+        "rate_limit": budget,
+        "profile": profile,
     }
     log_file.write_text(json.dumps(log_data, ensure_ascii=False, indent=2))
     print(f"\n로그 저장: {Color.BOLD}{log_file}{Color.RESET}")
 
 
+def _print_profile(profile: dict):
+    wall = profile["wall_seconds"]
+    print(f"\n{Color.BOLD}프로파일{Color.RESET} {Color.DIM}(경과 {wall:.0f}초){Color.RESET}")
+    print(f"  {'요청':<48} {'횟수':>6} {'합계 초':>8} {'평균 ms':>7} {'재시도':>5}  상태")
+    for label, e in profile["requests"].items():
+        status = " ".join(f"{code}×{n}" for code, n in e["status"].items())
+        print(
+            f"  {label:<48} {e['count']:>6} {e['seconds']:>8.1f} {e['avg_ms']:>7} "
+            f"{e['retries']:>5}  {Color.DIM}{status}{Color.RESET}"
+        )
+    if profile["sleep"]:
+        print(f"\n  {'Sleep (워커 합산)':<48} {'횟수':>6} {'합계 초':>8}")
+        for reason, e in profile["sleep"].items():
+            print(f"  {reason:<48} {e['count']:>6} {e['seconds']:>8.1f}")
+
+
 # ─────────────────────────────────────────────
 # CLI (parents 패턴 -> --org 위치 자유)
 # ─────────────────────────────────────────────
+def _delta_list(value: str) -> list[str]:
+    deltas = [d.strip().lower() for d in value.split(",") if d.strip()]
+    unknown = [d for d in deltas if d not in SEMVER_DELTAS]
+    if unknown:
+        raise argparse.ArgumentTypeError(
+            f"알 수 없는 업데이트 유형: {', '.join(unknown)} ({', '.join(SEMVER_DELTAS)} 중 선택)"
+        )
+    return deltas
+
+
+def _ecosystem_list(value: str) -> list[str]:
+    names = [e.strip().lower() for e in value.split(",") if e.strip()]
+    return [ECOSYSTEM_ALIASES.get(e, e) for e in names]
+
+
 def build_parser() -> argparse.ArgumentParser:
     common = argparse.ArgumentParser(add_help=False)
     common.add_argument("--org", required=True, help="GitHub 조직 또는 사용자명")
@@ -655,123 +4092,333 @@ def build_parser() -> argparse.ArgumentParser:
     common.add_argument(
         "--dry-run", action="store_true", help="실제 머지 없이 시뮬레이션"
     )
+    common.add_argument(
+        "--discovery",
+        choices=["repos", "search"],
+        default="repos",
+        help="PR 탐색 방식: repo마다 pulls 목록 조회 (기본), 또는 조직 전체 "
+        "GraphQL 검색 한 번 (오류 시 repo별 조회로 폴백)",
+    )
     common.add_argument(
         "-y", "--yes", action="store_true", help="확인 프롬프트 생략"
     )
     common.add_argument(
         "-v", "--verbose", action="store_true", help="상세 로깅 활성화"
     )
-
-    parser = argparse.ArgumentParser(
-        prog="dependabot-pr-merge",
-        description="여러 리포지토리의 Dependabot PR을 찾아 순차적으로 머지",
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
-예시:
-  # 열린 Dependabot PR 미리보기
-  python dependabot-pr-merge.py list --org somaz94
-
-  # 모든 Dependabot PR 순차 머지 (기본 squash)
-  python dependabot-pr-merge.py merge --org somaz94
-
-  # 각 머지 전에 필수 CI 체크 대기
-  python dependabot-pr-merge.py merge --org somaz94 --wait-checks
-
-  # 특정 리포지토리만
-  python dependabot-pr-merge.py merge --org somaz94 --repos kube-diff,git-bridge
-
-  # Dry-run 모드
-  python dependabot-pr-merge.py merge --org somaz94 --dry-run
-        """,
+    common.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=f"GET 요청의 디스크 ETag 캐시 비활성화 ({CACHE_DIR})",
     )
-
-    sub = parser.add_subparsers(dest="command", required=True, help="실행할 명령")
-
-    # list
-    sub.add_parser(
-        "list", parents=[common], help="모든 리포지토리의 열린 Dependabot PR 목록 조회"
+    common.add_argument(
+        "--profile",
+        action="store_true",
+        help="종료 시 엔드포인트별 API 요청과 사유별 sleep 시간 출력 "
+        "(merge 실행 로그에는 항상 기록)",
+    )
+    common.add_argument(
+        "--no-inventory",
+        action="store_true",
+        help=f"로컬 인벤토리({INVENTORY_PATH})를 갱신하는 대신 모든 repo와 pulls를 "
+        f"처음부터 조회",
+    )
+    common.add_argument(
+        "--metrics-port",
+        type=int,
+        help="실행 중 이 포트의 GET /metrics로 Prometheus 메트릭 제공 "
+        "(요청, 레이트 리밋, PR 결과, 대기)",
+    )
+    common.add_argument(
+        "--metrics-host",
+        default="127.0.0.1",
+        help="--metrics-port의 바인드 주소 (기본: 127.0.0.1)",
     )
 
-    # merge
-    p_merge = sub.add_parser(
-        "merge", parents=[common], help="Dependabot PR 순차 머지"
+    # 대상 PR 선택 옵션, `list`·`merge`·`watch`가 공유
+    filtering = argparse.ArgumentParser(add_help=False)
+    filtering.add_argument(
+        "--only",
+        type=_delta_list,
+        help="PR 제목 기준으로 이 업데이트 유형만 (쉼표 구분: "
+        f"{', '.join(SEMVER_DELTAS)}; 예: patch,minor)",
     )
-    p_merge.add_argument(
+    filtering.add_argument(
+        "--ecosystem",
+        type=_ecosystem_list,
+        help="dependabot/<ecosystem>/ 브랜치 기준으로 이 에코시스템만 "
+        "(쉼표 구분, 예: npm_and_yarn,github_actions; npm/go/actions 약칭도 가능)",
+    )
+
+    # `merge`와 `watch`가 공유하는 머지 동작 옵션
+    merging = argparse.ArgumentParser(add_help=False)
+    merging.add_argument(
         "--merge-method",
         choices=["merge", "squash", "rebase"],
         default="squash",
         help="머지 방식 (기본: squash)",
     )
-    p_merge.add_argument(
+    merging.add_argument(
         "--one-per-repo",
         action="store_true",
         help="run당 repo별 Dependabot PR 1개만 머지하고 나머지는 보류 "
         "(changelog/release repo에 가장 안전 — Dependabot 리베이스 후 재실행)",
     )
-    p_merge.add_argument(
+    merging.add_argument(
+        "--train",
+        action="store_true",
+        help="PR이 2개+인 repo는 한 브랜치/PR로 합쳐 CI를 한 번 기다리고, 한 번 "
+        "머지한 뒤 대체된 PR을 닫음",
+    )
+    merging.add_argument(
+        "--close-superseded",
+        action="store_true",
+        help="같은 repo의 다른 열린 PR이 이미 포함하는 PR(같은 패키지, 같거나 "
+        "더 높은 버전)을 건너뛰기만 하지 않고 닫는다",
+    )
+    merging.add_argument(
         "--wait-checks",
         action="store_true",
         help="각 PR 머지 전에 필수 CI 체크 완료를 대기",
     )
-    p_merge.add_argument(
+    merging.add_argument(
         "--checks-timeout",
         type=int,
         default=600,
         help="PR당 체크 대기 최대 초 (기본: 600)",
     )
-    p_merge.add_argument(
+    merging.add_argument(
         "--workflow-timeout",
         type=int,
         default=300,
         help="같은 repo 머지 사이에 repo의 워크플로(changelog/release) 완료를 "
         "기다리는 최대 초 (기본: 300)",
     )
-    p_merge.add_argument(
+    merging.add_argument(
+        "--queue-timeout",
+        type=int,
+        default=1800,
+        help="base 브랜치에 머지 큐가 있는 repo: 큐에 넣은 PR을 GitHub에 맡기기 전까지 "
+        "따라가는 최대 초 (기본: 1800)",
+    )
+    merging.add_argument(
         "--poll-interval",
         type=int,
         default=15,
         help="체크 상태 / 워크플로 폴링 간격 초 (기본: 15)",
     )
-    p_merge.add_argument(
+    merging.add_argument(
         "--merge-behind",
         action="store_true",
         help="behind 상태 PR은 update-branch로 리베이스 후 머지 "
         "(같은 repo followup은 자동 수행; 그 외 기본: 건너뜀)",
     )
-    p_merge.add_argument(
+    merging.add_argument(
+        "--cancel-stale-runs",
+        action="store_true",
+        help="update-branch 후 PR의 이전 head SHA에서 아직 진행 중인 워크플로 실행을 "
+        "취소해 러너가 새 실행을 먼저 잡게 함",
+    )
+    merging.add_argument(
         "--delay",
         type=int,
-        default=3,
-        help="머지 사이 대기 초 (기본: 3)",
+        default=0,
+        help="머지 사이 추가 대기 초, 레이트 예산의 쓰기 간격 "
+        f"({WRITE_INTERVAL:g}초)에 더해짐 (기본: 0)",
+    )
+    merging.add_argument(
+        "--no-dashboard",
+        action="store_true",
+        help="터미널 맨 아래에 라이브 상태 줄(건수, 분당 머지, 쿼터, ETA)을 고정하지 "
+        "않음 (stdout이 TTY가 아니면 항상 꺼짐)",
+    )
+    merging.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="병렬로 머지할 repo 수; 같은 repo의 PR은 직렬 유지 "
+        "(기본: 1 = 완전 순차)",
+    )
+    merging.add_argument(
+        "--webhook-port",
+        type=int,
+        help="이 포트에서 workflow_run / check_suite 웹훅을 받아 전달 즉시 대기 중인 "
+        "머지를 깨움; 폴링은 폴백이 됨 "
+        f"({WEBHOOK_FALLBACK_POLL}초+ 주기); `watch`에서는 pull_request / push "
+        "전달이 오면 즉시 갱신. 검증하려면 GITHUB_WEBHOOK_SECRET 설정",
+    )
+    merging.add_argument(
+        "--webhook-host",
+        default="127.0.0.1",
+        help="--webhook-port의 바인드 주소 (기본: 127.0.0.1)",
+    )
+    merging.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=MAX_IN_FLIGHT,
+        help="전체 워커에 걸친 최대 동시 API 요청 수 — --concurrency를 수백까지 "
+        f"올릴 수 있다 (기본: {MAX_IN_FLIGHT})",
+    )
+
+    parser = argparse.ArgumentParser(
+        prog="dependabot-pr-merge",
+        description="여러 리포지토리의 Dependabot PR을 찾아 머지",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+예시:
+  # 열린 Dependabot PR 미리보기
+  python dependabot-pr-merge.py list --org somaz94
+
+  # 모든 Dependabot PR 머지 (기본 squash)
+  python dependabot-pr-merge.py merge --org somaz94
+
+  # 각 머지 전에 필수 CI 체크 대기
+  python dependabot-pr-merge.py merge --org somaz94 --wait-checks
+
+  # 특정 리포지토리만
+  python dependabot-pr-merge.py merge --org somaz94 --repos kube-diff,git-bridge
+
+  # Dry-run 모드
+  python dependabot-pr-merge.py merge --org somaz94 --dry-run
+
+  # 최대 8개 repo 병렬 머지 (repo 내부는 직렬)
+  python dependabot-pr-merge.py merge --org somaz94 --concurrency 8
+        """,
+    )
+
+    sub = parser.add_subparsers(dest="command", required=True, help="실행할 명령")
+
+    # list
+    p_list = sub.add_parser(
+        "list",
+        parents=[common, filtering],
+        help="모든 리포지토리의 열린 Dependabot PR 목록 조회",
+    )
+    p_list.add_argument(
+        "--format",
+        choices=["text", "ndjson", "csv"],
+        default="text",
+        help="출력 형식: 색상 텍스트(기본), 또는 PR마다 NDJSON / CSV 레코드 하나를 "
+        "stdout에 repo 조회가 끝나는 대로 출력",
+    )
+    p_list.add_argument(
+        "--mergeable",
+        action="store_true",
+        help="각 PR의 머지 가능 상태도 가져온다 (repo마다 GraphQL 요청 1회, "
+        "--discovery search면 추가 비용 없음)",
+    )
+
+    # merge
+    p_merge = sub.add_parser(
+        "merge",
+        parents=[common, filtering, merging],
+        help="Dependabot PR 머지 (repo 안에서는 직렬)",
+    )
+    p_merge.add_argument(
+        "--auto-merge",
+        action="store_true",
+        help="대상 PR마다 GitHub 네이티브 auto-merge를 켜고 CI를 기다리지 않고 "
+        "종료; 진행 상황은 나중에 `status`로 확인",
+    )
+    p_merge.add_argument(
+        "--resume",
+        metavar="JOURNAL",
+        help="중단된 실행을 logs/dependabot_merge_*.jsonl 저널에서 이어서 진행: "
+        "탐색된 PR을 재사용하고 이미 머지/건너뛴 PR은 생략",
+    )
+
+    # watch
+    p_watch = sub.add_parser(
+        "watch",
+        parents=[common, filtering, merging],
+        help="상주하면서 새 Dependabot PR을 머지 가능해지는 대로 머지",
+    )
+    p_watch.add_argument(
+        "--interval",
+        type=int,
+        default=WATCH_INTERVAL,
+        help="갱신 주기(초); pull_request/push 웹훅이 오면 "
+        f"앞당겨 시작 (기본: {WATCH_INTERVAL})",
+    )
+    p_watch.add_argument(
+        "--health-port",
+        type=int,
+        help="이 포트에서 GET /healthz 제공 (JSON 상태, 갱신이 멈추면 503)",
+    )
+    p_watch.add_argument(
+        "--health-host",
+        default="127.0.0.1",
+        help="--health-port 바인드 주소 (기본: 127.0.0.1)",
+    )
+    p_watch.set_defaults(auto_merge=False, resume=None)
+
+    # status
+    p_status = sub.add_parser(
+        "status",
+        parents=[common],
+        help="--auto-merge에 맡긴 PR 중 머지된 것을 표시",
+    )
+    p_status.add_argument(
+        "--journal",
+        help="확인할 머지 저널 (기본: 가장 최근 logs/dependabot_merge_*.jsonl)",
     )
 
     return parser
 
 
 def main():
+    global _webhook, _inventory
     parser = build_parser()
     args = parser.parse_args()
 
     # `list`에는 merge 전용 속성이 없으므로 공용 헬퍼를 위해 기본값을 채운다.
     if not hasattr(args, "merge_method"):
         args.merge_method = "-"
+    if not hasattr(args, "concurrency"):
+        args.concurrency = 1
+        args.max_in_flight = MAX_IN_FLIGHT
+
+    if getattr(args, "train", False) and args.one_per_repo:
+        parser.error("--train과 --one-per-repo는 함께 쓸 수 없습니다")
+    if getattr(args, "auto_merge", False) and (args.train or args.one_per_repo or args.wait_checks):
+        parser.error("--auto-merge는 --train, --one-per-repo, --wait-checks와 함께 쓸 수 없습니다")
 
     logging.basicConfig(
         level=logging.DEBUG if args.verbose else logging.INFO,
         format="%(levelname)s: %(message)s",
     )
 
-    token = os.environ.get("GITHUB_TOKEN", "")
-    if not token:
+    try:
+        tokens = TokenPool.from_env(args.org)
+    except (RuntimeError, OSError) as e:
+        print(f"{Color.RED}✗ {e}{Color.RESET}")
+        sys.exit(1)
+    if not tokens:
         print(f"{Color.RED}✗ GITHUB_TOKEN 환경변수를 설정해주세요.{Color.RESET}")
         print("  export GITHUB_TOKEN='ghp_xxxxxxxxxxxx'")
+        print("  (토큰 풀은 GITHUB_TOKENS, GitHub App은 GITHUB_APP_ID)")
         sys.exit(1)
 
-    client = GitHubClient(token)
+    if getattr(args, "webhook_port", None):
+        _webhook = WebhookReceiver(
+            args.org,
+            args.webhook_host,
+            args.webhook_port,
+            os.environ.get("GITHUB_WEBHOOK_SECRET", ""),
+        )
+        _webhook.start()
+
+    cache = None if args.no_cache else HTTPCache()
+    client = GitHubClient(tokens, max_in_flight=args.max_in_flight, cache=cache)
+    if not args.no_inventory:
+        _inventory = Inventory()
+    if args.metrics_port:
+        MetricsEndpoint(args.metrics_host, args.metrics_port, client).start()
 
     commands = {
         "list": cmd_list,
         "merge": cmd_merge,
+        "status": cmd_status,
+        "watch": cmd_watch,
     }
 
     try:
@@ -786,6 +4433,12 @@ def main():
 
             traceback.print_exc()
         sys.exit(1)
+    finally:
+        if args.profile:
+            # `list --format` 스트리밍 stdout은 기계가 읽을 수 있게 유지한다.
+            streamed = getattr(args, "format", "text") != "text"
+            with redirect_stdout(sys.stderr if streamed else sys.stdout):
+                _print_profile(_profile.snapshot())
 
 
 if __name__ == "__main__":
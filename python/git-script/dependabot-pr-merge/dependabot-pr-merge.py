@@ -3,17 +3,19 @@
 Dependabot PR Bulk Merger
 =========================
 Find every open Dependabot pull request across an organization / user's
-repositories and merge them sequentially.
+repositories and merge them, one at a time within each repository.
 
 Features:
   - list   : List all open Dependabot PRs across repositories
-  - merge  : Merge the Dependabot PRs one by one (sequentially)
+  - merge  : Merge the Dependabot PRs, one by one per repository
+  - status : Report which PRs handed to --auto-merge have landed
+  - watch  : Stay resident and merge Dependabot PRs as they become ready
 
 Usage examples:
   # Preview every open Dependabot PR
   python dependabot-pr-merge.py list --org somaz94
 
-  # Merge all Dependabot PRs sequentially (squash by default)
+  # Merge all Dependabot PRs (squash by default)
   python dependabot-pr-merge.py merge --org somaz94
 
   # Merge with a specific method
@@ -28,43 +30,301 @@ Usage examples:
   # Dry-run mode (no actual merge)
   python dependabot-pr-merge.py merge --org somaz94 --dry-run
 
+  # Continue an interrupted run from its journal
+  python dependabot-pr-merge.py merge --org somaz94 --resume logs/dependabot_merge_<ts>.jsonl
+
   # Skip the confirmation prompt
   python dependabot-pr-merge.py merge --org somaz94 -y
+
+  # Run up to 8 repos' merge chains in parallel (serial within each repo)
+  python dependabot-pr-merge.py merge --org somaz94 --concurrency 8
+
+  # Combine each repo's Dependabot PRs into one PR (one CI run, one merge)
+  python dependabot-pr-merge.py merge --org somaz94 --train
+
+  # Enable native auto-merge on every PR and exit; later, see what landed
+  python dependabot-pr-merge.py merge --org somaz94 --auto-merge
+  python dependabot-pr-merge.py status --org somaz94
+
+  # Stay resident: re-check every 5 min, expose /healthz on :8081
+  python dependabot-pr-merge.py watch --org somaz94 --health-port 8081
+
+  # Discover all PRs with one org-wide GraphQL search instead of per-repo listing
+  python dependabot-pr-merge.py list --org somaz94 --discovery search
+
+  # One JSON record per PR, streamed while the org is still being scanned
+  python dependabot-pr-merge.py list --org somaz94 --format ndjson | jq -r .url
 """
 
 from __future__ import annotations
 
 import argparse
+import csv
+import hashlib
+import hmac
 import json
 import logging
 import os
+import re
+import shutil
+import sqlite3
+import statistics
 import sys
+import threading
 import time
-from dataclasses import dataclass, field
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager, redirect_stdout
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
+from urllib.parse import parse_qs, urlencode, urlparse
 
 import requests
+from requests.structures import CaseInsensitiveDict
+from requests.adapters import HTTPAdapter
 
 # ─────────────────────────────────────────────
 # Constants
 # ─────────────────────────────────────────────
 GITHUB_API = "https://api.github.com"
 PER_PAGE = 100
+# Pages of one listing fetched at once, after the first page's Link header
+# gives the page count (still capped by --max-in-flight)
+PAGE_WORKERS = 8
+# GitHub search never returns more than 1000 results for a single query.
+SEARCH_RESULT_CAP = 1000
+# PRs per GraphQL request in the mergeability prefetch (aliased lookups)
+PREFETCH_BATCH = 50
 RATE_LIMIT_BUFFER = 10
+# GitHub's content-creation guidance: at most 80 writes a minute and 500 an
+# hour, with about a second between them (merge / update-branch count).
+WRITE_INTERVAL = 1.0
+WRITE_LIMIT_HOUR = 500
+# First pause after a secondary rate limit without Retry-After; doubles per hit.
+SECONDARY_BACKOFF = 60
+# Retries of one request after a 403/429 rate-limit reply
+RATE_LIMIT_RETRIES = 3
 REQUEST_TIMEOUT = 30
+# Default cap on concurrent HTTP requests, independent of --concurrency: most
+# workers spend their time waiting on CI, not holding a connection.
+MAX_IN_FLIGHT = 10
+# Re-mint a GitHub App installation token this long before it expires (1h tokens)
+APP_TOKEN_REFRESH = 300
+# After a failed mint, leave that installation to the rest of the pool this long
+APP_MINT_RETRY = 60
+
+# Conditional-request cache (ETag / Last-Modified), next to logs/ by default
+CACHE_DIR = Path(".cache") / "github-http"
+CACHE_MAX_BYTES = 50 * 1024 * 1024
+
+# Local repo inventory (SQLite): each repo's pushed_at / updated_at / flags and
+# its last-seen open Dependabot PRs, so unchanged repos are never re-queried.
+# Every INVENTORY_FULL_SWEEP seconds the whole org is listed again, since a
+# sweep that stops early can't see deleted or transferred repos.
+INVENTORY_PATH = Path(".cache") / "inventory.sqlite3"
+INVENTORY_FULL_SWEEP = 24 * 3600
+INVENTORY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS repos (
+    owner TEXT NOT NULL,
+    name TEXT NOT NULL,
+    pushed_at TEXT NOT NULL DEFAULT '',
+    updated_at TEXT NOT NULL DEFAULT '',
+    archived INTEGER NOT NULL DEFAULT 0,
+    disabled INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (owner, name)
+);
+CREATE TABLE IF NOT EXISTS sweeps (
+    owner TEXT PRIMARY KEY,
+    full_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pr_lists (
+    owner TEXT NOT NULL,
+    repo TEXT NOT NULL,
+    pushed_at TEXT NOT NULL,
+    PRIMARY KEY (owner, repo)
+);
+CREATE TABLE IF NOT EXISTS prs (
+    owner TEXT NOT NULL,
+    repo TEXT NOT NULL,
+    number INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    head TEXT NOT NULL,
+    url TEXT NOT NULL,
+    updates TEXT NOT NULL DEFAULT '{}',
+    PRIMARY KEY (owner, repo, number)
+);
+"""
+
+# Chain scheduling: timings from the newest journals of this org, the last
+# samples kept per repo, and the guess for a step nothing is known about.
+HISTORY_RUNS = 20
+HISTORY_SAMPLES = 20
+HISTORY_DEFAULT_SECONDS = 60
 
 # Dependabot author logins (current + legacy preview app)
 DEPENDABOT_LOGINS = {"dependabot[bot]", "dependabot-preview[bot]"}
 
+# Dependabot PR classification, from the head branch and title alone:
+#   dependabot/<ecosystem>/[<directory>/]<package>-<version>
+#   "[build(deps): ]Bump <package> from <old> to <new>[ in /dir]"
+#   "Update <package> requirement from ~> 1.0 to ~> 2.0" (version ranges)
+#   "Bump the <group> group ... with N updates" (grouped: delta unknown)
+DEPENDABOT_BRANCH_RE = re.compile(r"^dependabot/(?P<ecosystem>[^/]+)/(?P<rest>.+)$")
+BUMP_TITLE_RE = re.compile(
+    r"\b(?:bump|update) (?P<package>\S+)(?: requirement)? from (?P<old>.+?) "
+    r"to (?P<new>.+?)(?: in \S+)?$",
+    re.IGNORECASE,
+)
+GROUP_TITLE_RE = re.compile(r"\bbump the (?P<group>\S+) group\b", re.IGNORECASE)
+# Grouped / multi-package PR descriptions list each update on its own line
+UPDATES_BODY_RE = re.compile(r"^Updates `(?P<package>[^`]+)` from \S+ to (?P<new>\S+)", re.MULTILINE)
+# Manifest directory from the title: "... in /frontend", "... across 2 directories"
+DIRECTORY_RE = re.compile(r" in (?P<directory>/\S*)")
+# A dotted version, not part of a commit SHA (actions pinned by SHA: unknown)
+VERSION_RE = re.compile(r"(?<![\w.])v?(\d+(?:\.\d+)*)(?![\w.])")
+# A semver prerelease suffix right after such a version: "1.0.0-beta.1"
+PRERELEASE_RE = re.compile(r"-[0-9A-Za-z]")
+# Semver deltas, safest first; grouped or unparseable updates are "unknown".
+SEMVER_DELTAS = ("patch", "minor", "major", "unknown")
+# `list --format ndjson|csv` record fields; --mergeable adds LIST_STATE_FIELDS
+LIST_FIELDS = ["repo", "number", "title", "head", "url", "ecosystem", "package", "delta"]
+LIST_STATE_FIELDS = ["mergeable", "mergeable_state"]
+# Shorthands accepted by --ecosystem -> Dependabot's branch names
+ECOSYSTEM_ALIASES = {
+    "npm": "npm_and_yarn",
+    "yarn": "npm_and_yarn",
+    "pnpm": "npm_and_yarn",
+    "go": "go_modules",
+    "gomod": "go_modules",
+    "actions": "github_actions",
+    "github-actions": "github_actions",
+    "python": "pip",
+    "rust": "cargo",
+    "ruby": "bundler",
+}
+
+# Org-wide Dependabot PR search (one paginated query instead of N+1 REST calls)
+SEARCH_PRS_QUERY = """
+query($q: String!, $after: String) {
+  search(query: $q, type: ISSUE, first: 100, after: $after) {
+    issueCount
+    pageInfo { hasNextPage endCursor }
+    nodes {
+      ... on PullRequest {
+        id
+        number
+        title
+        body
+        url
+        headRefName
+        headRefOid
+        mergeable
+        mergeStateStatus
+        isMergeQueueEnabled
+        isInMergeQueue
+        repository { name isArchived isDisabled }
+      }
+    }
+  }
+}
+"""
+
+# Per-PR fields fetched in bulk so most PRs need no REST get_pr() round trip
+PR_STATE_FIELDS = (
+    "id state headRefOid mergeable mergeStateStatus isMergeQueueEnabled isInMergeQueue"
+)
+
+# Per-PR fields read by `status` to see whether auto-merged PRs have landed
+PR_STATUS_FIELDS = (
+    "state mergedAt mergeStateStatus autoMergeRequest { enabledAt } "
+    "isInMergeQueue mergeQueueEntry { position }"
+)
+
+# Per-PR fields polled while following a repo's merge queue
+PR_QUEUE_FIELDS = (
+    "state isInMergeQueue mergeQueueEntry { position state } autoMergeRequest { enabledAt }"
+)
+
+# --auto-merge: let GitHub merge the PR itself once its requirements pass
+ENABLE_AUTO_MERGE_MUTATION = """
+mutation($id: ID!, $method: PullRequestMergeMethod!, $sha: GitObjectID) {
+  enablePullRequestAutoMerge(
+    input: {pullRequestId: $id, mergeMethod: $method, expectedHeadOid: $sha}
+  ) {
+    pullRequest { autoMergeRequest { enabledAt } }
+  }
+}
+"""
+
+# Base branches with a merge queue: GitHub batches, tests and merges the PRs
+ENQUEUE_MUTATION = """
+mutation($id: ID!, $sha: GitObjectID) {
+  enqueuePullRequest(input: {pullRequestId: $id, expectedHeadOid: $sha}) {
+    mergeQueueEntry { position }
+  }
+}
+"""
+
 # Seconds to let a just-pushed merge queue its workflow run before polling for
 # idle. Without this grace, count_active_runs() can read 0 and return before a
-# changelog/release workflow has even started.
+# changelog/release workflow has even started. When the merge commit SHA is
+# known this is only an upper bound: we poll every WORKFLOW_REGISTER_POLL
+# seconds and move on as soon as that commit's runs show up and finish.
 WORKFLOW_START_GRACE = 12
+WORKFLOW_REGISTER_POLL = 3
+
+# With --webhook-port, polls become a fallback: re-check at least this often
+# even if no workflow_run / check_suite delivery arrives (lost/blocked hooks).
+WEBHOOK_FALLBACK_POLL = 60
+
+# --train: branch that collects a repo's Dependabot updates into one PR
+TRAIN_BRANCH_PREFIX = "dependabot-train/"
+
+# watch: seconds between refresh cycles, and how many recent results the
+# health endpoint keeps (memory stays bounded however long the daemon runs)
+WATCH_INTERVAL = 300
+WATCH_RECENT = 100
+
+# Live dashboard: seconds between redraws of the status lines pinned below the
+# scrolling output (merge / watch on a terminal, unless --no-dashboard)
+DASHBOARD_REFRESH = 1
+
+# --metrics-port: upper bounds (seconds) of the wait-duration histogram buckets
+WAIT_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1800)
+
+# Request profile labels: owner, repo, PR number, run id and branch collapse
+# into a template so counts aggregate per endpoint
+ENDPOINT_TEMPLATES = [
+    (re.compile(r"^/repos/[^/]+/[^/]+"), "/repos/{o}/{r}"),
+    (re.compile(r"/(pulls|issues)/\d+"), r"/\1/{n}"),
+    (re.compile(r"/actions/runs/\d+"), "/actions/runs/{id}"),
+    (re.compile(r"/(git/refs?)/heads/.+"), r"/\1/heads/{ref}"),
+    (re.compile(r"^/(orgs|users)/[^/]+"), r"/\1/{org}"),
+]
 
 # mergeable_state values that mean "ready to merge right now"
 MERGEABLE_STATES = {"clean", "unstable", "has_hooks"}
 
+# With --concurrency > 1, per-PR output is buffered per worker thread and
+# flushed as one block when the PR finishes, so lines never interleave.
+_output = threading.local()
+_print_lock = threading.Lock()
+
+# Set on Ctrl-C so worker threads stop sleeping/polling and unwind promptly.
+_stop = threading.Event()
+
+# Webhook receiver started by --webhook-port (None = plain polling).
+_webhook: WebhookReceiver | None = None
+
+# Live dashboard while merge chains run (None = off, or no TTY).
+_dashboard: Dashboard | None = None
+
+# Repo / PR inventory (None = --no-inventory: list everything every run).
+_inventory: Inventory | None = None
+
 
 class Color:
     GREEN = "\033[92m"
@@ -87,6 +347,45 @@ class PullRequest:
     title: str
     head: str
     url: str
+    # Subset of the REST PR detail (mergeable, mergeable_state, head.sha) from
+    # the bulk prefetch; None until prefetched.
+    prefetched: dict | None = None
+    # package -> new version for grouped / multi-package PRs, from the PR body
+    updates: dict[str, str] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class Bump:
+    """What a Dependabot PR updates, parsed from its branch and title."""
+
+    ecosystem: str
+    package: str
+    old: str = ""
+    new: str = ""
+    delta: str = "unknown"  # one of SEMVER_DELTAS
+
+    @property
+    def risk(self) -> tuple[int, bool]:
+        """Sort key, safest first: by delta, then 1.x+ before 0.x (pre-1.0 may break)."""
+        return SEMVER_DELTAS.index(self.delta), self.old.split(".")[0] == "0"
+
+
+@dataclass(frozen=True)
+class Duplicate:
+    """A PR that another open PR in the same repo already covers, fully or in part."""
+
+    pr: PullRequest
+    by: PullRequest
+    packages: tuple[str, ...]  # the packages both PRs update
+    covered: bool  # `by` updates all of them, at least as far
+
+    def reason(self, close: bool) -> str:
+        if not self.covered:
+            return (
+                f"overlaps #{self.by.number} ({', '.join(self.packages)}); "
+                "left for Dependabot to rebase"
+            )
+        return f"{'closed, ' if close else ''}superseded by #{self.by.number}"
 
 
 @dataclass
@@ -94,7 +393,7 @@ class PRResult:
     repo: str
     number: int
     title: str
-    action: str  # merged / skipped / failed
+    action: str  # merged / auto-merge / skipped / failed
     success: bool
     message: str = ""
 
@@ -105,248 +404,2458 @@ class Stats:
     merged: int = 0
     failed: int = 0
     skipped: int = 0
+    auto_merge: int = 0  # handed to GitHub's auto-merge, not merged yet
     details: list[PRResult] = field(default_factory=list)
+    journal: Journal | None = field(default=None, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def recorded(self, pr: PullRequest) -> bool:
+        """Whether `pr` already has a result in this run."""
+        with self._lock:
+            return any(r.repo == pr.repo and r.number == pr.number for r in self.details)
 
     def record(self, result: PRResult):
-        self.total += 1
-        if result.success:
-            if result.action == "skipped":
-                self.skipped += 1
+        with self._lock:
+            if self.journal:
+                self.journal.write("result", **asdict(result))
+            self.total += 1
+            if result.success:
+                if result.action == "skipped":
+                    self.skipped += 1
+                elif result.action == "auto-merge":
+                    self.auto_merge += 1
+                else:
+                    self.merged += 1
             else:
-                self.merged += 1
-        else:
-            self.failed += 1
-        self.details.append(result)
+                self.failed += 1
+            self.details.append(result)
+        _metrics.record(result)
+
+
+@dataclass
+class Progress:
+    """Thread-safe [idx/total] counter shared by the merge workers."""
+
+    total: int
+    done: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def advance(self) -> int:
+        with self._lock:
+            self.done += 1
+            return self.done
 
 
 # ─────────────────────────────────────────────
-# GitHub API Client
+# Run journal (resumable merges)
 # ─────────────────────────────────────────────
-class GitHubClient:
-    """GitHub API client with rate-limit handling."""
+class Journal:
+    """
+    Append-only JSONL record of a merge run, written as each PR finishes.
 
-    def __init__(self, token: str):
-        self.token = token
-        self.session = requests.Session()
-        self.session.headers.update(
+    Lines are a "run" header, the "discovery" PR list, then one "result" per
+    PR (flushed and fsync'd immediately), so an interrupted or crashed run can
+    be picked up with --resume without rediscovering anything.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._file = path.open("a", encoding="utf-8")
+
+    def write(self, kind: str, **data):
+        record = {"type": kind, "time": datetime.now().isoformat(), **data}
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    @staticmethod
+    def load(path: Path) -> tuple[dict, list[PullRequest], dict[tuple[str, int], PRResult]]:
+        """Read a journal back: (run header, discovered PRs, latest result per PR)."""
+        header, prs, results = None, [], {}
+        for line in path.read_text(encoding="utf-8").splitlines():
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # torn last line from a crash mid-write
+            kind = record.pop("type", None)
+            record.pop("time", None)
+            if kind == "run":
+                header = record
+            elif kind == "discovery":
+                prs = [PullRequest(**pr) for pr in record["prs"]]
+            elif kind == "result":
+                result = PRResult(**record)
+                results[(result.repo, result.number)] = result
+        if header is None:
+            raise RuntimeError(f"{path} is not a dependabot merge journal")
+        return header, prs, results
+
+
+# ─────────────────────────────────────────────
+# Merge history (longest chain first)
+# ─────────────────────────────────────────────
+class MergeHistory:
+    """
+    Per-repo merge timings, used to start the longest merge chains first.
+
+    Every real merge adds a "timing" line to the journal: how long the PR
+    waited for the previous same-repo merge's workflows, and how long its own
+    rebase / checks / merge took. load() reads them back from the newest
+    HISTORY_RUNS journals for the org; watch keeps adding to the same history.
+    A repo's chain estimate is its first merge plus, per followup, one
+    workflow wait and one followup merge (medians of the repo's samples, else
+    of every repo's, else HISTORY_DEFAULT_SECONDS).
+    """
+
+    KINDS = ("first", "followup", "workflow")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples: dict[str, dict[str, deque[float]]] = {}
+        self.runs = 0  # journals that contributed at least one timing
+
+    def load(self, org: str, log_dir: Path = Path("logs")):
+        """Read timings from the newest HISTORY_RUNS journals for `org`."""
+        for path in sorted(log_dir.glob("dependabot_merge_*.jsonl"))[-HISTORY_RUNS:]:
+            timings = []
+            try:
+                lines = path.read_text(encoding="utf-8").splitlines()
+            except OSError:
+                continue
+            for line in lines:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record.get("type") == "run" and record.get("org") != org:
+                    break
+                if record.get("type") == "timing":
+                    timings.append(record)
+            for t in timings:
+                self.add(t["repo"], t["followup"], t["workflow"], t["merge"])
+            self.runs += bool(timings)
+
+    def add(self, repo: str, followup: bool, workflow: float, merge: float):
+        with self._lock:
+            samples = self.samples.setdefault(
+                repo, {k: deque(maxlen=HISTORY_SAMPLES) for k in self.KINDS}
+            )
+            samples["followup" if followup else "first"].append(merge)
+            if followup:
+                samples["workflow"].append(workflow)
+
+    def _median(self, repo: str, kind: str) -> float:
+        own = self.samples.get(repo, {}).get(kind)
+        if own:
+            return statistics.median(own)
+        every = [x for s in self.samples.values() for x in s[kind]]
+        return statistics.median(every) if every else HISTORY_DEFAULT_SECONDS
+
+    def estimate(self, repo: str, steps: int) -> float:
+        """Expected seconds for `steps` serial merges in `repo`."""
+        with self._lock:
+            first = self._median(repo, "first")
+            followup = self._median(repo, "workflow") + self._median(repo, "followup")
+        return first + (steps - 1) * followup
+
+
+_history = MergeHistory()
+
+
+# ─────────────────────────────────────────────
+# HTTP cache (conditional requests)
+# ─────────────────────────────────────────────
+class HTTPCache:
+    """
+    On-disk cache of GET responses, revalidated with ETag / Last-Modified.
+
+    A 304 reply is answered from disk and does not count against the primary
+    rate limit. One JSON file per credential+URL+params, so a body fetched
+    with one token is never served to another that may not see the same data;
+    once the directory grows past max_bytes the least recently used entries
+    are evicted.
+    """
+
+    # Response headers worth replaying from the cache (pagination, body type)
+    KEEP_HEADERS = ("Content-Type", "Link")
+
+    def __init__(self, path: Path = CACHE_DIR, max_bytes: int = CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._size = sum(f.stat().st_size for f in self.path.glob("*.json"))
+
+    def _file(self, url: str, params: dict | None, credential: str) -> Path:
+        # Hashed, so the credential (a PAT) never shows up in a file name.
+        key = f"{credential} {url}?{urlencode(sorted((params or {}).items()))}"
+        return self.path / f"{hashlib.sha256(key.encode()).hexdigest()}.json"
+
+    def load(self, url: str, params: dict | None, credential: str) -> dict | None:
+        try:
+            return json.loads(self._file(url, params, credential).read_text())
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def validators(entry: dict) -> dict:
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, url: str, params: dict | None, credential: str, resp: requests.Response):
+        etag = resp.headers.get("ETag")
+        last_modified = resp.headers.get("Last-Modified")
+        if not (etag or last_modified):
+            return
+        data = json.dumps(
             {
-                "Authorization": f"token {token}",
-                "Accept": "application/vnd.github.v3+json",
+                "etag": etag,
+                "last_modified": last_modified,
+                "headers": {h: resp.headers[h] for h in self.KEEP_HEADERS if h in resp.headers},
+                "body": resp.text,
             }
         )
+        f = self._file(url, params, credential)
+        with self._lock:
+            old = f.stat().st_size if f.exists() else 0
+            tmp = f.with_suffix(".tmp")
+            tmp.write_text(data)
+            os.replace(tmp, f)
+            self._size += f.stat().st_size - old
+            if self._size > self.max_bytes:
+                self._evict()
 
-    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
-        resp = self.session.request(method, url, timeout=REQUEST_TIMEOUT, **kwargs)
-        self._handle_rate_limit(resp)
-        return resp
+    def replay(
+        self,
+        url: str,
+        params: dict | None,
+        credential: str,
+        entry: dict,
+        resp: requests.Response,
+    ) -> requests.Response:
+        """Turn a 304 into the cached 200, keeping the fresh rate-limit headers."""
+        try:
+            os.utime(self._file(url, params, credential))  # mark as recently used
+        except OSError:
+            pass
+        cached = requests.Response()
+        cached.status_code = 200
+        cached._content = entry["body"].encode("utf-8")
+        cached.encoding = "utf-8"
+        cached.headers = CaseInsensitiveDict(entry["headers"])
+        cached.headers.update(
+            {k: v for k, v in resp.headers.items() if k.lower().startswith("x-ratelimit")}
+        )
+        cached.url = resp.url
+        cached.request = resp.request
+        return cached
 
-    def get(self, path: str, **kwargs) -> requests.Response:
-        return self._request("GET", f"{GITHUB_API}{path}", **kwargs)
+    def _evict(self):
+        # Drop least recently used entries down to 90% of the budget.
+        files = sorted(self.path.glob("*.json"), key=lambda f: f.stat().st_mtime)
+        for f in files:
+            if self._size <= self.max_bytes * 0.9:
+                break
+            size = f.stat().st_size
+            f.unlink(missing_ok=True)
+            self._size -= size
 
-    def put(self, path: str, **kwargs) -> requests.Response:
-        return self._request("PUT", f"{GITHUB_API}{path}", **kwargs)
 
-    def _handle_rate_limit(self, resp: requests.Response):
-        remaining = int(resp.headers.get("X-RateLimit-Remaining", 999))
-        if remaining <= RATE_LIMIT_BUFFER:
-            reset_ts = int(resp.headers.get("X-RateLimit-Reset", 0))
-            wait = max(reset_ts - int(time.time()), 1) + 1
-            logging.warning(
-                f"Rate limit approaching (remaining={remaining}). Waiting {wait}s..."
-            )
-            time.sleep(wait)
+# ─────────────────────────────────────────────
+# Repo inventory (SQLite, incremental refresh)
+# ─────────────────────────────────────────────
+class Inventory:
+    """
+    Local SQLite record of an owner's repos and their open Dependabot PRs.
 
-    def list_repos(self, org: str) -> list[str]:
-        repos: list[str] = []
-        page = 1
-        while True:
-            resp = self.get(
-                f"/orgs/{org}/repos", params={"per_page": PER_PAGE, "page": page}
-            )
-            if resp.status_code == 404:
-                resp = self.get(
-                    f"/users/{org}/repos",
-                    params={"per_page": PER_PAGE, "page": page, "type": "owner"},
-                )
-            if resp.status_code != 200:
-                raise RuntimeError(
-                    f"Failed to list repositories: HTTP {resp.status_code}\n{resp.text}"
+    refresh() lists repos most recently updated first (`sort=updated`) and
+    stops at the first one whose updated_at and pushed_at match the stored
+    row: every repo after it is unchanged too, so a quiet org costs one
+    request. The early stop relies on GitHub bumping updated_at (the sort key)
+    on every push and settings edit; a change that doesn't is only seen by the
+    daily full sweep. A repo's pulls are re-listed only when its pushed_at has
+    moved since they were last listed (Dependabot pushing a branch, a merge
+    landing); otherwise its PRs come from the database.
+    """
+
+    def __init__(self, path: Path = INVENTORY_PATH):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._db:
+            self._db.executescript(INVENTORY_SCHEMA)
+
+    def refresh(self, client: GitHubClient, org: str) -> list[str]:
+        """Bring `org`'s repos up to date; returns the active ones, sorted."""
+        with self._lock:
+            stored = {
+                name: (updated, pushed)
+                for name, updated, pushed in self._db.execute(
+                    "SELECT name, updated_at, pushed_at FROM repos WHERE owner = ?", (org,)
                 )
-            data = resp.json()
-            if not data:
+            }
+            row = self._db.execute("SELECT full_at FROM sweeps WHERE owner = ?", (org,)).fetchone()
+        full = not stored or not row or time.time() - row[0] >= INVENTORY_FULL_SWEEP
+
+        changed: list[tuple] = []
+        for repo in client.iter_repos_by_update(org):
+            stamps = (repo.get("updated_at") or "", repo.get("pushed_at") or "")
+            if not full and stored.get(repo["name"]) == stamps:
                 break
-            repos.extend(
-                r["name"]
-                for r in data
-                if not r.get("archived", False) and not r.get("disabled", False)
+            changed.append(
+                (
+                    org,
+                    repo["name"],
+                    stamps[1],
+                    stamps[0],
+                    int(bool(repo.get("archived"))),
+                    int(bool(repo.get("disabled"))),
+                )
             )
-            logging.info(f"  Page {page}: {len(data)} repos (total {len(repos)})")
-            page += 1
-        return sorted(repos)
 
-    def list_dependabot_prs(self, org: str, repo: str) -> list[PullRequest]:
-        prs: list[PullRequest] = []
-        page = 1
-        while True:
-            resp = self.get(
-                f"/repos/{org}/{repo}/pulls",
-                params={"state": "open", "per_page": PER_PAGE, "page": page},
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO repos VALUES (?, ?, ?, ?, ?, ?)", changed
             )
-            if resp.status_code != 200:
-                return prs
-            data = resp.json()
-            if not data:
-                break
-            for pr in data:
-                login = (pr.get("user") or {}).get("login", "")
-                if login in DEPENDABOT_LOGINS:
-                    prs.append(
-                        PullRequest(
-                            repo=repo,
-                            number=pr["number"],
-                            title=pr["title"],
-                            head=(pr.get("head") or {}).get("ref", ""),
-                            url=pr["html_url"],
-                        )
+            if full:
+                seen = {c[1] for c in changed}
+                for gone in set(stored) - seen:
+                    self._forget(org, gone, drop_repo=True)
+                self._db.execute(
+                    "INSERT OR REPLACE INTO sweeps VALUES (?, ?)", (org, time.time())
+                )
+            repos = [
+                name
+                for (name,) in self._db.execute(
+                    "SELECT name FROM repos WHERE owner = ? AND NOT archived AND NOT disabled "
+                    "ORDER BY name",
+                    (org,),
+                )
+            ]
+        kind = "full sweep" if full else "incremental sweep"
+        logging.info(f"Inventory: {len(changed)} repo(s) new or changed ({kind})")
+        return repos
+
+    def dependabot_prs(self, client: GitHubClient, org: str, repo: str) -> list[PullRequest]:
+        """`repo`'s open Dependabot PRs, listed only if it was pushed since last time."""
+        with self._lock:
+            current = self._db.execute(
+                "SELECT pushed_at FROM repos WHERE owner = ? AND name = ?", (org, repo)
+            ).fetchone()
+            listed = self._db.execute(
+                "SELECT pushed_at FROM pr_lists WHERE owner = ? AND repo = ?", (org, repo)
+            ).fetchone()
+            if current and listed and current == listed:
+                return [
+                    PullRequest(repo, number, title, head, url, updates=json.loads(updates))
+                    for number, title, head, url, updates in self._db.execute(
+                        "SELECT number, title, head, url, updates FROM prs "
+                        "WHERE owner = ? AND repo = ? ORDER BY number DESC",
+                        (org, repo),
                     )
-            if len(data) < PER_PAGE:
-                break
-            page += 1
+                ]
+        try:
+            prs = client.list_dependabot_prs(org, repo, strict=True)
+        except RuntimeError as e:
+            logging.debug(f"{e}; not recorded in the inventory")
+            return []
+        if not current:
+            return prs  # not in the inventory (e.g. a --repos name it hasn't seen)
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM prs WHERE owner = ? AND repo = ?", (org, repo))
+            self._db.executemany(
+                "INSERT INTO prs VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (org, repo, pr.number, pr.title, pr.head, pr.url, json.dumps(pr.updates))
+                    for pr in prs
+                ],
+            )
+            self._db.execute(
+                "INSERT OR REPLACE INTO pr_lists VALUES (?, ?, ?)", (org, repo, current[0])
+            )
         return prs
 
-    def get_pr(self, org: str, repo: str, number: int) -> dict:
-        resp = self.get(f"/repos/{org}/{repo}/pulls/{number}")
-        if resp.status_code != 200:
+    def forget(self, org: str, repo: str):
+        """Re-list `repo`'s pulls next time (a cached PR turned out to be closed)."""
+        with self._lock, self._db:
+            self._forget(org, repo, drop_repo=False)
+
+    def _forget(self, org: str, repo: str, drop_repo: bool):
+        self._db.execute("DELETE FROM pr_lists WHERE owner = ? AND repo = ?", (org, repo))
+        self._db.execute("DELETE FROM prs WHERE owner = ? AND repo = ?", (org, repo))
+        if drop_repo:
+            self._db.execute("DELETE FROM repos WHERE owner = ? AND name = ?", (org, repo))
+
+
+# ─────────────────────────────────────────────
+# Token pool (PATs and GitHub App installations)
+# ─────────────────────────────────────────────
+@dataclass
+class Token:
+    label: str  # never the secret itself: this one is logged
+    value: str = ""
+    installation: str = ""  # GitHub App installation id (minted token)
+    expires: float = 0.0
+    # resource -> {"limit", "remaining", "reset"} from this token's last reply
+    quota: dict[str, dict] = field(default_factory=dict)
+    last_used: float = 0.0
+    # Held while minting, so only one thread mints a slot and the pool stays free
+    minting: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+    mint_retry: float = 0.0  # no new mint attempt before this (after a failure)
+
+
+class GitHubApp:
+    """Mints installation tokens for a GitHub App (needs PyJWT[crypto])."""
+
+    def __init__(self, app_id: str, private_key: str):
+        try:
+            import jwt  # noqa: F401  (optional: only GitHub App auth needs it)
+        except ImportError:
             raise RuntimeError(
-                f"Failed to fetch PR {org}/{repo}#{number}: HTTP {resp.status_code}"
+                "GitHub App auth needs PyJWT with crypto support: pip install 'PyJWT[crypto]'"
             )
-        return resp.json()
+        self.app_id = app_id
+        self.private_key = private_key
 
-    def merge_pr(
-        self, org: str, repo: str, number: int, sha: str, method: str
-    ) -> tuple[bool, str]:
-        resp = self.put(
-            f"/repos/{org}/{repo}/pulls/{number}/merge",
-            json={"sha": sha, "merge_method": method},
-        )
-        if resp.status_code == 200:
-            return True, "merged"
-        try:
-            msg = resp.json().get("message", resp.text)
-        except ValueError:
-            msg = resp.text
-        return False, f"HTTP {resp.status_code}: {msg}"
+    def _headers(self) -> dict:
+        import jwt
 
-    def update_branch(self, org: str, repo: str, number: int) -> tuple[bool, str]:
-        """Rebase the PR branch onto the latest base (PUT .../update-branch)."""
-        resp = self.put(f"/repos/{org}/{repo}/pulls/{number}/update-branch")
-        if resp.status_code == 202:
-            return True, "update requested"
-        try:
-            msg = resp.json().get("message", resp.text)
-        except ValueError:
-            msg = resp.text
-        return False, f"HTTP {resp.status_code}: {msg}"
+        now = int(time.time())
+        # Backdated for clock drift; GitHub caps app JWTs at 10 minutes.
+        payload = {"iat": now - 60, "exp": now + 540, "iss": self.app_id}
+        return {
+            "Authorization": f"Bearer {jwt.encode(payload, self.private_key, algorithm='RS256')}",
+            "Accept": "application/vnd.github.v3+json",
+        }
 
-    def count_active_runs(self, org: str, repo: str) -> int:
-        """Count queued + in-progress Actions workflow runs for a repo."""
-        total = 0
-        for status in ("queued", "in_progress"):
-            resp = self.get(
-                f"/repos/{org}/{repo}/actions/runs",
-                params={"status": status, "per_page": 1},
+    def find_installation(self, org: str) -> str:
+        """Installation id of this App on an org (or user) account."""
+        for kind in ("orgs", "users"):
+            resp = requests.get(
+                f"{GITHUB_API}/{kind}/{org}/installation",
+                headers=self._headers(),
+                timeout=REQUEST_TIMEOUT,
             )
             if resp.status_code == 200:
-                total += resp.json().get("total_count", 0)
-        return total
+                return str(resp.json()["id"])
+        raise RuntimeError(
+            f"GitHub App {self.app_id} is not installed on {org}: HTTP {resp.status_code}"
+        )
 
+    def mint(self, installation: str) -> tuple[str, float]:
+        """A fresh installation token and its expiry (epoch seconds)."""
+        resp = requests.post(
+            f"{GITHUB_API}/app/installations/{installation}/access_tokens",
+            headers=self._headers(),
+            timeout=REQUEST_TIMEOUT,
+        )
+        if resp.status_code != 201:
+            raise RuntimeError(
+                f"Failed to mint a token for installation {installation}: HTTP {resp.status_code}"
+            )
+        data = resp.json()
+        expires = datetime.fromisoformat(data["expires_at"].replace("Z", "+00:00")).timestamp()
+        return data["token"], expires
 
-# ─────────────────────────────────────────────
-# Commands
-# ─────────────────────────────────────────────
-def cmd_list(client: GitHubClient, args: argparse.Namespace):
-    """List all open Dependabot PRs across repositories."""
-    repos = _resolve_repos(client, args)
 
-    print(f"\n{Color.BOLD}Open Dependabot Pull Requests{Color.RESET}")
-    print(f"Scope: {len(repos)} repositories\n")
+class TokenUnavailable(requests.RequestException):
+    """No token in the pool could be used: every App installation failed to mint."""
 
-    total = 0
-    for repo in repos:
-        prs = client.list_dependabot_prs(args.org, repo)
-        if not prs:
-            continue
-        total += len(prs)
-        print(f"{Color.BOLD}{Color.CYAN}{args.org}/{repo}{Color.RESET}")
-        for pr in prs:
-            print(
-                f"  #{pr.number} {pr.title}\n"
-                f"      {Color.DIM}{pr.head} | {pr.url}{Color.RESET}"
-            )
-        print()
 
-    if total == 0:
-        print(f"{Color.GREEN}No open Dependabot PRs found.{Color.RESET}")
-    else:
-        print(f"{Color.BOLD}Total: {total} Dependabot PR(s){Color.RESET}")
+class TokenPool:
+    """
+    Tokens the client spreads its requests over, shared by all threads.
 
+    Each request goes out with the token that has the most quota left for its
+    resource (untried tokens first, then least recently used on ties), so N
+    tokens give roughly N x 5,000 requests an hour. GitHub App installation
+    tokens are minted on first use and re-minted APP_TOKEN_REFRESH seconds
+    before they expire, outside the pool lock so other threads keep picking
+    while one waits on GitHub. An installation that fails to mint is skipped
+    in favour of the rest of the pool. quota() sums the pool for the RateBudget.
+    """
 
-def cmd_merge(client: GitHubClient, args: argparse.Namespace):
-    """Merge all Dependabot PRs sequentially."""
-    repos = _resolve_repos(client, args)
+    def __init__(self, tokens: list[Token], app: GitHubApp | None = None):
+        self.tokens = tokens
+        self.app = app
+        self._lock = threading.Lock()
 
-    print(f"\n{Color.BOLD}Dependabot PR Sequential Merge{Color.RESET}")
-    print(f"Scope: {len(repos)} repositories | merge method: {args.merge_method}")
-    if args.one_per_repo:
-        print("Mode: one PR per repo per run (re-run to merge the rest)")
-    if args.wait_checks:
-        print(f"Waiting for CI checks: up to {args.checks_timeout}s per PR")
-    if args.dry_run:
-        _print_warn("DRY-RUN mode: no actual merge will be performed")
-    print()
+    @classmethod
+    def from_env(cls, org: str) -> TokenPool:
+        """GITHUB_TOKEN / GITHUB_TOKENS, plus a GitHub App if GITHUB_APP_ID is set."""
+        values = [os.environ.get("GITHUB_TOKEN", "")]
+        values += os.environ.get("GITHUB_TOKENS", "").split(",")
+        values = list(dict.fromkeys(v.strip() for v in values if v.strip()))
+        tokens = [Token(label=f"token {i + 1}", value=v) for i, v in enumerate(values)]
 
-    # Collect all Dependabot PRs first so we can show the scope before merging.
-    logging.info("Collecting Dependabot PRs...")
-    all_prs: list[PullRequest] = []
-    for repo in repos:
-        all_prs.extend(client.list_dependabot_prs(args.org, repo))
+        app = None
+        app_id = os.environ.get("GITHUB_APP_ID", "")
+        if app_id:
+            key = os.environ.get("GITHUB_APP_PRIVATE_KEY", "")
+            key_file = os.environ.get("GITHUB_APP_PRIVATE_KEY_FILE", "")
+            if not key and key_file:
+                key = Path(key_file).expanduser().read_text()
+            if not key:
+                raise RuntimeError(
+                    "GITHUB_APP_ID needs GITHUB_APP_PRIVATE_KEY or GITHUB_APP_PRIVATE_KEY_FILE"
+                )
+            app = GitHubApp(app_id, key)
+            ids = os.environ.get("GITHUB_APP_INSTALLATION_ID", "")
+            installations = [i.strip() for i in ids.split(",") if i.strip()]
+            for installation in installations or [app.find_installation(org)]:
+                tokens.append(
+                    Token(label=f"app installation {installation}", installation=installation)
+                )
+        return cls(tokens, app)
 
-    if not all_prs:
-        print(f"{Color.GREEN}No open Dependabot PRs to merge.{Color.RESET}")
-        return
+    def __len__(self) -> int:
+        return len(self.tokens)
 
-    groups = _group_by_repo(all_prs)
-    multi = [r for r, prs in groups.items() if len(prs) > 1]
+    def pick(self, resource: str) -> Token:
+        """The token with the most `resource` quota left, minted/refreshed if needed."""
+        failed: list[Token] = []
+        while True:
+            with self._lock:
+                now = time.time()
 
-    print(f"Found {Color.BOLD}{len(all_prs)}{Color.RESET} Dependabot PR(s):")
-    for pr in all_prs:
-        print(f"  {Color.CYAN}{args.org}/{pr.repo}{Color.RESET} #{pr.number} {pr.title}")
-    if multi:
-        # Same-repo PRs are merged one at a time, waiting for each merge's
-        # changelog/release workflow to finish before the next, so two never
-        # run concurrently.
-        print(
-            f"\n  {Color.YELLOW}Note: {len(multi)} repo(s) have 2+ PRs "
-            f"({', '.join(multi)}) — these are merged serially per repo.{Color.RESET}"
-        )
-    print()
+                def left(t: Token) -> float:
+                    q = t.quota.get(resource)
+                    if not q or q["reset"] <= now:
+                        return float("inf")  # untried, or its window has reset
+                    return q["remaining"]
 
-    if not args.dry_run and not args.yes:
-        if not _confirm(f"Merge {len(all_prs)} Dependabot PR(s) sequentially?"):
-            return
+                usable = [t for t in self.tokens if all(t is not f for f in failed)]
+                if not usable:
+                    raise TokenUnavailable(f"no usable token: {failed[-1].label} failed to mint")
+                # Installations backing off from a failed mint go last.
+                token = max(
+                    usable, key=lambda t: (t.mint_retry <= now, left(t), -t.last_used)
+                )
+                token.last_used = now
+            if not token.installation or self._mint(token):
+                return token
+            failed.append(token)
 
-    stats = Stats()
-    idx = 0
+    def _mint(self, token: Token) -> bool:
+        """Mint `token` if it is (nearly) expired; False if it can't be used."""
+        # Threads that picked the same slot wait here; the first one mints.
+        with token.minting:
+            now = time.time()
+            if token.expires - now >= APP_TOKEN_REFRESH or token.mint_retry > now:
+                # The current token may still have a few minutes left.
+                return token.expires > now
+            try:
+                token.value, token.expires = self.app.mint(token.installation)
+            except (RuntimeError, requests.RequestException) as e:
+                logging.warning(
+                    f"Could not mint a token for {token.label} ({e}); "
+                    f"using the rest of the pool for {APP_MINT_RETRY}s"
+                )
+                token.mint_retry = now + APP_MINT_RETRY
+                return token.expires > now
+            logging.debug(f"Minted a token for {token.label}")
+            return True
 
-    for repo, prs in groups.items():
-        for i, pr in enumerate(prs):
-            idx += 1
-            _print_progress(idx, len(all_prs), f"{args.org}/{pr.repo} #{pr.number}")
-            print(f"  {Color.DIM}{pr.title}{Color.RESET}")
+    def observe(self, token: Token, resource: str, resp: requests.Response) -> str:
+        """Record a reply's quota headers for `token`; returns the resource they name."""
+        h = resp.headers
+        resource = h.get("X-RateLimit-Resource", resource)
+        if "X-RateLimit-Remaining" in h:
+            with self._lock:
+                token.quota[resource] = {
+                    "limit": int(h.get("X-RateLimit-Limit", 0)),
+                    "remaining": int(h["X-RateLimit-Remaining"]),
+                    "reset": int(h.get("X-RateLimit-Reset", 0)),
+                }
+        return resource
 
-            followup = i > 0  # 2nd+ Dependabot PR in the SAME repo
+    def quota(self, resource: str) -> dict | None:
+        """
+        The pool's combined quota for `resource`.
 
-            if followup and not args.dry_run:
+        `remaining` / `limit` are summed over tokens; `reset` is the latest
+        reset (the pacing window) and `refill` the earliest, i.e. when an
+        exhausted pool gets requests back.
+        """
+        with self._lock:
+            now = time.time()
+            seen = [t.quota[resource] for t in self.tokens if resource in t.quota]
+            if not seen:
+                return None
+            # A token that has not replied yet is assumed to have a full quota.
+            fresh = len(self.tokens) - len(seen)
+            limit = max(q["limit"] for q in seen)
+            return {
+                "limit": sum(q["limit"] for q in seen) + fresh * limit,
+                "remaining": sum(q["remaining"] if q["reset"] > now else q["limit"] for q in seen)
+                + fresh * limit,
+                "reset": max(q["reset"] for q in seen),
+                "refill": min(q["reset"] for q in seen),
+            }
+
+    def snapshot(self) -> list[dict]:
+        """Per-token quota for the run log (labels only, never token values)."""
+        with self._lock:
+            return [
+                {
+                    "token": t.label,
+                    "quota": {
+                        r: {**q, "reset": datetime.fromtimestamp(q["reset"]).isoformat()}
+                        for r, q in sorted(t.quota.items())
+                    },
+                }
+                for t in self.tokens
+            ]
+
+
+# ─────────────────────────────────────────────
+# Rate-limit budget (shared by every worker)
+# ─────────────────────────────────────────────
+class RateBudget:
+    """
+    Token-bucket pacing against GitHub's rate limits, shared by all threads.
+
+    Each resource (core, graphql, ...) refills at remaining/seconds-to-reset, so
+    a long run spreads its quota over the window instead of hitting the wall;
+    the bucket holds half the spendable quota, so short runs are never slowed.
+    Content-creating calls (merge, update-branch) are additionally spaced
+    WRITE_INTERVAL apart and capped at WRITE_LIMIT_HOUR per hour. A 403/429
+    secondary limit pauses every worker for Retry-After (or a backoff).
+    Quota is the TokenPool's combined quota, so more tokens mean faster pacing.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._quota: dict[str, dict] = {}  # resource -> limit/remaining/reset/refill
+        self._tokens: dict[str, float] = {}
+        self._refilled: dict[str, float] = {}
+        self._writes: deque[float] = deque()  # timestamps of recent writes
+        self._paused_until = 0.0
+        self._backoffs = 0  # consecutive secondary-limit hits
+        self.requests = 0
+        self.write_requests = 0
+        self.secondary_hits = 0
+        self.throttled = 0.0
+
+    def acquire(self, resource: str, write: bool = False):
+        """Block until a request against `resource` fits the budget."""
+        while True:
+            with self._lock:
+                wait, reason = self._wait_for(resource, write)
+                if wait <= 0:
+                    self.requests += 1
+                    if resource in self._tokens:
+                        self._tokens[resource] -= 1
+                    if write:
+                        self.write_requests += 1
+                        self._writes.append(time.time())
+                    return
+                self.throttled += wait
+            if wait >= 5:
+                logging.info(f"Rate budget: {reason}, waiting {wait:.0f}s...")
+            _sleep(wait, f"rate limit ({reason})")
+
+    def _wait_for(self, resource: str, write: bool) -> tuple[float, str]:
+        now = time.time()
+        if self._paused_until > now:
+            return self._paused_until - now, "secondary rate limit"
+        q = self._quota.get(resource)
+        if q:
+            window = max(q["reset"] - now, 1)
+            spendable = q["remaining"] - RATE_LIMIT_BUFFER
+            if spendable <= 0:
+                refill = q.get("refill", q["reset"])
+                if refill > now:
+                    return refill - now + 1, f"{resource} quota exhausted"
+            else:
+                rate = spendable / window
+                tokens = min(
+                    self._tokens[resource] + (now - self._refilled[resource]) * rate,
+                    max(spendable / 2, 1),
+                )
+                self._tokens[resource], self._refilled[resource] = tokens, now
+                if tokens < 1:
+                    return (1 - tokens) / rate, f"pacing {resource} quota"
+        if write:
+            while self._writes and self._writes[0] <= now - 3600:
+                self._writes.popleft()
+            if len(self._writes) >= WRITE_LIMIT_HOUR:
+                return self._writes[0] + 3600 - now, "hourly write limit"
+            if self._writes and now - self._writes[-1] < WRITE_INTERVAL:
+                return self._writes[-1] + WRITE_INTERVAL - now, "write spacing"
+        return 0, ""
+
+    def observe(
+        self, resource: str, resp: requests.Response, quota: dict | None = None
+    ) -> float | None:
+        """
+        Record the pool's quota after a reply; return seconds to back off if
+        rate-limited (0: that token ran dry, retry now with another one).
+        """
+        h = resp.headers
+        now = time.time()
+        with self._lock:
+            if quota:
+                prev = self._quota.get(resource)
+                if (
+                    not prev
+                    or quota["reset"] > prev["reset"]
+                    or quota.get("refill", 0) > prev.get("refill", 0)
+                ):
+                    # New resource or a fresh window: start with a full bucket.
+                    self._quota[resource] = quota
+                    self._tokens[resource] = float("inf")  # clamped to capacity
+                    self._refilled[resource] = now
+                elif quota["reset"] == prev["reset"] and quota["remaining"] <= prev["remaining"]:
+                    self._quota[resource] = quota
+                # Anything else is an older reply overtaken by a newer one under
+                # --concurrency: its higher `remaining` is stale, so keep ours.
+            if resp.status_code not in (403, 429) or not self._is_rate_limited(resp):
+                self._backoffs = 0
+                return None
+            if (
+                h.get("X-RateLimit-Remaining") == "0"
+                and "Retry-After" not in h
+                and quota
+                and quota["remaining"] > RATE_LIMIT_BUFFER
+            ):
+                return 0.0
+            self.secondary_hits += 1
+            if "Retry-After" in h:
+                wait = float(h["Retry-After"])
+            elif h.get("X-RateLimit-Remaining") == "0":
+                # The whole pool is dry: wait for the first token to refill.
+                reset = quota["refill"] if quota else int(h.get("X-RateLimit-Reset", 0))
+                wait = max(reset - now, 0) + 1
+            else:
+                # No hint: GitHub asks for at least a minute, then exponential.
+                wait = SECONDARY_BACKOFF * 2 ** min(self._backoffs, 4)
+            self._backoffs += 1
+            self._paused_until = max(self._paused_until, now + wait)
+            return wait
+
+    @staticmethod
+    def _is_rate_limited(resp: requests.Response) -> bool:
+        h = resp.headers
+        if resp.status_code == 429 or "Retry-After" in h:
+            return True
+        if h.get("X-RateLimit-Remaining") == "0":
+            return True
+        return "rate limit" in resp.text.lower()
+
+    def snapshot(self) -> dict:
+        """Budget state for the run log."""
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "write_requests": self.write_requests,
+                "secondary_limit_hits": self.secondary_hits,
+                "throttled_seconds": round(self.throttled, 1),
+                "quota": {
+                    r: {
+                        **q,
+                        **{
+                            k: datetime.fromtimestamp(v).isoformat()
+                            for k, v in q.items()
+                            if k in ("reset", "refill")
+                        },
+                    }
+                    for r, q in sorted(self._quota.items())
+                },
+            }
+
+
+# ─────────────────────────────────────────────
+# Request profile (run log / --profile)
+# ─────────────────────────────────────────────
+def _endpoint_template(method: str, url: str) -> str:
+    """`GET /repos/{o}/{r}/pulls/{n}`-style label for a request URL."""
+    path = url[len(GITHUB_API):] if url.startswith(GITHUB_API) else url
+    for pattern, repl in ENDPOINT_TEMPLATES:
+        path = pattern.sub(repl, path)
+    return f"{method} {path}"
+
+
+class Profile:
+    """
+    Where a run's time and quota went, shared by all threads.
+
+    Every API request is counted and timed (on the wire, retries included) by
+    endpoint template and status; every sleep is timed by reason (settle,
+    checks, workflow idle, rate limit, delay, ...). Throttling and waits show
+    up as sleep, not request time.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._started = time.time()
+        self._requests: dict[str, dict] = {}
+        self._sleeps: dict[str, dict] = {}
+        self._waiting: dict[int, str] = {}  # thread id -> reason, while asleep
+        self._histograms: dict[str, list[int]] = {}  # reason -> WAIT_BUCKETS counts
+
+    def request(self, label: str, status: int, seconds: float, retries: int):
+        with self._lock:
+            entry = self._requests.setdefault(
+                label, {"count": 0, "seconds": 0.0, "retries": 0, "status": {}}
+            )
+            entry["count"] += 1
+            entry["seconds"] += seconds
+            entry["retries"] += retries
+            entry["status"][str(status)] = entry["status"].get(str(status), 0) + 1
+
+    def slept(self, reason: str, seconds: float):
+        with self._lock:
+            entry = self._sleeps.setdefault(reason, {"count": 0, "seconds": 0.0})
+            entry["count"] += 1
+            entry["seconds"] += seconds
+            buckets = self._histograms.setdefault(reason, [0] * len(WAIT_BUCKETS))
+            for i, bound in enumerate(WAIT_BUCKETS):
+                if seconds <= bound:
+                    buckets[i] += 1
+                    break
+
+    @contextmanager
+    def waiting(self, reason: str):
+        """Time a sleep under `reason`; meanwhile the thread counts in waits()."""
+        thread = threading.get_ident()
+        with self._lock:
+            self._waiting[thread] = reason
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._waiting.pop(thread, None)
+            self.slept(reason, time.monotonic() - start)
+
+    def waits(self) -> dict[str, int]:
+        """Threads asleep right now, by reason (`rate limit (...)` folded into one)."""
+        counts: dict[str, int] = {}
+        with self._lock:
+            for reason in self._waiting.values():
+                reason = reason.split(" (")[0]
+                counts[reason] = counts.get(reason, 0) + 1
+        return counts
+
+    def wait_histograms(self) -> dict[str, dict]:
+        """Sleeps per reason as cumulative WAIT_BUCKETS counts, plus count and sum."""
+        with self._lock:
+            return {
+                reason: {
+                    "buckets": [sum(counts[: i + 1]) for i in range(len(counts))],
+                    "count": self._sleeps[reason]["count"],
+                    "sum": self._sleeps[reason]["seconds"],
+                }
+                for reason, counts in sorted(self._histograms.items())
+            }
+
+    def snapshot(self) -> dict:
+        """Profile for the run log, slowest endpoints / longest waits first."""
+        with self._lock:
+            requests_ = sorted(self._requests.items(), key=lambda kv: -kv[1]["seconds"])
+            sleeps = sorted(self._sleeps.items(), key=lambda kv: -kv[1]["seconds"])
+            return {
+                "wall_seconds": round(time.time() - self._started, 1),
+                "requests": {
+                    label: {
+                        "count": e["count"],
+                        "seconds": round(e["seconds"], 2),
+                        "avg_ms": round(e["seconds"] / e["count"] * 1000),
+                        "retries": e["retries"],
+                        "status": dict(sorted(e["status"].items())),
+                    }
+                    for label, e in requests_
+                },
+                "sleep": {
+                    reason: {**e, "seconds": round(e["seconds"], 1)} for reason, e in sleeps
+                },
+            }
+
+
+# Request counts/timings and sleep time by reason, for the run log / --profile.
+_profile = Profile()
+
+
+# ─────────────────────────────────────────────
+# GitHub API Client
+# ─────────────────────────────────────────────
+def _last_page(resp: requests.Response) -> int:
+    """Page count from a listing's `Link: <...&page=N>; rel="last"` (1 without one)."""
+    last = resp.links.get("last", {}).get("url")
+    if not last:
+        return 1
+    return int(parse_qs(urlparse(last).query).get("page", ["1"])[0])
+
+
+class GitHubClient:
+    """GitHub API client paced by a shared RateBudget over a TokenPool."""
+
+    def __init__(
+        self,
+        tokens: TokenPool,
+        max_in_flight: int = MAX_IN_FLIGHT,
+        cache: HTTPCache | None = None,
+    ):
+        self.tokens = tokens
+        self.cache = cache
+        self.budget = RateBudget()
+        # Bounds in-flight requests so hundreds of merge workers can wait on
+        # CI at once while only a few ever talk to the API simultaneously.
+        self._in_flight = threading.BoundedSemaphore(max(max_in_flight, 1))
+        self.session = requests.Session()
+        # One pooled connection per in-flight slot (requests defaults to 10).
+        self.session.mount("https://", HTTPAdapter(pool_maxsize=max(max_in_flight, 10)))
+        # Authorization is set per request: each one goes out with the pool's
+        # token that has the most quota left.
+        self.session.headers.update({"Accept": "application/vnd.github.v3+json"})
+
+    def _request(
+        self, method: str, url: str, write: bool | None = None, **kwargs
+    ) -> requests.Response:
+        params = kwargs.get("params")
+        resource = "graphql" if url.endswith("/graphql") else "core"
+        if write is None:
+            write = method != "GET" and resource == "core"
+        headers = kwargs.pop("headers", {})
+        cached = self.cache is not None and method == "GET"
+        elapsed = 0.0
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            self.budget.acquire(resource, write)
+            token = self.tokens.pick(resource)
+            # Cached per credential; an App token's value rotates, its installation doesn't.
+            credential = token.installation or token.value
+            entry = self.cache.load(url, params, credential) if cached else None
+            validators = self.cache.validators(entry) if entry else {}
+            auth = {**headers, **validators, "Authorization": f"token {token.value}"}
+            with self._in_flight:
+                start = time.monotonic()
+                resp = self.session.request(
+                    method, url, headers=auth, timeout=REQUEST_TIMEOUT, **kwargs
+                )
+                elapsed += time.monotonic() - start
+            observed = self.tokens.observe(token, resource, resp)
+            backoff = self.budget.observe(observed, resp, self.tokens.quota(observed))
+            if backoff is None or attempt == RATE_LIMIT_RETRIES:
+                break
+            if backoff == 0:
+                logging.info(
+                    f"{token.label} is out of {observed} quota on {method} {url}; "
+                    f"retrying with another token (retry {attempt + 1}/{RATE_LIMIT_RETRIES})"
+                )
+                continue
+            logging.warning(
+                f"Rate limited (HTTP {resp.status_code}) on {method} {url}; "
+                f"pausing all requests {backoff:.0f}s (retry {attempt + 1}/{RATE_LIMIT_RETRIES})"
+            )
+        _profile.request(_endpoint_template(method, url), resp.status_code, elapsed, attempt)
+        if entry and resp.status_code == 304:
+            return self.cache.replay(url, params, credential, entry, resp)
+        if cached and resp.status_code == 200:
+            self.cache.store(url, params, credential, resp)
+        return resp
+
+    def rate_limit(self) -> dict:
+        """Budget state plus per-token quota, for the run log and /healthz."""
+        return {**self.budget.snapshot(), "tokens": self.tokens.snapshot()}
+
+    def get(self, path: str, **kwargs) -> requests.Response:
+        return self._request("GET", f"{GITHUB_API}{path}", **kwargs)
+
+    def put(self, path: str, **kwargs) -> requests.Response:
+        return self._request("PUT", f"{GITHUB_API}{path}", **kwargs)
+
+    def post(self, path: str, **kwargs) -> requests.Response:
+        return self._request("POST", f"{GITHUB_API}{path}", **kwargs)
+
+    def patch(self, path: str, **kwargs) -> requests.Response:
+        return self._request("PATCH", f"{GITHUB_API}{path}", **kwargs)
+
+    def delete(self, path: str, **kwargs) -> requests.Response:
+        return self._request("DELETE", f"{GITHUB_API}{path}", **kwargs)
+
+    def graphql(self, query: str, variables: dict) -> dict:
+        """`data` of a GraphQL request; any error raises."""
+        data, errors = self.graphql_partial(query, variables)
+        if errors:
+            raise RuntimeError(f"GraphQL error: {errors[0].get('message')}")
+        return data
+
+    def graphql_partial(self, query: str, variables: dict) -> tuple[dict, list[dict]]:
+        """
+        (`data`, `errors`) of a GraphQL request, for queries that tolerate holes.
+
+        GitHub answers a batch of aliased lookups with whatever resolved plus
+        one error per alias that didn't (NOT_FOUND for a deleted repo or PR),
+        whose value is null. Only a response without `data` raises.
+        """
+        # mergeStateStatus is still gated behind the merge-info preview media type.
+        resp = self.post(
+            "/graphql",
+            json={"query": query, "variables": variables},
+            headers={"Accept": "application/vnd.github.merge-info-preview+json"},
+            write=query.lstrip().startswith("mutation"),
+        )
+        if resp.status_code != 200:
+            raise RuntimeError(f"GraphQL request failed: HTTP {resp.status_code}")
+        body = resp.json()
+        errors = body.get("errors") or []
+        if body.get("data") is None:
+            message = errors[0].get("message") if errors else "no data"
+            raise RuntimeError(f"GraphQL error: {message}")
+        return body["data"], errors
+
+    def get_pages(self, path: str, params: dict | None = None) -> list[requests.Response]:
+        """
+        Every page of a paginated listing, in page order.
+
+        The first page's `Link: rel="last"` gives the page count, and the
+        remaining pages are fetched concurrently. Without a Link header the
+        first page is the only one, so no request ever comes back empty. A
+        failed first page is returned alone for the caller to report.
+        """
+        params = {**(params or {}), "per_page": PER_PAGE}
+        first = self.get(path, params={**params, "page": 1})
+        last = _last_page(first) if first.status_code == 200 else 1
+        if last <= 1:
+            return [first]
+        with ThreadPoolExecutor(max_workers=min(last - 1, PAGE_WORKERS)) as pool:
+            rest = pool.map(
+                lambda page: self.get(path, params={**params, "page": page}),
+                range(2, last + 1),
+            )
+            return [first, *rest]
+
+    def list_repos(self, org: str) -> list[str]:
+        return sorted(self.list_repos_pushed(org))
+
+    def list_repos_pushed(self, org: str) -> dict[str, str]:
+        """Active (non-archived, non-disabled) repos mapped to their `pushed_at` timestamp."""
+        repos: dict[str, str] = {}
+        pages = self.get_pages(f"/orgs/{org}/repos")
+        if pages[0].status_code == 404:
+            pages = self.get_pages(f"/users/{org}/repos", {"type": "owner"})
+        for page, resp in enumerate(pages, 1):
+            if resp.status_code != 200:
+                raise RuntimeError(
+                    f"Failed to list repositories: HTTP {resp.status_code}\n{resp.text}"
+                )
+            data = resp.json()
+            repos.update(
+                (r["name"], r.get("pushed_at") or "")
+                for r in data
+                if not r.get("archived", False) and not r.get("disabled", False)
+            )
+            logging.info(f"  Page {page}: {len(data)} repos (total {len(repos)})")
+        return repos
+
+    def iter_repos_by_update(self, org: str) -> Iterator[dict]:
+        """
+        Every repo (archived ones included), most recently updated first.
+
+        Pages are fetched one at a time as the caller iterates, so a caller
+        that stops early (Inventory.refresh) never requests the rest.
+        """
+        path, params = f"/orgs/{org}/repos", {"sort": "updated", "direction": "desc"}
+        page = 1
+        while True:
+            resp = self.get(path, params={**params, "per_page": PER_PAGE, "page": page})
+            if resp.status_code == 404 and page == 1 and path.startswith("/orgs/"):
+                path, params = f"/users/{org}/repos", {**params, "type": "owner"}
+                continue
+            if resp.status_code != 200:
+                raise RuntimeError(
+                    f"Failed to list repositories: HTTP {resp.status_code}\n{resp.text}"
+                )
+            yield from resp.json()
+            if page >= _last_page(resp):
+                return
+            page += 1
+
+    def list_dependabot_prs(
+        self, org: str, repo: str, strict: bool = False
+    ) -> list[PullRequest]:
+        """Open Dependabot PRs; a failed page ends the list (strict: raises)."""
+        prs: list[PullRequest] = []
+        for resp in self.get_pages(f"/repos/{org}/{repo}/pulls", {"state": "open"}):
+            if resp.status_code != 200:
+                if strict:
+                    raise RuntimeError(
+                        f"Failed to list pulls of {org}/{repo}: HTTP {resp.status_code}"
+                    )
+                return prs
+            data = resp.json()
+            for pr in data:
+                login = (pr.get("user") or {}).get("login", "")
+                if login in DEPENDABOT_LOGINS:
+                    prs.append(
+                        PullRequest(
+                            repo=repo,
+                            number=pr["number"],
+                            title=pr["title"],
+                            head=(pr.get("head") or {}).get("ref", ""),
+                            url=pr["html_url"],
+                            updates=_body_updates(pr.get("body")),
+                        )
+                    )
+        return prs
+
+    def search_dependabot_prs(self, org: str) -> list[PullRequest]:
+        """
+        Find every open Dependabot PR owned by `org` with one paginated search.
+
+        Raises RuntimeError when the search can't be used (API error, or more
+        hits than the search cap) so callers can fall back to per-repo listing.
+        """
+        q = f"is:pr is:open archived:false author:app/dependabot user:{org}"
+        prs: list[PullRequest] = []
+        after = None
+        page = 1
+        while True:
+            data = self.graphql(SEARCH_PRS_QUERY, {"q": q, "after": after})["search"]
+            if data["issueCount"] > SEARCH_RESULT_CAP:
+                raise RuntimeError(
+                    f"{data['issueCount']} search results exceed the {SEARCH_RESULT_CAP} cap"
+                )
+            for node in data["nodes"]:
+                repo = (node or {}).get("repository") or {}
+                if not repo or repo.get("isArchived") or repo.get("isDisabled"):
+                    continue
+                prs.append(
+                    PullRequest(
+                        repo=repo["name"],
+                        number=node["number"],
+                        title=node["title"],
+                        head=node.get("headRefName") or "",
+                        url=node["url"],
+                        prefetched=_merge_detail_from_graphql(node),
+                        updates=_body_updates(node.get("body")),
+                    )
+                )
+            logging.info(f"  Search page {page}: {len(data['nodes'])} PRs (total {len(prs)})")
+            if not data["pageInfo"]["hasNextPage"]:
+                break
+            after = data["pageInfo"]["endCursor"]
+            page += 1
+        # Same order as per-repo listing: repos alphabetically, newest PR first.
+        return sorted(prs, key=lambda pr: (pr.repo, -pr.number))
+
+    def fetch_merge_states(
+        self, org: str, prs: list[PullRequest]
+    ) -> dict[tuple[str, int], dict]:
+        """
+        Fetch mergeable state for many PRs, PREFETCH_BATCH per GraphQL request.
+
+        Returns {(repo, number): detail} where detail mirrors the REST fields
+        the merge logic reads (mergeable, mergeable_state, head.sha).
+        """
+        nodes = self.fetch_pr_nodes(org, [(pr.repo, pr.number) for pr in prs], PR_STATE_FIELDS)
+        return {key: _merge_detail_from_graphql(node) for key, node in nodes.items()}
+
+    def fetch_pr_nodes(
+        self, org: str, keys: list[tuple[str, int]], fields: str
+    ) -> dict[tuple[str, int], dict]:
+        """
+        GraphQL `fields` of many PRs, PREFETCH_BATCH aliased lookups per request.
+
+        PRs (or repos) that no longer resolve are simply absent from the result.
+        """
+        nodes: dict[tuple[str, int], dict] = {}
+        for start in range(0, len(keys), PREFETCH_BATCH):
+            batch = keys[start : start + PREFETCH_BATCH]
+            lookups = "\n".join(
+                f"pr{i}: repository(owner: {json.dumps(org)}, name: {json.dumps(repo)}) "
+                f"{{ pullRequest(number: {number}) {{ {fields} }} }}"
+                for i, (repo, number) in enumerate(batch)
+            )
+            data, errors = self.graphql_partial(f"query {{\n{lookups}\n}}", {})
+            for error in errors:
+                logging.debug(f"GraphQL lookup {error.get('path')}: {error.get('message')}")
+            for i, key in enumerate(batch):
+                node = (data.get(f"pr{i}") or {}).get("pullRequest")
+                if node:
+                    nodes[key] = node
+        return nodes
+
+    def get_pr(self, org: str, repo: str, number: int) -> dict:
+        resp = self.get(f"/repos/{org}/{repo}/pulls/{number}")
+        if resp.status_code != 200:
+            raise RuntimeError(
+                f"Failed to fetch PR {org}/{repo}#{number}: HTTP {resp.status_code}"
+            )
+        return resp.json()
+
+    def merge_pr(
+        self, org: str, repo: str, number: int, sha: str, method: str
+    ) -> tuple[bool, str]:
+        """Merge a PR. Returns (True, merge commit SHA) or (False, error)."""
+        resp = self.put(
+            f"/repos/{org}/{repo}/pulls/{number}/merge",
+            json={"sha": sha, "merge_method": method},
+        )
+        if resp.status_code == 200:
+            return True, resp.json().get("sha", "")
+        try:
+            msg = resp.json().get("message", resp.text)
+        except ValueError:
+            msg = resp.text
+        return False, f"HTTP {resp.status_code}: {msg}"
+
+    def enable_auto_merge(self, node_id: str, sha: str, method: str) -> tuple[bool, str]:
+        """Turn on native auto-merge for a PR (pinned to its current head SHA)."""
+        try:
+            self.graphql(
+                ENABLE_AUTO_MERGE_MUTATION,
+                {"id": node_id, "method": method.upper(), "sha": sha or None},
+            )
+        except RuntimeError as e:
+            return False, str(e)
+        return True, "auto-merge enabled"
+
+    def enqueue_pr(self, node_id: str, sha: str) -> tuple[bool, str]:
+        """Add a PR to its base branch's merge queue (pinned to its current head SHA)."""
+        try:
+            data = self.graphql(ENQUEUE_MUTATION, {"id": node_id, "sha": sha or None})
+        except RuntimeError as e:
+            return False, str(e)
+        entry = (data.get("enqueuePullRequest") or {}).get("mergeQueueEntry") or {}
+        return True, f"queued at position {entry.get('position', '?')}"
+
+    def update_branch(self, org: str, repo: str, number: int) -> tuple[bool, str]:
+        """Rebase the PR branch onto the latest base (PUT .../update-branch)."""
+        resp = self.put(f"/repos/{org}/{repo}/pulls/{number}/update-branch")
+        if resp.status_code == 202:
+            return True, "update requested"
+        try:
+            msg = resp.json().get("message", resp.text)
+        except ValueError:
+            msg = resp.text
+        return False, f"HTTP {resp.status_code}: {msg}"
+
+    def get_branch_sha(self, org: str, repo: str, branch: str) -> str:
+        """Current head commit of a branch."""
+        resp = self.get(f"/repos/{org}/{repo}/git/ref/heads/{branch}")
+        if resp.status_code != 200:
+            raise RuntimeError(
+                f"Failed to read {org}/{repo}@{branch}: HTTP {resp.status_code}"
+            )
+        return resp.json()["object"]["sha"]
+
+    def create_branch(self, org: str, repo: str, branch: str, sha: str):
+        resp = self.post(
+            f"/repos/{org}/{repo}/git/refs",
+            json={"ref": f"refs/heads/{branch}", "sha": sha},
+        )
+        if resp.status_code != 201:
+            raise RuntimeError(
+                f"Failed to create branch {org}/{repo}@{branch}: HTTP {resp.status_code}"
+            )
+
+    def delete_branch(self, org: str, repo: str, branch: str) -> bool:
+        resp = self.delete(f"/repos/{org}/{repo}/git/refs/heads/{branch}")
+        return resp.status_code in (204, 422)  # 422: already deleted
+
+    def merge_branch(
+        self, org: str, repo: str, base: str, head: str, message: str
+    ) -> tuple[bool, str]:
+        """Merge `head` into branch `base` server-side (POST .../merges)."""
+        resp = self.post(
+            f"/repos/{org}/{repo}/merges",
+            json={"base": base, "head": head, "commit_message": message},
+        )
+        if resp.status_code in (201, 204):  # 204: already contained
+            return True, "merged"
+        if resp.status_code == 409:
+            return False, "merge conflict"
+        return False, f"HTTP {resp.status_code}"
+
+    def create_pr(
+        self, org: str, repo: str, head: str, base: str, title: str, body: str
+    ) -> dict:
+        resp = self.post(
+            f"/repos/{org}/{repo}/pulls",
+            json={"head": head, "base": base, "title": title, "body": body},
+        )
+        if resp.status_code != 201:
+            raise RuntimeError(
+                f"Failed to open PR {org}/{repo} {head}: HTTP {resp.status_code}"
+            )
+        return resp.json()
+
+    def close_pr(self, org: str, repo: str, number: int, comment: str) -> bool:
+        """Comment on a PR, then close it."""
+        self.post(f"/repos/{org}/{repo}/issues/{number}/comments", json={"body": comment})
+        resp = self.patch(f"/repos/{org}/{repo}/pulls/{number}", json={"state": "closed"})
+        return resp.status_code == 200
+
+    def count_active_runs(self, org: str, repo: str) -> int:
+        """Count queued + in-progress Actions workflow runs for a repo."""
+        total = 0
+        for status in ("queued", "in_progress"):
+            resp = self.get(
+                f"/repos/{org}/{repo}/actions/runs",
+                params={"status": status, "per_page": 1},
+            )
+            if resp.status_code == 200:
+                total += resp.json().get("total_count", 0)
+        return total
+
+    def list_runs_for_sha(self, org: str, repo: str, sha: str) -> list[dict]:
+        """Actions workflow runs triggered for one commit (one filtered query)."""
+        resp = self.get(
+            f"/repos/{org}/{repo}/actions/runs",
+            params={"head_sha": sha, "per_page": PER_PAGE},
+        )
+        if resp.status_code != 200:
+            return []
+        return resp.json().get("workflow_runs", [])
+
+    def cancel_run(self, org: str, repo: str, run_id: int) -> bool:
+        """Cancel a workflow run (POST .../actions/runs/{id}/cancel)."""
+        resp = self.post(f"/repos/{org}/{repo}/actions/runs/{run_id}/cancel")
+        return resp.status_code == 202  # 409: already finished
+
+
+# ─────────────────────────────────────────────
+# Webhook receiver (optional, event-driven waits)
+# ─────────────────────────────────────────────
+class WebhookReceiver:
+    """
+    Tiny HTTP endpoint for GitHub `workflow_run` / `check_suite` webhooks.
+
+    Point a repo/org webhook (or a local replayer such as smee/gh webhook
+    forward) at it. Each delivery wakes the merge workers waiting on that repo,
+    so idle/check waits end as soon as GitHub reports progress instead of on
+    the next poll. `pull_request` / `push` deliveries flag the repo as changed
+    for `watch`. Deliveries are verified against GITHUB_WEBHOOK_SECRET when set.
+    """
+
+    EVENTS = {"workflow_run", "check_suite"}
+    CHANGE_EVENTS = {"pull_request", "push"}
+
+    def __init__(self, org: str, host: str, port: int, secret: str = ""):
+        self.org = org.lower()
+        self.secret = secret
+        self._cond = threading.Condition()
+        # repo -> [deliveries seen, completion deliveries seen]
+        self._counts: dict[str, list[int]] = {}
+        self._changed: set[str] = set()  # repos with PR/push activity (watch)
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        host, port = self.server.server_address[:2]
+        logging.info(f"Webhook receiver listening on http://{host}:{port}/")
+
+    def _handler(self):
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, fmt, *args):
+                logging.debug(f"webhook: {fmt % args}")
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if not receiver._verify(body, self.headers.get("X-Hub-Signature-256", "")):
+                    self.send_response(401)
+                    self.end_headers()
+                    return
+                self.send_response(204)
+                self.end_headers()
+                try:
+                    payload = json.loads(body or b"{}")
+                except ValueError:
+                    return
+                receiver._deliver(self.headers.get("X-GitHub-Event", ""), payload)
+
+        return Handler
+
+    def _verify(self, body: bytes, signature: str) -> bool:
+        if not self.secret:
+            return True
+        digest = hmac.new(self.secret.encode(), body, hashlib.sha256).hexdigest()
+        return hmac.compare_digest(f"sha256={digest}", signature)
+
+    def _deliver(self, event: str, payload: dict):
+        repo = payload.get("repository") or {}
+        owner = ((repo.get("owner") or {}).get("login") or "").lower()
+        if owner != self.org:
+            return
+        if event in self.CHANGE_EVENTS:
+            with self._cond:
+                self._changed.add(repo.get("name", ""))
+                self._cond.notify_all()
+            return
+        if event not in self.EVENTS:
+            return
+        with self._cond:
+            counts = self._counts.setdefault(repo.get("name", ""), [0, 0])
+            counts[0] += 1
+            if payload.get("action") == "completed":
+                counts[1] += 1
+            self._cond.notify_all()
+        logging.debug(f"webhook: {event} {payload.get('action')} for {repo.get('name')}")
+
+    def mark(self, repo: str) -> tuple[int, int]:
+        """
+        Delivery counts for `repo` so far, to pass to wait().
+
+        Take it before the status request that may lead to a wait: a delivery
+        arriving while that request is in flight then still ends the wait.
+        """
+        with self._cond:
+            return tuple(self._counts.get(repo, [0, 0]))
+
+    def wait(
+        self,
+        repo: str,
+        mark: tuple[int, int],
+        timeout: float,
+        completed_only: bool = True,
+    ) -> bool:
+        """
+        Block until a (completion) event for `repo` newer than `mark`, or `timeout`.
+
+        Returns True if an event arrived; False means the caller should fall
+        back to polling. Raises KeyboardInterrupt once Ctrl-C sets _stop.
+        """
+        slot = 1 if completed_only else 0
+        deadline = time.time() + timeout
+        seen = mark[slot]
+        with self._cond:
+            while True:
+                if _stop.is_set():
+                    raise KeyboardInterrupt
+                if self._counts.get(repo, [0, 0])[slot] != seen:
+                    return True
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return False
+                # Short slices so Ctrl-C (which can't notify us) is noticed.
+                self._cond.wait(min(remaining, 1))
+
+    def take_changed(self, timeout: float = 0) -> set[str]:
+        """Pop repos flagged by pull_request/push deliveries, waiting up to `timeout`."""
+        deadline = time.time() + timeout
+        with self._cond:
+            while not self._changed:
+                if _stop.is_set():
+                    raise KeyboardInterrupt
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                self._cond.wait(min(remaining, 1))
+            changed, self._changed = self._changed, set()
+        return changed
+
+
+# ─────────────────────────────────────────────
+# Watch daemon (in-memory index + health endpoint)
+# ─────────────────────────────────────────────
+class WatchIndex:
+    """
+    In-memory view of the org for `watch`: repo -> pushed_at, repo -> open PRs.
+
+    A repo's pulls are re-listed only when its `pushed_at` moves (Dependabot
+    pushing a branch, a merge landing) or a webhook flags it, so a quiet cycle
+    costs one repo listing (mostly 304s from the ETag cache) plus the bulk
+    mergeable-state prefetch. Memory is bounded by the org itself: one entry
+    per repo and one per open Dependabot PR.
+    """
+
+    def __init__(self):
+        self.pushed: dict[str, str] = {}
+        self.prs: dict[str, list[PullRequest]] = {}
+        self.previewed: set[tuple[str, int]] = set()
+
+    def refresh(
+        self, client: GitHubClient, args: argparse.Namespace, changed: set[str]
+    ) -> int:
+        """Bring the index up to date; returns how many repos were re-listed."""
+        repos = client.list_repos_pushed(args.org)
+        if args.repos:
+            wanted = {r.strip() for r in args.repos.split(",")}
+            repos = {r: ts for r, ts in repos.items() if r in wanted}
+        for gone in set(self.pushed) - set(repos):  # archived / deleted
+            self.pushed.pop(gone, None)
+            self.prs.pop(gone, None)
+        stale = [r for r, ts in repos.items() if self.pushed.get(r) != ts or r in changed]
+        for repo in stale:
+            prs = client.list_dependabot_prs(args.org, repo)
+            if prs:
+                self.prs[repo] = prs
+            else:
+                self.prs.pop(repo, None)
+            self.pushed[repo] = repos[repo]
+        return len(stale)
+
+    def invalidate(self, repo: str):
+        """Force a re-list of `repo` on the next refresh."""
+        self.pushed.pop(repo, None)
+
+    def open_prs(self) -> list[PullRequest]:
+        return [pr for prs in self.prs.values() for pr in prs]
+
+
+@dataclass
+class WatchState:
+    """What the health endpoint reports about the `watch` loop."""
+
+    interval: int
+    started: float = field(default_factory=time.time)
+    cycles: int = 0
+    last_ok: float = 0.0
+    last_error: str = ""
+    repos: int = 0
+    open_prs: int = 0
+    merged: int = 0
+    failed: int = 0
+    recent: deque = field(default_factory=lambda: deque(maxlen=WATCH_RECENT))
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, stats: Stats):
+        with self._lock:
+            self.merged += stats.merged
+            self.failed += stats.failed
+            now = datetime.now().isoformat(timespec="seconds")
+            self.recent.extend(
+                {"time": now, "repo": d.repo, "number": d.number, "action": d.action, "message": d.message}
+                for d in stats.details
+            )
+
+    def healthy(self) -> bool:
+        """A refresh succeeded within the last three intervals (or we just started)."""
+        since = self.last_ok or self.started
+        return time.time() - since <= 3 * self.interval
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "status": "ok" if self.healthy() else "stalled",
+                "started": datetime.fromtimestamp(self.started).isoformat(timespec="seconds"),
+                "cycles": self.cycles,
+                "last_refresh": (
+                    datetime.fromtimestamp(self.last_ok).isoformat(timespec="seconds")
+                    if self.last_ok
+                    else None
+                ),
+                "last_error": self.last_error,
+                "repos": self.repos,
+                "open_prs": self.open_prs,
+                "merged": self.merged,
+                "failed": self.failed,
+                "recent": list(self.recent),
+            }
+
+
+class HealthEndpoint:
+    """GET /healthz for `watch`: JSON state, 200 while healthy, 503 when stalled."""
+
+    def __init__(self, host: str, port: int, state: WatchState, client: GitHubClient):
+        self.state = state
+        self.client = client
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        host, port = self.server.server_address[:2]
+        logging.info(f"Health endpoint on http://{host}:{port}/healthz")
+
+    def _handler(self):
+        endpoint = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, fmt, *args):
+                logging.debug(f"health: {fmt % args}")
+
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/healthz"):
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                report = endpoint.state.snapshot()
+                report["rate_limit"] = endpoint.client.rate_limit()
+                report["profile"] = _profile.snapshot()
+                body = json.dumps(report, ensure_ascii=False).encode()
+                self.send_response(200 if report["status"] == "ok" else 503)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+
+# ─────────────────────────────────────────────
+# Prometheus metrics (--metrics-port)
+# ─────────────────────────────────────────────
+class Metrics:
+    """
+    Process-wide PR outcome totals for --metrics-port, fed by Stats.record.
+
+    A Stats lives for one run (one cycle under `watch`), but a Prometheus
+    counter must only go up for as long as the process does.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.last_result = 0.0
+        self.results: dict[str, int] = {}
+
+    def record(self, result: PRResult):
+        outcome = result.action if result.success else "failed"
+        with self._lock:
+            self.results[outcome] = self.results.get(outcome, 0) + 1
+            self.last_result = time.time()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "started": self.started,
+                "last_result": self.last_result,
+                "results": dict(sorted(self.results.items())),
+            }
+
+
+# PR outcomes across every run / watch cycle, for --metrics-port.
+_metrics = Metrics()
+
+
+def _prometheus_labels(labels: dict[str, str]) -> str:
+    """`{k="v",...}` with values escaped for the text format ("" without labels)."""
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _prometheus_text(client: GitHubClient) -> str:
+    """Current counters in the Prometheus text exposition format."""
+    out: list[str] = []
+
+    def metric(name: str, kind: str, help_: str, samples: list[tuple[dict, float]]):
+        out.append(f"# HELP dependabot_merge_{name} {help_}")
+        out.append(f"# TYPE dependabot_merge_{name} {kind}")
+        for labels, value in samples:
+            out.append(f"dependabot_merge_{name}{_prometheus_labels(labels)} {value}")
+
+    profile = _profile.snapshot()
+    metric(
+        "api_requests_total",
+        "counter",
+        "GitHub API requests by endpoint template and HTTP status.",
+        [
+            ({"endpoint": label, "status": status}, n)
+            for label, entry in profile["requests"].items()
+            for status, n in entry["status"].items()
+        ],
+    )
+    metric(
+        "api_request_seconds_total",
+        "counter",
+        "Time spent on the wire per endpoint template, retries included.",
+        [({"endpoint": label}, entry["seconds"]) for label, entry in profile["requests"].items()],
+    )
+    quota = client.rate_limit()["quota"]
+    metric(
+        "rate_limit_remaining",
+        "gauge",
+        "Requests left in the current window, per rate-limit resource (whole token pool).",
+        [({"resource": r}, q["remaining"]) for r, q in quota.items()],
+    )
+    metric(
+        "rate_limit_limit",
+        "gauge",
+        "Window size per rate-limit resource (whole token pool).",
+        [({"resource": r}, q["limit"]) for r, q in quota.items()],
+    )
+
+    totals = _metrics.snapshot()
+    metric(
+        "prs_total",
+        "counter",
+        "PRs processed, by outcome (merged, auto-merge, skipped, failed).",
+        [({"result": r}, n) for r, n in totals["results"].items()],
+    )
+    metric(
+        "last_result_timestamp_seconds",
+        "gauge",
+        "Unix time the last PR outcome was recorded (0 before the first); alert when it stops moving.",
+        [({}, totals["last_result"])],
+    )
+    metric(
+        "start_time_seconds",
+        "gauge",
+        "Unix time the process started.",
+        [({}, totals["started"])],
+    )
+
+    histograms = _profile.wait_histograms()
+    waits = _profile.waits()
+    reasons = sorted({r.split(" (")[0] for r in histograms} | set(waits))
+    metric(
+        "waiting_workers",
+        "gauge",
+        "Workers asleep right now, by wait reason.",
+        [({"reason": r}, waits.get(r, 0)) for r in reasons],
+    )
+    samples: list[tuple[dict, float]] = []
+    for reason, h in histograms.items():
+        for bound, n in zip(WAIT_BUCKETS, h["buckets"]):
+            samples.append(({"reason": reason, "le": f"{bound:g}"}, n))
+        samples.append(({"reason": reason, "le": "+Inf"}, h["count"]))
+    out.append("# HELP dependabot_merge_wait_seconds Duration of each sleep, by wait reason.")
+    out.append("# TYPE dependabot_merge_wait_seconds histogram")
+    for labels, n in samples:
+        out.append(f"dependabot_merge_wait_seconds_bucket{_prometheus_labels(labels)} {n}")
+    for reason, h in histograms.items():
+        labels = _prometheus_labels({"reason": reason})
+        out.append(f"dependabot_merge_wait_seconds_sum{labels} {round(h['sum'], 3)}")
+        out.append(f"dependabot_merge_wait_seconds_count{labels} {h['count']}")
+    return "\n".join(out) + "\n"
+
+
+class MetricsEndpoint:
+    """GET /metrics: Prometheus text metrics while a run (or `watch`) is in progress."""
+
+    def __init__(self, host: str, port: int, client: GitHubClient):
+        self.client = client
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        host, port = self.server.server_address[:2]
+        logging.info(f"Metrics endpoint on http://{host}:{port}/metrics")
+
+    def _handler(self):
+        endpoint = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, fmt, *args):
+                logging.debug(f"metrics: {fmt % args}")
+
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                body = _prometheus_text(endpoint.client).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+
+# ─────────────────────────────────────────────
+# Live dashboard (merge / watch on a terminal)
+# ─────────────────────────────────────────────
+class Dashboard:
+    """
+    Two status lines pinned to the bottom of the terminal while chains run.
+
+    The footer sits outside the terminal's scroll region, so per-PR output
+    keeps scrolling above it as usual. Every DASHBOARD_REFRESH seconds it is
+    redrawn with the results so far, the PRs in flight and what they are
+    waiting on (checks, workflow idle, merge queue, rate limit, ...), merges
+    per minute, the core quota left and an ETA: the mean observed time per
+    progress step, times the steps left, spread over the busy workers.
+    """
+
+    LINES = 2
+
+    def __init__(self, client: GitHubClient, stats: Stats, progress: Progress, workers: int):
+        self.client = client
+        self.stats = stats
+        self.progress = progress
+        self.workers = max(workers, 1)
+        self._lock = threading.Lock()
+        self._active: dict[int, float] = {}  # thread id -> step start
+        self._durations: list[float] = []
+        self._started = time.monotonic()
+        self._merged_before = stats.merged
+        self._rows = 0
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+
+    @staticmethod
+    def available(args: argparse.Namespace) -> bool:
+        """On unless --no-dashboard, or stdout isn't an interactive terminal."""
+        return (
+            not args.no_dashboard
+            and sys.stdout.isatty()
+            and os.environ.get("TERM", "dumb") != "dumb"
+        )
+
+    def started(self):
+        with self._lock:
+            self._active[threading.get_ident()] = time.monotonic()
+
+    def finished(self):
+        with self._lock:
+            start = self._active.pop(threading.get_ident(), None)
+            if start is not None:
+                self._durations.append(time.monotonic() - start)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        """Stop redrawing, give the scroll region back and clear the footer."""
+        self._done.set()
+        self._thread.join()
+        if self._rows:
+            top = self._rows - self.LINES
+            clear = "".join(f"\033[{top + 1 + i};1H\033[2K" for i in range(self.LINES))
+            self._write(f"\0337\033[r{clear}\0338")
+
+    def lines(self) -> list[str]:
+        """The footer's text, without colours."""
+        with self._lock:
+            in_flight = len(self._active)
+            durations = list(self._durations)
+        elapsed = time.monotonic() - self._started
+        stats = self.stats
+        left = max(self.progress.total - len(durations), 0)
+        if not durations:
+            eta = "ETA —"
+        else:
+            mean = sum(durations) / len(durations)
+            eta = f"ETA {_duration(mean * left / min(self.workers, max(left, 1)))}"
+        done = f"merged {stats.merged} · skipped {stats.skipped} · failed {stats.failed}"
+        if stats.auto_merge:
+            done += f" · auto-merge {stats.auto_merge}"
+
+        waits = _profile.waits()
+        waiting = ", ".join(f"{reason} {n}" for reason, n in sorted(waits.items()))
+        rate = (stats.merged - self._merged_before) / max(elapsed / 60, 1 / 60)
+        core = self.client.rate_limit()["quota"].get("core")
+        quota = f"quota {core['remaining']}/{core['limit']}" if core else "quota —"
+        return [
+            f"{done} | {left}/{self.progress.total} left · {eta}",
+            f"in flight {in_flight}" + (f" (waiting: {waiting})" if waiting else "")
+            + f" · {rate:.1f} merges/min · {quota} · {_duration(elapsed)} elapsed",
+        ]
+
+    def _loop(self):
+        while True:
+            try:
+                self._draw()
+            except OSError:
+                return  # terminal went away
+            if self._done.wait(DASHBOARD_REFRESH):
+                return
+
+    def _draw(self):
+        cols, rows = shutil.get_terminal_size()
+        if rows <= self.LINES + 2:
+            return
+        top = rows - self.LINES
+        out = ""
+        if rows != self._rows:
+            # Scroll the output up out of the footer's way, then fence it in.
+            if not self._rows:
+                out += "\n" * self.LINES + f"\033[{self.LINES}A"
+            out += f"\0337\033[1;{top}r\0338"
+            self._rows = rows
+        out += "\0337"
+        for i, line in enumerate(self.lines()):
+            style = Color.BOLD if i == 0 else Color.DIM
+            out += f"\033[{top + 1 + i};1H\033[2K{style}{line[: cols - 1]}{Color.RESET}"
+        self._write(out + "\0338")
+
+    @staticmethod
+    def _write(text: str):
+        with _print_lock:
+            sys.stdout.write(text)
+            sys.stdout.flush()
+
+
+def _duration(seconds: float) -> str:
+    """`1h05m` / `4m20s` / `12s`."""
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}h{minutes:02d}m"
+    if minutes:
+        return f"{minutes}m{secs:02d}s"
+    return f"{secs}s"
+
+
+@contextmanager
+def _live_dashboard(
+    client: GitHubClient, args: argparse.Namespace, stats: Stats, progress: Progress
+):
+    """Show the dashboard for the duration of the block, when a terminal is attached."""
+    global _dashboard
+    if not Dashboard.available(args):
+        yield
+        return
+    _dashboard = Dashboard(client, stats, progress, args.concurrency)
+    _dashboard.start()
+    try:
+        yield
+    finally:
+        _dashboard.stop()
+        _dashboard = None
+
+
+# ─────────────────────────────────────────────
+# Commands
+# ─────────────────────────────────────────────
+def cmd_list(client: GitHubClient, args: argparse.Namespace):
+    """List all open Dependabot PRs across repositories."""
+    if args.format != "text":
+        _stream_list(client, args)
+        return
+    found = _search_prs(client, args)
+    if found is None:
+        repos = _resolve_repos(client, args)
+        scope = f"{len(repos)} repositories"
+        listing = _list_concurrently(client, args, repos, ordered=True)
+    else:
+        groups = _group_by_repo(found)
+        scope = f"{len(groups)} repositories with open Dependabot PRs (search)"
+        listing = groups.items()
+
+    print(f"\n{Color.BOLD}Open Dependabot Pull Requests{Color.RESET}")
+    print(f"Scope: {scope}\n")
+
+    total = 0
+    deltas: dict[str, int] = {}
+    ecosystems: dict[str, int] = {}
+    for repo, prs in listing:
+        prs = _group_by_repo(_filter_prs(args, prs)).get(repo, [])
+        if not prs:
+            continue
+        total += len(prs)
+        if args.mergeable:
+            _prefetch_merge_states(client, args, prs)
+        print(f"{Color.BOLD}{Color.CYAN}{args.org}/{repo}{Color.RESET}")
+        for pr in prs:
+            bump = _classify(pr)
+            deltas[bump.delta] = deltas.get(bump.delta, 0) + 1
+            ecosystems[bump.ecosystem] = ecosystems.get(bump.ecosystem, 0) + 1
+            state = f" | {(pr.prefetched or {}).get('mergeable_state', 'unknown')}" if args.mergeable else ""
+            print(
+                f"  #{pr.number} {pr.title} {Color.DIM}[{_bump_label(pr)}]{Color.RESET}\n"
+                f"      {Color.DIM}{pr.head} | {pr.url}{state}{Color.RESET}"
+            )
+        print()
+
+    if total == 0:
+        print(f"{Color.GREEN}No open Dependabot PRs found.{Color.RESET}")
+    else:
+        print(f"{Color.BOLD}Total: {total} Dependabot PR(s){Color.RESET}")
+        by_delta = ", ".join(f"{d} {deltas[d]}" for d in SEMVER_DELTAS if d in deltas)
+        by_ecosystem = ", ".join(
+            f"{e} {n}" for e, n in sorted(ecosystems.items(), key=lambda x: -x[1])
+        )
+        print(f"{Color.DIM}  by update type: {by_delta}\n  by ecosystem:   {by_ecosystem}{Color.RESET}")
+
+
+def _stream_list(client: GitHubClient, args: argparse.Namespace):
+    """
+    `list --format ndjson|csv`: one record per PR on stdout, written as soon
+    as its repo's listing arrives (repos are listed concurrently, so output
+    follows completion order). Progress and errors go to stderr.
+    """
+    fields = LIST_FIELDS + (LIST_STATE_FIELDS if args.mergeable else [])
+    writer = csv.DictWriter(sys.stdout, fields, lineterminator="\n")
+    if args.format == "csv":
+        writer.writeheader()
+    found = _search_prs(client, args)
+    if found is None:
+        listing = _list_concurrently(client, args, _resolve_repos(client, args), ordered=False)
+    else:
+        listing = _group_by_repo(found).items()
+    try:
+        for repo, prs in listing:
+            prs = _group_by_repo(_filter_prs(args, prs)).get(repo, [])
+            if args.mergeable:
+                _prefetch_merge_states(client, args, prs)
+            for pr in prs:
+                record = _list_record(pr, fields)
+                if args.format == "csv":
+                    writer.writerow(record)
+                else:
+                    sys.stdout.write(json.dumps(record, ensure_ascii=False) + "\n")
+            sys.stdout.flush()
+    except BrokenPipeError:
+        # The reader (e.g. `| head`) is done; silence the flush at exit.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+
+
+def _list_record(pr: PullRequest, fields: list[str]) -> dict:
+    bump = _classify(pr)
+    detail = pr.prefetched or {}
+    record = {
+        "repo": pr.repo,
+        "number": pr.number,
+        "title": pr.title,
+        "head": pr.head,
+        "url": pr.url,
+        "ecosystem": bump.ecosystem,
+        "package": bump.package,
+        "delta": bump.delta,
+        "mergeable": detail.get("mergeable"),
+        "mergeable_state": detail.get("mergeable_state", "unknown"),
+    }
+    return {k: record[k] for k in fields}
+
+
+def _list_concurrently(
+    client: GitHubClient, args: argparse.Namespace, repos: list[str], ordered: bool
+) -> Iterator[tuple[str, list[PullRequest]]]:
+    """
+    (repo, Dependabot PRs) for each repo, listed up to --max-in-flight at once.
+
+    ordered keeps repo order (a slow repo holds back the ones after it);
+    otherwise each repo is yielded as soon as its listing completes.
+    """
+    with ThreadPoolExecutor(max_workers=max(args.max_in_flight, 1)) as pool:
+        if ordered:
+            yield from zip(repos, pool.map(lambda r: _dependabot_prs(client, args, r), repos))
+            return
+        futures = {pool.submit(_dependabot_prs, client, args, repo): repo for repo in repos}
+        try:
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        finally:
+            for future in futures:
+                future.cancel()  # stopped early (Ctrl-C, closed pipe): drop the rest
+
+
+def cmd_merge(client: GitHubClient, args: argparse.Namespace):
+    """Merge all Dependabot PRs: serially within a repo, --concurrency repos at once."""
+    prior: dict[tuple[str, int], PRResult] = {}
+    if args.resume:
+        all_prs, prior = _load_journal(args)
+        scope = f"{len({pr.repo for pr in all_prs})} repositories (resumed)"
+    else:
+        found = _search_prs(client, args)
+        if found is None:
+            repos = _resolve_repos(client, args)
+            scope = f"{len(repos)} repositories"
+        else:
+            scope = f"{len({pr.repo for pr in found})} repositories (search)"
+
+    print(f"\n{Color.BOLD}Dependabot PR Bulk Merge{Color.RESET}")
+    print(f"Scope: {scope} | merge method: {args.merge_method}")
+    if args.one_per_repo:
+        print("Mode: one PR per repo per run (re-run to merge the rest)")
+    if args.train:
+        print("Mode: merge train (one combined PR per repo with 2+ PRs)")
+    if args.auto_merge:
+        print("Mode: enable native auto-merge and exit (check later with `status`)")
+    if args.wait_checks:
+        print(f"Waiting for CI checks: up to {args.checks_timeout}s per PR")
+    if args.concurrency > 1 and not args.auto_merge:
+        _history.load(args.org)
+        print(f"Concurrency: up to {args.concurrency} repos in parallel (serial within a repo)")
+        basis = f"timings from {_history.runs} past run(s)" if _history.runs else "no timings yet"
+        print(f"Schedule: longest estimated chains first ({basis})")
+    if args.dry_run:
+        _print_warn("DRY-RUN mode: no actual merge will be performed")
+    print()
+
+    # Collect all Dependabot PRs first so we can show the scope before merging.
+    if args.resume:
+        pass  # discovery results come from the journal
+    elif found is None:
+        logging.info("Collecting Dependabot PRs...")
+        all_prs: list[PullRequest] = []
+        for repo in repos:
+            all_prs.extend(_dependabot_prs(client, args, repo))
+    else:
+        all_prs = found
+
+    # --only / --ecosystem come from titles and branches: no per-PR API calls.
+    found_count = len(all_prs)
+    all_prs = _filter_prs(args, all_prs)
+    if len(all_prs) < found_count:
+        print(f"Filter: {len(all_prs)} of {found_count} PR(s) match --only / --ecosystem")
+
+    if not all_prs:
+        print(f"{Color.GREEN}No open Dependabot PRs to merge.{Color.RESET}")
+        return
+
+    # PRs merged or skipped before the interruption are carried over as-is.
+    pending = [pr for pr in all_prs if (pr.repo, pr.number) not in prior]
+    if prior:
+        print(f"Resuming {args.resume}: {len(prior)} of {len(all_prs)} PR(s) already done")
+    if not pending:
+        print(f"{Color.GREEN}Every PR in the journal is already done.{Color.RESET}")
+        return
+
+    # A PR another one in its repo already covers would only conflict once
+    # that one merges: drop it before spending a prefetch or a CI cycle on it.
+    listed = pending
+    pending, dupes = _dedupe_prs(pending)
+    close = args.close_superseded and not args.dry_run
+
+    # Ask for every PR's mergeable state in bulk, so settled PRs skip the
+    # per-PR get_pr() polling and hopeless ones are skipped up front.
+    _prefetch_merge_states(client, args, pending)
+    groups, early_skips = _split_early_skips(args, _group_by_repo(pending))
+    queued = sum(len(prs) for prs in groups.values())
+    multi = [r for r, prs in groups.items() if len(prs) > 1]
+
+    print(f"Found {Color.BOLD}{len(listed)}{Color.RESET} Dependabot PR(s):")
+    skip_reasons = {(pr.repo, pr.number): msg for pr, msg in early_skips}
+    skip_reasons.update({(d.pr.repo, d.pr.number): d.reason(close) for d in dupes})
+    for pr in listed:
+        reason = skip_reasons.get((pr.repo, pr.number))
+        note = f" {Color.DIM}(skip: {reason}){Color.RESET}" if reason else ""
+        print(
+            f"  {Color.CYAN}{args.org}/{pr.repo}{Color.RESET} #{pr.number} {pr.title} "
+            f"{Color.DIM}[{_bump_label(pr)}]{Color.RESET}{note}"
+        )
+    if dupes:
+        superseded = sum(d.covered for d in dupes)
+        print(
+            f"\n  {Color.DIM}{superseded} PR(s) superseded and {len(dupes) - superseded} "
+            f"overlapping another PR in the same repo are skipped"
+            f"{' (superseded ones are closed)' if close else ''}.{Color.RESET}"
+        )
+    if early_skips:
+        print(
+            f"\n  {Color.DIM}{len(early_skips)} PR(s) skipped up front from the "
+            f"prefetched mergeable state.{Color.RESET}"
+        )
+    # Merge-queue repos leave batching to GitHub: no train, no serial chain.
+    queue_repos = [
+        r for r, prs in groups.items() if _uses_merge_queue(prs) and not args.auto_merge
+    ]
+    multi = [r for r in multi if r not in queue_repos]
+    if queue_repos:
+        print(
+            f"\n  {Color.YELLOW}Note: {len(queue_repos)} repo(s) have a merge queue "
+            f"({', '.join(queue_repos)}) — their PRs are queued together and GitHub "
+            f"batches them.{Color.RESET}"
+        )
+    if multi and args.train:
+        print(
+            f"\n  {Color.YELLOW}Note: {len(multi)} repo(s) have 2+ PRs "
+            f"({', '.join(multi)}) — each is merged as one combined train PR.{Color.RESET}"
+        )
+    elif multi and not args.auto_merge:
+        # Same-repo PRs are merged one at a time, waiting for each merge's
+        # changelog/release workflow to finish before the next, so two never
+        # run concurrently.
+        print(
+            f"\n  {Color.YELLOW}Note: {len(multi)} repo(s) have 2+ PRs "
+            f"({', '.join(multi)}) — these are merged serially per repo.{Color.RESET}"
+        )
+    print()
+
+    if not args.dry_run and not args.yes:
+        if args.auto_merge:
+            prompt = f"Enable auto-merge on {queued} Dependabot PR(s)?"
+        else:
+            prompt = f"Merge {queued} Dependabot PR(s)?"
+        if not _confirm(prompt):
+            return
+
+    stats = Stats()
+    for result in prior.values():
+        stats.record(result)
+    stats.journal = _open_journal(args, all_prs)
+    print(f"Journal: {stats.journal.path}\n")
+    for dupe in dupes:
+        if close and dupe.covered:
+            _close_superseded(client, args, dupe)
+        pr = dupe.pr
+        stats.record(PRResult(pr.repo, pr.number, pr.title, "skipped", True, dupe.reason(close)))
+    for pr, msg in early_skips:
+        stats.record(PRResult(pr.repo, pr.number, pr.title, "skipped", True, msg))
+    # A train reports as one progress step for its whole repo.
+    steps = sum(_progress_steps(args, prs) for prs in groups.values())
+    progress = Progress(total=steps)
+
+    try:
+        # Repos that already merged a PR before --resume continue as followups.
+        merged = {r.repo for r in prior.values() if r.action == "merged"}
+        with _live_dashboard(client, args, stats, progress):
+            _run_chains(client, args, groups, stats, progress, merged)
+    except (KeyboardInterrupt, Exception):
+        print(
+            f"\n{Color.YELLOW}Finished PRs are journaled; continue with "
+            f"--resume {stats.journal.path}{Color.RESET}"
+        )
+        raise
+
+    _print_summary(stats, args, client.rate_limit(), _profile.snapshot())
+    if stats.auto_merge and not args.dry_run:
+        print(
+            f"Check what has landed: {Color.BOLD}dependabot-pr-merge.py status "
+            f"--org {args.org} --journal {stats.journal.path}{Color.RESET}"
+        )
+
+
+def _run_chains(
+    client: GitHubClient,
+    args: argparse.Namespace,
+    groups: dict[str, list[PullRequest]],
+    stats: Stats,
+    progress: Progress,
+    merged_repos: set[str],
+):
+    """Run every repo's merge chain, in parallel across repos if asked."""
+    # Merge-queue repos first, all of them: enqueueing takes a request or two
+    # per PR, and GitHub then works through every queue at once while the
+    # other chains run here. The queues are followed together at the end.
+    queued: list[PullRequest] = []
+    chains: dict[str, list[PullRequest]] = {}
+    for repo, prs in groups.items():
+        if _uses_merge_queue(prs) and not args.auto_merge:
+            queued += _enqueue_merge_queue(client, args, prs, stats, progress)
+        else:
+            chains[repo] = prs
+    queue_deadline = time.monotonic() + args.queue_timeout
+
+    if args.concurrency > 1:
+        # Each repo's chain stays serial (changelog/release safety); different
+        # repos never share a workflow, so their chains run side by side.
+        # Longest estimated chain first: a slow repo's CI then overlaps the
+        # short chains instead of starting after them (shorter makespan).
+        order = sorted(
+            chains.items(),
+            key=lambda g: _history.estimate(g[0], _chain_steps(args, g[1])),
+            reverse=True,
+        )
+        logging.debug(
+            "Chain order: "
+            + ", ".join(
+                f"{repo} (~{_history.estimate(repo, _chain_steps(args, prs)):.0f}s)"
+                for repo, prs in order
+            )
+        )
+        pool = ThreadPoolExecutor(max_workers=args.concurrency)
+        futures = [
+            pool.submit(
+                _merge_chain, client, args, prs, stats, progress, repo in merged_repos
+            )
+            for repo, prs in order
+        ]
+        try:
+            for future in as_completed(futures):
+                future.result()
+        except BaseException as e:
+            # Ctrl-C, or a chain died on an unexpected error: stop the other
+            # chains at their next check and wait for them, so nothing is
+            # still merging when the error is reported (or a `watch` cycle
+            # starts a second chain on the same repo).
+            _stop.set()
+            pool.shutdown(wait=True, cancel_futures=True)
+            if not isinstance(e, KeyboardInterrupt):
+                _stop.clear()
+            raise
+        pool.shutdown()
+    else:
+        for repo, prs in chains.items():
+            _merge_chain(client, args, prs, stats, progress, repo in merged_repos)
+    if queued and not _stop.is_set():
+        _follow_merge_queue(client, args, queued, stats, queue_deadline)
+
+
+def _chain_steps(args: argparse.Namespace, prs: list[PullRequest]) -> int:
+    """Serial merges a repo's chain makes (a train or --one-per-repo is one)."""
+    if args.auto_merge or args.one_per_repo:
+        return 1
+    if args.train and len(prs) > 1:
+        return 1
+    return len(prs)
+
+
+def _progress_steps(args: argparse.Namespace, prs: list[PullRequest]) -> int:
+    """[idx/total] steps for one repo: a train reports once for its whole repo."""
+    if args.train and len(prs) > 1 and not args.auto_merge and not _uses_merge_queue(prs):
+        return 1
+    return len(prs)
+
+
+def cmd_status(client: GitHubClient, args: argparse.Namespace):
+    """Report whether the PRs handed to auto-merge have landed."""
+    path = Path(args.journal) if args.journal else _latest_journal()
+    header, _, results = Journal.load(path)
+    if header.get("org") != args.org:
+        raise RuntimeError(f"Journal {path} is for --org {header.get('org')}, not {args.org}")
+    queued = [r for r in results.values() if r.action == "auto-merge"]
+
+    print(f"\n{Color.BOLD}Dependabot Auto-merge Status{Color.RESET}")
+    print(f"Journal: {path}\n")
+    if header.get("dry_run"):
+        print(f"{Color.YELLOW}Dry-run journal: auto-merge was never enabled.{Color.RESET}")
+        return
+    if not queued:
+        print(f"{Color.GREEN}No PRs were handed to auto-merge in this run.{Color.RESET}")
+        return
+
+    nodes = client.fetch_pr_nodes(
+        args.org, [(r.repo, r.number) for r in queued], PR_STATUS_FIELDS
+    )
+    landed = waiting = attention = 0
+    for r in queued:
+        # Absent: the lookup came back NOT_FOUND (PR or repo deleted, or no
+        # longer visible to this token); the other PRs are still reported.
+        node = nodes.get((r.repo, r.number))
+        label = f"{Color.CYAN}{args.org}/{r.repo}{Color.RESET} #{r.number} {r.title}"
+        state = node.get("state") if node else None
+        if state == "MERGED":
+            landed += 1
+            print(f"  {Color.GREEN}✓{Color.RESET} {label} {Color.DIM}(merged {node['mergedAt']}){Color.RESET}")
+        elif state == "OPEN" and node.get("isInMergeQueue"):
+            waiting += 1
+            position = (node.get("mergeQueueEntry") or {}).get("position", "?")
+            print(f"  {Color.BLUE}…{Color.RESET} {label} {Color.DIM}(in merge queue, position {position}){Color.RESET}")
+        elif state == "OPEN" and node.get("autoMergeRequest"):
+            waiting += 1
+            merge_state = (node.get("mergeStateStatus") or "unknown").lower()
+            print(f"  {Color.BLUE}…{Color.RESET} {label} {Color.DIM}(waiting, state={merge_state}){Color.RESET}")
+        else:
+            attention += 1
+            reason = {
+                "OPEN": "auto-merge was disabled",
+                "CLOSED": "closed without merging",
+            }.get(state, "not found: deleted, or not visible to this token")
+            print(f"  {Color.YELLOW}⚠{Color.RESET} {label} {Color.DIM}({reason}){Color.RESET}")
+
+    print(
+        f"\n{Color.BOLD}Landed: {landed}{Color.RESET}  Waiting: {waiting}  "
+        f"{Color.YELLOW if attention else ''}Needs attention: {attention}{Color.RESET}"
+    )
+
+
+def cmd_watch(client: GitHubClient, args: argparse.Namespace):
+    """Stay resident and merge Dependabot PRs as they become mergeable."""
+    index = WatchIndex()
+    state = WatchState(interval=max(args.interval, 1))
+    _history.load(args.org)
+    if args.health_port:
+        HealthEndpoint(args.health_host, args.health_port, state, client).start()
+
+    print(f"\n{Color.BOLD}Dependabot PR Watch{Color.RESET}")
+    print(f"Org: {args.org} | merge method: {args.merge_method} | refresh every {state.interval}s")
+    if _webhook is not None:
+        print("pull_request / push webhooks trigger an early refresh")
+    if args.dry_run:
+        _print_warn("DRY-RUN mode: no actual merge will be performed")
+    print(f"{Color.DIM}Ctrl-C to stop.{Color.RESET}")
+
+    while True:
+        changed = _webhook.take_changed() if _webhook is not None else set()
+        try:
+            _watch_cycle(client, args, index, state, changed)
+        except (RuntimeError, requests.RequestException) as e:
+            state.last_error = f"{datetime.now().isoformat(timespec='seconds')} {e}"
+            logging.error(f"Watch cycle failed: {e}")
+        if _webhook is not None:
+            # Sleep until the next interval, or the first PR/push delivery.
+            with _profile.waiting("watch interval"):
+                changed_repos = _webhook.take_changed(state.interval)
+            for repo in changed_repos:
+                index.invalidate(repo)
+        else:
+            _sleep(state.interval, "watch interval")
+
+
+def _watch_cycle(
+    client: GitHubClient,
+    args: argparse.Namespace,
+    index: WatchIndex,
+    state: WatchState,
+    changed: set[str],
+):
+    """One `watch` pass: refresh the index, then merge whatever is ready."""
+    relisted = index.refresh(client, args, changed)
+    prs, dupes = _dedupe_prs(_filter_prs(args, index.open_prs()))
+    if args.close_superseded and not args.dry_run:
+        for dupe in dupes:
+            if dupe.covered:
+                _close_superseded(client, args, dupe)
+                index.invalidate(dupe.pr.repo)
+                print(f"{args.org}/{dupe.pr.repo} #{dupe.pr.number}: {dupe.reason(True)}")
+    state.last_ok = time.time()  # a long merge chain below is not a stall
+    state.repos, state.open_prs = len(index.pushed), len(prs)
+    for pr in prs:
+        pr.prefetched = None  # mergeable state moves on without a push (CI finishing)
+    _prefetch_merge_states(client, args, prs)
+    if args.dry_run:  # dry-run: report each PR once, not every cycle
+        keys = {(pr.repo, pr.number) for pr in prs}
+        index.previewed &= keys
+        prs = [pr for pr in prs if (pr.repo, pr.number) not in index.previewed]
+        index.previewed |= {(pr.repo, pr.number) for pr in prs}
+    groups = _ready_groups(args, _group_by_repo(prs))
+
+    stats = Stats()
+    if groups:
+        progress = Progress(total=sum(_progress_steps(args, g) for g in groups.values()))
+        with _live_dashboard(client, args, stats, progress):
+            _run_chains(client, args, groups, stats, progress, set())
+        for repo in groups:
+            index.invalidate(repo)  # merged/closed PRs drop out next cycle
+        state.record(stats)
+
+    state.cycles += 1
+    ts = datetime.now().strftime("%H:%M:%S")
+    print(
+        f"{Color.DIM}[{ts}] {state.repos} repos, {state.open_prs} open PR(s), "
+        f"{relisted} re-listed, {len(groups)} repo(s) ready{Color.RESET}"
+        + (f" — merged {stats.merged}, failed {stats.failed}" if groups else "")
+    )
+
+
+def _merge_chain(
+    client: GitHubClient,
+    args: argparse.Namespace,
+    prs: list[PullRequest],
+    stats: Stats,
+    progress: Progress,
+    merged_before: bool = False,
+):
+    """
+    Merge one repo's Dependabot PRs in order (the unit of parallelism).
+
+    merged_before: a resumed run already merged a PR in this repo, so even
+    the first PR here is a followup (its SHA is unknown: wait for idle).
+    """
+    if args.auto_merge:
+        _auto_merge_chain(client, args, prs, stats, progress)
+        return
+    if args.train and len(prs) > 1:
+        _merge_train(client, args, prs, stats, progress)
+        return
+    buffered = args.concurrency > 1
+    # set after a real merge, until we've waited on it ("" = SHA unknown)
+    merge_sha: str | None = "" if merged_before else None
+    for i, pr in enumerate(prs):
+        if _stop.is_set():
+            return
+        followup = i > 0 or merged_before  # 2nd+ Dependabot PR in the SAME repo
+
+        with _pr_block(progress, f"{args.org}/{pr.repo} #{pr.number}", buffered):
+            _emit(f"  {Color.DIM}{pr.title}{Color.RESET}")
+            start = time.monotonic()
+
+            if followup and not args.dry_run:
                 if args.one_per_repo:
                     msg = "deferred (one-per-repo; re-run after Dependabot rebases)"
                     stats.record(
@@ -357,28 +2866,91 @@ def cmd_merge(client: GitHubClient, args: argparse.Namespace):
                 # The previous merge in this repo may have triggered a
                 # changelog/release workflow. Let it finish first so the two
                 # never run concurrently.
-                _wait_repo_idle(client, args, pr.repo)
+                if merge_sha:
+                    _wait_merge_runs(client, args, pr.repo, merge_sha)
+                elif merge_sha is not None:
+                    _wait_repo_idle(client, args, pr.repo)  # SHA unknown
+                merge_sha = None
 
-            _merge_one(client, args, pr, stats, followup=followup)
+            waited = time.monotonic() - start
+            merged = _merge_one(client, args, pr, stats, followup=followup)
+            if merged is not None:
+                merge_sha = merged
+                _record_timing(stats, pr, followup, waited, time.monotonic() - start - waited)
 
-            if idx < len(all_prs) and not args.dry_run:
-                time.sleep(args.delay)
+        # Writes are already spaced by the rate budget; --delay is extra courtesy.
+        if args.delay and progress.done < progress.total and not args.dry_run:
+            _sleep(args.delay, "delay")
 
-    _print_summary(stats, args)
+
+def _record_timing(
+    stats: Stats, pr: PullRequest, followup: bool, workflow: float, merge: float
+):
+    """Add one merge's timing to the history and the journal."""
+    _history.add(pr.repo, followup, workflow, merge)
+    if stats.journal:
+        stats.journal.write(
+            "timing",
+            repo=pr.repo,
+            number=pr.number,
+            followup=followup,
+            workflow=round(workflow, 1),
+            merge=round(merge, 1),
+        )
 
 
 # ─────────────────────────────────────────────
 # Merge logic
 # ─────────────────────────────────────────────
+def _cancel_stale_runs(client: GitHubClient, args: argparse.Namespace, pr: PullRequest, sha: str):
+    """
+    Cancel workflow runs still going on a PR's pre-update head SHA.
+
+    update-branch gives the PR a new head whose CI is the run we wait on; runs
+    for the old head can only be superseded, but keep holding runners until
+    they finish. Best effort: a run that ends meanwhile just isn't cancelled.
+    """
+    stale = [
+        run
+        for run in client.list_runs_for_sha(args.org, pr.repo, sha)
+        if run.get("status") != "completed"
+    ]
+    cancelled = sum(1 for run in stale if client.cancel_run(args.org, pr.repo, run["id"]))
+    if stale:
+        _print_skip(f"cancelled {cancelled}/{len(stale)} stale workflow run(s) on {sha[:7]}")
+
+
 def _merge_one(
     client: GitHubClient,
     args: argparse.Namespace,
     pr: PullRequest,
     stats: Stats,
-    followup: bool = False,
-):
+    followup: bool = False,
+) -> str | None:
+    """Merge (or skip) one PR; returns the merge commit SHA if it was merged."""
+    try:
+        return _merge_one_pr(client, args, pr, stats, followup)
+    except requests.RequestException as e:
+        # A dropped connection fails this PR, not the rest of its chain.
+        msg = f"request failed: {e}"
+        stats.record(PRResult(pr.repo, pr.number, pr.title, "failed", False, msg))
+        _print_err(msg)
+
+
+def _merge_one_pr(
+    client: GitHubClient,
+    args: argparse.Namespace,
+    pr: PullRequest,
+    stats: Stats,
+    followup: bool,
+) -> str | None:
+    """Body of _merge_one; network errors are left to it."""
     try:
-        detail = _resolve_mergeable(client, args, pr)
+        # The prefetched state is only trusted for a repo's first PR: once a
+        # same-repo merge lands, every followup's state is stale.
+        detail = None if followup else _settled_prefetch(args, pr)
+        if detail is None:
+            detail = _resolve_mergeable(client, args, pr)
     except RuntimeError as e:
         result = PRResult(pr.repo, pr.number, pr.title, "failed", False, str(e))
         stats.record(result)
@@ -412,14 +2984,17 @@ def _merge_one(
             )
             _print_ok("would update-branch then merge (dry-run)")
             return
+        mark = _event_mark(pr.repo)
         ok, m = client.update_branch(args.org, pr.repo, pr.number)
         if not ok:
             msg = f"update-branch failed: {m}"
             stats.record(PRResult(pr.repo, pr.number, pr.title, "failed", False, msg))
             _print_err(msg)
             return
+        if args.cancel_stale_runs and sha:
+            _cancel_stale_runs(client, args, pr, sha)
         _print_wait("rebasing branch onto base (update-branch), waiting for checks...")
-        time.sleep(args.poll_interval)
+        _wait_event(pr.repo, args.poll_interval, "checks", mark=mark)
         try:
             # After a rebase, CI restarts — always wait for it to settle here.
             detail = _resolve_mergeable(client, args, pr, wait_checks=True)
@@ -436,98 +3011,797 @@ def _merge_one(
             _print_skip(msg)
             return
 
-    if state == "blocked":
-        msg = "merge blocked (required checks/reviews not satisfied)"
-        stats.record(PRResult(pr.repo, pr.number, pr.title, "skipped", True, msg))
-        _print_skip(msg)
-        return
+    if state == "blocked":
+        msg = "merge blocked (required checks/reviews not satisfied)"
+        stats.record(PRResult(pr.repo, pr.number, pr.title, "skipped", True, msg))
+        _print_skip(msg)
+        return
+
+    if state not in MERGEABLE_STATES:
+        msg = f"unexpected mergeable_state={state}"
+        stats.record(PRResult(pr.repo, pr.number, pr.title, "skipped", True, msg))
+        _print_skip(msg)
+        return
+
+    if args.dry_run:
+        stats.record(
+            PRResult(pr.repo, pr.number, pr.title, "merged", True, f"dry-run (state={state})")
+        )
+        _print_ok(f"would merge (state={state}, dry-run)")
+        return
+
+    ok, msg = client.merge_pr(args.org, pr.repo, pr.number, sha, args.merge_method)
+    if ok:
+        stats.record(PRResult(pr.repo, pr.number, pr.title, "merged", True))
+        _print_ok("merged")
+        return msg
+    stats.record(PRResult(pr.repo, pr.number, pr.title, "failed", False, msg))
+    _print_err(msg)
+
+
+def _merge_train(
+    client: GitHubClient,
+    args: argparse.Namespace,
+    prs: list[PullRequest],
+    stats: Stats,
+    progress: Progress,
+):
+    """
+    Merge a repo's Dependabot PRs as one combined PR (--train).
+
+    Every PR branch is merged server-side into a fresh branch off the base; PRs
+    that conflict with the ones before them are left out (and left open for
+    Dependabot to rebase). The combined PR runs CI once and is merged once,
+    then the PRs it carried are closed as superseded.
+    """
+    repo = prs[0].repo
+    with _pr_block(progress, f"{args.org}/{repo} train ({len(prs)} PRs)", args.concurrency > 1):
+        try:
+            _run_train(client, args, prs, stats)
+        except requests.RequestException as e:
+            msg = f"train: request failed: {e}"
+            for pr in prs:
+                if not stats.recorded(pr):
+                    stats.record(PRResult(pr.repo, pr.number, pr.title, "failed", False, msg))
+            _print_err(msg)
+
+
+def _run_train(
+    client: GitHubClient,
+    args: argparse.Namespace,
+    prs: list[PullRequest],
+    stats: Stats,
+):
+    """Body of _merge_train, inside its output block."""
+    repo = prs[0].repo
+    for pr in prs:
+        _emit(f"  {Color.DIM}#{pr.number} {pr.title}{Color.RESET}")
+    if args.dry_run:
+        for pr in prs:
+            stats.record(PRResult(pr.repo, pr.number, pr.title, "merged", True, "dry-run (train)"))
+        _print_ok(f"would combine {len(prs)} PRs into one branch and merge it (dry-run)")
+        return
+
+    try:
+        branch, base, included, left_out = _build_train(client, args, prs)
+    except RuntimeError as e:
+        for pr in prs:
+            stats.record(PRResult(pr.repo, pr.number, pr.title, "failed", False, f"train: {e}"))
+        _print_err(str(e))
+        return
+    for pr, msg in left_out:
+        stats.record(PRResult(pr.repo, pr.number, pr.title, "skipped", True, msg))
+        _print_skip(f"#{pr.number} {msg}")
+
+    if len(included) < 2:
+        # Nothing left to combine: merge the one clean PR on its own.
+        client.delete_branch(args.org, repo, branch)
+        if included:
+            _merge_one(client, args, included[0], stats)
+        return
+
+    def fail(msg: str):
+        for pr in included:
+            stats.record(PRResult(pr.repo, pr.number, pr.title, "failed", False, msg))
+        _print_err(msg)
+
+    body = "Combined Dependabot updates:\n\n" + "\n".join(
+        f"- #{pr.number} {pr.title}" for pr in included
+    )
+    mark = _event_mark(repo)
+    try:
+        opened = client.create_pr(
+            args.org, repo, branch, base,
+            f"Combined Dependabot updates ({len(included)} PRs)", body,
+        )
+    except RuntimeError as e:
+        client.delete_branch(args.org, repo, branch)
+        return fail(f"train: {e}")
+    train = PullRequest(repo, opened["number"], opened["title"], branch, opened.get("html_url", ""))
+    _print_wait(f"opened train #{train.number} ({len(included)} PRs), waiting for checks...")
+    _wait_event(repo, args.poll_interval, "checks", mark=mark)
+    try:
+        # A brand-new branch always starts CI, so wait for it regardless.
+        detail = _resolve_mergeable(client, args, train, wait_checks=True)
+    except RuntimeError as e:
+        return fail(f"train #{train.number}: {e}")
+    state = detail.get("mergeable_state", "unknown")
+    if detail.get("mergeable") is False or state not in MERGEABLE_STATES:
+        return fail(f"train #{train.number} not mergeable (state={state}); left open {train.url}")
+
+    sha = (detail.get("head") or {}).get("sha", "")
+    ok, msg = client.merge_pr(args.org, repo, train.number, sha, args.merge_method)
+    if not ok:
+        return fail(f"train #{train.number}: {msg}")
+    _print_ok(f"merged train #{train.number}")
+    for pr in included:
+        stats.record(PRResult(pr.repo, pr.number, pr.title, "merged", True, f"via train #{train.number}"))
+    try:  # best effort: the updates have landed whatever happens here
+        client.delete_branch(args.org, repo, branch)
+        for pr in included:
+            client.close_pr(
+                args.org, repo, pr.number,
+                f"Superseded by #{train.number}, which merged this update together "
+                "with the repository's other Dependabot PRs.",
+            )
+    except requests.RequestException as e:
+        _print_warn(f"train #{train.number} merged, but cleanup failed ({e})")
+
+
+def _build_train(
+    client: GitHubClient, args: argparse.Namespace, prs: list[PullRequest]
+) -> tuple[str, str, list[PullRequest], list[tuple[PullRequest, str]]]:
+    """
+    Create the train branch and merge each PR branch into it.
+
+    Returns (branch, base, included PRs, [(left-out PR, reason)]). Only PRs
+    targeting the same base as the first one can ride the same train.
+    """
+    repo = prs[0].repo
+    bases = {pr.number: client.get_pr(args.org, repo, pr.number)["base"]["ref"] for pr in prs}
+    base = bases[prs[0].number]
+    branch = f"{TRAIN_BRANCH_PREFIX}{datetime.now():%Y%m%d-%H%M%S}"
+    client.create_branch(args.org, repo, branch, client.get_branch_sha(args.org, repo, base))
+
+    included, left_out = [], []
+    try:
+        for pr in prs:
+            if bases[pr.number] != base:
+                left_out.append(
+                    (pr, f"targets {bases[pr.number]}, not {base}; left out of the train")
+                )
+                continue
+            ok, msg = client.merge_branch(
+                args.org, repo, branch, pr.head, f"Merge #{pr.number}: {pr.title}"
+            )
+            if ok:
+                included.append(pr)
+            else:
+                left_out.append((pr, f"{msg} with the other updates; left out of the train"))
+    except BaseException:
+        # Don't leave a half-built train branch on the remote.
+        try:
+            client.delete_branch(args.org, repo, branch)
+        except (RuntimeError, requests.RequestException) as e:
+            logging.warning(f"Could not delete {repo}@{branch}: {e}")
+        raise
+    return branch, base, included, left_out
+
+
+def _auto_merge_chain(
+    client: GitHubClient,
+    args: argparse.Namespace,
+    prs: list[PullRequest],
+    stats: Stats,
+    progress: Progress,
+):
+    """
+    Enable GitHub's native auto-merge on one repo's PRs and move on (--auto-merge).
+
+    Nothing waits on CI: GitHub merges each PR once its branch protection is
+    satisfied. A PR that is already mergeable can't take auto-merge, so it is
+    merged right away, but only one per repo, so two changelog/release
+    workflows never start together. Later ready PRs are deferred to a re-run.
+    """
+    buffered = args.concurrency > 1
+    merged_now = False
+    for pr in prs:
+        if _stop.is_set():
+            return
+        with _pr_block(progress, f"{args.org}/{pr.repo} #{pr.number}", buffered):
+            _emit(f"  {Color.DIM}{pr.title}{Color.RESET}")
+            detail = pr.prefetched if (pr.prefetched or {}).get("node_id") else None
+            try:
+                detail = detail or client.get_pr(args.org, pr.repo, pr.number)
+            except RuntimeError as e:
+                stats.record(PRResult(pr.repo, pr.number, pr.title, "failed", False, str(e)))
+                _print_err(str(e))
+                continue
+            state = detail.get("mergeable_state", "unknown")
+            sha = (detail.get("head") or {}).get("sha", "")
+
+            if detail.get("mergeable") is False or state == "dirty":
+                msg = f"not mergeable (conflict, state={state})"
+                stats.record(PRResult(pr.repo, pr.number, pr.title, "skipped", True, msg))
+                _print_skip(msg)
+                continue
+            if args.dry_run:
+                msg = f"dry-run (would enable auto-merge, state={state})"
+                stats.record(PRResult(pr.repo, pr.number, pr.title, "auto-merge", True, msg))
+                _print_ok(f"would enable auto-merge (state={state}, dry-run)")
+                continue
+
+            ok, msg = client.enable_auto_merge(detail["node_id"], sha, args.merge_method)
+            if ok:
+                msg = f"auto-merge enabled ({args.merge_method})"
+                stats.record(PRResult(pr.repo, pr.number, pr.title, "auto-merge", True, msg))
+                _print_ok(msg)
+                continue
+
+            # "Pull request is in clean status": nothing to wait for, merge now.
+            ready = re.search(r"is in (\w+) status", msg)
+            if not ready or ready.group(1).lower() not in MERGEABLE_STATES:
+                stats.record(PRResult(pr.repo, pr.number, pr.title, "failed", False, msg))
+                _print_err(msg)
+                continue
+            if merged_now:
+                msg = "deferred (already mergeable; one direct merge per repo — re-run)"
+                stats.record(PRResult(pr.repo, pr.number, pr.title, "skipped", True, msg))
+                _print_skip(msg)
+                continue
+            ok, msg = client.merge_pr(args.org, pr.repo, pr.number, sha, args.merge_method)
+            if ok:
+                merged_now = True
+                stats.record(PRResult(pr.repo, pr.number, pr.title, "merged", True, "already mergeable"))
+                _print_ok("already mergeable: merged")
+            else:
+                stats.record(PRResult(pr.repo, pr.number, pr.title, "failed", False, msg))
+                _print_err(msg)
+
+
+def _uses_merge_queue(prs: list[PullRequest]) -> bool:
+    """Whether a repo's PRs target a base branch with a merge queue (from the prefetch)."""
+    return any((pr.prefetched or {}).get("merge_queue") for pr in prs)
+
+
+def _enqueue_merge_queue(
+    client: GitHubClient,
+    args: argparse.Namespace,
+    prs: list[PullRequest],
+    stats: Stats,
+    progress: Progress,
+) -> list[PullRequest]:
+    """
+    Add all of one repo's PRs to its merge queue; returns the ones now queued.
+
+    GitHub rebases, batches and tests queued PRs itself, so no PR here goes
+    through the local update-branch / wait-for-checks / workflow wait, and no
+    PR waits for the one before it. A PR whose checks are still running can't
+    join the queue yet; auto-merge adds it once they pass.
+    """
+    buffered = args.concurrency > 1
+    queued: list[PullRequest] = []
+    for pr in prs:
+        if _stop.is_set():
+            break
+        with _pr_block(progress, f"{args.org}/{pr.repo} #{pr.number}", buffered):
+            _emit(f"  {Color.DIM}{pr.title}{Color.RESET}")
+            # No prefetch (e.g. its GraphQL alias came back NOT_FOUND): ask REST.
+            detail = pr.prefetched if (pr.prefetched or {}).get("node_id") else None
+            try:
+                detail = detail or client.get_pr(args.org, pr.repo, pr.number)
+            except RuntimeError as e:
+                stats.record(PRResult(pr.repo, pr.number, pr.title, "failed", False, str(e)))
+                _print_err(str(e))
+                continue
+            state = detail.get("mergeable_state", "unknown")
+            sha = (detail.get("head") or {}).get("sha", "")
+
+            if detail.get("mergeable") is False or state == "dirty":
+                msg = f"not mergeable (conflict, state={state})"
+                stats.record(PRResult(pr.repo, pr.number, pr.title, "skipped", True, msg))
+                _print_skip(msg)
+                continue
+            if args.dry_run:
+                msg = f"dry-run (would add to the merge queue, state={state})"
+                stats.record(PRResult(pr.repo, pr.number, pr.title, "merged", True, msg))
+                _print_ok(f"would add to the merge queue (state={state}, dry-run)")
+                continue
+            if detail.get("in_merge_queue"):
+                _print_ok("already in the merge queue")
+                queued.append(pr)
+                continue
+
+            ok, msg = client.enqueue_pr(detail["node_id"], sha)
+            if not ok:
+                ok, error = client.enable_auto_merge(detail["node_id"], sha, args.merge_method)
+                msg = "auto-merge enabled: joins the merge queue once checks pass" if ok else msg
+                if not ok:
+                    msg = f"{msg}; auto-merge: {error}"
+            if ok:
+                _print_ok(msg)
+                queued.append(pr)
+            else:
+                stats.record(PRResult(pr.repo, pr.number, pr.title, "failed", False, msg))
+                _print_err(msg)
+    return queued
+
+
+def _follow_merge_queue(
+    client: GitHubClient,
+    args: argparse.Namespace,
+    prs: list[PullRequest],
+    stats: Stats,
+    deadline: float,
+):
+    """
+    Poll queued PRs of every repo until each merges or drops out, or `deadline`.
+
+    One bulk GraphQL lookup per poll covers all queues. PRs still queued at
+    the deadline (--queue-timeout after they were enqueued) are left to GitHub
+    and journaled like --auto-merge ones, so `status` reports later whether
+    they landed.
+    """
+    pending = {(pr.repo, pr.number): pr for pr in prs}
+    nodes: dict[tuple[str, int], dict] = {}
+    while pending and not _stop.is_set():
+        if time.monotonic() >= deadline:
+            break
+        _sleep(args.poll_interval, "merge queue")
+        try:
+            nodes = client.fetch_pr_nodes(args.org, list(pending), PR_QUEUE_FIELDS)
+        except (RuntimeError, requests.RequestException) as e:
+            logging.warning(f"Merge queue poll failed ({e}); retrying")
+            continue
+        for key, pr in list(pending.items()):
+            node = nodes.get(key) or {}
+            label = f"{args.org}/{pr.repo} #{pr.number}"
+            if node.get("state") == "MERGED":
+                stats.record(PRResult(pr.repo, pr.number, pr.title, "merged", True, "via merge queue"))
+                _emit(f"  {Color.GREEN}✓ {label} merged via the merge queue{Color.RESET}")
+            elif node.get("state") == "CLOSED":
+                msg = "closed while in the merge queue"
+                stats.record(PRResult(pr.repo, pr.number, pr.title, "failed", False, msg))
+                _emit(f"  {Color.RED}✗ {label}: {msg}{Color.RESET}")
+            elif not node.get("isInMergeQueue") and not node.get("autoMergeRequest"):
+                msg = "removed from the merge queue (failed checks or a conflict)"
+                stats.record(PRResult(pr.repo, pr.number, pr.title, "failed", False, msg))
+                _emit(f"  {Color.RED}✗ {label}: {msg}{Color.RESET}")
+            else:
+                continue
+            del pending[key]
+    for key, pr in pending.items():
+        position = ((nodes.get(key) or {}).get("mergeQueueEntry") or {}).get("position")
+        where = f"position {position}" if position else "waiting for checks"
+        msg = f"still in the merge queue ({where}) after {args.queue_timeout}s"
+        stats.record(PRResult(pr.repo, pr.number, pr.title, "auto-merge", True, msg))
+        _emit(f"  {Color.BLUE}… {args.org}/{pr.repo} #{pr.number}: {msg}{Color.RESET}")
+
+
+def _resolve_mergeable(
+    client: GitHubClient,
+    args: argparse.Namespace,
+    pr: PullRequest,
+    wait_checks: bool | None = None,
+) -> dict:
+    """
+    Fetch PR detail and resolve its mergeable state.
+
+    GitHub computes `mergeable` / `mergeable_state` asynchronously, so the first
+    response may carry `mergeable: null` / `mergeable_state: unknown`. We poll
+    until it settles. When waiting for checks is enabled we keep polling while
+    the state is `blocked` (required checks still running) up to --checks-timeout.
+
+    `wait_checks` overrides args.wait_checks (used after a rebase, when CI always
+    restarts and we must wait regardless of the flag).
+    """
+    if wait_checks is None:
+        wait_checks = args.wait_checks
+    poll_interval = max(args.poll_interval, 1)
+    settle_deadline = time.time() + 30  # max wait for the null/unknown to settle
+    checks_deadline = time.time() + args.checks_timeout
+
+    while True:
+        mark = _event_mark(pr.repo)
+        detail = client.get_pr(args.org, pr.repo, pr.number)
+        state = detail.get("mergeable_state", "unknown")
+        mergeable = detail.get("mergeable")
+
+        # Still computing — wait for it to settle.
+        if mergeable is None or state == "unknown":
+            if time.time() < settle_deadline:
+                _sleep(2, "settle")
+                continue
+            return detail
+
+        # Waiting for required CI checks to finish.
+        if wait_checks and state == "blocked":
+            if time.time() < checks_deadline:
+                _print_wait(f"checks pending (state={state}), waiting {poll_interval}s...")
+                _wait_event(pr.repo, poll_interval, "checks", mark=mark)
+                continue
+            return detail
+
+        return detail
+
+
+# ─────────────────────────────────────────────
+# Helpers
+# ─────────────────────────────────────────────
+def _load_journal(
+    args: argparse.Namespace,
+) -> tuple[list[PullRequest], dict[tuple[str, int], PRResult]]:
+    """Discovered PRs and the PRs already merged/skipped, from --resume."""
+    header, prs, results = Journal.load(Path(args.resume))
+    if header.get("org") != args.org:
+        raise RuntimeError(
+            f"Journal {args.resume} is for --org {header.get('org')}, not {args.org}"
+        )
+    # Failed PRs are retried; a dry-run journal's "merges" never happened.
+    done = {
+        key: r
+        for key, r in results.items()
+        if r.success and not (header.get("dry_run") and not args.dry_run and r.action == "merged")
+    }
+    return prs, done
+
+
+def _latest_journal() -> Path:
+    """Newest logs/dependabot_merge_*.jsonl (timestamped names sort in order)."""
+    journals = sorted(Path("logs").glob("dependabot_merge_*.jsonl"))
+    if not journals:
+        raise RuntimeError("No merge journal found in logs/; pass --journal")
+    return journals[-1]
+
+
+def _open_journal(args: argparse.Namespace, prs: list[PullRequest]) -> Journal:
+    """Continue the --resume journal, or start a new one with the discovery."""
+    if args.resume:
+        journal = Journal(Path(args.resume))
+        journal.write("resume", dry_run=args.dry_run)
+        return journal
+    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    journal = Journal(Path("logs") / f"dependabot_merge_{ts}.jsonl")
+    journal.write("run", org=args.org, dry_run=args.dry_run, merge_method=args.merge_method)
+    journal.write(
+        "discovery",
+        prs=[{k: v for k, v in asdict(pr).items() if k != "prefetched"} for pr in prs],
+    )
+    return journal
+
+
+def _resolve_repos(client: GitHubClient, args: argparse.Namespace) -> list[str]:
+    if args.repos:
+        return [r.strip() for r in args.repos.split(",")]
+    if _inventory is not None:
+        logging.info("Refreshing the repository inventory...")
+        repos = _inventory.refresh(client, args.org)
+    else:
+        logging.info("Fetching repository list...")
+        repos = client.list_repos(args.org)
+    logging.info(f"Found {len(repos)} repositories (excluding archived and disabled)")
+    return repos
+
+
+def _dependabot_prs(client: GitHubClient, args: argparse.Namespace, repo: str) -> list[PullRequest]:
+    """A repo's open Dependabot PRs, from the inventory when it hasn't been pushed."""
+    if _inventory is not None and not args.repos:
+        # --repos skips the sweep, so the stored pushed_at can't vouch for cached PRs.
+        return _inventory.dependabot_prs(client, args.org, repo)
+    return client.list_dependabot_prs(args.org, repo)
+
+
+def _merge_detail_from_graphql(node: dict) -> dict:
+    """Map GraphQL PR fields onto the REST detail shape _merge_one reads."""
+    mergeable = {"MERGEABLE": True, "CONFLICTING": False}.get(node.get("mergeable"))
+    return {
+        "mergeable": mergeable,
+        "mergeable_state": (node.get("mergeStateStatus") or "unknown").lower(),
+        "head": {"sha": node.get("headRefOid") or ""},
+        "node_id": node.get("id") or "",
+        "merge_queue": bool(node.get("isMergeQueueEnabled")),
+        "in_merge_queue": bool(node.get("isInMergeQueue")),
+        "open": node.get("state", "OPEN") == "OPEN",
+    }
+
+
+def _prefetch_merge_states(
+    client: GitHubClient, args: argparse.Namespace, prs: list[PullRequest]
+):
+    """Fill PullRequest.prefetched in bulk; failures just mean per-PR polling."""
+    missing = [pr for pr in prs if pr.prefetched is None]
+    if not missing:
+        return
+    logging.info(f"Prefetching mergeable state for {len(missing)} PR(s)...")
+    try:
+        states = client.fetch_merge_states(args.org, missing)
+    except (RuntimeError, requests.RequestException) as e:
+        logging.warning(f"Mergeable-state prefetch failed ({e}); polling each PR instead")
+        return
+    for pr in missing:
+        pr.prefetched = states.get((pr.repo, pr.number))
+        if pr.prefetched and not pr.prefetched["open"] and _inventory is not None:
+            _inventory.forget(args.org, pr.repo)  # closed without a push: re-list next run
+
+
+def _settled_prefetch(args: argparse.Namespace, pr: PullRequest) -> dict | None:
+    """Return the prefetched detail if it can replace _resolve_mergeable()."""
+    detail = pr.prefetched
+    if not detail or detail["mergeable"] is None or detail["mergeable_state"] == "unknown":
+        return None  # still computing -> polling path
+    if args.wait_checks and detail["mergeable_state"] == "blocked":
+        return None  # needs the wait-for-checks loop
+    return detail
+
+
+def _split_early_skips(
+    args: argparse.Namespace, groups: dict[str, list[PullRequest]]
+) -> tuple[dict[str, list[PullRequest]], list[tuple[PullRequest, str]]]:
+    """
+    Drop PRs the prefetch already shows can't be merged in this run.
+
+    Conflicts (`dirty`) never clear by merging other PRs, so they are skipped
+    anywhere in a chain. `blocked` is only final for the PR that would run
+    first in its repo (and only without --wait-checks / --auto-merge, both of
+    which wait it out); later PRs are re-evaluated after the base moves.
+    """
+    kept: dict[str, list[PullRequest]] = {}
+    skips: list[tuple[PullRequest, str]] = []
+    for repo, prs in groups.items():
+        for pr in prs:
+            detail = pr.prefetched or {}
+            state = detail.get("mergeable_state", "unknown")
+            if not detail.get("open", True):
+                skips.append((pr, "no longer open"))
+            elif detail.get("mergeable") is False or state == "dirty":
+                skips.append((pr, f"not mergeable (conflict, state={state})"))
+            elif (
+                state == "blocked"
+                and not (args.wait_checks or args.auto_merge or detail.get("merge_queue"))
+                and repo not in kept
+            ):
+                skips.append((pr, "merge blocked (required checks/reviews not satisfied)"))
+            else:
+                kept.setdefault(repo, []).append(pr)
+    return kept, skips
+
+
+def _ready_groups(
+    args: argparse.Namespace, groups: dict[str, list[PullRequest]]
+) -> dict[str, list[PullRequest]]:
+    """
+    Chains `watch` can start now: repos whose first non-conflicting PR is ready.
+
+    Conflicting PRs wait for Dependabot to rebase them, and a repo whose next PR
+    is still blocked/behind/computing is simply looked at again next cycle.
+    """
+    ready: dict[str, list[PullRequest]] = {}
+    for repo, prs in groups.items():
+        prs = [
+            pr
+            for pr in prs
+            if (pr.prefetched or {}).get("mergeable") is not False
+            and (pr.prefetched or {}).get("mergeable_state") != "dirty"
+        ]
+        if not prs:
+            continue
+        state = (prs[0].prefetched or {}).get("mergeable_state", "unknown")
+        if (
+            _uses_merge_queue(prs)
+            or state in MERGEABLE_STATES
+            or (state == "blocked" and args.wait_checks)
+            or (state == "behind" and args.merge_behind)
+        ):
+            ready[repo] = prs
+    return ready
+
+
+def _search_prs(
+    client: GitHubClient, args: argparse.Namespace
+) -> list[PullRequest] | None:
+    """
+    Discover PRs with one org-wide search when --discovery search is set.
+
+    Returns None to mean "use the per-repo path": either search discovery is
+    off, or it failed (the failure is logged and we fall back transparently).
+    """
+    if args.discovery != "search":
+        return None
+    logging.info("Searching open Dependabot PRs...")
+    try:
+        prs = client.search_dependabot_prs(args.org)
+    except (RuntimeError, requests.RequestException) as e:
+        logging.warning(f"Search discovery unavailable ({e}); falling back to per-repo listing")
+        return None
+    if args.repos:
+        wanted = {r.strip() for r in args.repos.split(",")}
+        prs = [pr for pr in prs if pr.repo in wanted]
+    logging.info(f"Found {len(prs)} Dependabot PRs via search")
+    return prs
+
+
+def _group_by_repo(prs: list[PullRequest]) -> dict[str, list[PullRequest]]:
+    """
+    Group PRs by repo in discovery order (dict keeps insertion order), each
+    repo's PRs safest bump first, so a risky major lands after the patches.
+    """
+    groups: dict[str, list[PullRequest]] = {}
+    for pr in prs:
+        groups.setdefault(pr.repo, []).append(pr)
+    for repo_prs in groups.values():
+        repo_prs.sort(key=lambda pr: _classify(pr).risk)
+    return groups
+
+
+def _classify(pr: PullRequest) -> Bump:
+    """Ecosystem, package and semver delta of a Dependabot PR (no API calls)."""
+    branch = DEPENDABOT_BRANCH_RE.match(pr.head)
+    ecosystem = branch.group("ecosystem") if branch else "unknown"
+    m = BUMP_TITLE_RE.search(pr.title)
+    if not m:
+        group = GROUP_TITLE_RE.search(pr.title)
+        package = group.group("group") if group else (branch.group("rest") if branch else "")
+        return Bump(ecosystem, package)
+    old, new = VERSION_RE.search(m.group("old")), VERSION_RE.search(m.group("new"))
+    if not (old and new):
+        return Bump(ecosystem, m.group("package"))
+    delta = _semver_delta(old.group(1), new.group(1))
+    # To, from or between prereleases ("1.0.0-beta.1 -> 1.0.0") is no plain patch/minor.
+    if delta != "major" and any(PRERELEASE_RE.match(v.string, v.end()) for v in (old, new)):
+        delta = "unknown"
+    return Bump(ecosystem, m.group("package"), old.group(1), new.group(1), delta)
+
+
+def _semver_delta(old: str, new: str) -> str:
+    """
+    "major" / "minor" / "patch": the first of the three components that changed.
+
+    Below 1.0 the minor component is the breaking one, so 0.3 -> 0.4 is "major".
+    """
+    a = [int(x) for x in old.split(".")] + [0, 0]
+    b = [int(x) for x in new.split(".")] + [0, 0]
+    if a[0] != b[0]:
+        return "major"
+    if a[1] != b[1]:
+        return "major" if a[0] == 0 else "minor"
+    return "patch"
+
+
+def _filter_prs(args: argparse.Namespace, prs: list[PullRequest]) -> list[PullRequest]:
+    """Apply --only / --ecosystem, from titles and branches alone (no API calls)."""
+    if not (args.only or args.ecosystem):
+        return prs
+    return [
+        pr
+        for pr in prs
+        if (not args.only or _classify(pr).delta in args.only)
+        and (not args.ecosystem or _classify(pr).ecosystem in args.ecosystem)
+    ]
+
+
+def _bump_label(pr: PullRequest) -> str:
+    bump = _classify(pr)
+    return f"{bump.ecosystem} · {bump.delta}"
 
-    if state not in MERGEABLE_STATES:
-        msg = f"unexpected mergeable_state={state}"
-        stats.record(PRResult(pr.repo, pr.number, pr.title, "skipped", True, msg))
-        _print_skip(msg)
-        return
 
-    if args.dry_run:
-        stats.record(
-            PRResult(pr.repo, pr.number, pr.title, "merged", True, f"dry-run (state={state})")
-        )
-        _print_ok(f"would merge (state={state}, dry-run)")
-        return
+def _body_updates(body: str | None) -> dict[str, str]:
+    """package -> new version from a grouped / multi-package PR's description."""
+    return {m.group("package"): m.group("new") for m in UPDATES_BODY_RE.finditer(body or "")}
 
-    ok, msg = client.merge_pr(args.org, pr.repo, pr.number, sha, args.merge_method)
-    if ok:
-        stats.record(PRResult(pr.repo, pr.number, pr.title, "merged", True))
-        _print_ok("merged")
+
+def _updates(pr: PullRequest) -> dict[tuple[str, str, str], tuple[int, ...]]:
+    """
+    (ecosystem, directory, package) -> new version, for every package the PR
+    updates. Directory "*" is a group spanning several directories.
+    """
+    bump = _classify(pr)
+    if "directories" in pr.title:
+        directory = "*"
     else:
-        stats.record(PRResult(pr.repo, pr.number, pr.title, "failed", False, msg))
-        _print_err(msg)
+        m = DIRECTORY_RE.search(pr.title)
+        directory = m.group("directory") if m else "/"
+    packages = pr.updates or ({bump.package: bump.new} if bump.new else {})
+    return {
+        (bump.ecosystem, directory, package): _version_key(new)
+        for package, new in packages.items()
+    }
 
 
-def _resolve_mergeable(
-    client: GitHubClient,
-    args: argparse.Namespace,
-    pr: PullRequest,
-    wait_checks: bool | None = None,
-) -> dict:
-    """
-    Fetch PR detail and resolve its mergeable state.
+def _version_key(version: str) -> tuple[int, ...]:
+    m = VERSION_RE.search(version)
+    return tuple(int(x) for x in m.group(1).split(".")) if m else ()
 
-    GitHub computes `mergeable` / `mergeable_state` asynchronously, so the first
-    response may carry `mergeable: null` / `mergeable_state: unknown`. We poll
-    until it settles. When waiting for checks is enabled we keep polling while
-    the state is `blocked` (required checks still running) up to --checks-timeout.
 
-    `wait_checks` overrides args.wait_checks (used after a rebase, when CI always
-    restarts and we must wait regardless of the flag).
-    """
-    if wait_checks is None:
-        wait_checks = args.wait_checks
-    poll_interval = max(args.poll_interval, 1)
-    settle_deadline = time.time() + 30  # max wait for the null/unknown to settle
-    checks_deadline = time.time() + args.checks_timeout
+def _match(
+    updates: dict[tuple[str, str, str], tuple[int, ...]], key: tuple[str, str, str]
+) -> tuple[int, ...] | None:
+    """The version `updates` takes `key`'s package to, directly or via a "*" group."""
+    ecosystem, _, package = key
+    return updates.get(key, updates.get((ecosystem, "*", package)))
 
-    while True:
-        detail = client.get_pr(args.org, pr.repo, pr.number)
-        state = detail.get("mergeable_state", "unknown")
-        mergeable = detail.get("mergeable")
 
-        # Still computing — wait for it to settle.
-        if mergeable is None or state == "unknown":
-            if time.time() < settle_deadline:
-                time.sleep(2)
-                continue
-            return detail
+def _covers(
+    by: dict[tuple[str, str, str], tuple[int, ...]],
+    updates: dict[tuple[str, str, str], tuple[int, ...]],
+) -> bool:
+    """Whether `by` updates every package in `updates`, at least as far."""
+    for key, version in updates.items():
+        target = _match(by, key)
+        if target is None or target < version:
+            return False
+    return True
 
-        # Waiting for required CI checks to finish.
-        if wait_checks and state == "blocked":
-            if time.time() < checks_deadline:
-                _print_wait(f"checks pending (state={state}), waiting {poll_interval}s...")
-                time.sleep(poll_interval)
-                continue
-            return detail
 
-        return detail
+def _dedupe_prs(prs: list[PullRequest]) -> tuple[list[PullRequest], list[Duplicate]]:
+    """
+    Split off PRs another open PR in the same repo already covers.
 
+    A PR is superseded when another one updates all of its packages to the
+    same or a newer version (a newer single bump, or a group including it);
+    between identical PRs the newest is kept. Of two PRs that only share some
+    packages, the one updating fewer is skipped: it would conflict once the
+    other merges, and Dependabot rebases it then. Titles and bodies only, no
+    API calls.
+    """
+    updates = {id(pr): _updates(pr) for pr in prs}
 
-# ─────────────────────────────────────────────
-# Helpers
-# ─────────────────────────────────────────────
-def _resolve_repos(client: GitHubClient, args: argparse.Namespace) -> list[str]:
-    if args.repos:
-        return [r.strip() for r in args.repos.split(",")]
-    logging.info("Fetching repository list...")
-    repos = client.list_repos(args.org)
-    logging.info(f"Found {len(repos)} repositories (excluding archived)")
-    return repos
+    def size(pr: PullRequest) -> tuple[int, int]:
+        return len(updates[id(pr)]), pr.number
 
+    dupes: list[Duplicate] = []
+    for repo_prs in _group_by_repo(prs).values():
+        live: list[PullRequest] = []
+        for pr in repo_prs:
+            mine = updates[id(pr)]
+            by = max(
+                (
+                    other
+                    for other in repo_prs
+                    if mine
+                    and other is not pr
+                    and _covers(updates[id(other)], mine)
+                    and not (_covers(mine, updates[id(other)]) and pr.number > other.number)
+                ),
+                key=size,
+                default=None,
+            )
+            if by:
+                dupes.append(Duplicate(pr, by, tuple(k[2] for k in mine), True))
+            else:
+                live.append(pr)
+        # Partial overlaps: the larger PR (newer on ties) goes ahead.
+        kept: list[PullRequest] = []
+        for pr in sorted(live, key=size, reverse=True):
+            mine = updates[id(pr)]
+            for other in kept:
+                shared = tuple(k[2] for k in mine if _match(updates[id(other)], k) is not None)
+                if shared:
+                    dupes.append(Duplicate(pr, other, shared, False))
+                    break
+            else:
+                kept.append(pr)
 
-def _group_by_repo(prs: list[PullRequest]) -> dict[str, list[PullRequest]]:
-    """Group PRs by repo, preserving discovery order (dict keeps insertion order)."""
-    groups: dict[str, list[PullRequest]] = {}
-    for pr in prs:
-        groups.setdefault(pr.repo, []).append(pr)
-    return groups
+    # Point each skip at the PR that survives, never at one that is itself
+    # superseded (and closed in the same run with --close-superseded).
+    superseded = {id(d.pr): d.by for d in dupes if d.covered}
+    resolved: list[Duplicate] = []
+    for d in dupes:
+        by, seen = d.by, {id(d.pr)}
+        while id(by) in superseded and id(by) not in seen:
+            seen.add(id(by))
+            by = superseded[id(by)]
+        resolved.append(Duplicate(d.pr, by, d.packages, d.covered))
+    skipped = {id(d.pr) for d in resolved}
+    return [pr for pr in prs if id(pr) not in skipped], resolved
+
+
+def _close_superseded(client: GitHubClient, args: argparse.Namespace, dupe: Duplicate):
+    """--close-superseded: close a superseded PR, pointing at the one that covers it."""
+    client.close_pr(
+        args.org, dupe.pr.repo, dupe.pr.number,
+        f"Superseded by #{dupe.by.number}, which updates {', '.join(dupe.packages)} "
+        "to the same or a newer version.",
+    )
 
 
 def _wait_repo_idle(client: GitHubClient, args: argparse.Namespace, repo: str):
@@ -541,8 +3815,10 @@ def _wait_repo_idle(client: GitHubClient, args: argparse.Namespace, repo: str):
     poll_interval = max(args.poll_interval, 1)
     # Let the just-pushed merge register its workflow run before the first poll.
     _print_wait(f"letting workflows in {repo} register ({WORKFLOW_START_GRACE}s)...")
-    time.sleep(WORKFLOW_START_GRACE)
+    # Any delivery for the repo means its run is registered: end the grace early.
+    _wait_event(repo, WORKFLOW_START_GRACE, "workflow idle", completed_only=False, fallback=False)
     while True:
+        mark = _event_mark(repo)
         active = client.count_active_runs(args.org, repo)
         if active == 0:
             return
@@ -554,7 +3830,134 @@ def _wait_repo_idle(client: GitHubClient, args: argparse.Namespace, repo: str):
         _print_wait(
             f"{active} workflow run(s) active in {repo} (changelog/release?), waiting {poll_interval}s..."
         )
-        time.sleep(poll_interval)
+        _wait_event(repo, poll_interval, "workflow idle", mark=mark)
+
+
+def _wait_merge_runs(
+    client: GitHubClient, args: argparse.Namespace, repo: str, merge_sha: str
+):
+    """
+    Wait until the workflow runs for one merge commit have finished.
+
+    Only runs whose head_sha is the merge commit count, so unrelated
+    long-running workflows in the repo don't hold up the next merge. Returns as
+    soon as those runs complete, or once WORKFLOW_START_GRACE passes without
+    any registering (the merge triggered no workflows).
+    """
+    deadline = time.time() + args.workflow_timeout
+    register_deadline = time.time() + WORKFLOW_START_GRACE
+    poll_interval = max(args.poll_interval, 1)
+    short = merge_sha[:7]
+    _print_wait(f"waiting for workflows on {short} in {repo}...")
+    while True:
+        mark = _event_mark(repo)
+        runs = client.list_runs_for_sha(args.org, repo, merge_sha)
+        active = sum(1 for r in runs if r.get("status") != "completed")
+        if runs and not active:
+            return
+        now = time.time()
+        if not runs and now >= register_deadline:
+            return
+        if now >= deadline:
+            _print_warn(
+                f"workflows for {short} still active in {repo} after {args.workflow_timeout}s; proceeding anyway"
+            )
+            return
+        if not runs:
+            # Not registered yet: poll briefly, or wake on the first delivery.
+            _wait_event(
+                repo,
+                WORKFLOW_REGISTER_POLL,
+                "workflow idle",
+                completed_only=False,
+                fallback=False,
+                mark=mark,
+            )
+            continue
+        _print_wait(
+            f"{active} workflow run(s) for {short} active in {repo} (changelog/release?), waiting {poll_interval}s..."
+        )
+        _wait_event(repo, poll_interval, "workflow idle", mark=mark)
+
+
+def _sleep(seconds: float, reason: str):
+    """time.sleep() that wakes up (and aborts the worker) on Ctrl-C."""
+    with _profile.waiting(reason):
+        if _stop.wait(seconds):
+            raise KeyboardInterrupt
+
+
+def _event_mark(repo: str) -> tuple[int, int] | None:
+    """Webhook mark for `repo`, taken before a status request (None without a receiver)."""
+    return _webhook.mark(repo) if _webhook is not None else None
+
+
+def _wait_event(
+    repo: str,
+    seconds: float,
+    reason: str,
+    completed_only: bool = True,
+    fallback: bool = True,
+    mark: tuple[int, int] | None = None,
+):
+    """
+    Wait for the next webhook delivery for `repo`, or sleep without a receiver.
+
+    With --webhook-port the poll interval is only a fallback: the wait ends on
+    the first matching delivery after `mark` (from _event_mark() before the
+    poll that decided to wait; default: now), or after
+    max(seconds, WEBHOOK_FALLBACK_POLL) (just `seconds` when fallback=False,
+    e.g. for the fixed start grace). Either way the time spent is profiled
+    under `reason`.
+    """
+    if _webhook is None:
+        _sleep(seconds, reason)
+        return
+    if mark is None:
+        mark = _webhook.mark(repo)
+    timeout = max(seconds, WEBHOOK_FALLBACK_POLL) if fallback else seconds
+    with _profile.waiting(reason):
+        _webhook.wait(repo, mark, timeout, completed_only=completed_only)
+
+
+@contextmanager
+def _pr_block(progress: Progress, label: str, buffered: bool):
+    """
+    Frame one PR's console output with its [idx/total] header.
+
+    Unbuffered (serial run) the header prints up front and lines stream live.
+    Buffered (--concurrency > 1) lines are collected on this thread and printed
+    as one block under a lock when the PR finishes; idx is the completion order.
+    """
+    dashboard = _dashboard
+    if dashboard is not None:
+        dashboard.started()
+    try:
+        if not buffered:
+            _print_progress(progress.advance(), progress.total, label)
+            yield
+            return
+        _output.lines = []
+        try:
+            yield
+        finally:
+            lines, _output.lines = _output.lines, None
+            with _print_lock:
+                _print_progress(progress.advance(), progress.total, label)
+                for line in lines:
+                    print(line)
+    finally:
+        if dashboard is not None:
+            dashboard.finished()
+
+
+def _emit(line: str):
+    """Print a per-PR line, or buffer it when inside a buffered _pr_block."""
+    lines = getattr(_output, "lines", None)
+    if lines is None:
+        print(line)
+    else:
+        lines.append(line)
 
 
 def _confirm(message: str) -> bool:
@@ -567,36 +3970,38 @@ def _confirm(message: str) -> bool:
 
 
 def _print_progress(idx: int, total: int, label: str):
-    print(f"\n[{idx}/{total}] {Color.BOLD}{label}{Color.RESET}")
+    _emit(f"\n[{idx}/{total}] {Color.BOLD}{label}{Color.RESET}")
 
 
 def _print_ok(msg: str):
-    print(f"  {Color.GREEN}✓ {msg}{Color.RESET}")
+    _emit(f"  {Color.GREEN}✓ {msg}{Color.RESET}")
 
 
 def _print_err(msg: str):
-    print(f"  {Color.RED}✗ {msg}{Color.RESET}")
+    _emit(f"  {Color.RED}✗ {msg}{Color.RESET}")
 
 
 def _print_warn(msg: str):
-    print(f"  {Color.YELLOW}⚠ {msg}{Color.RESET}")
+    _emit(f"  {Color.YELLOW}⚠ {msg}{Color.RESET}")
 
 
 def _print_skip(msg: str):
-    print(f"  {Color.DIM}→ {msg}{Color.RESET}")
+    _emit(f"  {Color.DIM}→ {msg}{Color.RESET}")
 
 
 def _print_wait(msg: str):
-    print(f"  {Color.BLUE}… {msg}{Color.RESET}")
+    _emit(f"  {Color.BLUE}… {msg}{Color.RESET}")
 
 
-def _print_summary(stats: Stats, args: argparse.Namespace):
+def _print_summary(stats: Stats, args: argparse.Namespace, budget: dict, profile: dict):
     print(f"\n{Color.BOLD}{Color.BLUE}{'='*60}{Color.RESET}")
     print(f"{Color.BOLD}Summary{Color.RESET}")
     print(f"{Color.BOLD}{Color.BLUE}{'='*60}{Color.RESET}")
     print(f"  Total:    {stats.total}")
     print(f"  {Color.GREEN}Merged:   {stats.merged}{Color.RESET}")
     print(f"  {Color.DIM}Skipped:  {stats.skipped}{Color.RESET}")
+    if stats.auto_merge:
+        print(f"  {Color.CYAN}Auto-merge: {stats.auto_merge}{Color.RESET}")
     if stats.failed:
         print(f"  {Color.RED}Failed:   {stats.failed}{Color.RESET}")
 
@@ -612,6 +4017,17 @@ def _print_summary(stats: Stats, args: argparse.Namespace):
         for r in failed:
             print(f"  - {r.repo} #{r.number} {r.message}")
 
+    core = budget["quota"].get("core")
+    if core:
+        tokens = len(budget["tokens"])
+        pool = f" across {tokens} tokens" if tokens > 1 else ""
+        print(
+            f"\n{Color.DIM}Rate limit: {core['remaining']}/{core['limit']} core left{pool}, "
+            f"{budget['requests']} requests ({budget['write_requests']} writes), "
+            f"throttled {budget['throttled_seconds']:.0f}s, "
+            f"{budget['secondary_limit_hits']} secondary-limit hit(s){Color.RESET}"
+        )
+
     # Save log
     log_dir = Path("logs")
     log_dir.mkdir(exist_ok=True)
@@ -628,6 +4044,7 @@ def _print_summary(stats: Stats, args: argparse.Namespace):
             "merged": stats.merged,
             "failed": stats.failed,
             "skipped": stats.skipped,
+            "auto_merge": stats.auto_merge,
         },
         "details": [
             {
@@ -640,14 +4057,47 @@ def _print_summary(stats: Stats, args: argparse.Namespace):
             }
             for d in stats.details
         ],
+        "rate_limit": budget,
+        "profile": profile,
     }
     log_file.write_text(json.dumps(log_data, ensure_ascii=False, indent=2))
     print(f"\nLog saved: {Color.BOLD}{log_file}{Color.RESET}")
 
 
+def _print_profile(profile: dict):
+    wall = profile["wall_seconds"]
+    print(f"\n{Color.BOLD}Profile{Color.RESET} {Color.DIM}(wall {wall:.0f}s){Color.RESET}")
+    print(f"  {'Requests':<48} {'count':>6} {'total s':>8} {'avg ms':>7} {'retry':>5}  status")
+    for label, e in profile["requests"].items():
+        status = " ".join(f"{code}×{n}" for code, n in e["status"].items())
+        print(
+            f"  {label:<48} {e['count']:>6} {e['seconds']:>8.1f} {e['avg_ms']:>7} "
+            f"{e['retries']:>5}  {Color.DIM}{status}{Color.RESET}"
+        )
+    if profile["sleep"]:
+        print(f"\n  {'Sleep (summed over workers)':<48} {'count':>6} {'total s':>8}")
+        for reason, e in profile["sleep"].items():
+            print(f"  {reason:<48} {e['count']:>6} {e['seconds']:>8.1f}")
+
+
 # ─────────────────────────────────────────────
 # CLI (parents pattern -> flexible --org placement)
 # ─────────────────────────────────────────────
+def _delta_list(value: str) -> list[str]:
+    deltas = [d.strip().lower() for d in value.split(",") if d.strip()]
+    unknown = [d for d in deltas if d not in SEMVER_DELTAS]
+    if unknown:
+        raise argparse.ArgumentTypeError(
+            f"unknown update type(s): {', '.join(unknown)} (choose from {', '.join(SEMVER_DELTAS)})"
+        )
+    return deltas
+
+
+def _ecosystem_list(value: str) -> list[str]:
+    names = [e.strip().lower() for e in value.split(",") if e.strip()]
+    return [ECOSYSTEM_ALIASES.get(e, e) for e in names]
+
+
 def build_parser() -> argparse.ArgumentParser:
     common = argparse.ArgumentParser(add_help=False)
     common.add_argument("--org", required=True, help="GitHub organization or username")
@@ -658,123 +4108,333 @@ def build_parser() -> argparse.ArgumentParser:
     common.add_argument(
         "--dry-run", action="store_true", help="Simulate without merging"
     )
+    common.add_argument(
+        "--discovery",
+        choices=["repos", "search"],
+        default="repos",
+        help="How to find PRs: list each repo's pulls (default), or one "
+        "org-wide GraphQL search (falls back to per-repo on error)",
+    )
     common.add_argument(
         "-y", "--yes", action="store_true", help="Skip confirmation prompts"
     )
     common.add_argument(
         "-v", "--verbose", action="store_true", help="Enable verbose logging"
     )
-
-    parser = argparse.ArgumentParser(
-        prog="dependabot-pr-merge",
-        description="Find and sequentially merge Dependabot pull requests across repositories",
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
-Examples:
-  # Preview every open Dependabot PR
-  python dependabot-pr-merge.py list --org somaz94
-
-  # Merge all Dependabot PRs sequentially (squash by default)
-  python dependabot-pr-merge.py merge --org somaz94
-
-  # Wait for required CI checks before each merge
-  python dependabot-pr-merge.py merge --org somaz94 --wait-checks
-
-  # Target specific repositories only
-  python dependabot-pr-merge.py merge --org somaz94 --repos kube-diff,git-bridge
-
-  # Dry-run mode
-  python dependabot-pr-merge.py merge --org somaz94 --dry-run
-        """,
+    common.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=f"Disable the on-disk ETag cache for GET requests ({CACHE_DIR})",
     )
-
-    sub = parser.add_subparsers(dest="command", required=True, help="Command to execute")
-
-    # list
-    sub.add_parser(
-        "list", parents=[common], help="List all open Dependabot PRs across repositories"
+    common.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print API requests per endpoint and time slept per reason at exit "
+        "(always recorded in the merge run log)",
+    )
+    common.add_argument(
+        "--no-inventory",
+        action="store_true",
+        help=f"List every repo and its pulls from scratch instead of refreshing the "
+        f"local inventory ({INVENTORY_PATH})",
+    )
+    common.add_argument(
+        "--metrics-port",
+        type=int,
+        help="Serve Prometheus metrics on GET /metrics on this port while the run is "
+        "in progress (requests, rate limit, PR outcomes, waits)",
+    )
+    common.add_argument(
+        "--metrics-host",
+        default="127.0.0.1",
+        help="Bind address for --metrics-port (default: 127.0.0.1)",
     )
 
-    # merge
-    p_merge = sub.add_parser(
-        "merge", parents=[common], help="Merge Dependabot PRs sequentially"
+    # Which PRs to act on, shared by `list`, `merge` and `watch`
+    filtering = argparse.ArgumentParser(add_help=False)
+    filtering.add_argument(
+        "--only",
+        type=_delta_list,
+        help="Only these update types, from the PR title (comma-separated: "
+        f"{', '.join(SEMVER_DELTAS)}; e.g. patch,minor)",
     )
-    p_merge.add_argument(
+    filtering.add_argument(
+        "--ecosystem",
+        type=_ecosystem_list,
+        help="Only these ecosystems, from the dependabot/<ecosystem>/ branch "
+        "(comma-separated, e.g. npm_and_yarn,github_actions; npm/go/actions also work)",
+    )
+
+    # Merge behavior shared by `merge` and `watch`
+    merging = argparse.ArgumentParser(add_help=False)
+    merging.add_argument(
         "--merge-method",
         choices=["merge", "squash", "rebase"],
         default="squash",
         help="Merge method (default: squash)",
     )
-    p_merge.add_argument(
+    merging.add_argument(
         "--one-per-repo",
         action="store_true",
         help="Merge at most one Dependabot PR per repo per run; defer the rest "
         "(safest for changelog/release repos — re-run after Dependabot rebases)",
     )
-    p_merge.add_argument(
+    merging.add_argument(
+        "--train",
+        action="store_true",
+        help="For repos with 2+ PRs, combine them into one branch/PR, wait for CI "
+        "once, merge once and close the superseded PRs",
+    )
+    merging.add_argument(
+        "--close-superseded",
+        action="store_true",
+        help="Close PRs that another open PR in the same repo already covers "
+        "(same packages, same or newer versions) instead of only skipping them",
+    )
+    merging.add_argument(
         "--wait-checks",
         action="store_true",
         help="Wait for required CI checks to finish before merging each PR",
     )
-    p_merge.add_argument(
+    merging.add_argument(
         "--checks-timeout",
         type=int,
         default=600,
         help="Max seconds to wait for checks per PR (default: 600)",
     )
-    p_merge.add_argument(
+    merging.add_argument(
         "--workflow-timeout",
         type=int,
         default=300,
         help="Max seconds to wait for a repo's workflows (changelog/release) to "
         "finish between same-repo merges (default: 300)",
     )
-    p_merge.add_argument(
+    merging.add_argument(
+        "--queue-timeout",
+        type=int,
+        default=1800,
+        help="For repos whose base branch has a merge queue: max seconds to follow "
+        "the queued PRs before leaving them to GitHub (default: 1800)",
+    )
+    merging.add_argument(
         "--poll-interval",
         type=int,
         default=15,
         help="Seconds between check-status / workflow polls (default: 15)",
     )
-    p_merge.add_argument(
+    merging.add_argument(
         "--merge-behind",
         action="store_true",
         help="For behind-base PRs, rebase via update-branch then merge "
         "(same-repo followups do this automatically; default for others: skip)",
     )
-    p_merge.add_argument(
+    merging.add_argument(
+        "--cancel-stale-runs",
+        action="store_true",
+        help="After update-branch, cancel workflow runs still in progress on the "
+        "PR's previous head SHA so runners pick up the new run first",
+    )
+    merging.add_argument(
         "--delay",
         type=int,
-        default=3,
-        help="Seconds to wait between merges (default: 3)",
+        default=0,
+        help="Extra seconds to wait between merges, on top of the rate budget's "
+        f"write spacing ({WRITE_INTERVAL:g}s) (default: 0)",
+    )
+    merging.add_argument(
+        "--no-dashboard",
+        action="store_true",
+        help="Don't pin the live status lines (counts, merges/min, quota, ETA) to "
+        "the bottom of the terminal (always off when stdout is not a TTY)",
+    )
+    merging.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="Number of repos to merge in parallel; PRs within a repo stay "
+        "serial (default: 1 = fully sequential)",
+    )
+    merging.add_argument(
+        "--webhook-port",
+        type=int,
+        help="Listen for workflow_run / check_suite webhooks on this port and wake "
+        "waiting merges on delivery; polling becomes a fallback "
+        f"(every {WEBHOOK_FALLBACK_POLL}s+); under `watch`, pull_request / push "
+        "deliveries trigger an early refresh. Set GITHUB_WEBHOOK_SECRET to verify",
+    )
+    merging.add_argument(
+        "--webhook-host",
+        default="127.0.0.1",
+        help="Bind address for --webhook-port (default: 127.0.0.1)",
+    )
+    merging.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=MAX_IN_FLIGHT,
+        help="Max concurrent API requests across all workers, so --concurrency "
+        f"can go into the hundreds (default: {MAX_IN_FLIGHT})",
+    )
+
+    parser = argparse.ArgumentParser(
+        prog="dependabot-pr-merge",
+        description="Find and merge Dependabot pull requests across repositories",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Preview every open Dependabot PR
+  python dependabot-pr-merge.py list --org somaz94
+
+  # Merge all Dependabot PRs (squash by default)
+  python dependabot-pr-merge.py merge --org somaz94
+
+  # Wait for required CI checks before each merge
+  python dependabot-pr-merge.py merge --org somaz94 --wait-checks
+
+  # Target specific repositories only
+  python dependabot-pr-merge.py merge --org somaz94 --repos kube-diff,git-bridge
+
+  # Dry-run mode
+  python dependabot-pr-merge.py merge --org somaz94 --dry-run
+
+  # Merge up to 8 repos in parallel (serial within each repo)
+  python dependabot-pr-merge.py merge --org somaz94 --concurrency 8
+        """,
+    )
+
+    sub = parser.add_subparsers(dest="command", required=True, help="Command to execute")
+
+    # list
+    p_list = sub.add_parser(
+        "list",
+        parents=[common, filtering],
+        help="List all open Dependabot PRs across repositories",
+    )
+    p_list.add_argument(
+        "--format",
+        choices=["text", "ndjson", "csv"],
+        default="text",
+        help="Output format: coloured text (default), or one NDJSON / CSV record per PR "
+        "on stdout, streamed as each repo is listed",
+    )
+    p_list.add_argument(
+        "--mergeable",
+        action="store_true",
+        help="Also fetch each PR's mergeable state (one GraphQL request per repo, "
+        "free with --discovery search)",
+    )
+
+    # merge
+    p_merge = sub.add_parser(
+        "merge",
+        parents=[common, filtering, merging],
+        help="Merge Dependabot PRs (serially within each repo)",
+    )
+    p_merge.add_argument(
+        "--auto-merge",
+        action="store_true",
+        help="Enable GitHub's native auto-merge on every eligible PR and exit "
+        "without waiting on CI; check progress later with `status`",
+    )
+    p_merge.add_argument(
+        "--resume",
+        metavar="JOURNAL",
+        help="Continue an interrupted run from its logs/dependabot_merge_*.jsonl "
+        "journal: reuse its discovered PRs and skip those already merged/skipped",
+    )
+
+    # watch
+    p_watch = sub.add_parser(
+        "watch",
+        parents=[common, filtering, merging],
+        help="Stay resident and merge new Dependabot PRs as they become mergeable",
+    )
+    p_watch.add_argument(
+        "--interval",
+        type=int,
+        default=WATCH_INTERVAL,
+        help="Seconds between refresh cycles; a pull_request/push webhook "
+        f"delivery starts one early (default: {WATCH_INTERVAL})",
+    )
+    p_watch.add_argument(
+        "--health-port",
+        type=int,
+        help="Serve GET /healthz (JSON status, 503 when refreshes stall) on this port",
+    )
+    p_watch.add_argument(
+        "--health-host",
+        default="127.0.0.1",
+        help="Bind address for --health-port (default: 127.0.0.1)",
+    )
+    p_watch.set_defaults(auto_merge=False, resume=None)
+
+    # status
+    p_status = sub.add_parser(
+        "status",
+        parents=[common],
+        help="Show which PRs handed to --auto-merge have landed",
+    )
+    p_status.add_argument(
+        "--journal",
+        help="Merge journal to check (default: newest logs/dependabot_merge_*.jsonl)",
     )
 
     return parser
 
 
 def main():
+    global _webhook, _inventory
     parser = build_parser()
     args = parser.parse_args()
 
     # `list` has no merge-specific attributes; default them for shared helpers.
     if not hasattr(args, "merge_method"):
         args.merge_method = "-"
+    if not hasattr(args, "concurrency"):
+        args.concurrency = 1
+        args.max_in_flight = MAX_IN_FLIGHT
+
+    if getattr(args, "train", False) and args.one_per_repo:
+        parser.error("--train and --one-per-repo are mutually exclusive")
+    if getattr(args, "auto_merge", False) and (args.train or args.one_per_repo or args.wait_checks):
+        parser.error("--auto-merge can't be combined with --train, --one-per-repo or --wait-checks")
 
     logging.basicConfig(
         level=logging.DEBUG if args.verbose else logging.INFO,
         format="%(levelname)s: %(message)s",
     )
 
-    token = os.environ.get("GITHUB_TOKEN", "")
-    if not token:
+    try:
+        tokens = TokenPool.from_env(args.org)
+    except (RuntimeError, OSError) as e:
+        print(f"{Color.RED}✗ {e}{Color.RESET}")
+        sys.exit(1)
+    if not tokens:
         print(f"{Color.RED}✗ Please set the GITHUB_TOKEN environment variable.{Color.RESET}")
         print("  export GITHUB_TOKEN='ghp_xxxxxxxxxxxx'")
+        print("  (or GITHUB_TOKENS for a pool of tokens, or GITHUB_APP_ID for a GitHub App)")
         sys.exit(1)
 
-    client = GitHubClient(token)
+    if getattr(args, "webhook_port", None):
+        _webhook = WebhookReceiver(
+            args.org,
+            args.webhook_host,
+            args.webhook_port,
+            os.environ.get("GITHUB_WEBHOOK_SECRET", ""),
+        )
+        _webhook.start()
+
+    cache = None if args.no_cache else HTTPCache()
+    client = GitHubClient(tokens, max_in_flight=args.max_in_flight, cache=cache)
+    if not args.no_inventory:
+        _inventory = Inventory()
+    if args.metrics_port:
+        MetricsEndpoint(args.metrics_host, args.metrics_port, client).start()
 
     commands = {
         "list": cmd_list,
         "merge": cmd_merge,
+        "status": cmd_status,
+        "watch": cmd_watch,
     }
 
     try:
@@ -789,6 +4449,12 @@ def main():
 
             traceback.print_exc()
         sys.exit(1)
+    finally:
+        if args.profile:
+            # Keep a streamed `list --format` stdout machine-readable.
+            streamed = getattr(args, "format", "text") != "text"
+            with redirect_stdout(sys.stderr if streamed else sys.stdout):
+                _print_profile(_profile.snapshot())
 
 
 if __name__ == "__main__":
@@ -49,17 +49,27 @@ Actions / Dependabot Secret을 일괄 관리합니다.
 from __future__ import annotations
 
 import argparse
+import hashlib
 import json
 import logging
 import os
+import re
+import sqlite3
 import sys
+import threading
 import time
 from base64 import b64encode
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
+from urllib.parse import parse_qs, urlencode, urlparse
 
 import requests
+from requests.structures import CaseInsensitiveDict
 from nacl import encoding, public
 
 # ─────────────────────────────────────────────
@@ -67,8 +77,67 @@ from nacl import encoding, public
 # ─────────────────────────────────────────────
 GITHUB_API = "https://api.github.com"
 PER_PAGE = 100
+# 첫 페이지의 Link 헤더로 페이지 수를 안 뒤 한 목록에서 동시에 가져오는 페이지 수
+PAGE_WORKERS = 8
 RATE_LIMIT_BUFFER = 10
 REQUEST_TIMEOUT = 30
+# GitHub App 설치 토큰을 만료 이 시간 전에 재발급 (토큰 수명 1시간)
+APP_TOKEN_REFRESH = 300
+# 발급에 실패한 설치는 이 시간 동안 쉬고 풀의 나머지 토큰이 요청을 맡는다
+APP_MINT_RETRY = 60
+
+# 조건부 요청 캐시 (ETag / Last-Modified), 기본 위치는 logs/ 옆
+CACHE_DIR = Path(".cache") / "github-http"
+CACHE_MAX_BYTES = 50 * 1024 * 1024
+
+# 로컬 리포 인벤토리 (SQLite). 같은 디렉터리에서 실행하면 dependabot-pr-merge와
+# 공유하므로 스키마에 그쪽 PR 테이블도 포함한다: repo를 지우면 캐시된 PR도 함께
+# 지워진다. 삭제/이전된 repo를 잡기 위해 INVENTORY_FULL_SWEEP초마다 소유자 전체를
+# 다시 조회한다.
+INVENTORY_PATH = Path(".cache") / "inventory.sqlite3"
+INVENTORY_FULL_SWEEP = 24 * 3600
+INVENTORY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS repos (
+    owner TEXT NOT NULL,
+    name TEXT NOT NULL,
+    pushed_at TEXT NOT NULL DEFAULT '',
+    updated_at TEXT NOT NULL DEFAULT '',
+    archived INTEGER NOT NULL DEFAULT 0,
+    disabled INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (owner, name)
+);
+CREATE TABLE IF NOT EXISTS sweeps (
+    owner TEXT PRIMARY KEY,
+    full_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pr_lists (
+    owner TEXT NOT NULL,
+    repo TEXT NOT NULL,
+    pushed_at TEXT NOT NULL,
+    PRIMARY KEY (owner, repo)
+);
+CREATE TABLE IF NOT EXISTS prs (
+    owner TEXT NOT NULL,
+    repo TEXT NOT NULL,
+    number INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    head TEXT NOT NULL,
+    url TEXT NOT NULL,
+    updates TEXT NOT NULL DEFAULT '{}',
+    PRIMARY KEY (owner, repo, number)
+);
+"""
+
+# --metrics-port: 대기 시간 히스토그램 버킷의 상한(초)
+WAIT_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1800)
+
+# 메트릭 레이블: owner, repo, 시크릿 이름을 템플릿으로 접어 요청 수가
+# 엔드포인트별로 집계되게 한다
+ENDPOINT_TEMPLATES = [
+    (re.compile(r"^/repos/[^/]+/[^/]+"), "/repos/{o}/{r}"),
+    (re.compile(r"/secrets/(?!public-key$)[^/]+$"), "/secrets/{name}"),
+    (re.compile(r"^/(orgs|users)/[^/]+"), r"/\1/{org}"),
+]
 
 
 class Color:
@@ -112,27 +181,654 @@ class Stats:
         else:
             self.failed += 1
         self.details.append(result)
+        _metrics.result(result)
 
 
 # ─────────────────────────────────────────────
-# GitHub API Client
+# HTTP cache (conditional requests)
 # ─────────────────────────────────────────────
-class GitHubClient:
-    """GitHub API 클라이언트 (rate-limit 핸들링 포함)"""
+class HTTPCache:
+    """
+    GET 응답을 디스크에 캐시하고 ETag / Last-Modified로 재검증한다.
 
-    def __init__(self, token: str):
-        self.token = token
-        self.session = requests.Session()
-        self.session.headers.update(
+    304 응답은 디스크에서 돌려주며 기본 레이트 리밋에 포함되지 않는다.
+    자격 증명+URL+params마다 JSON 파일 하나이므로, 한 토큰으로 받은 본문을 같은
+    데이터를 볼 수 없을지도 모르는 다른 토큰에 돌려주지 않는다. 디렉터리가
+    max_bytes를 넘으면 가장 오래 사용하지 않은 항목부터 제거한다.
+    """
+
+    # 캐시에서 되살릴 응답 헤더 (페이지네이션, 본문 타입)
+    KEEP_HEADERS = ("Content-Type", "Link")
+
+    def __init__(self, path: Path = CACHE_DIR, max_bytes: int = CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._size = sum(f.stat().st_size for f in self.path.glob("*.json"))
+
+    def _file(self, url: str, params: dict | None, credential: str) -> Path:
+        # 해시하므로 자격 증명(PAT)이 파일 이름에 드러나지 않는다.
+        key = f"{credential} {url}?{urlencode(sorted((params or {}).items()))}"
+        return self.path / f"{hashlib.sha256(key.encode()).hexdigest()}.json"
+
+    def load(self, url: str, params: dict | None, credential: str) -> dict | None:
+        try:
+            return json.loads(self._file(url, params, credential).read_text())
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def validators(entry: dict) -> dict:
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, url: str, params: dict | None, credential: str, resp: requests.Response):
+        etag = resp.headers.get("ETag")
+        last_modified = resp.headers.get("Last-Modified")
+        if not (etag or last_modified):
+            return
+        data = json.dumps(
             {
-                "Authorization": f"token {token}",
-                "Accept": "application/vnd.github.v3+json",
+                "etag": etag,
+                "last_modified": last_modified,
+                "headers": {h: resp.headers[h] for h in self.KEEP_HEADERS if h in resp.headers},
+                "body": resp.text,
             }
         )
+        f = self._file(url, params, credential)
+        with self._lock:
+            old = f.stat().st_size if f.exists() else 0
+            tmp = f.with_suffix(".tmp")
+            tmp.write_text(data)
+            os.replace(tmp, f)
+            self._size += f.stat().st_size - old
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def replay(
+        self,
+        url: str,
+        params: dict | None,
+        credential: str,
+        entry: dict,
+        resp: requests.Response,
+    ) -> requests.Response:
+        """304를 캐시된 200으로 바꾸되, 새 레이트 리밋 헤더는 유지한다."""
+        try:
+            os.utime(self._file(url, params, credential))  # 최근 사용으로 표시
+        except OSError:
+            pass
+        cached = requests.Response()
+        cached.status_code = 200
+        cached._content = entry["body"].encode("utf-8")
+        cached.encoding = "utf-8"
+        cached.headers = CaseInsensitiveDict(entry["headers"])
+        cached.headers.update(
+            {k: v for k, v in resp.headers.items() if k.lower().startswith("x-ratelimit")}
+        )
+        cached.url = resp.url
+        cached.request = resp.request
+        return cached
+
+    def _evict(self):
+        # 가장 오래 사용하지 않은 항목부터 예산의 90%까지 제거한다.
+        files = sorted(self.path.glob("*.json"), key=lambda f: f.stat().st_mtime)
+        for f in files:
+            if self._size <= self.max_bytes * 0.9:
+                break
+            size = f.stat().st_size
+            f.unlink(missing_ok=True)
+            self._size -= size
+
+
+# ─────────────────────────────────────────────
+# 리포 인벤토리 (SQLite, 증분 갱신)
+# ─────────────────────────────────────────────
+class Inventory:
+    """
+    소유자의 repo를 기록하는 로컬 SQLite.
+
+    refresh()는 최근에 갱신된 repo부터 조회하고 (`sort=updated`) updated_at과
+    pushed_at이 저장된 행과 같은 첫 repo에서 멈추므로, 변화 없는 org는 요청 하나로
+    끝난다. 이 조기 중단은 GitHub가 push와 설정 변경 때마다 updated_at(정렬 키)을
+    갱신한다는 데 기대며, 그렇지 않은 변경은 하루 한 번의 전체 조회에서만 보인다.
+    """
+
+    def __init__(self, path: Path = INVENTORY_PATH):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path)
+        with self._db:
+            self._db.executescript(INVENTORY_SCHEMA)
+
+    def refresh(self, client: GitHubClient, org: str) -> list[str]:
+        """`org`의 repo를 최신으로 갱신; 활성 repo를 정렬해 반환."""
+        stored = {
+            name: (updated, pushed)
+            for name, updated, pushed in self._db.execute(
+                "SELECT name, updated_at, pushed_at FROM repos WHERE owner = ?", (org,)
+            )
+        }
+        row = self._db.execute("SELECT full_at FROM sweeps WHERE owner = ?", (org,)).fetchone()
+        full = not stored or not row or time.time() - row[0] >= INVENTORY_FULL_SWEEP
+
+        changed: list[tuple] = []
+        for repo in client.iter_repos_by_update(org):
+            stamps = (repo.get("updated_at") or "", repo.get("pushed_at") or "")
+            if not full and stored.get(repo["name"]) == stamps:
+                break
+            changed.append(
+                (
+                    org,
+                    repo["name"],
+                    stamps[1],
+                    stamps[0],
+                    int(bool(repo.get("archived"))),
+                    int(bool(repo.get("disabled"))),
+                )
+            )
+
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO repos VALUES (?, ?, ?, ?, ?, ?)", changed
+            )
+            if full:
+                # 같은 트랜잭션: dependabot-pr-merge가 캐시한 PR도 repo와 함께 지운다.
+                gone = [(org, name) for name in set(stored) - {c[1] for c in changed}]
+                for table, column in (("pr_lists", "repo"), ("prs", "repo"), ("repos", "name")):
+                    self._db.executemany(
+                        f"DELETE FROM {table} WHERE owner = ? AND {column} = ?", gone
+                    )
+                self._db.execute(
+                    "INSERT OR REPLACE INTO sweeps VALUES (?, ?)", (org, time.time())
+                )
+        repos = [
+            name
+            for (name,) in self._db.execute(
+                "SELECT name FROM repos WHERE owner = ? AND NOT archived AND NOT disabled "
+                "ORDER BY name",
+                (org,),
+            )
+        ]
+        kind = "전체 스윕" if full else "증분 스윕"
+        logging.info(f"인벤토리: 새로 생기거나 바뀐 repo {len(changed)}개 ({kind})")
+        return repos
+
+
+# ─────────────────────────────────────────────
+# 토큰 풀 (PAT와 GitHub App 설치 토큰)
+# ─────────────────────────────────────────────
+@dataclass
+class Token:
+    label: str  # 로그에 남는 이름 (토큰 값 자체는 절대 아님)
+    value: str = ""
+    installation: str = ""  # GitHub App 설치 ID (발급받는 토큰)
+    expires: float = 0.0
+    # 리소스 -> 이 토큰의 마지막 응답에서 본 {"limit", "remaining", "reset"}
+    quota: dict[str, dict] = field(default_factory=dict)
+    last_used: float = 0.0
+    # 발급 중에 잡는다: 슬롯마다 한 스레드만 발급하고 풀 잠금은 비워 둔다
+    minting: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+    mint_retry: float = 0.0  # 이 시각 전에는 다시 발급을 시도하지 않는다 (실패 후)
+
+
+class GitHubApp:
+    """GitHub App의 설치 토큰을 발급한다 (PyJWT[crypto] 필요)."""
+
+    def __init__(self, app_id: str, private_key: str):
+        try:
+            import jwt  # noqa: F401  (선택 의존성: GitHub App 인증에서만 필요)
+        except ImportError:
+            raise RuntimeError(
+                "GitHub App 인증에는 crypto 지원 PyJWT가 필요합니다: pip install 'PyJWT[crypto]'"
+            )
+        self.app_id = app_id
+        self.private_key = private_key
+
+    def _headers(self) -> dict:
+        import jwt
+
+        now = int(time.time())
+        # 시계 오차를 감안해 과거로 발급; GitHub는 App JWT를 최대 10분으로 제한한다.
+        payload = {"iat": now - 60, "exp": now + 540, "iss": self.app_id}
+        return {
+            "Authorization": f"Bearer {jwt.encode(payload, self.private_key, algorithm='RS256')}",
+            "Accept": "application/vnd.github.v3+json",
+        }
+
+    def find_installation(self, org: str) -> str:
+        """조직 (또는 사용자) 계정에 설치된 이 App의 설치 ID."""
+        for kind in ("orgs", "users"):
+            resp = requests.get(
+                f"{GITHUB_API}/{kind}/{org}/installation",
+                headers=self._headers(),
+                timeout=REQUEST_TIMEOUT,
+            )
+            if resp.status_code == 200:
+                return str(resp.json()["id"])
+        raise RuntimeError(
+            f"GitHub App {self.app_id}이(가) {org}에 설치되어 있지 않습니다: HTTP {resp.status_code}"
+        )
+
+    def mint(self, installation: str) -> tuple[str, float]:
+        """새 설치 토큰과 만료 시각 (epoch 초)."""
+        resp = requests.post(
+            f"{GITHUB_API}/app/installations/{installation}/access_tokens",
+            headers=self._headers(),
+            timeout=REQUEST_TIMEOUT,
+        )
+        if resp.status_code != 201:
+            raise RuntimeError(
+                f"설치 {installation}의 토큰 발급 실패: HTTP {resp.status_code}"
+            )
+        data = resp.json()
+        expires = datetime.fromisoformat(data["expires_at"].replace("Z", "+00:00")).timestamp()
+        return data["token"], expires
+
+
+class TokenUnavailable(requests.RequestException):
+    """풀에서 쓸 수 있는 토큰이 없다: 모든 App 설치의 토큰 발급이 실패했다."""
+
+
+class TokenPool:
+    """
+    클라이언트가 요청을 나눠 보내는 토큰들. 모든 스레드가 공유한다.
+
+    각 요청은 해당 리소스의 쿼터가 가장 많이 남은 토큰으로 나간다 (아직 안 쓴
+    토큰 우선, 같으면 가장 오래전에 쓴 토큰). 그래서 토큰 N개면 시간당 약
+    N x 5,000 요청을 쓸 수 있다. GitHub App 설치 토큰은 처음 쓸 때 발급하고
+    만료 APP_TOKEN_REFRESH초 전에 재발급하되, 풀 잠금 밖에서 하므로 한 스레드가
+    GitHub를 기다리는 동안에도 다른 스레드는 계속 토큰을 고른다. 발급에 실패한
+    설치는 건너뛰고 풀의 나머지 토큰을 쓴다. quota()는 rate-limit 대기를 위해
+    풀 전체를 합산한다.
+    """
+
+    def __init__(self, tokens: list[Token], app: GitHubApp | None = None):
+        self.tokens = tokens
+        self.app = app
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, org: str) -> TokenPool:
+        """GITHUB_TOKEN / GITHUB_TOKENS, 그리고 GITHUB_APP_ID가 있으면 GitHub App."""
+        values = [os.environ.get("GITHUB_TOKEN", "")]
+        values += os.environ.get("GITHUB_TOKENS", "").split(",")
+        values = list(dict.fromkeys(v.strip() for v in values if v.strip()))
+        tokens = [Token(label=f"token {i + 1}", value=v) for i, v in enumerate(values)]
+
+        app = None
+        app_id = os.environ.get("GITHUB_APP_ID", "")
+        if app_id:
+            key = os.environ.get("GITHUB_APP_PRIVATE_KEY", "")
+            key_file = os.environ.get("GITHUB_APP_PRIVATE_KEY_FILE", "")
+            if not key and key_file:
+                key = Path(key_file).expanduser().read_text()
+            if not key:
+                raise RuntimeError(
+                    "GITHUB_APP_ID에는 GITHUB_APP_PRIVATE_KEY 또는 GITHUB_APP_PRIVATE_KEY_FILE이 필요합니다"
+                )
+            app = GitHubApp(app_id, key)
+            ids = os.environ.get("GITHUB_APP_INSTALLATION_ID", "")
+            installations = [i.strip() for i in ids.split(",") if i.strip()]
+            for installation in installations or [app.find_installation(org)]:
+                tokens.append(
+                    Token(label=f"app installation {installation}", installation=installation)
+                )
+        return cls(tokens, app)
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    def pick(self, resource: str) -> Token:
+        """`resource` 쿼터가 가장 많이 남은 토큰. 필요하면 발급/재발급한다."""
+        failed: list[Token] = []
+        while True:
+            with self._lock:
+                now = time.time()
+
+                def left(t: Token) -> float:
+                    q = t.quota.get(resource)
+                    if not q or q["reset"] <= now:
+                        return float("inf")  # 아직 안 썼거나 윈도우가 리셋됨
+                    return q["remaining"]
+
+                usable = [t for t in self.tokens if all(t is not f for f in failed)]
+                if not usable:
+                    raise TokenUnavailable(f"쓸 수 있는 토큰 없음: {failed[-1].label} 발급 실패")
+                # 발급 실패 후 쉬고 있는 설치는 맨 뒤로 보낸다.
+                token = max(
+                    usable, key=lambda t: (t.mint_retry <= now, left(t), -t.last_used)
+                )
+                token.last_used = now
+            if not token.installation or self._mint(token):
+                return token
+            failed.append(token)
+
+    def _mint(self, token: Token) -> bool:
+        """`token`이 만료(임박)면 발급한다. 쓸 수 없으면 False."""
+        # 같은 슬롯을 고른 스레드는 여기서 기다리고, 처음 온 스레드가 발급한다.
+        with token.minting:
+            now = time.time()
+            if token.expires - now >= APP_TOKEN_REFRESH or token.mint_retry > now:
+                # 현재 토큰이 아직 몇 분 남아 있을 수 있다.
+                return token.expires > now
+            try:
+                token.value, token.expires = self.app.mint(token.installation)
+            except (RuntimeError, requests.RequestException) as e:
+                logging.warning(
+                    f"{token.label} 토큰 발급 실패 ({e}); "
+                    f"{APP_MINT_RETRY}초 동안 풀의 나머지 토큰 사용"
+                )
+                token.mint_retry = now + APP_MINT_RETRY
+                return token.expires > now
+            logging.debug(f"{token.label} 토큰 발급")
+            return True
+
+    def observe(self, token: Token, resource: str, resp: requests.Response) -> str:
+        """응답의 쿼터 헤더를 `token`에 기록하고, 헤더가 가리키는 리소스를 반환."""
+        h = resp.headers
+        resource = h.get("X-RateLimit-Resource", resource)
+        if "X-RateLimit-Remaining" in h:
+            with self._lock:
+                token.quota[resource] = {
+                    "limit": int(h.get("X-RateLimit-Limit", 0)),
+                    "remaining": int(h["X-RateLimit-Remaining"]),
+                    "reset": int(h.get("X-RateLimit-Reset", 0)),
+                }
+        return resource
+
+    def quota(self, resource: str) -> dict | None:
+        """
+        `resource`에 대한 풀 전체의 쿼터.
+
+        `remaining` / `limit`은 토큰별 합계, `reset`은 가장 늦은 리셋,
+        `refill`은 가장 이른 리셋, 즉 소진된 풀이 요청을 되찾는 시각.
+        """
+        with self._lock:
+            now = time.time()
+            seen = [t.quota[resource] for t in self.tokens if resource in t.quota]
+            if not seen:
+                return None
+            # 아직 응답을 받지 못한 토큰은 쿼터가 가득 찬 것으로 본다.
+            fresh = len(self.tokens) - len(seen)
+            limit = max(q["limit"] for q in seen)
+            return {
+                "limit": sum(q["limit"] for q in seen) + fresh * limit,
+                "remaining": sum(q["remaining"] if q["reset"] > now else q["limit"] for q in seen)
+                + fresh * limit,
+                "reset": max(q["reset"] for q in seen),
+                "refill": min(q["reset"] for q in seen),
+            }
+
+
+# ─────────────────────────────────────────────
+# Prometheus 메트릭 (--metrics-port)
+# ─────────────────────────────────────────────
+def _endpoint_template(method: str, url: str) -> str:
+    """요청 URL의 `PUT /repos/{o}/{r}/actions/secrets/{name}` 형태 레이블."""
+    path = url[len(GITHUB_API):] if url.startswith(GITHUB_API) else url
+    for pattern, repl in ENDPOINT_TEMPLATES:
+        path = pattern.sub(repl, path)
+    return f"{method} {path}"
+
+
+class Metrics:
+    """
+    --metrics-port의 카운터. 모든 스레드가 공유한다.
+
+    GitHubClient는 모든 요청을 엔드포인트 템플릿과 상태 코드별로 세고 레이트
+    리밋 대기 시간을 잰다. Stats.record는 결과(success, skipped, failed)를
+    센다. 아무것도 초기화하지 않으므로 모든 카운터는 증가만 한다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.last_result = 0.0
+        self._requests: dict[tuple[str, str], int] = {}
+        self._seconds: dict[str, float] = {}
+        self._results: dict[str, int] = {}
+        self._waiting: dict[int, str] = {}  # 스레드 id -> 대기 중인 사유
+        self._waits: dict[str, dict] = {}  # 사유 -> WAIT_BUCKETS별 횟수, 횟수, 합계
+
+    def request(self, label: str, status: int, seconds: float):
+        with self._lock:
+            key = (label, str(status))
+            self._requests[key] = self._requests.get(key, 0) + 1
+            self._seconds[label] = self._seconds.get(label, 0.0) + seconds
+
+    def result(self, result: RepoResult):
+        outcome = "failed" if not result.success else (
+            "skipped" if result.action == "skipped" else "success"
+        )
+        with self._lock:
+            self._results[outcome] = self._results.get(outcome, 0) + 1
+            self.last_result = time.time()
+
+    @contextmanager
+    def waiting(self, reason: str):
+        """대기 시간을 `reason`으로 잰다. 그동안 이 스레드는 그 사유로 대기 중으로 센다."""
+        thread = threading.get_ident()
+        with self._lock:
+            self._waiting[thread] = reason
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            seconds = time.monotonic() - start
+            with self._lock:
+                self._waiting.pop(thread, None)
+                entry = self._waits.setdefault(
+                    reason, {"buckets": [0] * len(WAIT_BUCKETS), "count": 0, "sum": 0.0}
+                )
+                entry["count"] += 1
+                entry["sum"] += seconds
+                for i, bound in enumerate(WAIT_BUCKETS):
+                    if seconds <= bound:
+                        entry["buckets"][i] += 1
+                        break
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            waiting: dict[str, int] = {reason: 0 for reason in self._waits}
+            for reason in self._waiting.values():
+                waiting[reason] = waiting.get(reason, 0) + 1
+            return {
+                "requests": dict(sorted(self._requests.items())),
+                "seconds": dict(sorted(self._seconds.items())),
+                "results": dict(sorted(self._results.items())),
+                "waiting": dict(sorted(waiting.items())),
+                "waits": {
+                    reason: {
+                        **e,
+                        "buckets": [sum(e["buckets"][: i + 1]) for i in range(len(WAIT_BUCKETS))],
+                    }
+                    for reason, e in sorted(self._waits.items())
+                },
+            }
+
+
+# --metrics-port용 요청 / 결과 / 대기 카운터.
+_metrics = Metrics()
+
+# 리포 인벤토리 (None = --no-inventory: 매 실행마다 모든 repo 조회).
+_inventory: Inventory | None = None
+
+
+def _prometheus_labels(labels: dict[str, str]) -> str:
+    """텍스트 형식에 맞게 값을 이스케이프한 `{k="v",...}` (레이블이 없으면 "")."""
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _prometheus_text(client: GitHubClient) -> str:
+    """현재 카운터를 Prometheus 텍스트 노출 형식으로."""
+    out: list[str] = []
+
+    def metric(name: str, kind: str, help_: str, samples: list[tuple[dict, float]]):
+        out.append(f"# HELP github_secrets_{name} {help_}")
+        out.append(f"# TYPE github_secrets_{name} {kind}")
+        for labels, value in samples:
+            out.append(f"github_secrets_{name}{_prometheus_labels(labels)} {value}")
+
+    snap = _metrics.snapshot()
+    metric(
+        "api_requests_total",
+        "counter",
+        "GitHub API requests by endpoint template and HTTP status.",
+        [({"endpoint": label, "status": status}, n) for (label, status), n in snap["requests"].items()],
+    )
+    metric(
+        "api_request_seconds_total",
+        "counter",
+        "Time spent on the wire per endpoint template.",
+        [({"endpoint": label}, round(t, 3)) for label, t in snap["seconds"].items()],
+    )
+    quota = client.tokens.quota("core")
+    if quota:
+        metric(
+            "rate_limit_remaining",
+            "gauge",
+            "Core requests left in the current window (whole token pool).",
+            [({"resource": "core"}, quota["remaining"])],
+        )
+        metric(
+            "rate_limit_limit",
+            "gauge",
+            "Core window size (whole token pool).",
+            [({"resource": "core"}, quota["limit"])],
+        )
+    metric(
+        "items_total",
+        "counter",
+        "Repo/secret operations processed, by outcome (success, skipped, failed).",
+        [({"result": r}, n) for r, n in snap["results"].items()],
+    )
+    metric(
+        "last_result_timestamp_seconds",
+        "gauge",
+        "Unix time the last outcome was recorded (0 before the first); alert when it stops moving.",
+        [({}, _metrics.last_result)],
+    )
+    metric(
+        "start_time_seconds",
+        "gauge",
+        "Unix time the process started.",
+        [({}, _metrics.started)],
+    )
+    metric(
+        "waiting",
+        "gauge",
+        "Threads asleep right now, by wait reason.",
+        [({"reason": r}, n) for r, n in snap["waiting"].items()],
+    )
+    out.append("# HELP github_secrets_wait_seconds Duration of each sleep, by wait reason.")
+    out.append("# TYPE github_secrets_wait_seconds histogram")
+    for reason, h in snap["waits"].items():
+        for bound, n in zip(WAIT_BUCKETS, h["buckets"]):
+            labels = _prometheus_labels({"reason": reason, "le": f"{bound:g}"})
+            out.append(f"github_secrets_wait_seconds_bucket{labels} {n}")
+        labels = _prometheus_labels({"reason": reason, "le": "+Inf"})
+        out.append(f"github_secrets_wait_seconds_bucket{labels} {h['count']}")
+        labels = _prometheus_labels({"reason": reason})
+        out.append(f"github_secrets_wait_seconds_sum{labels} {round(h['sum'], 3)}")
+        out.append(f"github_secrets_wait_seconds_count{labels} {h['count']}")
+    return "\n".join(out) + "\n"
+
+
+class MetricsEndpoint:
+    """GET /metrics: 실행 중 Prometheus 텍스트 메트릭."""
+
+    def __init__(self, host: str, port: int, client: GitHubClient):
+        self.client = client
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        host, port = self.server.server_address[:2]
+        logging.info(f"메트릭 엔드포인트: http://{host}:{port}/metrics")
+
+    def _handler(self):
+        endpoint = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, fmt, *args):
+                logging.debug(f"metrics: {fmt % args}")
+
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                body = _prometheus_text(endpoint.client).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+
+# ─────────────────────────────────────────────
+# GitHub API Client
+# ─────────────────────────────────────────────
+def _last_page(resp: requests.Response) -> int:
+    """목록 응답의 `Link: <...&page=N>; rel="last"`에서 읽은 페이지 수 (없으면 1)."""
+    last = resp.links.get("last", {}).get("url")
+    if not last:
+        return 1
+    return int(parse_qs(urlparse(last).query).get("page", ["1"])[0])
+
+
+class GitHubClient:
+    """GitHub API 클라이언트 (TokenPool 기반, rate-limit 핸들링 포함)"""
+
+    def __init__(self, tokens: TokenPool, cache: HTTPCache | None = None):
+        self.tokens = tokens
+        self.cache = cache
+        self.session = requests.Session()
+        # Authorization은 요청마다 풀에서 골라 설정한다.
+        self.session.headers.update({"Accept": "application/vnd.github.v3+json"})
 
     def _request(self, method: str, url: str, **kwargs) -> requests.Response:
-        resp = self.session.request(method, url, timeout=REQUEST_TIMEOUT, **kwargs)
-        self._handle_rate_limit(resp)
+        params = kwargs.get("params")
+        headers = kwargs.pop("headers", {})
+        cached = self.cache is not None and method == "GET"
+        for _ in range(len(self.tokens)):
+            token = self.tokens.pick("core")
+            # 자격 증명별로 캐시한다. App 토큰 값은 바뀌지만 설치 id는 그대로다.
+            credential = token.installation or token.value
+            entry = self.cache.load(url, params, credential) if cached else None
+            validators = self.cache.validators(entry) if entry else {}
+            auth = {**headers, **validators, "Authorization": f"token {token.value}"}
+            start = time.monotonic()
+            resp = self.session.request(
+                method, url, headers=auth, timeout=REQUEST_TIMEOUT, **kwargs
+            )
+            _metrics.request(
+                _endpoint_template(method, url), resp.status_code, time.monotonic() - start
+            )
+            self.tokens.observe(token, "core", resp)
+            # 이 토큰만 소진됨: 다음 pick은 쿼터가 남은 토큰이다.
+            if resp.status_code != 403 or resp.headers.get("X-RateLimit-Remaining") != "0":
+                break
+            logging.info(f"{token.label} 쿼터 소진; 다른 토큰으로 재시도")
+        self._handle_rate_limit()
+        if entry and resp.status_code == 304:
+            return self.cache.replay(url, params, credential, entry, resp)
+        if cached and resp.status_code == 200:
+            self.cache.store(url, params, credential, resp)
         return resp
 
     def get(self, path: str, **kwargs) -> requests.Response:
@@ -144,59 +840,90 @@ class GitHubClient:
     def delete_req(self, path: str, **kwargs) -> requests.Response:
         return self._request("DELETE", f"{GITHUB_API}{path}", **kwargs)
 
-    def _handle_rate_limit(self, resp: requests.Response):
-        remaining = int(resp.headers.get("X-RateLimit-Remaining", 999))
+    def _handle_rate_limit(self):
+        # 풀 전체가 부족할 때만; 가장 먼저 리셋되는 토큰까지 대기.
+        quota = self.tokens.quota("core")
+        remaining = quota["remaining"] if quota else 999
         if remaining <= RATE_LIMIT_BUFFER:
-            reset_ts = int(resp.headers.get("X-RateLimit-Reset", 0))
-            wait = max(reset_ts - int(time.time()), 1) + 1
+            wait = max(quota["refill"] - int(time.time()), 1) + 1
             logging.warning(
                 f"Rate limit 임박 (remaining={remaining}). {wait}초 대기..."
             )
-            time.sleep(wait)
+            with _metrics.waiting("rate limit"):
+                time.sleep(wait)
+
+    def get_pages(self, path: str, params: dict | None = None) -> list[requests.Response]:
+        """
+        페이지네이션된 목록의 모든 페이지를 페이지 순서대로 반환한다.
+
+        첫 페이지의 `Link: rel="last"`로 페이지 수를 알고, 나머지 페이지는
+        동시에 가져온다. Link 헤더가 없으면 첫 페이지가 유일한 페이지다.
+        첫 페이지가 실패하면 그 응답만 반환한다.
+        """
+        params = {**(params or {}), "per_page": PER_PAGE}
+        first = self.get(path, params={**params, "page": 1})
+        last = _last_page(first) if first.status_code == 200 else 1
+        if last <= 1:
+            return [first]
+        with ThreadPoolExecutor(max_workers=min(last - 1, PAGE_WORKERS)) as pool:
+            rest = pool.map(
+                lambda page: self.get(path, params={**params, "page": page}),
+                range(2, last + 1),
+            )
+            return [first, *rest]
 
     def list_repos(self, org: str) -> list[str]:
         repos: list[str] = []
-        page = 1
-        while True:
-            resp = self.get(
-                f"/orgs/{org}/repos", params={"per_page": PER_PAGE, "page": page}
-            )
-            if resp.status_code == 404:
-                resp = self.get(
-                    f"/users/{org}/repos",
-                    params={"per_page": PER_PAGE, "page": page, "type": "owner"},
-                )
+        pages = self.get_pages(f"/orgs/{org}/repos")
+        if pages[0].status_code == 404:
+            pages = self.get_pages(f"/users/{org}/repos", {"type": "owner"})
+        for page, resp in enumerate(pages, 1):
             if resp.status_code != 200:
                 raise RuntimeError(
                     f"리포지토리 목록 조회 실패: HTTP {resp.status_code}\n{resp.text}"
                 )
             data = resp.json()
-            if not data:
-                break
-            repos.extend(r["name"] for r in data if not r.get("archived", False))
+            repos.extend(
+                r["name"]
+                for r in data
+                if not r.get("archived", False) and not r.get("disabled", False)
+            )
             logging.info(f"  페이지 {page}: {len(data)}개 (누적 {len(repos)}개)")
-            page += 1
         return sorted(repos)
 
+    def iter_repos_by_update(self, org: str) -> Iterator[dict]:
+        """
+        모든 repo (아카이브 포함), 최근에 갱신된 순.
+
+        호출자가 순회하는 만큼 페이지를 하나씩 가져오므로, 중간에 멈추는 호출자
+        (Inventory.refresh)는 나머지를 요청하지 않는다.
+        """
+        path, params = f"/orgs/{org}/repos", {"sort": "updated", "direction": "desc"}
+        page = 1
+        while True:
+            resp = self.get(path, params={**params, "per_page": PER_PAGE, "page": page})
+            if resp.status_code == 404 and page == 1 and path.startswith("/orgs/"):
+                path, params = f"/users/{org}/repos", {**params, "type": "owner"}
+                continue
+            if resp.status_code != 200:
+                raise RuntimeError(
+                    f"리포지토리 목록 조회 실패: HTTP {resp.status_code}\n{resp.text}"
+                )
+            yield from resp.json()
+            if page >= _last_page(resp):
+                return
+            page += 1
+
     def _secret_base(self, target: str) -> str:
         return "actions" if target == "actions" else "dependabot"
 
     def list_secrets(self, org: str, repo: str, target: str) -> list[str]:
         base = self._secret_base(target)
         secrets: list[str] = []
-        page = 1
-        while True:
-            resp = self.get(
-                f"/repos/{org}/{repo}/{base}/secrets",
-                params={"per_page": PER_PAGE, "page": page},
-            )
+        for resp in self.get_pages(f"/repos/{org}/{repo}/{base}/secrets"):
             if resp.status_code != 200:
                 return []
-            data = resp.json()
-            secrets.extend(s["name"] for s in data.get("secrets", []))
-            if len(data.get("secrets", [])) < PER_PAGE:
-                break
-            page += 1
+            secrets.extend(s["name"] for s in resp.json().get("secrets", []))
         return secrets
 
     def get_public_key(self, org: str, repo: str, target: str) -> dict:
@@ -495,9 +1222,13 @@ def cmd_delete(client: GitHubClient, args: argparse.Namespace):
 def _resolve_repos(client: GitHubClient, args: argparse.Namespace) -> list[str]:
     if args.repos:
         return [r.strip() for r in args.repos.split(",")]
-    logging.info("리포지토리 목록 가져오는 중...")
-    repos = client.list_repos(args.org)
-    logging.info(f"총 {len(repos)}개 리포지토리 발견 (archived 제외)")
+    if _inventory is not None:
+        logging.info("리포지토리 인벤토리 갱신 중...")
+        repos = _inventory.refresh(client, args.org)
+    else:
+        logging.info("리포지토리 목록 가져오는 중...")
+        repos = client.list_repos(args.org)
+    logging.info(f"총 {len(repos)}개 리포지토리 발견 (archived·disabled 제외)")
     return repos
 
 
@@ -669,6 +1400,28 @@ def build_parser() -> argparse.ArgumentParser:
     common.add_argument(
         "-v", "--verbose", action="store_true", help="상세 로그 출력"
     )
+    common.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=f"GET 요청의 디스크 ETag 캐시 비활성화 ({CACHE_DIR})",
+    )
+    common.add_argument(
+        "--no-inventory",
+        action="store_true",
+        help=f"로컬 인벤토리({INVENTORY_PATH})를 갱신하는 대신 모든 repo를 "
+        f"처음부터 조회",
+    )
+    common.add_argument(
+        "--metrics-port",
+        type=int,
+        help="실행 중 이 포트의 GET /metrics로 Prometheus 메트릭 제공 "
+        "(요청, 레이트 리밋, 결과, 대기)",
+    )
+    common.add_argument(
+        "--metrics-host",
+        default="127.0.0.1",
+        help="--metrics-port의 바인드 주소 (기본: 127.0.0.1)",
+    )
 
     parser = argparse.ArgumentParser(
         prog="github-secrets-manage",
@@ -771,6 +1524,7 @@ def build_parser() -> argparse.ArgumentParser:
 
 
 def main():
+    global _inventory
     parser = build_parser()
     args = parser.parse_args()
 
@@ -779,13 +1533,23 @@ def main():
         format="%(levelname)s: %(message)s",
     )
 
-    token = os.environ.get("GITHUB_TOKEN", "")
-    if not token:
+    try:
+        tokens = TokenPool.from_env(args.org)
+    except (RuntimeError, OSError) as e:
+        print(f"{Color.RED}✗ {e}{Color.RESET}")
+        sys.exit(1)
+    if not tokens:
         print(f"{Color.RED}✗ GITHUB_TOKEN 환경변수를 설정해주세요.{Color.RESET}")
         print("  export GITHUB_TOKEN='ghp_xxxxxxxxxxxx'")
+        print("  (토큰 풀은 GITHUB_TOKENS, GitHub App은 GITHUB_APP_ID)")
         sys.exit(1)
 
-    client = GitHubClient(token)
+    cache = None if args.no_cache else HTTPCache()
+    client = GitHubClient(tokens, cache=cache)
+    if not args.no_inventory:
+        _inventory = Inventory()
+    if args.metrics_port:
+        MetricsEndpoint(args.metrics_host, args.metrics_port, client).start()
 
     commands = {
         "list": cmd_list,
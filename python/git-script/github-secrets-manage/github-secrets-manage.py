@@ -49,17 +49,27 @@ Usage examples:
 from __future__ import annotations
 
 import argparse
+import hashlib
 import json
 import logging
 import os
+import re
+import sqlite3
 import sys
+import threading
 import time
 from base64 import b64encode
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
+from urllib.parse import parse_qs, urlencode, urlparse
 
 import requests
+from requests.structures import CaseInsensitiveDict
 from nacl import encoding, public
 
 # ─────────────────────────────────────────────
@@ -67,8 +77,68 @@ from nacl import encoding, public
 # ─────────────────────────────────────────────
 GITHUB_API = "https://api.github.com"
 PER_PAGE = 100
+# Pages of one listing fetched at once, after the first page's Link header
+# gives the page count
+PAGE_WORKERS = 8
 RATE_LIMIT_BUFFER = 10
 REQUEST_TIMEOUT = 30
+# Re-mint a GitHub App installation token this long before it expires (1h tokens)
+APP_TOKEN_REFRESH = 300
+# After a failed mint, leave that installation to the rest of the pool this long
+APP_MINT_RETRY = 60
+
+# Conditional-request cache (ETag / Last-Modified), next to logs/ by default
+CACHE_DIR = Path(".cache") / "github-http"
+CACHE_MAX_BYTES = 50 * 1024 * 1024
+
+# Local repo inventory (SQLite), shared with dependabot-pr-merge when both run
+# from the same directory, so the schema includes its PR tables: dropping a
+# repo drops its cached PRs too. The whole owner is re-listed every
+# INVENTORY_FULL_SWEEP seconds to catch deleted / transferred repos.
+INVENTORY_PATH = Path(".cache") / "inventory.sqlite3"
+INVENTORY_FULL_SWEEP = 24 * 3600
+INVENTORY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS repos (
+    owner TEXT NOT NULL,
+    name TEXT NOT NULL,
+    pushed_at TEXT NOT NULL DEFAULT '',
+    updated_at TEXT NOT NULL DEFAULT '',
+    archived INTEGER NOT NULL DEFAULT 0,
+    disabled INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (owner, name)
+);
+CREATE TABLE IF NOT EXISTS sweeps (
+    owner TEXT PRIMARY KEY,
+    full_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pr_lists (
+    owner TEXT NOT NULL,
+    repo TEXT NOT NULL,
+    pushed_at TEXT NOT NULL,
+    PRIMARY KEY (owner, repo)
+);
+CREATE TABLE IF NOT EXISTS prs (
+    owner TEXT NOT NULL,
+    repo TEXT NOT NULL,
+    number INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    head TEXT NOT NULL,
+    url TEXT NOT NULL,
+    updates TEXT NOT NULL DEFAULT '{}',
+    PRIMARY KEY (owner, repo, number)
+);
+"""
+
+# --metrics-port: upper bounds (seconds) of the wait-duration histogram buckets
+WAIT_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1800)
+
+# Metric labels: owner, repo and secret name collapse into a template so
+# request counts aggregate per endpoint
+ENDPOINT_TEMPLATES = [
+    (re.compile(r"^/repos/[^/]+/[^/]+"), "/repos/{o}/{r}"),
+    (re.compile(r"/secrets/(?!public-key$)[^/]+$"), "/secrets/{name}"),
+    (re.compile(r"^/(orgs|users)/[^/]+"), r"/\1/{org}"),
+]
 
 
 class Color:
@@ -112,27 +182,657 @@ class Stats:
         else:
             self.failed += 1
         self.details.append(result)
+        _metrics.result(result)
 
 
 # ─────────────────────────────────────────────
-# GitHub API Client
+# HTTP cache (conditional requests)
 # ─────────────────────────────────────────────
-class GitHubClient:
-    """GitHub API client with rate-limit handling."""
+class HTTPCache:
+    """
+    On-disk cache of GET responses, revalidated with ETag / Last-Modified.
 
-    def __init__(self, token: str):
-        self.token = token
-        self.session = requests.Session()
-        self.session.headers.update(
+    A 304 reply is answered from disk and does not count against the primary
+    rate limit. One JSON file per credential+URL+params, so a body fetched
+    with one token is never served to another that may not see the same data;
+    once the directory grows past max_bytes the least recently used entries
+    are evicted.
+    """
+
+    # Response headers worth replaying from the cache (pagination, body type)
+    KEEP_HEADERS = ("Content-Type", "Link")
+
+    def __init__(self, path: Path = CACHE_DIR, max_bytes: int = CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._size = sum(f.stat().st_size for f in self.path.glob("*.json"))
+
+    def _file(self, url: str, params: dict | None, credential: str) -> Path:
+        # Hashed, so the credential (a PAT) never shows up in a file name.
+        key = f"{credential} {url}?{urlencode(sorted((params or {}).items()))}"
+        return self.path / f"{hashlib.sha256(key.encode()).hexdigest()}.json"
+
+    def load(self, url: str, params: dict | None, credential: str) -> dict | None:
+        try:
+            return json.loads(self._file(url, params, credential).read_text())
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def validators(entry: dict) -> dict:
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, url: str, params: dict | None, credential: str, resp: requests.Response):
+        etag = resp.headers.get("ETag")
+        last_modified = resp.headers.get("Last-Modified")
+        if not (etag or last_modified):
+            return
+        data = json.dumps(
             {
-                "Authorization": f"token {token}",
-                "Accept": "application/vnd.github.v3+json",
+                "etag": etag,
+                "last_modified": last_modified,
+                "headers": {h: resp.headers[h] for h in self.KEEP_HEADERS if h in resp.headers},
+                "body": resp.text,
             }
         )
+        f = self._file(url, params, credential)
+        with self._lock:
+            old = f.stat().st_size if f.exists() else 0
+            tmp = f.with_suffix(".tmp")
+            tmp.write_text(data)
+            os.replace(tmp, f)
+            self._size += f.stat().st_size - old
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def replay(
+        self,
+        url: str,
+        params: dict | None,
+        credential: str,
+        entry: dict,
+        resp: requests.Response,
+    ) -> requests.Response:
+        """Turn a 304 into the cached 200, keeping the fresh rate-limit headers."""
+        try:
+            os.utime(self._file(url, params, credential))  # mark as recently used
+        except OSError:
+            pass
+        cached = requests.Response()
+        cached.status_code = 200
+        cached._content = entry["body"].encode("utf-8")
+        cached.encoding = "utf-8"
+        cached.headers = CaseInsensitiveDict(entry["headers"])
+        cached.headers.update(
+            {k: v for k, v in resp.headers.items() if k.lower().startswith("x-ratelimit")}
+        )
+        cached.url = resp.url
+        cached.request = resp.request
+        return cached
+
+    def _evict(self):
+        # Drop least recently used entries down to 90% of the budget.
+        files = sorted(self.path.glob("*.json"), key=lambda f: f.stat().st_mtime)
+        for f in files:
+            if self._size <= self.max_bytes * 0.9:
+                break
+            size = f.stat().st_size
+            f.unlink(missing_ok=True)
+            self._size -= size
+
+
+# ─────────────────────────────────────────────
+# Repo inventory (SQLite, incremental refresh)
+# ─────────────────────────────────────────────
+class Inventory:
+    """
+    Local SQLite record of an owner's repos.
+
+    refresh() lists repos most recently updated first (`sort=updated`) and
+    stops at the first one whose updated_at and pushed_at match the stored
+    row, so an org where nothing changed costs one request. The early stop
+    relies on GitHub bumping updated_at (the sort key) on every push and
+    settings edit; a change that doesn't is only seen by the daily full sweep.
+    """
+
+    def __init__(self, path: Path = INVENTORY_PATH):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path)
+        with self._db:
+            self._db.executescript(INVENTORY_SCHEMA)
+
+    def refresh(self, client: GitHubClient, org: str) -> list[str]:
+        """Bring `org`'s repos up to date; returns the active ones, sorted."""
+        stored = {
+            name: (updated, pushed)
+            for name, updated, pushed in self._db.execute(
+                "SELECT name, updated_at, pushed_at FROM repos WHERE owner = ?", (org,)
+            )
+        }
+        row = self._db.execute("SELECT full_at FROM sweeps WHERE owner = ?", (org,)).fetchone()
+        full = not stored or not row or time.time() - row[0] >= INVENTORY_FULL_SWEEP
+
+        changed: list[tuple] = []
+        for repo in client.iter_repos_by_update(org):
+            stamps = (repo.get("updated_at") or "", repo.get("pushed_at") or "")
+            if not full and stored.get(repo["name"]) == stamps:
+                break
+            changed.append(
+                (
+                    org,
+                    repo["name"],
+                    stamps[1],
+                    stamps[0],
+                    int(bool(repo.get("archived"))),
+                    int(bool(repo.get("disabled"))),
+                )
+            )
+
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO repos VALUES (?, ?, ?, ?, ?, ?)", changed
+            )
+            if full:
+                # Same transaction: dependabot-pr-merge's cached PRs go with the repo.
+                gone = [(org, name) for name in set(stored) - {c[1] for c in changed}]
+                for table, column in (("pr_lists", "repo"), ("prs", "repo"), ("repos", "name")):
+                    self._db.executemany(
+                        f"DELETE FROM {table} WHERE owner = ? AND {column} = ?", gone
+                    )
+                self._db.execute(
+                    "INSERT OR REPLACE INTO sweeps VALUES (?, ?)", (org, time.time())
+                )
+        repos = [
+            name
+            for (name,) in self._db.execute(
+                "SELECT name FROM repos WHERE owner = ? AND NOT archived AND NOT disabled "
+                "ORDER BY name",
+                (org,),
+            )
+        ]
+        kind = "full sweep" if full else "incremental sweep"
+        logging.info(f"Inventory: {len(changed)} repo(s) new or changed ({kind})")
+        return repos
+
+
+# ─────────────────────────────────────────────
+# Token pool (PATs and GitHub App installations)
+# ─────────────────────────────────────────────
+@dataclass
+class Token:
+    label: str  # never the secret itself: this one is logged
+    value: str = ""
+    installation: str = ""  # GitHub App installation id (minted token)
+    expires: float = 0.0
+    # resource -> {"limit", "remaining", "reset"} from this token's last reply
+    quota: dict[str, dict] = field(default_factory=dict)
+    last_used: float = 0.0
+    # Held while minting, so only one thread mints a slot and the pool stays free
+    minting: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+    mint_retry: float = 0.0  # no new mint attempt before this (after a failure)
+
+
+class GitHubApp:
+    """Mints installation tokens for a GitHub App (needs PyJWT[crypto])."""
+
+    def __init__(self, app_id: str, private_key: str):
+        try:
+            import jwt  # noqa: F401  (optional: only GitHub App auth needs it)
+        except ImportError:
+            raise RuntimeError(
+                "GitHub App auth needs PyJWT with crypto support: pip install 'PyJWT[crypto]'"
+            )
+        self.app_id = app_id
+        self.private_key = private_key
+
+    def _headers(self) -> dict:
+        import jwt
+
+        now = int(time.time())
+        # Backdated for clock drift; GitHub caps app JWTs at 10 minutes.
+        payload = {"iat": now - 60, "exp": now + 540, "iss": self.app_id}
+        return {
+            "Authorization": f"Bearer {jwt.encode(payload, self.private_key, algorithm='RS256')}",
+            "Accept": "application/vnd.github.v3+json",
+        }
+
+    def find_installation(self, org: str) -> str:
+        """Installation id of this App on an org (or user) account."""
+        for kind in ("orgs", "users"):
+            resp = requests.get(
+                f"{GITHUB_API}/{kind}/{org}/installation",
+                headers=self._headers(),
+                timeout=REQUEST_TIMEOUT,
+            )
+            if resp.status_code == 200:
+                return str(resp.json()["id"])
+        raise RuntimeError(
+            f"GitHub App {self.app_id} is not installed on {org}: HTTP {resp.status_code}"
+        )
+
+    def mint(self, installation: str) -> tuple[str, float]:
+        """A fresh installation token and its expiry (epoch seconds)."""
+        resp = requests.post(
+            f"{GITHUB_API}/app/installations/{installation}/access_tokens",
+            headers=self._headers(),
+            timeout=REQUEST_TIMEOUT,
+        )
+        if resp.status_code != 201:
+            raise RuntimeError(
+                f"Failed to mint a token for installation {installation}: HTTP {resp.status_code}"
+            )
+        data = resp.json()
+        expires = datetime.fromisoformat(data["expires_at"].replace("Z", "+00:00")).timestamp()
+        return data["token"], expires
+
+
+class TokenUnavailable(requests.RequestException):
+    """No token in the pool could be used: every App installation failed to mint."""
+
+
+class TokenPool:
+    """
+    Tokens the client spreads its requests over, shared by all threads.
+
+    Each request goes out with the token that has the most quota left for its
+    resource (untried tokens first, then least recently used on ties), so N
+    tokens give roughly N x 5,000 requests an hour. GitHub App installation
+    tokens are minted on first use and re-minted APP_TOKEN_REFRESH seconds
+    before they expire, outside the pool lock so other threads keep picking
+    while one waits on GitHub. An installation that fails to mint is skipped
+    in favour of the rest of the pool. quota() sums the pool for the rate-limit wait.
+    """
+
+    def __init__(self, tokens: list[Token], app: GitHubApp | None = None):
+        self.tokens = tokens
+        self.app = app
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, org: str) -> TokenPool:
+        """GITHUB_TOKEN / GITHUB_TOKENS, plus a GitHub App if GITHUB_APP_ID is set."""
+        values = [os.environ.get("GITHUB_TOKEN", "")]
+        values += os.environ.get("GITHUB_TOKENS", "").split(",")
+        values = list(dict.fromkeys(v.strip() for v in values if v.strip()))
+        tokens = [Token(label=f"token {i + 1}", value=v) for i, v in enumerate(values)]
+
+        app = None
+        app_id = os.environ.get("GITHUB_APP_ID", "")
+        if app_id:
+            key = os.environ.get("GITHUB_APP_PRIVATE_KEY", "")
+            key_file = os.environ.get("GITHUB_APP_PRIVATE_KEY_FILE", "")
+            if not key and key_file:
+                key = Path(key_file).expanduser().read_text()
+            if not key:
+                raise RuntimeError(
+                    "GITHUB_APP_ID needs GITHUB_APP_PRIVATE_KEY or GITHUB_APP_PRIVATE_KEY_FILE"
+                )
+            app = GitHubApp(app_id, key)
+            ids = os.environ.get("GITHUB_APP_INSTALLATION_ID", "")
+            installations = [i.strip() for i in ids.split(",") if i.strip()]
+            for installation in installations or [app.find_installation(org)]:
+                tokens.append(
+                    Token(label=f"app installation {installation}", installation=installation)
+                )
+        return cls(tokens, app)
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    def pick(self, resource: str) -> Token:
+        """The token with the most `resource` quota left, minted/refreshed if needed."""
+        failed: list[Token] = []
+        while True:
+            with self._lock:
+                now = time.time()
+
+                def left(t: Token) -> float:
+                    q = t.quota.get(resource)
+                    if not q or q["reset"] <= now:
+                        return float("inf")  # untried, or its window has reset
+                    return q["remaining"]
+
+                usable = [t for t in self.tokens if all(t is not f for f in failed)]
+                if not usable:
+                    raise TokenUnavailable(f"no usable token: {failed[-1].label} failed to mint")
+                # Installations backing off from a failed mint go last.
+                token = max(
+                    usable, key=lambda t: (t.mint_retry <= now, left(t), -t.last_used)
+                )
+                token.last_used = now
+            if not token.installation or self._mint(token):
+                return token
+            failed.append(token)
+
+    def _mint(self, token: Token) -> bool:
+        """Mint `token` if it is (nearly) expired; False if it can't be used."""
+        # Threads that picked the same slot wait here; the first one mints.
+        with token.minting:
+            now = time.time()
+            if token.expires - now >= APP_TOKEN_REFRESH or token.mint_retry > now:
+                # The current token may still have a few minutes left.
+                return token.expires > now
+            try:
+                token.value, token.expires = self.app.mint(token.installation)
+            except (RuntimeError, requests.RequestException) as e:
+                logging.warning(
+                    f"Could not mint a token for {token.label} ({e}); "
+                    f"using the rest of the pool for {APP_MINT_RETRY}s"
+                )
+                token.mint_retry = now + APP_MINT_RETRY
+                return token.expires > now
+            logging.debug(f"Minted a token for {token.label}")
+            return True
+
+    def observe(self, token: Token, resource: str, resp: requests.Response) -> str:
+        """Record a reply's quota headers for `token`; returns the resource they name."""
+        h = resp.headers
+        resource = h.get("X-RateLimit-Resource", resource)
+        if "X-RateLimit-Remaining" in h:
+            with self._lock:
+                token.quota[resource] = {
+                    "limit": int(h.get("X-RateLimit-Limit", 0)),
+                    "remaining": int(h["X-RateLimit-Remaining"]),
+                    "reset": int(h.get("X-RateLimit-Reset", 0)),
+                }
+        return resource
+
+    def quota(self, resource: str) -> dict | None:
+        """
+        The pool's combined quota for `resource`.
+
+        `remaining` / `limit` are summed over tokens; `reset` is the latest
+        reset and `refill` the earliest, i.e. when an exhausted pool gets
+        requests back.
+        """
+        with self._lock:
+            now = time.time()
+            seen = [t.quota[resource] for t in self.tokens if resource in t.quota]
+            if not seen:
+                return None
+            # A token that has not replied yet is assumed to have a full quota.
+            fresh = len(self.tokens) - len(seen)
+            limit = max(q["limit"] for q in seen)
+            return {
+                "limit": sum(q["limit"] for q in seen) + fresh * limit,
+                "remaining": sum(q["remaining"] if q["reset"] > now else q["limit"] for q in seen)
+                + fresh * limit,
+                "reset": max(q["reset"] for q in seen),
+                "refill": min(q["reset"] for q in seen),
+            }
+
+
+# ─────────────────────────────────────────────
+# Prometheus metrics (--metrics-port)
+# ─────────────────────────────────────────────
+def _endpoint_template(method: str, url: str) -> str:
+    """`PUT /repos/{o}/{r}/actions/secrets/{name}`-style label for a request URL."""
+    path = url[len(GITHUB_API):] if url.startswith(GITHUB_API) else url
+    for pattern, repl in ENDPOINT_TEMPLATES:
+        path = pattern.sub(repl, path)
+    return f"{method} {path}"
+
+
+class Metrics:
+    """
+    Counters behind --metrics-port, shared by all threads.
+
+    GitHubClient counts every request by endpoint template and status and
+    times its rate-limit waits; Stats.record counts outcomes (success,
+    skipped, failed). Nothing is reset, so every counter only goes up.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.last_result = 0.0
+        self._requests: dict[tuple[str, str], int] = {}
+        self._seconds: dict[str, float] = {}
+        self._results: dict[str, int] = {}
+        self._waiting: dict[int, str] = {}  # thread id -> reason, while asleep
+        self._waits: dict[str, dict] = {}  # reason -> WAIT_BUCKETS counts, count, sum
+
+    def request(self, label: str, status: int, seconds: float):
+        with self._lock:
+            key = (label, str(status))
+            self._requests[key] = self._requests.get(key, 0) + 1
+            self._seconds[label] = self._seconds.get(label, 0.0) + seconds
+
+    def result(self, result: RepoResult):
+        outcome = "failed" if not result.success else (
+            "skipped" if result.action == "skipped" else "success"
+        )
+        with self._lock:
+            self._results[outcome] = self._results.get(outcome, 0) + 1
+            self.last_result = time.time()
+
+    @contextmanager
+    def waiting(self, reason: str):
+        """Time a sleep under `reason`; meanwhile the thread counts as waiting on it."""
+        thread = threading.get_ident()
+        with self._lock:
+            self._waiting[thread] = reason
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            seconds = time.monotonic() - start
+            with self._lock:
+                self._waiting.pop(thread, None)
+                entry = self._waits.setdefault(
+                    reason, {"buckets": [0] * len(WAIT_BUCKETS), "count": 0, "sum": 0.0}
+                )
+                entry["count"] += 1
+                entry["sum"] += seconds
+                for i, bound in enumerate(WAIT_BUCKETS):
+                    if seconds <= bound:
+                        entry["buckets"][i] += 1
+                        break
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            waiting: dict[str, int] = {reason: 0 for reason in self._waits}
+            for reason in self._waiting.values():
+                waiting[reason] = waiting.get(reason, 0) + 1
+            return {
+                "requests": dict(sorted(self._requests.items())),
+                "seconds": dict(sorted(self._seconds.items())),
+                "results": dict(sorted(self._results.items())),
+                "waiting": dict(sorted(waiting.items())),
+                "waits": {
+                    reason: {
+                        **e,
+                        "buckets": [sum(e["buckets"][: i + 1]) for i in range(len(WAIT_BUCKETS))],
+                    }
+                    for reason, e in sorted(self._waits.items())
+                },
+            }
+
+
+# Request / outcome / wait counters for --metrics-port.
+_metrics = Metrics()
+
+# Repo inventory (None = --no-inventory: list every repo every run).
+_inventory: Inventory | None = None
+
+
+def _prometheus_labels(labels: dict[str, str]) -> str:
+    """`{k="v",...}` with values escaped for the text format ("" without labels)."""
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _prometheus_text(client: GitHubClient) -> str:
+    """Current counters in the Prometheus text exposition format."""
+    out: list[str] = []
+
+    def metric(name: str, kind: str, help_: str, samples: list[tuple[dict, float]]):
+        out.append(f"# HELP github_secrets_{name} {help_}")
+        out.append(f"# TYPE github_secrets_{name} {kind}")
+        for labels, value in samples:
+            out.append(f"github_secrets_{name}{_prometheus_labels(labels)} {value}")
+
+    snap = _metrics.snapshot()
+    metric(
+        "api_requests_total",
+        "counter",
+        "GitHub API requests by endpoint template and HTTP status.",
+        [({"endpoint": label, "status": status}, n) for (label, status), n in snap["requests"].items()],
+    )
+    metric(
+        "api_request_seconds_total",
+        "counter",
+        "Time spent on the wire per endpoint template.",
+        [({"endpoint": label}, round(t, 3)) for label, t in snap["seconds"].items()],
+    )
+    quota = client.tokens.quota("core")
+    if quota:
+        metric(
+            "rate_limit_remaining",
+            "gauge",
+            "Core requests left in the current window (whole token pool).",
+            [({"resource": "core"}, quota["remaining"])],
+        )
+        metric(
+            "rate_limit_limit",
+            "gauge",
+            "Core window size (whole token pool).",
+            [({"resource": "core"}, quota["limit"])],
+        )
+    metric(
+        "items_total",
+        "counter",
+        "Repo/secret operations processed, by outcome (success, skipped, failed).",
+        [({"result": r}, n) for r, n in snap["results"].items()],
+    )
+    metric(
+        "last_result_timestamp_seconds",
+        "gauge",
+        "Unix time the last outcome was recorded (0 before the first); alert when it stops moving.",
+        [({}, _metrics.last_result)],
+    )
+    metric(
+        "start_time_seconds",
+        "gauge",
+        "Unix time the process started.",
+        [({}, _metrics.started)],
+    )
+    metric(
+        "waiting",
+        "gauge",
+        "Threads asleep right now, by wait reason.",
+        [({"reason": r}, n) for r, n in snap["waiting"].items()],
+    )
+    out.append("# HELP github_secrets_wait_seconds Duration of each sleep, by wait reason.")
+    out.append("# TYPE github_secrets_wait_seconds histogram")
+    for reason, h in snap["waits"].items():
+        for bound, n in zip(WAIT_BUCKETS, h["buckets"]):
+            labels = _prometheus_labels({"reason": reason, "le": f"{bound:g}"})
+            out.append(f"github_secrets_wait_seconds_bucket{labels} {n}")
+        labels = _prometheus_labels({"reason": reason, "le": "+Inf"})
+        out.append(f"github_secrets_wait_seconds_bucket{labels} {h['count']}")
+        labels = _prometheus_labels({"reason": reason})
+        out.append(f"github_secrets_wait_seconds_sum{labels} {round(h['sum'], 3)}")
+        out.append(f"github_secrets_wait_seconds_count{labels} {h['count']}")
+    return "\n".join(out) + "\n"
+
+
+class MetricsEndpoint:
+    """GET /metrics: Prometheus text metrics while a run is in progress."""
+
+    def __init__(self, host: str, port: int, client: GitHubClient):
+        self.client = client
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        host, port = self.server.server_address[:2]
+        logging.info(f"Metrics endpoint on http://{host}:{port}/metrics")
+
+    def _handler(self):
+        endpoint = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, fmt, *args):
+                logging.debug(f"metrics: {fmt % args}")
+
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                body = _prometheus_text(endpoint.client).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+
+# ─────────────────────────────────────────────
+# GitHub API Client
+# ─────────────────────────────────────────────
+def _last_page(resp: requests.Response) -> int:
+    """Page count from a listing's `Link: <...&page=N>; rel="last"` (1 without one)."""
+    last = resp.links.get("last", {}).get("url")
+    if not last:
+        return 1
+    return int(parse_qs(urlparse(last).query).get("page", ["1"])[0])
+
+
+class GitHubClient:
+    """GitHub API client with rate-limit handling over a TokenPool."""
+
+    def __init__(self, tokens: TokenPool, cache: HTTPCache | None = None):
+        self.tokens = tokens
+        self.cache = cache
+        self.session = requests.Session()
+        # Authorization is set per request, from the pool.
+        self.session.headers.update({"Accept": "application/vnd.github.v3+json"})
 
     def _request(self, method: str, url: str, **kwargs) -> requests.Response:
-        resp = self.session.request(method, url, timeout=REQUEST_TIMEOUT, **kwargs)
-        self._handle_rate_limit(resp)
+        params = kwargs.get("params")
+        headers = kwargs.pop("headers", {})
+        cached = self.cache is not None and method == "GET"
+        for _ in range(len(self.tokens)):
+            token = self.tokens.pick("core")
+            # Cached per credential; an App token's value rotates, its installation doesn't.
+            credential = token.installation or token.value
+            entry = self.cache.load(url, params, credential) if cached else None
+            validators = self.cache.validators(entry) if entry else {}
+            auth = {**headers, **validators, "Authorization": f"token {token.value}"}
+            start = time.monotonic()
+            resp = self.session.request(
+                method, url, headers=auth, timeout=REQUEST_TIMEOUT, **kwargs
+            )
+            _metrics.request(
+                _endpoint_template(method, url), resp.status_code, time.monotonic() - start
+            )
+            self.tokens.observe(token, "core", resp)
+            # Only this token ran dry: the next pick is one with quota left.
+            if resp.status_code != 403 or resp.headers.get("X-RateLimit-Remaining") != "0":
+                break
+            logging.info(f"{token.label} is out of quota; retrying with another token")
+        self._handle_rate_limit()
+        if entry and resp.status_code == 304:
+            return self.cache.replay(url, params, credential, entry, resp)
+        if cached and resp.status_code == 200:
+            self.cache.store(url, params, credential, resp)
         return resp
 
     def get(self, path: str, **kwargs) -> requests.Response:
@@ -144,59 +844,90 @@ class GitHubClient:
     def delete_req(self, path: str, **kwargs) -> requests.Response:
         return self._request("DELETE", f"{GITHUB_API}{path}", **kwargs)
 
-    def _handle_rate_limit(self, resp: requests.Response):
-        remaining = int(resp.headers.get("X-RateLimit-Remaining", 999))
+    def _handle_rate_limit(self):
+        # Only when the whole pool is low; wait for the first token to reset.
+        quota = self.tokens.quota("core")
+        remaining = quota["remaining"] if quota else 999
         if remaining <= RATE_LIMIT_BUFFER:
-            reset_ts = int(resp.headers.get("X-RateLimit-Reset", 0))
-            wait = max(reset_ts - int(time.time()), 1) + 1
+            wait = max(quota["refill"] - int(time.time()), 1) + 1
             logging.warning(
                 f"Rate limit approaching (remaining={remaining}). Waiting {wait}s..."
             )
-            time.sleep(wait)
+            with _metrics.waiting("rate limit"):
+                time.sleep(wait)
+
+    def get_pages(self, path: str, params: dict | None = None) -> list[requests.Response]:
+        """
+        Every page of a paginated listing, in page order.
+
+        The first page's `Link: rel="last"` gives the page count, and the
+        remaining pages are fetched concurrently. Without a Link header the
+        first page is the only one. A failed first page is returned alone.
+        """
+        params = {**(params or {}), "per_page": PER_PAGE}
+        first = self.get(path, params={**params, "page": 1})
+        last = _last_page(first) if first.status_code == 200 else 1
+        if last <= 1:
+            return [first]
+        with ThreadPoolExecutor(max_workers=min(last - 1, PAGE_WORKERS)) as pool:
+            rest = pool.map(
+                lambda page: self.get(path, params={**params, "page": page}),
+                range(2, last + 1),
+            )
+            return [first, *rest]
 
     def list_repos(self, org: str) -> list[str]:
         repos: list[str] = []
-        page = 1
-        while True:
-            resp = self.get(
-                f"/orgs/{org}/repos", params={"per_page": PER_PAGE, "page": page}
-            )
-            if resp.status_code == 404:
-                resp = self.get(
-                    f"/users/{org}/repos",
-                    params={"per_page": PER_PAGE, "page": page, "type": "owner"},
-                )
+        pages = self.get_pages(f"/orgs/{org}/repos")
+        if pages[0].status_code == 404:
+            pages = self.get_pages(f"/users/{org}/repos", {"type": "owner"})
+        for page, resp in enumerate(pages, 1):
             if resp.status_code != 200:
                 raise RuntimeError(
                     f"Failed to list repositories: HTTP {resp.status_code}\n{resp.text}"
                 )
             data = resp.json()
-            if not data:
-                break
-            repos.extend(r["name"] for r in data if not r.get("archived", False))
+            repos.extend(
+                r["name"]
+                for r in data
+                if not r.get("archived", False) and not r.get("disabled", False)
+            )
             logging.info(f"  Page {page}: {len(data)} repos (total {len(repos)})")
-            page += 1
         return sorted(repos)
 
+    def iter_repos_by_update(self, org: str) -> Iterator[dict]:
+        """
+        Every repo (archived ones included), most recently updated first.
+
+        Pages are fetched one at a time as the caller iterates, so a caller
+        that stops early (Inventory.refresh) never requests the rest.
+        """
+        path, params = f"/orgs/{org}/repos", {"sort": "updated", "direction": "desc"}
+        page = 1
+        while True:
+            resp = self.get(path, params={**params, "per_page": PER_PAGE, "page": page})
+            if resp.status_code == 404 and page == 1 and path.startswith("/orgs/"):
+                path, params = f"/users/{org}/repos", {**params, "type": "owner"}
+                continue
+            if resp.status_code != 200:
+                raise RuntimeError(
+                    f"Failed to list repositories: HTTP {resp.status_code}\n{resp.text}"
+                )
+            yield from resp.json()
+            if page >= _last_page(resp):
+                return
+            page += 1
+
     def _secret_base(self, target: str) -> str:
         return "actions" if target == "actions" else "dependabot"
 
     def list_secrets(self, org: str, repo: str, target: str) -> list[str]:
         base = self._secret_base(target)
         secrets: list[str] = []
-        page = 1
-        while True:
-            resp = self.get(
-                f"/repos/{org}/{repo}/{base}/secrets",
-                params={"per_page": PER_PAGE, "page": page},
-            )
+        for resp in self.get_pages(f"/repos/{org}/{repo}/{base}/secrets"):
             if resp.status_code != 200:
                 return []
-            data = resp.json()
-            secrets.extend(s["name"] for s in data.get("secrets", []))
-            if len(data.get("secrets", [])) < PER_PAGE:
-                break
-            page += 1
+            secrets.extend(s["name"] for s in resp.json().get("secrets", []))
         return secrets
 
     def get_public_key(self, org: str, repo: str, target: str) -> dict:
@@ -495,9 +1226,13 @@ def cmd_delete(client: GitHubClient, args: argparse.Namespace):
 def _resolve_repos(client: GitHubClient, args: argparse.Namespace) -> list[str]:
     if args.repos:
         return [r.strip() for r in args.repos.split(",")]
-    logging.info("Fetching repository list...")
-    repos = client.list_repos(args.org)
-    logging.info(f"Found {len(repos)} repositories (excluding archived)")
+    if _inventory is not None:
+        logging.info("Refreshing the repository inventory...")
+        repos = _inventory.refresh(client, args.org)
+    else:
+        logging.info("Fetching repository list...")
+        repos = client.list_repos(args.org)
+    logging.info(f"Found {len(repos)} repositories (excluding archived and disabled)")
     return repos
 
 
@@ -670,6 +1405,28 @@ def build_parser() -> argparse.ArgumentParser:
     common.add_argument(
         "-v", "--verbose", action="store_true", help="Enable verbose logging"
     )
+    common.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=f"Disable the on-disk ETag cache for GET requests ({CACHE_DIR})",
+    )
+    common.add_argument(
+        "--no-inventory",
+        action="store_true",
+        help=f"List every repo from scratch instead of refreshing the local "
+        f"inventory ({INVENTORY_PATH})",
+    )
+    common.add_argument(
+        "--metrics-port",
+        type=int,
+        help="Serve Prometheus metrics on GET /metrics on this port while the run is "
+        "in progress (requests, rate limit, outcomes, waits)",
+    )
+    common.add_argument(
+        "--metrics-host",
+        default="127.0.0.1",
+        help="Bind address for --metrics-port (default: 127.0.0.1)",
+    )
 
     parser = argparse.ArgumentParser(
         prog="github-secrets-manage",
@@ -772,6 +1529,7 @@ Examples:
 
 
 def main():
+    global _inventory
     parser = build_parser()
     args = parser.parse_args()
 
@@ -780,13 +1538,23 @@ def main():
         format="%(levelname)s: %(message)s",
     )
 
-    token = os.environ.get("GITHUB_TOKEN", "")
-    if not token:
+    try:
+        tokens = TokenPool.from_env(args.org)
+    except (RuntimeError, OSError) as e:
+        print(f"{Color.RED}✗ {e}{Color.RESET}")
+        sys.exit(1)
+    if not tokens:
         print(f"{Color.RED}✗ Please set the GITHUB_TOKEN environment variable.{Color.RESET}")
         print("  export GITHUB_TOKEN='ghp_xxxxxxxxxxxx'")
+        print("  (or GITHUB_TOKENS for a pool of tokens, or GITHUB_APP_ID for a GitHub App)")
         sys.exit(1)
 
-    client = GitHubClient(token)
+    cache = None if args.no_cache else HTTPCache()
+    client = GitHubClient(tokens, cache=cache)
+    if not args.no_inventory:
+        _inventory = Inventory()
+    if args.metrics_port:
+        MetricsEndpoint(args.metrics_host, args.metrics_port, client).start()
 
     commands = {
         "list": cmd_list,